@@ -0,0 +1,271 @@
+"""
+Cold-start latency tracking for the Triton Admin Dashboard.
+
+Records how long model loads take, per model and per storage backend, so the
+dashboard can report p50/p95 cold-start figures instead of only showing the
+UNAVAILABLE/LOADING -> READY state transition.
+
+Two kinds of loads are recorded:
+
+- "triggered": loads the dashboard itself issued (POST .../load). Triton's
+  repository load call blocks until the model is READY, so the request round
+  trip is the load duration.
+- "observed": loads started elsewhere (the proxy's auto-load on first request,
+  another client, admin scripts) that the dashboard only sees through its
+  repository index polling. These are bounded by the poll interval, so they
+  are less precise than triggered loads.
+
+Each load is split into phases where they can be observed from outside Triton:
+
+- load: repository load call -> READY (weight read + backend initialize; the
+  two are not separable without instrumentation inside the model itself)
+- first_inference: the first real inference after READY (the dashboard's
+  quick-test stage), which captures lazy work such as CUDA context setup,
+  kernel autotuning and page-cache misses on memory-mapped weights
+
+State is in-memory only (single-replica dashboard), bounded per model.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Maximum samples kept per (namespace, model, storage backend)
+MAX_SAMPLES_PER_MODEL = 200
+
+# A first inference is only attributed to a load if it happens within this
+# many seconds of the model becoming READY
+FIRST_INFERENCE_WINDOW_SECS = 300.0
+
+
+@dataclass
+class LoadSample:
+    """A single completed model load."""
+    model: str
+    namespace: str
+    storage_backend: str
+    source: str  # "triggered" or "observed"
+    started_at: float
+    ready_at: float
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_secs(self) -> float:
+        """Load duration plus any attributed post-READY phases."""
+        return (self.ready_at - self.started_at) + self.phases.get("first_inference", 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "namespace": self.namespace,
+            "storage_backend": self.storage_backend,
+            "source": self.source,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "load_secs": round(self.ready_at - self.started_at, 3),
+            "total_secs": round(self.total_secs, 3),
+            "phases": {k: round(v, 3) for k, v in self.phases.items()},
+        }
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0-100). Returns None for no data."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Count/p50/p95/max summary of a list of durations in seconds."""
+    return {
+        "count": len(values),
+        "p50_secs": _round(percentile(values, 50)),
+        "p95_secs": _round(percentile(values, 95)),
+        "max_secs": _round(max(values)) if values else None,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+class ColdStartTracker:
+    """Thread-safe store of per-model load-duration samples."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES_PER_MODEL):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str, str], Deque[LoadSample]] = {}
+        # In-flight loads: (namespace, model) -> (started_at, source, storage_backend)
+        self._pending: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+        # Last repository state seen per (namespace, model), for observed loads
+        self._last_state: Dict[Tuple[str, str], str] = {}
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def start_load(self, namespace: str, model: str, storage_backend: str,
+                   source: str = "triggered", started_at: Optional[float] = None) -> None:
+        """Mark the start of a load (no-op if one is already in flight)."""
+        key = (namespace, model)
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = (started_at or time.time(), source, storage_backend)
+
+    def finish_load(self, namespace: str, model: str,
+                    ready_at: Optional[float] = None) -> Optional[LoadSample]:
+        """Mark a pending load as READY and record its sample."""
+        key = (namespace, model)
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return None
+            started_at, source, backend = pending
+            sample = LoadSample(
+                model=model,
+                namespace=namespace,
+                storage_backend=backend,
+                source=source,
+                started_at=started_at,
+                ready_at=ready_at or time.time(),
+            )
+            self._append(sample)
+            self._last_state[key] = "READY"
+            return sample
+
+    def abort_load(self, namespace: str, model: str) -> None:
+        """Drop a pending load that failed (failures are not cold starts)."""
+        with self._lock:
+            self._pending.pop((namespace, model), None)
+
+    def record_first_inference(self, namespace: str, model: str, duration_secs: float) -> bool:
+        """Attach a first-inference duration to the model's most recent load.
+
+        Only attributed if the load completed recently and has no
+        first-inference phase yet. Returns True if the phase was recorded.
+        """
+        now = time.time()
+        with self._lock:
+            latest = self._latest_sample(namespace, model)
+            if latest is None or "first_inference" in latest.phases:
+                return False
+            if now - latest.ready_at > FIRST_INFERENCE_WINDOW_SECS:
+                return False
+            latest.phases["first_inference"] = duration_secs
+            return True
+
+    def observe_states(self, namespace: str, states: Dict[str, Optional[str]],
+                       storage_backend: str) -> None:
+        """Feed the latest repository index states to detect observed loads.
+
+        A model first seen LOADING and later READY is recorded as an observed
+        load starting at the first LOADING poll. Loads that go straight from
+        UNAVAILABLE to READY between two polls have no usable start time and
+        are not recorded. Triggered loads in flight are left alone.
+        """
+        now = time.time()
+        finished = []
+        with self._lock:
+            for model, state in states.items():
+                if not model or not state:
+                    continue
+                key = (namespace, model)
+                previous = self._last_state.get(key)
+                self._last_state[key] = state
+
+                if state == "LOADING" and key not in self._pending:
+                    self._pending[key] = (now, "observed", storage_backend)
+                elif state == "READY" and key in self._pending:
+                    _, source, _ = self._pending[key]
+                    # Triggered loads are finished by their own request
+                    if source == "observed":
+                        finished.append(model)
+                elif state == "UNAVAILABLE" and previous == "LOADING":
+                    # Load failed or was cancelled -- not a cold start
+                    pending = self._pending.get(key)
+                    if pending and pending[1] == "observed":
+                        del self._pending[key]
+        for model in finished:
+            self.finish_load(namespace, model, ready_at=now)
+
+    def _append(self, sample: LoadSample) -> None:
+        key = (sample.namespace, sample.model, sample.storage_backend)
+        bucket = self._samples.get(key)
+        if bucket is None:
+            bucket = deque(maxlen=self.max_samples)
+            self._samples[key] = bucket
+        bucket.append(sample)
+
+    def _latest_sample(self, namespace: str, model: str) -> Optional[LoadSample]:
+        latest = None
+        for (ns, name, _), bucket in self._samples.items():
+            if ns == namespace and name == model and bucket:
+                if latest is None or bucket[-1].ready_at > latest.ready_at:
+                    latest = bucket[-1]
+        return latest
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def samples(self, namespace: str, model: Optional[str] = None) -> List[LoadSample]:
+        """All samples for a namespace (optionally one model), oldest first."""
+        with self._lock:
+            result = [
+                s for (ns, name, _), bucket in self._samples.items()
+                if ns == namespace and (model is None or name == model)
+                for s in bucket
+            ]
+        return sorted(result, key=lambda s: s.ready_at)
+
+    def is_loading(self, namespace: str, model: str) -> bool:
+        with self._lock:
+            return (namespace, model) in self._pending
+
+    def model_stats(self, namespace: str, model: str) -> Dict[str, Any]:
+        """p50/p95 cold-start figures for one model, overall and per backend."""
+        samples = self.samples(namespace, model)
+        by_backend: Dict[str, List[LoadSample]] = {}
+        for s in samples:
+            by_backend.setdefault(s.storage_backend, []).append(s)
+
+        return {
+            "model": model,
+            "load": summarize([s.ready_at - s.started_at for s in samples]),
+            "first_inference": summarize(
+                [s.phases["first_inference"] for s in samples if "first_inference" in s.phases]
+            ),
+            "total": summarize([s.total_secs for s in samples]),
+            "by_storage_backend": {
+                backend: summarize([s.ready_at - s.started_at for s in group])
+                for backend, group in by_backend.items()
+            },
+            "last_load": samples[-1].to_dict() if samples else None,
+        }
+
+    def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        """Per-model and per-storage-backend stats for a namespace."""
+        samples = self.samples(namespace)
+        models = sorted({s.model for s in samples})
+        by_backend: Dict[str, List[float]] = {}
+        for s in samples:
+            by_backend.setdefault(s.storage_backend, []).append(s.ready_at - s.started_at)
+        return {
+            "namespace": namespace,
+            "models": [self.model_stats(namespace, m) for m in models],
+            "by_storage_backend": {b: summarize(v) for b, v in by_backend.items()},
+        }
+
+    def expected_cold_start_secs(self, namespace: str, model: str) -> Optional[float]:
+        """p95 of total cold-start time, used as the expected reload cost."""
+        return percentile([s.total_secs for s in self.samples(namespace, model)], 95)
+
+
+# Global tracker instance (single-replica dashboard)
+tracker = ColdStartTracker()
@@ -33,6 +33,18 @@ class Settings:
     # Should be disabled in Helm deployments (production)
     local_auth_mode: bool
 
+    # Background test-inference jobs (Testing page)
+    test_jobs_max_running: int
+    test_jobs_per_namespace: int
+
+    # Test-inference result cache (Testing page)
+    result_cache_max_entries: int
+    result_cache_max_mb: int
+
+    # OpenTelemetry tracing (requires opentelemetry-sdk)
+    tracing_enabled: bool
+    tracing_exporter: str  # memory, console, or otlp
+
 
 def load_settings() -> Settings:
     """Load settings from environment variables."""
@@ -49,6 +61,12 @@ def load_settings() -> Settings:
         proxy_timeout_secs=float(os.getenv("PROXY_TIMEOUT_SECS", "1600.0")),
         # Local auth mode enabled by default for local dev, disable in Helm
         local_auth_mode=os.getenv("LOCAL_AUTH_MODE", "true").strip().lower() == "true",
+        test_jobs_max_running=int(os.getenv("TEST_JOBS_MAX_RUNNING", "4")),
+        test_jobs_per_namespace=int(os.getenv("TEST_JOBS_PER_NAMESPACE", "2")),
+        result_cache_max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "200")),
+        result_cache_max_mb=int(os.getenv("RESULT_CACHE_MAX_MB", "2048")),
+        tracing_enabled=os.getenv("TRACING_ENABLED", "false").strip().lower() == "true",
+        tracing_exporter=os.getenv("TRACING_EXPORTER", "memory").strip().lower(),
     )
 
 
@@ -106,6 +124,55 @@ def get_grpc_url(namespace: str) -> str:
     return "localhost:50051"
 
 
+def get_storage_backend(namespace: str) -> str:
+    """Get the model storage backend label for a namespace (e.g. "s3-fuse", "efs").
+
+    Configured in namespaces.json via 'storage_backend'. Used to group
+    cold-start statistics by where weights are read from.
+    """
+    deployment = get_deployment(namespace)
+    if deployment:
+        return deployment.get("storage_backend", "default")
+    return "default"
+
+
+def get_test_job_limit(namespace: str) -> int:
+    """Get the maximum number of concurrently running test jobs for a namespace.
+
+    Configured in namespaces.json via 'max_concurrent_test_jobs', defaulting
+    to TEST_JOBS_PER_NAMESPACE.
+    """
+    deployment = get_deployment(namespace)
+    if deployment and deployment.get("max_concurrent_test_jobs"):
+        return int(deployment["max_concurrent_test_jobs"])
+    return settings.test_jobs_per_namespace
+
+
+def get_triton_metrics_url_pattern(namespace: str) -> Optional[str]:
+    """Get the per-pod Triton Prometheus metrics URL pattern for a namespace.
+
+    Configured in namespaces.json via 'triton_metrics_url_pattern', with a
+    {pod} placeholder, e.g.
+    http://{pod}.triton-inference-server-headless.<ns>.svc.cluster.local:8002/metrics
+    """
+    deployment = get_deployment(namespace)
+    if deployment:
+        return deployment.get("triton_metrics_url_pattern")
+    return None
+
+
+def get_triton_metrics_url(namespace: str) -> Optional[str]:
+    """Get a single Triton Prometheus metrics URL for a namespace.
+
+    Configured in namespaces.json via 'triton_metrics_url'. Used when the
+    pods are not individually addressable (e.g. behind one Service).
+    """
+    deployment = get_deployment(namespace)
+    if deployment:
+        return deployment.get("triton_metrics_url")
+    return None
+
+
 def get_model_repo_path(namespace: str) -> str:
     """Get model repository path for a namespace.
 
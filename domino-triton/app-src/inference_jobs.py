@@ -0,0 +1,265 @@
+"""
+Background inference jobs for the Testing page.
+
+A synchronous test request has to finish within one HTTP request, so long
+video tests either complete within the client-script timeout or are lost,
+with no feedback until the end. Jobs decouple the two:
+
+- submit returns a job ID immediately; the job waits in a queue
+- progress (frames processed, FPS, log lines) is published as events that
+  clients follow over Server-Sent Events, resuming via Last-Event-ID
+- queued or running jobs can be cancelled (running client processes are
+  killed by the runner when its task is cancelled)
+- finished jobs are kept in a bounded store, oldest evicted first
+
+Scheduling is fair across namespaces: the next job comes from the namespace
+that was least recently served (FIFO within a namespace), subject to a
+global cap on running jobs and a per-namespace cap, so one namespace's long
+video tests cannot starve another's quick checks.
+
+State is in-memory only (single-replica dashboard).
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+# Finished jobs (with their results) kept for later retrieval
+MAX_FINISHED_JOBS = 100
+
+# Events kept per job for SSE replay (older ones are dropped)
+MAX_EVENTS_PER_JOB = 500
+
+
+@dataclass
+class Job:
+    """A queued, running or finished test inference job."""
+    id: str
+    namespace: str
+    model: str
+    params: Dict[str, Any]
+    created_at: float = field(default_factory=time.time)
+    status: str = QUEUED
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_EVENTS_PER_JOB))
+    last_event_id: int = 0
+    task: Optional[asyncio.Task] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Append an event and wake any SSE subscribers."""
+        self.last_event_id += 1
+        self.events.append({"id": self.last_event_id, "event": event, "data": data})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def update_progress(self, **fields: Any) -> None:
+        """Merge progress fields and publish a progress event."""
+        self.progress.update(fields)
+        self.publish("progress", dict(self.progress))
+
+    def events_after(self, event_id: int) -> List[Dict[str, Any]]:
+        return [e for e in self.events if e["id"] > event_id]
+
+    async def wait_for_events(self, after_id: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events newer than after_id, waiting up to timeout for new ones."""
+        pending = self.events_after(after_id)
+        if pending or self.finished:
+            return pending
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.events_after(after_id)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "namespace": self.namespace,
+            "model": self.model,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+# A runner executes the job and returns its result (a TestInferResponse
+# dict). It may call job.update_progress()/job.publish() as it goes, and must
+# clean up (e.g. kill its subprocess) when cancelled.
+Runner = Callable[[Job], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """Fair scheduler and bounded store for test inference jobs."""
+
+    def __init__(self, max_running: int, namespace_limit: Callable[[str], int],
+                 max_finished: int = MAX_FINISHED_JOBS):
+        self.max_running = max_running
+        self.namespace_limit = namespace_limit
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._runners: Dict[str, Runner] = {}
+        self._queues: Dict[str, Deque[Job]] = {}
+        self._running: Dict[str, int] = {}
+        # Namespace -> when it last had a job started, for fair ordering
+        self._last_served: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Submission and control
+    # ------------------------------------------------------------------
+
+    def submit(self, namespace: str, model: str, params: Dict[str, Any], runner: Runner) -> Job:
+        """Queue a job and start it if capacity allows."""
+        job = Job(id=uuid.uuid4().hex[:12], namespace=namespace, model=model, params=params)
+        self._jobs[job.id] = job
+        self._runners[job.id] = runner
+        queue = self._queues.get(namespace)
+        if queue is None:
+            queue = deque()
+            self._queues[namespace] = queue
+        queue.append(job)
+        job.publish("status", {"status": QUEUED, "queue_position": self.queue_position(job)})
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Returns the job, or None if unknown."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.status == QUEUED:
+            self._queues.get(job.namespace, deque()).remove(job)
+            self._runners.pop(job.id, None)
+            self._finish(job, CANCELLED)
+            self._evict()
+        elif job.task is not None:
+            # _release frees the slot once the task is done, even when it is
+            # cancelled before _run starts
+            job.task.cancel()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, namespace: Optional[str] = None) -> List[Job]:
+        """Jobs newest first, optionally for one namespace."""
+        jobs = [j for j in self._jobs.values() if namespace is None or j.namespace == namespace]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """1-based position within the job's namespace queue, None if not queued."""
+        queue = self._queues.get(job.namespace)
+        if job.status != QUEUED or not queue:
+            return None
+        for i, queued in enumerate(queue):
+            if queued is job:
+                return i + 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_running": self.max_running,
+            "running": dict(self._running),
+            "queued": {ns: len(q) for ns, q in self._queues.items() if q},
+            "stored": len(self._jobs),
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _dispatch(self) -> None:
+        """Start queued jobs, least recently served namespace first, while capacity allows."""
+        while sum(self._running.values()) < self.max_running:
+            eligible = [
+                ns for ns, queue in self._queues.items()
+                if queue and self._running.get(ns, 0) < self.namespace_limit(ns)
+            ]
+            if not eligible:
+                break
+            # Never-served namespaces first, then oldest service; ties by queue age
+            namespace = min(
+                eligible,
+                key=lambda ns: (self._last_served.get(ns, 0.0), self._queues[ns][0].created_at),
+            )
+            self._last_served[namespace] = time.monotonic()
+            self._start(self._queues[namespace].popleft())
+
+    def _start(self, job: Job) -> None:
+        runner = self._runners.pop(job.id)
+        self._running[job.namespace] = self._running.get(job.namespace, 0) + 1
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.publish("status", {"status": RUNNING})
+        job.task = asyncio.create_task(self._run(job, runner))
+        job.task.add_done_callback(lambda _task: self._release(job))
+
+    async def _run(self, job: Job, runner: Runner) -> None:
+        try:
+            result = await runner(job)
+            job.result = result
+            if result.get("success"):
+                self._finish(job, SUCCEEDED)
+            else:
+                self._finish(job, FAILED, error=result.get("error"))
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.exception(f"Test job {job.id} ({job.model}) failed")
+            self._finish(job, FAILED, error=str(e))
+
+    def _release(self, job: Job) -> None:
+        """Free a finished task's slot and start the next jobs.
+
+        Runs as the task's done callback: a task cancelled before its first
+        step never executes _run, so the job is marked cancelled here.
+        """
+        if not job.finished:
+            self._finish(job, CANCELLED)
+        self._running[job.namespace] -= 1
+        job.task = None
+        self._evict()
+        self._dispatch()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.publish("status", {"status": status, "error": error})
+        job.publish("done", job.to_dict())
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond max_finished."""
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(finished) - self.max_finished
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[:max(excess, 0)]:
+            del self._jobs[job.id]
@@ -0,0 +1,340 @@
+"""
+Percentile latency pipeline for the Triton Admin Dashboard.
+
+Triton exposes per-model latency as cumulative counters (and, when enabled,
+summaries/histograms) on its Prometheus metrics port. Averages derived from
+those counters hide tail latency, so this module turns scrapes into mergeable
+DDSketch histograms:
+
+- Counters (nv_inference_*_duration_us) and summary _sum/_count pairs: each
+  scrape interval contributes its mean latency, weighted by the number of
+  requests completed in that interval (counter deltas).
+- Histograms (*_bucket{le=...}): bucket count deltas are inserted at the
+  bucket's upper bound, which is exact up to the bucket resolution.
+
+Sketches are kept per (namespace, pod, model, version, phase) in fixed time
+slots, so percentiles can be queried for any recent window, per pod, or merged
+across pods. DDSketch merges are lossless, which is what makes the cross-pod
+and cross-window aggregation valid (averaging per-pod percentiles is not).
+
+Phases tracked: request, queue, compute_input, compute_infer, compute_output
+(and "compute" when only the proxy's aggregate averages are available).
+"""
+
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Relative accuracy of the sketches (1% -> p99 within +/-1% of the true value)
+RELATIVE_ACCURACY = 0.01
+
+# Time slot size and retention for windowed queries
+SLOT_SECS = 60
+MAX_SLOTS = 60  # one hour of history
+
+PHASES = ("request", "queue", "compute_input", "compute_infer", "compute_output")
+
+# nv_inference_<phase>_<kind>_<unit>[_sum|_count|_bucket]
+_METRIC_RE = re.compile(
+    r"^nv_inference_(request|queue|compute_input|compute_infer|compute_output)"
+    r"_(duration|summary|histogram)_(us|ms)(_sum|_count|_bucket)?$"
+)
+_SAMPLE_RE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})?\s+(\S+)")
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+# =============================================================================
+# DDSketch
+# =============================================================================
+
+class DDSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Values are mapped to bucket index ceil(log_gamma(x)); any quantile is
+    returned within RELATIVE_ACCURACY of the true value. Two sketches with the
+    same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, float] = {}
+        self.zero_count = 0.0
+        self.count = 0.0
+        self.sum = 0.0
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        if weight <= 0:
+            return
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0.0) + weight
+        self.count += weight
+        self.sum += value * weight
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, weight in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0.0) + weight
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1) if self.bins else 0.0
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count > 0 else None
+
+
+# =============================================================================
+# Prometheus text parsing
+# =============================================================================
+
+def parse_prometheus_text(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Parse Prometheus text exposition into (name, labels, value) samples."""
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_RE.match(line)
+        if not match:
+            continue
+        name, _, label_str, value_str = match.groups()
+        try:
+            value = float(value_str)
+        except ValueError:
+            continue
+        labels = dict(_LABEL_RE.findall(label_str or ""))
+        samples.append((name, labels, value))
+    return samples
+
+
+def extract_latency_series(samples: Iterable[Tuple[str, Dict[str, str], float]]) -> Dict[str, Any]:
+    """Pick out the Triton per-model latency series from parsed samples.
+
+    Returns:
+        {
+          "counters": {(model, version, phase): (total_ms, count)},
+          "histograms": {(model, version, phase): {upper_bound_ms: cumulative_count}},
+        }
+    """
+    durations: Dict[Tuple[str, str, str], float] = {}
+    counts: Dict[Tuple[str, str, str], float] = {}
+    success: Dict[Tuple[str, str], float] = {}
+    histograms: Dict[Tuple[str, str, str], Dict[float, float]] = {}
+
+    for name, labels, value in samples:
+        model = labels.get("model")
+        if not model:
+            continue
+        version = labels.get("version", "")
+        if name == "nv_inference_request_success":
+            success[(model, version)] = success.get((model, version), 0.0) + value
+            continue
+        match = _METRIC_RE.match(name)
+        if not match:
+            continue
+        phase, kind, unit, suffix = match.groups()
+        key = (model, version, phase)
+        scale = 0.001 if unit == "us" else 1.0
+
+        if kind == "histogram" and suffix == "_bucket":
+            le = labels.get("le")
+            if le is None:
+                continue
+            bound = math.inf if le == "+Inf" else float(le) * scale
+            histograms.setdefault(key, {})[bound] = value
+        elif kind == "duration" and suffix is None:
+            durations[key] = value * scale
+        elif kind == "summary" and suffix == "_sum":
+            durations[key] = value * scale
+        elif kind == "summary" and suffix == "_count":
+            counts[key] = value
+
+    counters = {}
+    for key, total_ms in durations.items():
+        model, version, _ = key
+        count = counts.get(key, success.get((model, version)))
+        if count is not None:
+            counters[key] = (total_ms, count)
+
+    return {"counters": counters, "histograms": histograms}
+
+
+def series_from_proxy_averages(inference_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build counter series from the proxy's /v1/metrics/inference averages.
+
+    The proxy only reports running averages and counts, so cumulative totals
+    are reconstructed as avg * count. Used when no Triton metrics URL is
+    configured for a namespace.
+    """
+    counters = {}
+    for inf in inference_metrics or []:
+        model = inf.get("model")
+        count = inf.get("inference_success") or inf.get("inference_count") or 0
+        if not model or not count:
+            continue
+        version = str(inf.get("version") or "")
+        for phase, field_name in (
+            ("request", "avg_request_duration_ms"),
+            ("queue", "avg_queue_duration_ms"),
+            ("compute", "avg_compute_duration_ms"),
+        ):
+            avg = inf.get(field_name)
+            if avg is not None:
+                counters[(model, version, phase)] = (float(avg) * count, float(count))
+    return {"counters": counters, "histograms": {}}
+
+
+# =============================================================================
+# Windowed store
+# =============================================================================
+
+class LatencyStore:
+    """Windowed, per-pod DDSketch store fed by successive scrapes."""
+
+    def __init__(self, slot_secs: int = SLOT_SECS, max_slots: int = MAX_SLOTS):
+        self.slot_secs = slot_secs
+        self.max_slots = max_slots
+        self._lock = threading.Lock()
+        # (namespace, pod, model, version, phase) -> deque[(slot_start, sketch)]
+        self._slots: Dict[Tuple[str, str, str, str, str], Deque[Tuple[int, DDSketch]]] = {}
+        # Previous cumulative values for delta computation
+        self._prev_counters: Dict[Tuple[str, str, str, str, str], Tuple[float, float]] = {}
+        self._prev_buckets: Dict[Tuple[str, str, str, str, str], Dict[float, float]] = {}
+        self._last_scrape: Dict[str, float] = {}
+
+    def seconds_since_scrape(self, namespace: str) -> float:
+        with self._lock:
+            last = self._last_scrape.get(namespace)
+        return time.time() - last if last else math.inf
+
+    def ingest(self, namespace: str, pod: str, series: Dict[str, Any],
+               now: Optional[float] = None) -> None:
+        """Ingest one scrape's cumulative series for a pod.
+
+        The first scrape of a series only establishes the baseline; deltas
+        from later scrapes are added to the current time slot.
+        """
+        now = now or time.time()
+        slot_start = int(now // self.slot_secs) * self.slot_secs
+
+        with self._lock:
+            self._last_scrape[namespace] = now
+
+            for (model, version, phase), (total_ms, count) in series.get("counters", {}).items():
+                key = (namespace, pod, model, version, phase)
+                prev = self._prev_counters.get(key)
+                self._prev_counters[key] = (total_ms, count)
+                if prev is None:
+                    continue
+                d_total, d_count = total_ms - prev[0], count - prev[1]
+                if d_count < 0 or d_total < 0:
+                    # Counter reset (pod restart): everything since is new
+                    d_total, d_count = total_ms, count
+                if d_count > 0:
+                    self._sketch(key, slot_start).add(d_total / d_count, d_count)
+
+            for (model, version, phase), buckets in series.get("histograms", {}).items():
+                key = (namespace, pod, model, version, phase)
+                prev = self._prev_buckets.get(key)
+                self._prev_buckets[key] = dict(buckets)
+                if prev is None:
+                    continue
+                sketch = self._sketch(key, slot_start)
+                prev_cumulative = 0.0
+                cur_cumulative = 0.0
+                for bound in sorted(buckets):
+                    in_bucket = (buckets[bound] - cur_cumulative) - (prev.get(bound, 0.0) - prev_cumulative)
+                    cur_cumulative = buckets[bound]
+                    prev_cumulative = prev.get(bound, 0.0)
+                    if in_bucket > 0:
+                        # +Inf bucket has no upper bound; use the largest finite one
+                        value = bound if math.isfinite(bound) else max(
+                            (b for b in buckets if math.isfinite(b)), default=0.0
+                        )
+                        sketch.add(value, in_bucket)
+
+    def _sketch(self, key: Tuple[str, str, str, str, str], slot_start: int) -> DDSketch:
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = deque(maxlen=self.max_slots)
+            self._slots[key] = slots
+        if not slots or slots[-1][0] != slot_start:
+            slots.append((slot_start, DDSketch()))
+        return slots[-1][1]
+
+    def query(self, namespace: str, window_secs: float, model: Optional[str] = None,
+              pod: Optional[str] = None) -> Dict[Tuple[str, str, str, str], DDSketch]:
+        """Merge slots within the window into one sketch per (pod, model, version, phase)."""
+        cutoff = time.time() - window_secs
+        merged: Dict[Tuple[str, str, str, str], DDSketch] = {}
+        with self._lock:
+            for (ns, p, m, version, phase), slots in self._slots.items():
+                if ns != namespace or (model and m != model) or (pod and p != pod):
+                    continue
+                for slot_start, sketch in slots:
+                    if slot_start + self.slot_secs < cutoff:
+                        continue
+                    target = merged.setdefault((p, m, version, phase), DDSketch())
+                    target.merge(sketch)
+        return merged
+
+
+def percentiles_ms(sketch: Optional[DDSketch]) -> Optional[Dict[str, Optional[float]]]:
+    """p50/p90/p99 (ms) summary of a sketch, or None if it is empty."""
+    if sketch is None or sketch.count <= 0:
+        return None
+
+    def _q(q: float) -> Optional[float]:
+        value = sketch.quantile(q)
+        return round(value, 3) if value is not None else None
+
+    return {
+        "p50_ms": _q(0.50),
+        "p90_ms": _q(0.90),
+        "p99_ms": _q(0.99),
+        "count": int(sketch.count),
+    }
+
+
+def summarize_window(merged: Dict[Tuple[str, str, str, str], DDSketch]) -> Dict[str, Any]:
+    """Shape merged sketches into per-model results, per pod and across pods."""
+    models: Dict[str, Dict[str, Any]] = {}
+    across_pods: Dict[Tuple[str, str], DDSketch] = {}
+
+    for (pod, model, _version, phase), sketch in merged.items():
+        entry = models.setdefault(model, {"model": model, "phases": {}, "pods": {}})
+        entry["pods"].setdefault(pod, {})[phase] = percentiles_ms(sketch)
+        target = across_pods.setdefault((model, phase), DDSketch())
+        target.merge(sketch)
+
+    for (model, phase), sketch in across_pods.items():
+        models[model]["phases"][phase] = percentiles_ms(sketch)
+
+    return {"models": [models[m] for m in sorted(models)]}
+
+
+# Global store instance (single-replica dashboard)
+store = LatencyStore()
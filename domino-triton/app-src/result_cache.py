@@ -0,0 +1,247 @@
+"""
+Content-addressed cache of test-inference results for the Testing page.
+
+The testing page re-runs identical inferences (same model, same sample
+file, same protocol) constantly, and each run repeats the whole client
+pipeline. Results are cached under a key derived from everything that
+determines the output:
+
+- namespace and model name
+- a hash of the model's config as Triton reports it (so a config change is
+  a different key)
+- a digest of the input (sample file contents, or the text prompt)
+- protocol and the request parameters
+
+Each run writes into its own directory (results/<family>/runs/<run_id>/),
+so concurrent runs never clobber each other's output files; a cached entry
+owns its run directory and deletes it when evicted. Eviction is LRU under
+both an entry-count and a total-size limit. Entries for a model are also
+dropped when it is loaded/unloaded/reconfigured from the dashboard or seen
+reloading in the repository index.
+
+State is in-memory only (single-replica dashboard); run directories left
+over from a previous process are not reused.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import telemetry
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Run directories kept for results that are not cached (failed runs,
+# models whose config could not be fetched), oldest deleted first
+MAX_UNCACHED_RUNS = 20
+
+
+@dataclass
+class CacheEntry:
+    """A cached test-inference result and the run directory it owns."""
+    key: str
+    namespace: str
+    model: str
+    response: Dict[str, Any]
+    run_dir: Optional[str]
+    size_bytes: int
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+def cache_key(namespace: str, model: str, config_hash: str, input_digest: str,
+              protocol: str, params: Dict[str, Any]) -> str:
+    """Stable key over everything that determines a test result."""
+    material = json.dumps(
+        {
+            "namespace": namespace,
+            "model": model,
+            "config": config_hash,
+            "input": input_digest,
+            "protocol": protocol,
+            "params": params,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def hash_config(config: Dict[str, Any]) -> str:
+    """Hash a model config (as returned by /v2/models/{model}/config)."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def _dir_size(path: Optional[str]) -> int:
+    if not path or not os.path.isdir(path):
+        return 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _remove_dir(path: Optional[str]) -> None:
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class FileDigests:
+    """sha256 of sample files, memoized on (size, mtime) to avoid rehashing videos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[int, int, str]] = {}
+
+    def digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            known = self._digests.get(key)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                return known[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._digests[key] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+
+class ResultCache:
+    """LRU cache of test results bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._uncached_runs: Deque[str] = deque()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up a result, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.run_dir and not os.path.isdir(entry.run_dir):
+                # Output files were removed underneath us -- treat as a miss
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                self._hits += 1
+        telemetry.record_cache_lookup("test_results", hit=entry is not None)
+        return entry
+
+    def put(self, key: str, namespace: str, model: str, response: Dict[str, Any],
+            run_dir: Optional[str]) -> CacheEntry:
+        """Store a result; evicts least recently used entries to fit."""
+        size = _dir_size(run_dir) + len(json.dumps(response, default=str))
+        entry = CacheEntry(key=key, namespace=namespace, model=model, response=response,
+                           run_dir=run_dir, size_bytes=size)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._total_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                if oldest == key and len(self._entries) == 1:
+                    break  # a single oversized entry is still worth keeping
+                self._drop(oldest)
+                self._evictions += 1
+        return entry
+
+    def discard_run(self, run_dir: Optional[str]) -> None:
+        """Keep an uncached run's outputs briefly, deleting the oldest beyond the limit."""
+        if not run_dir:
+            return
+        with self._lock:
+            self._uncached_runs.append(run_dir)
+            while len(self._uncached_runs) > MAX_UNCACHED_RUNS:
+                _remove_dir(self._uncached_runs.popleft())
+
+    def invalidate(self, namespace: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Drop entries for a namespace and/or model (all if both None)."""
+        with self._lock:
+            keys = [
+                k for k, e in self._entries.items()
+                if (namespace is None or e.namespace == namespace)
+                and (model is None or e.model == model)
+            ]
+            for k in keys:
+                self._drop(k)
+            self._invalidations += len(keys)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached test result(s) for {namespace}/{model or '*'}")
+        return len(keys)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size_bytes
+        _remove_dir(entry.run_dir)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+    def entries(self, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entry summaries, most recently used first."""
+        with self._lock:
+            return [
+                {
+                    "key": e.key[:16],
+                    "namespace": e.namespace,
+                    "model": e.model,
+                    "protocol": e.response.get("protocol"),
+                    "input_type": e.response.get("input_type"),
+                    "source_file": e.response.get("source_file"),
+                    "size_bytes": e.size_bytes,
+                    "hits": e.hits,
+                    "created_at": e.created_at,
+                }
+                for e in reversed(self._entries.values())
+                if namespace is None or e.namespace == namespace
+            ]
+
+
+# Global instances (single-replica dashboard)
+cache = ResultCache(
+    max_entries=settings.result_cache_max_entries,
+    max_bytes=settings.result_cache_max_mb * 1024 * 1024,
+)
+file_digests = FileDigests()
@@ -14,7 +14,21 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
-from config import settings, get_proxy_url, get_admin_url, load_namespaces, get_auth_headers
+import latency_metrics
+import result_cache
+import telemetry
+from cold_start import tracker as cold_start_tracker
+from config import (
+    settings,
+    get_proxy_url,
+    get_admin_url,
+    get_storage_backend,
+    get_triton_metrics_url,
+    get_triton_metrics_url_pattern,
+    load_namespaces,
+    get_auth_headers,
+)
+from routes.placement import get_running_pods
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +74,9 @@ class DashboardModel(BaseModel):
     # `loaded` -- lets callers (e.g. the load-progress UI) distinguish "a load
     # is in progress" from "never loaded".
     raw_state: Optional[str] = None
+    # Cold-start figures from loads this dashboard triggered or observed
+    cold_start_p50_secs: Optional[float] = None
+    cold_start_p95_secs: Optional[float] = None
 
 
 class DashboardOverview(BaseModel):
@@ -94,6 +111,14 @@ class CPUMemoryMetrics(BaseModel):
     memory_free_bytes: Optional[float] = None
 
 
+class LatencyPercentiles(BaseModel):
+    """Latency percentiles for one phase over a time window."""
+    p50_ms: Optional[float] = None
+    p90_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    count: int = 0
+
+
 class InferenceMetrics(BaseModel):
     """Per-model inference metrics."""
     model: str
@@ -104,6 +129,13 @@ class InferenceMetrics(BaseModel):
     avg_request_duration_ms: Optional[float] = None
     avg_queue_duration_ms: Optional[float] = None
     avg_compute_duration_ms: Optional[float] = None
+    # Percentiles across all pods over the last LATENCY_WINDOW_SECS
+    # (None until at least two scrapes have seen traffic)
+    request_percentiles: Optional[LatencyPercentiles] = None
+    queue_percentiles: Optional[LatencyPercentiles] = None
+    compute_input_percentiles: Optional[LatencyPercentiles] = None
+    compute_infer_percentiles: Optional[LatencyPercentiles] = None
+    compute_output_percentiles: Optional[LatencyPercentiles] = None
     last_access_time: Optional[str] = None
     last_accessed_by: Optional[str] = None
 
@@ -142,6 +174,7 @@ async def get_proxy_client(namespace: str) -> httpx.AsyncClient:
         base_url=proxy_url,
         timeout=settings.proxy_timeout_secs,
         headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("proxy"),
     )
 
 
@@ -152,6 +185,7 @@ async def get_admin_client(namespace: str) -> httpx.AsyncClient:
         base_url=admin_url,
         timeout=settings.proxy_timeout_secs,
         headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("admin"),
     )
 
 
@@ -241,6 +275,67 @@ async def fetch_inference_metrics(namespace: str) -> List[Dict[str, Any]]:
             return []
 
 
+# Default window for percentiles merged into /api/dashboard/metrics
+LATENCY_WINDOW_SECS = 300.0
+
+# Minimum seconds between latency scrapes of the same namespace, so several
+# dashboard tabs polling at once don't shrink the counter-delta intervals
+LATENCY_MIN_SCRAPE_INTERVAL_SECS = 5.0
+
+
+async def fetch_triton_metrics_text(url: str) -> Optional[str]:
+    """Fetch Prometheus text exposition from a Triton metrics endpoint."""
+    async with httpx.AsyncClient(timeout=10.0, transport=telemetry.instrumented_transport("triton")) as client:
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to scrape Triton metrics from {url}: {e}")
+            return None
+
+
+async def scrape_latency_metrics(
+    namespace: str,
+    inference_metrics: Optional[List[Dict[str, Any]]] = None,
+) -> None:
+    """Feed one scrape of per-model latency into the percentile store.
+
+    Scrapes each Triton pod's Prometheus endpoint when configured for the
+    namespace; otherwise falls back to the proxy's aggregate averages
+    (pass them in via inference_metrics to avoid a second fetch).
+    """
+    recent = latency_metrics.store.seconds_since_scrape(namespace) < LATENCY_MIN_SCRAPE_INTERVAL_SECS
+    telemetry.record_cache_lookup("latency_scrape", hit=recent)
+    if recent:
+        return
+
+    urls: Dict[str, str] = {}
+    pattern = get_triton_metrics_url_pattern(namespace)
+    if pattern:
+        pods, _ = await get_running_pods(namespace)
+        urls = {p.name: pattern.format(pod=p.name) for p in pods if p.status == "Running"}
+    if not urls and get_triton_metrics_url(namespace):
+        urls = {"triton": get_triton_metrics_url(namespace)}
+
+    if urls:
+        texts = await asyncio.gather(*[fetch_triton_metrics_text(u) for u in urls.values()])
+        for pod, text in zip(urls.keys(), texts):
+            if text is None:
+                continue
+            series = latency_metrics.extract_latency_series(
+                latency_metrics.parse_prometheus_text(text)
+            )
+            latency_metrics.store.ingest(namespace, pod, series)
+        return
+
+    if inference_metrics is None:
+        inference_metrics = await fetch_inference_metrics(namespace)
+    latency_metrics.store.ingest(
+        namespace, "proxy", latency_metrics.series_from_proxy_averages(inference_metrics)
+    )
+
+
 async def fetch_dashboard_overview(namespace: str) -> Optional[Dict[str, Any]]:
     """Fetch dashboard overview from the proxy (includes default timeout)."""
     async with await get_proxy_client(namespace) as client:
@@ -312,6 +407,11 @@ async def get_models(namespace: str = Query(default="local")):
         fetch_models_from_proxy(namespace),
     )
     state_by_name = {m.get("name"): m.get("state") for m in raw_models if m.get("name")}
+    cold_start_tracker.observe_states(namespace, state_by_name, get_storage_backend(namespace))
+    # A model reloading (from anywhere) may come back with new weights
+    for name, state in state_by_name.items():
+        if state == "LOADING":
+            result_cache.cache.invalidate(namespace, name)
 
     # Fetch Triton config for all loaded models in parallel to get backend/platform
     loaded_names = [m["name"] for m in models if m.get("loaded")]
@@ -329,6 +429,7 @@ async def get_models(namespace: str = Query(default="local")):
     for model in models:
         name = model.get("name", "")
         cfg = config_by_name.get(name, {})
+        cold_start = cold_start_tracker.model_stats(namespace, name)["load"]
         dashboard_model = DashboardModel(
             name=name,
             loaded=model.get("loaded", False),
@@ -345,6 +446,8 @@ async def get_models(namespace: str = Query(default="local")):
             backend=cfg.get("backend") or cfg.get("platform") or None,
             platform=cfg.get("platform") or None,
             raw_state=state_by_name.get(name),
+            cold_start_p50_secs=cold_start["p50_secs"],
+            cold_start_p95_secs=cold_start["p95_secs"],
         )
         result.append(dashboard_model)
 
@@ -372,21 +475,35 @@ async def get_model(model_name: str, namespace: str = Query(default="local")):
 
 @router.post("/api/dashboard/models/{model_name}/load")
 async def load_model(model_name: str, namespace: str = Query(default="local")):
-    """Load a model."""
+    """Load a model.
+
+    Triton's repository load call blocks until the model is READY, so the
+    round trip is recorded as a triggered cold-start sample.
+    """
+    cold_start_tracker.start_load(namespace, model_name, get_storage_backend(namespace))
+    result_cache.cache.invalidate(namespace, model_name)
     async with await get_proxy_client(namespace) as client:
         try:
             response = await client.post(f"/v2/repository/models/{model_name}/load")
             response.raise_for_status()
-            return {"status": "success", "message": f"Model {model_name} loaded"}
+            sample = cold_start_tracker.finish_load(namespace, model_name)
+            return {
+                "status": "success",
+                "message": f"Model {model_name} loaded",
+                "load_secs": round(sample.ready_at - sample.started_at, 3) if sample else None,
+            }
         except httpx.HTTPStatusError as e:
+            cold_start_tracker.abort_load(namespace, model_name)
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
         except httpx.HTTPError as e:
+            cold_start_tracker.abort_load(namespace, model_name)
             raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/api/dashboard/models/{model_name}/unload")
 async def unload_model(model_name: str, namespace: str = Query(default="local")):
     """Unload a model."""
+    result_cache.cache.invalidate(namespace, model_name)
     async with await get_proxy_client(namespace) as client:
         try:
             response = await client.post(f"/v2/repository/models/{model_name}/unload")
@@ -558,6 +675,7 @@ async def update_model_config(
             admin_result = response.json()
 
         logger.info(f"Updated config for {model_name} via admin API: {admin_result.get('changes', [])}")
+        result_cache.cache.invalidate(namespace, model_name)
 
         # 2. Unload model via proxy (so changes take effect on next load)
         unload_message = ""
@@ -600,11 +718,19 @@ async def get_metrics(namespace: str = Query(default="local")):
     models = await fetch_dashboard_models(namespace)
     model_state_map = {m.get("name"): m for m in models}
 
+    # Update and read back windowed percentiles (aggregated across pods)
+    await scrape_latency_metrics(namespace, inference_metrics)
+    window = latency_metrics.summarize_window(
+        latency_metrics.store.query(namespace, LATENCY_WINDOW_SECS)
+    )
+    phases_by_model = {m["model"]: m["phases"] for m in window["models"]}
+
     # Merge inference metrics with model state
     merged_inference = []
     for inf in (inference_metrics or []):
         model_name = inf.get("model")
         model_state = model_state_map.get(model_name, {})
+        phases = phases_by_model.get(model_name, {})
         merged_inference.append(InferenceMetrics(
             model=model_name,
             version=inf.get("version"),
@@ -614,6 +740,11 @@ async def get_metrics(namespace: str = Query(default="local")):
             avg_request_duration_ms=inf.get("avg_request_duration_ms"),
             avg_queue_duration_ms=inf.get("avg_queue_duration_ms"),
             avg_compute_duration_ms=inf.get("avg_compute_duration_ms"),
+            request_percentiles=phases.get("request"),
+            queue_percentiles=phases.get("queue"),
+            compute_input_percentiles=phases.get("compute_input"),
+            compute_infer_percentiles=phases.get("compute_infer"),
+            compute_output_percentiles=phases.get("compute_output"),
             last_access_time=model_state.get("last_access_time"),
             last_accessed_by=model_state.get("last_accessed_by"),
         ))
@@ -625,6 +756,124 @@ async def get_metrics(namespace: str = Query(default="local")):
     )
 
 
+@router.get("/api/dashboard/metrics/latency")
+async def get_latency_percentiles(
+    namespace: str = Query(default="local"),
+    window_secs: float = Query(default=LATENCY_WINDOW_SECS, gt=0, le=3600),
+    model: Optional[str] = Query(default=None),
+    pod: Optional[str] = Query(default=None),
+):
+    """Get p50/p90/p99 latency per model and phase over a time window.
+
+    Each model entry has "phases" (merged across pods) and "pods" (per pod).
+    Phases: request, queue, compute_input, compute_infer, compute_output --
+    or request, queue, compute when only proxy averages are available.
+    """
+    await scrape_latency_metrics(namespace)
+    merged = latency_metrics.store.query(namespace, window_secs, model=model, pod=pod)
+    result = latency_metrics.summarize_window(merged)
+    result.update({"namespace": namespace, "window_secs": window_secs})
+    return result
+
+
+# =============================================================================
+# Cold-Start API
+#
+# Load-duration distributions recorded by cold_start.tracker, and the
+# eviction/pre-warm advice derived from them.
+# =============================================================================
+
+class PrewarmCandidate(BaseModel):
+    """An unloaded model worth loading ahead of demand."""
+    model: str
+    expected_cold_start_secs: float
+    access_count: int = 0
+    last_access_time: Optional[str] = None
+
+
+class EvictionCandidate(BaseModel):
+    """A loaded model ranked by how cheap it is to bring back."""
+    model: str
+    expected_cold_start_secs: Optional[float] = None
+    idle_seconds: Optional[float] = None
+    eligible_for_eviction: bool = False
+
+
+class ColdStartRecommendations(BaseModel):
+    """Eviction order and pre-warm candidates based on cold-start cost."""
+    namespace: str
+    prewarm: List[PrewarmCandidate] = []
+    eviction_order: List[EvictionCandidate] = []
+
+
+@router.get("/api/dashboard/cold-start")
+async def get_cold_start_stats(namespace: str = Query(default="local")):
+    """Get p50/p95 cold-start figures per model and per storage backend."""
+    return cold_start_tracker.namespace_stats(namespace)
+
+
+@router.get("/api/dashboard/cold-start/recommendations")
+async def get_cold_start_recommendations(
+    namespace: str = Query(default="local"),
+    min_cold_start_secs: float = Query(
+        default=30.0, description="Only suggest pre-warming models slower than this to load"
+    ),
+) -> ColdStartRecommendations:
+    """Suggest which models to pre-warm and which to evict first.
+
+    - Pre-warm: unloaded, uncordoned models that have been used before and
+      whose p95 cold start is at least min_cold_start_secs, slowest first.
+    - Eviction order: unpinned loaded models, cheapest to reload first.
+      Models with no recorded loads go last, since their reload cost is unknown.
+    """
+    models = await fetch_dashboard_models(namespace)
+
+    prewarm = []
+    eviction = []
+    for model in models:
+        name = model.get("name", "")
+        expected = cold_start_tracker.expected_cold_start_secs(namespace, name)
+
+        if not model.get("loaded", False):
+            if (
+                not model.get("cordoned", False)
+                and model.get("access_count", 0) > 0
+                and expected is not None
+                and expected >= min_cold_start_secs
+            ):
+                prewarm.append(PrewarmCandidate(
+                    model=name,
+                    expected_cold_start_secs=round(expected, 3),
+                    access_count=model.get("access_count", 0),
+                    last_access_time=model.get("last_access_time"),
+                ))
+        elif not model.get("pinned", False):
+            eviction.append(EvictionCandidate(
+                model=name,
+                expected_cold_start_secs=round(expected, 3) if expected is not None else None,
+                idle_seconds=model.get("idle_seconds"),
+                eligible_for_eviction=model.get("eligible_for_eviction", False),
+            ))
+
+    prewarm.sort(key=lambda c: c.expected_cold_start_secs, reverse=True)
+    eviction.sort(key=lambda c: (
+        c.expected_cold_start_secs is None,
+        c.expected_cold_start_secs or 0.0,
+        -(c.idle_seconds or 0.0),
+    ))
+
+    return ColdStartRecommendations(namespace=namespace, prewarm=prewarm, eviction_order=eviction)
+
+
+@router.get("/api/dashboard/cold-start/{model_name}")
+async def get_model_cold_start(model_name: str, namespace: str = Query(default="local")):
+    """Get cold-start figures and recent load samples for one model."""
+    stats = cold_start_tracker.model_stats(namespace, model_name)
+    stats["loading"] = cold_start_tracker.is_loading(namespace, model_name)
+    stats["samples"] = [s.to_dict() for s in cold_start_tracker.samples(namespace, model_name)[-20:]]
+    return stats
+
+
 # HTML Routes
 @router.get("/", response_class=HTMLResponse)
 async def dashboard_page(request: Request, namespace: str = Query(default=None)):
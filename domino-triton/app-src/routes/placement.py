@@ -16,6 +16,7 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
+import telemetry
 from config import get_admin_url, get_proxy_url, get_auth_headers, load_namespaces, settings
 
 logger = logging.getLogger(__name__)
@@ -39,7 +40,7 @@ async def get_domino_access_token() -> Optional[str]:
         return None
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, transport=telemetry.instrumented_transport("domino-api-proxy")) as client:
             response = await client.get(f"{api_proxy}/access-token")
             response.raise_for_status()
             # The endpoint returns raw JWT token, not JSON
@@ -161,6 +162,7 @@ async def get_proxy_client(namespace: str) -> httpx.AsyncClient:
         base_url=proxy_url,
         timeout=settings.proxy_timeout_secs,
         headers=headers,
+        transport=telemetry.instrumented_transport("proxy"),
     )
 
 
@@ -177,6 +179,7 @@ async def get_admin_client(namespace: str) -> httpx.AsyncClient:
         base_url=admin_url,
         timeout=30.0,
         headers=headers,
+        transport=telemetry.instrumented_transport("admin"),
     )
 
 
@@ -203,6 +206,7 @@ async def get_running_pods(namespace: str, request: Request = None) -> tuple[Lis
             base_url=admin_url,
             timeout=30.0,
             headers=headers,
+            transport=telemetry.instrumented_transport("admin"),
         ) as client:
             response = await client.get("/v1/deployments/inference-server/pods")
             response.raise_for_status()
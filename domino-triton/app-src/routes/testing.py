@@ -3,13 +3,18 @@
 These routes handle model inference testing with sample files.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import math
 import os
-import subprocess
+import re
 import tempfile
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File
@@ -17,7 +22,11 @@ from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
-from config import settings, get_proxy_url
+import result_cache
+import telemetry
+from cold_start import tracker as cold_start_tracker
+from config import settings, get_proxy_url, get_test_job_limit
+from inference_jobs import Job, JobManager
 from routes.dashboard import get_local_auth_headers
 
 logger = logging.getLogger(__name__)
@@ -157,6 +166,9 @@ class TestInferRequest(BaseModel):
     start_time: Optional[float] = 0.0  # seconds, for any video model
     end_time: Optional[float] = None  # seconds, None = full video length
     frames_per_iteration: int = 8  # frame budget per prompt, for vision-context-constrained LLMs
+    # Return a stored result for an identical earlier request (see result_cache.py);
+    # False forces a fresh run, whose result then replaces the cached one
+    use_cache: bool = True
 
 
 class TestInferResponse(BaseModel):
@@ -175,6 +187,8 @@ class TestInferResponse(BaseModel):
     # For media results
     source_file: Optional[str] = None
     result_file: Optional[str] = None
+    # True when served from the result cache without running the model
+    cached: bool = False
 
 
 def get_file_type(filename: str) -> str:
@@ -295,7 +309,12 @@ async def fetch_model_type_from_triton(model_name: str, namespace: str) -> Optio
     """Fetch model_types or model_type parameter from Triton model config."""
     proxy_url = get_proxy_url(namespace)
 
-    async with httpx.AsyncClient(base_url=proxy_url, timeout=10.0, headers=get_local_auth_headers()) as client:
+    async with httpx.AsyncClient(
+        base_url=proxy_url,
+        timeout=10.0,
+        headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("proxy"),
+    ) as client:
         try:
             # Try to get model config from Triton
             response = await client.get(f"/v2/models/{model_name}/config")
@@ -442,15 +461,32 @@ async def quick_test(model_name: str, namespace: str = Query(default="local")):
     if "text" not in input_types:
         return await _weak_ready_check(model_name, namespace)
 
-    request = TestInferRequest(input_type="text", text="Hello", max_tokens=20)
-    return await run_inference(model_name, request, namespace=namespace, protocol="rest")
+    # Never from cache -- the point is to exercise the freshly loaded model
+    request = TestInferRequest(input_type="text", text="Hello", max_tokens=20, use_cache=False)
+    started = time.time()
+    response = await run_inference(model_name, request, namespace=namespace, protocol="rest")
+    if response.success:
+        # First real inference after a load -- attribute it to the cold start
+        # (inference_time_ms excludes client-script startup when available)
+        elapsed = (
+            response.inference_time_ms / 1000.0
+            if response.inference_time_ms is not None
+            else time.time() - started
+        )
+        cold_start_tracker.record_first_inference(namespace, model_name, elapsed)
+    return response
 
 
 async def _weak_ready_check(model_name: str, namespace: str) -> TestInferResponse:
     """Re-confirm Triton reports this model READY, without attempting an
     actual inference call (see quick_test's docstring for why)."""
     proxy_url = get_proxy_url(namespace)
-    async with httpx.AsyncClient(base_url=proxy_url, timeout=10.0, headers=get_local_auth_headers()) as client:
+    async with httpx.AsyncClient(
+        base_url=proxy_url,
+        timeout=10.0,
+        headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("proxy"),
+    ) as client:
         try:
             response = await client.get(f"/v2/models/{model_name}/ready")
             ready = response.status_code == 200
@@ -476,23 +512,49 @@ async def _weak_ready_check(model_name: str, namespace: str) -> TestInferRespons
     )
 
 
-@router.post("/infer/{model_name}")
-async def run_inference(
+# Client-script timeout for synchronous /infer requests
+INFERENCE_TIMEOUT_SECS = 120
+
+# Client-script timeout for background jobs (long video tests)
+JOB_TIMEOUT_SECS = 3600
+
+# Safety cap on frames for per-frame CV models (see build_inference_plan).
+# Jobs have no request timeout to fit into, so they get a larger cap.
+INFERENCE_MAX_FRAMES = 200
+JOB_MAX_FRAMES = 5000
+
+# Seconds between SSE keepalive comments when a job has no new events
+SSE_KEEPALIVE_SECS = 15.0
+
+
+class InferencePlan(BaseModel):
+    """A client-script invocation plus where to find its outputs."""
+    model: str
+    namespace: str
+    input_type: str
+    protocol: str
+    result_type: str
+    cmd: List[str]
+    cwd: str
+    run_dir: str
+    output_file: str
+    result_video_path: Optional[str] = None
+    result_image_path: Optional[str] = None
+    source_file: Optional[str] = None
+
+
+def resolve_client_script(
     model_name: str,
     request: TestInferRequest,
-    namespace: str = Query(default="local"),
-    protocol: str = Query(default="rest"),
-):
-    """Run inference on a model using client scripts."""
-    from config import get_grpc_url
+    use_protocol: str,
+) -> Tuple[Optional[Path], str]:
+    """Pick the client script for a model/protocol.
 
-    # Use protocol from query param or request body
-    use_protocol = protocol if protocol else request.protocol
-
-    proxy_url = get_proxy_url(namespace)
-    grpc_url = get_grpc_url(namespace)
+    Returns (script_path, result_type); script_path is None when no REST
+    client script exists and the caller should fall back to a direct REST
+    call. Raises a 400 for unknown models and missing gRPC client scripts.
+    """
     scripts_dir = Path(settings.scripts_path) / "clients"
-    results_base = Path(settings.results_path)
 
     # Get model config
     model_config = MODEL_INPUT_TYPES.get(model_name, {})
@@ -525,21 +587,10 @@ async def run_inference(
 
     # Select REST or gRPC client script
     # Protocols: "rest" (JSON encoding), "rest-binary" (binary encoding), "grpc"
-    use_json_encoding = False
     if use_protocol == "grpc":
         client_script = f"{base_script}_grpc_client.py"
-        url_flag = "--grpc-url"
-        url_value = grpc_url
-    elif use_protocol == "rest-binary":
-        client_script = f"{base_script}_rest_client.py"
-        url_flag = "--rest-url"
-        url_value = proxy_url
-        use_json_encoding = False  # Binary is default for REST clients
-    else:  # "rest" defaults to JSON encoding
+    else:
         client_script = f"{base_script}_rest_client.py"
-        url_flag = "--rest-url"
-        url_value = proxy_url
-        use_json_encoding = True
 
     script_path = scripts_dir / client_script
 
@@ -547,27 +598,60 @@ async def run_inference(
         # Fall back to direct API call (REST only)
         if use_protocol == "grpc":
             raise HTTPException(status_code=400, detail=f"gRPC client script not found: {client_script}")
-        return await run_direct_inference(model_name, request, namespace)
+        return None, result_type
+
+    return script_path, result_type
+
+
+def build_inference_plan(
+    model_name: str,
+    request: TestInferRequest,
+    namespace: str,
+    use_protocol: str,
+    max_frames: int = INFERENCE_MAX_FRAMES,
+) -> Optional[InferencePlan]:
+    """Build the client-script command for a test inference.
+
+    Outputs go to a fresh per-run directory (results/<family>/runs/<run_id>/)
+    so concurrent runs never overwrite each other. Returns None when no
+    client script exists for this model/protocol and the caller should fall
+    back to a direct REST call.
+    """
+    from config import get_grpc_url
+
+    script_path, result_type = resolve_client_script(model_name, request, use_protocol)
+    if script_path is None:
+        return None
+    client_script = script_path.name
+    model_config = MODEL_INPUT_TYPES.get(model_name, {})
+    results_base = Path(settings.results_path)
+
+    # Protocols: "rest" (JSON encoding), "rest-binary" (binary encoding), "grpc"
+    if use_protocol == "grpc":
+        url_flag = "--grpc-url"
+        url_value = get_grpc_url(namespace)
+        use_json_encoding = False
+    else:
+        url_flag = "--rest-url"
+        url_value = get_proxy_url(namespace)
+        # Binary is default for REST clients; "rest" uses JSON encoding
+        use_json_encoding = use_protocol != "rest-binary"
 
     # Determine output paths based on model type
     # Map protocol to suffix for output files
     protocol_suffix = use_protocol.replace("-", "_")  # "rest-binary" -> "rest_binary"
     if "bert" in model_name.lower():
-        output_dir = results_base / "bert"
-        output_file = output_dir / f"bert_{protocol_suffix}.json"
+        family = "bert"
     elif "whisper" in model_name.lower():
-        output_dir = results_base / "whisper"
-        output_file = output_dir / f"whisper_{protocol_suffix}.json"
+        family = "whisper"
     elif "yolov8" in model_name.lower():
-        output_dir = results_base / "yolov8"
-        output_file = output_dir / f"yolov8_{protocol_suffix}.json"
-        output_video = output_dir / "annotated_output.mp4"
+        family = "yolov8"
     elif "llm" in model_name.lower() or "smollm" in model_name.lower() or "llama" in model_name.lower():
-        output_dir = results_base / "llm"
-        output_file = output_dir / f"llm_{protocol_suffix}.json"
+        family = "llm"
     else:
-        output_dir = results_base / model_name
-        output_file = output_dir / f"{model_name}_{protocol_suffix}.json"
+        family = model_name
+    output_dir = results_base / family / "runs" / uuid.uuid4().hex[:12]
+    output_file = output_dir / f"{family}_{protocol_suffix}.json"
 
     # Ensure output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -628,9 +712,9 @@ async def run_inference(
                 # kept only as a generous, non-user-facing safety cap (measured
                 # throughput is ~600ms/frame, see docs/known_issues_and_todos.md,
                 # so an unbounded high rate/wide range could otherwise run past
-                # this endpoint's subprocess timeout).
+                # the client-script timeout).
                 cmd.extend(["--fps", str(request.sample_fps or 2.0)])
-                cmd.extend(["--max-frames", "200"])
+                cmd.extend(["--max-frames", str(max_frames)])
 
             if "frames_per_iteration" in video_controls:
                 # Vision-context-constrained LLM (e.g. llama4scout): frames
@@ -658,102 +742,424 @@ async def run_inference(
             source_file = request.sample_file
             cmd.extend(["--audio", str(sample_path)])
 
-    try:
-        logger.info(f"Running inference command: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            cwd=str(scripts_dir.parent),
-        )
+    return InferencePlan(
+        model=model_name,
+        namespace=namespace,
+        input_type=request.input_type,
+        protocol=use_protocol,
+        result_type=result_type,
+        cmd=cmd,
+        cwd=str(scripts_dir.parent),
+        run_dir=str(output_dir),
+        output_file=str(output_file),
+        result_video_path=str(result_video_path) if result_video_path else None,
+        result_image_path=str(result_image_path) if result_image_path else None,
+        source_file=source_file,
+    )
 
-        if result.returncode != 0:
-            return TestInferResponse(
-                model=model_name,
-                input_type=request.input_type,
-                protocol=use_protocol,
-                success=False,
-                result=None,
-                result_type=result_type,
-                error=result.stderr or result.stdout,
-            )
 
-        # Parse the JSON output file for structured results
-        parsed_result = None
-        inference_time_ms = None
-        total_inference_time_ms = None
-        payload_size_mb = None
-        fps = None
-
-        if output_file.exists():
-            try:
-                with open(output_file) as f:
-                    parsed_result = json.load(f)
-                    # Extract inference time if available
-                    if "stats" in parsed_result:
-                        stats = parsed_result["stats"]
-                        inference_time_ms = stats.get("avg_text_ms") or stats.get("avg_batch_ms") or stats.get("avg_frame_ms")
-                        # Calculate total inference time
-                        if "total_time_sec" in stats:
-                            total_inference_time_ms = stats["total_time_sec"] * 1000
-                        elif "total_time_sec" in parsed_result:
-                            total_inference_time_ms = parsed_result["total_time_sec"] * 1000
-                        # Extract payload size and FPS
-                        payload_size_mb = stats.get("total_payload_mb")
-                        fps = stats.get("fps")
-                    elif "total_time_sec" in parsed_result:
-                        total_inference_time_ms = parsed_result["total_time_sec"] * 1000
-                        inference_time_ms = total_inference_time_ms
-            except Exception as e:
-                logger.error(f"Failed to parse output JSON: {e}")
-                parsed_result = result.stdout
+async def run_client_process(
+    plan: InferencePlan,
+    timeout: float,
+    on_stderr_line: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, str, str]:
+    """Run a plan's client script without blocking the event loop.
 
-        # Format result based on type
-        formatted_result = format_result(parsed_result, result_type, result.stdout)
+    Client scripts log progress to stderr; each line is passed to
+    on_stderr_line as it arrives. The process is killed on timeout
+    (asyncio.TimeoutError is raised) or when the calling task is cancelled.
+    """
+    logger.info(f"Running inference command: {' '.join(plan.cmd)}")
+    process = await asyncio.create_subprocess_exec(
+        *plan.cmd,
+        cwd=plan.cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stderr_lines: List[str] = []
 
-        # Determine result file path for video or image
-        result_file_url = None
-        if result_video_path and result_video_path.exists():
-            result_file_url = f"yolov8/{result_video_path.name}"
-        elif result_image_path and result_image_path.exists():
-            result_file_url = f"yolov8/{result_image_path.name}"
+    async def read_stderr():
+        async for raw in process.stderr:
+            line = raw.decode("utf-8", errors="replace")
+            stderr_lines.append(line)
+            if on_stderr_line is not None:
+                on_stderr_line(line.rstrip())
 
-        return TestInferResponse(
-            model=model_name,
-            input_type=request.input_type,
-            protocol=use_protocol,
-            success=True,
-            result=formatted_result,
-            result_type=result_type,
-            inference_time_ms=inference_time_ms,
-            total_inference_time_ms=total_inference_time_ms,
-            payload_size_mb=payload_size_mb,
-            fps=fps,
-            source_file=source_file,
-            result_file=result_file_url,
-        )
+    async def communicate():
+        stdout, _ = await asyncio.gather(process.stdout.read(), read_stderr())
+        await process.wait()
+        return stdout
+
+    try:
+        stdout = await asyncio.wait_for(communicate(), timeout)
+    except BaseException:
+        # Timeout or cancellation -- don't leave the client script running
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
 
-    except subprocess.TimeoutExpired:
+    return process.returncode, stdout.decode("utf-8", errors="replace"), "".join(stderr_lines)
+
+
+def build_inference_response(
+    plan: InferencePlan, returncode: int, stdout: str, stderr: str
+) -> TestInferResponse:
+    """Turn a finished client-script run into a TestInferResponse."""
+    if returncode != 0:
         return TestInferResponse(
-            model=model_name,
-            input_type=request.input_type,
-            protocol=use_protocol,
+            model=plan.model,
+            input_type=plan.input_type,
+            protocol=plan.protocol,
             success=False,
             result=None,
-            result_type=result_type,
-            error="Inference timed out",
+            result_type=plan.result_type,
+            error=stderr or stdout,
         )
+
+    # Parse the JSON output file for structured results
+    parsed_result = None
+    inference_time_ms = None
+    total_inference_time_ms = None
+    payload_size_mb = None
+    fps = None
+
+    output_file = Path(plan.output_file)
+    if output_file.exists():
+        try:
+            with open(output_file) as f:
+                parsed_result = json.load(f)
+                # Extract inference time if available
+                if "stats" in parsed_result:
+                    stats = parsed_result["stats"]
+                    inference_time_ms = stats.get("avg_text_ms") or stats.get("avg_batch_ms") or stats.get("avg_frame_ms")
+                    # Calculate total inference time
+                    if "total_time_sec" in stats:
+                        total_inference_time_ms = stats["total_time_sec"] * 1000
+                    elif "total_time_sec" in parsed_result:
+                        total_inference_time_ms = parsed_result["total_time_sec"] * 1000
+                    # Extract payload size and FPS
+                    payload_size_mb = stats.get("total_payload_mb")
+                    fps = stats.get("fps")
+                elif "total_time_sec" in parsed_result:
+                    total_inference_time_ms = parsed_result["total_time_sec"] * 1000
+                    inference_time_ms = total_inference_time_ms
+        except Exception as e:
+            logger.error(f"Failed to parse output JSON: {e}")
+            parsed_result = stdout
+
+    # Format result based on type
+    formatted_result = format_result(parsed_result, plan.result_type, stdout)
+
+    # Determine result file path (relative to results dir) for video or image
+    results_base = Path(settings.results_path)
+    result_file_url = None
+    if plan.result_video_path and Path(plan.result_video_path).exists():
+        result_file_url = Path(plan.result_video_path).relative_to(results_base).as_posix()
+    elif plan.result_image_path and Path(plan.result_image_path).exists():
+        result_file_url = Path(plan.result_image_path).relative_to(results_base).as_posix()
+
+    return TestInferResponse(
+        model=plan.model,
+        input_type=plan.input_type,
+        protocol=plan.protocol,
+        success=True,
+        result=formatted_result,
+        result_type=plan.result_type,
+        inference_time_ms=inference_time_ms,
+        total_inference_time_ms=total_inference_time_ms,
+        payload_size_mb=payload_size_mb,
+        fps=fps,
+        source_file=plan.source_file,
+        result_file=result_file_url,
+    )
+
+
+def _error_response(plan: InferencePlan, error: str) -> TestInferResponse:
+    return TestInferResponse(
+        model=plan.model,
+        input_type=plan.input_type,
+        protocol=plan.protocol,
+        success=False,
+        result=None,
+        result_type=plan.result_type,
+        error=error,
+    )
+
+
+async def fetch_model_config_hash(model_name: str, namespace: str) -> Optional[str]:
+    """Hash of the model's config as Triton serves it, None if unavailable."""
+    proxy_url = get_proxy_url(namespace)
+    async with httpx.AsyncClient(
+        base_url=proxy_url,
+        timeout=10.0,
+        headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("proxy"),
+    ) as client:
+        try:
+            response = await client.get(f"/v2/models/{model_name}/config")
+            if response.status_code != 200:
+                return None
+            return result_cache.hash_config(response.json())
+        except (httpx.HTTPError, ValueError):
+            return None
+
+
+async def result_cache_key(
+    model_name: str, request: TestInferRequest, namespace: str, use_protocol: str
+) -> Optional[str]:
+    """Result-cache key for a test request, None if it can't be cached.
+
+    Uncacheable when the model config can't be fetched (e.g. not loaded)
+    or the sample file is missing.
+    """
+    if request.sample_file:
+        sample_path = Path(settings.samples_path) / request.sample_file
+        if not sample_path.is_file():
+            return None
+        # Hashing a large video the first time takes a while -- off the loop
+        input_digest = await asyncio.to_thread(result_cache.file_digests.digest, sample_path)
+    else:
+        input_digest = hashlib.sha256(
+            json.dumps([request.text, request.texts]).encode()
+        ).hexdigest()
+
+    config_hash = await fetch_model_config_hash(model_name, namespace)
+    if config_hash is None:
+        return None
+
+    params = request.model_dump(exclude={"use_cache", "protocol", "text", "texts", "sample_file"})
+    return result_cache.cache_key(namespace, model_name, config_hash, input_digest, use_protocol, params)
+
+
+def lookup_cached_result(key: Optional[str], request: TestInferRequest) -> Optional[TestInferResponse]:
+    """Cached response for key, unless the request asked for a fresh run."""
+    if key is None or not request.use_cache:
+        return None
+    entry = result_cache.cache.get(key)
+    if entry is None:
+        return None
+    return TestInferResponse(**{**entry.response, "cached": True})
+
+
+def store_result(key: Optional[str], plan: InferencePlan, response: TestInferResponse) -> None:
+    """Cache a successful run; other runs' outputs are kept only briefly."""
+    if key is not None and response.success:
+        result_cache.cache.put(key, plan.namespace, plan.model, response.model_dump(), plan.run_dir)
+    else:
+        result_cache.cache.discard_run(plan.run_dir)
+
+
+@router.post("/infer/{model_name}")
+async def run_inference(
+    model_name: str,
+    request: TestInferRequest,
+    namespace: str = Query(default="local"),
+    protocol: str = Query(default="rest"),
+):
+    """Run inference on a model using client scripts.
+
+    Must finish within INFERENCE_TIMEOUT_SECS; use POST /jobs/{model_name}
+    for long-running tests (e.g. long videos) with progress streaming.
+    """
+    # Use protocol from query param or request body
+    use_protocol = protocol if protocol else request.protocol
+
+    key = await result_cache_key(model_name, request, namespace, use_protocol)
+    cached = lookup_cached_result(key, request)
+    if cached is not None:
+        return cached
+
+    plan = build_inference_plan(model_name, request, namespace, use_protocol)
+    if plan is None:
+        return await run_direct_inference(model_name, request, namespace)
+
+    try:
+        returncode, stdout, stderr = await run_client_process(plan, INFERENCE_TIMEOUT_SECS)
+        response = build_inference_response(plan, returncode, stdout, stderr)
+    except asyncio.TimeoutError:
+        response = _error_response(plan, "Inference timed out")
     except Exception as e:
-        return TestInferResponse(
-            model=model_name,
-            input_type=request.input_type,
-            protocol=use_protocol,
-            success=False,
-            result=None,
-            result_type=result_type,
-            error=str(e),
-        )
+        response = _error_response(plan, str(e))
+    store_result(key, plan, response)
+    return response
+
+
+# =============================================================================
+# Background Jobs
+# =============================================================================
+
+job_manager = JobManager(
+    max_running=settings.test_jobs_max_running,
+    namespace_limit=get_test_job_limit,
+)
+
+# Client-script log lines that carry progress (see yolov8n_video_*_client.py)
+_VIDEO_RANGE_RE = re.compile(r"interval: (\d+), frames \[(\d+), (\d+)\)")
+_BATCH_RE = re.compile(r"Batch \[([\d,]+)\]: inference=\s*([\d.]+)ms")
+_MAX_FRAMES_RE = re.compile(r"--max-frames (\d+)")
+
+
+class ClientProgress:
+    """Derives frames processed / FPS from a client script's log lines."""
+
+    def __init__(self, job: Job, max_frames: Optional[int] = None):
+        self.job = job
+        self.max_frames = max_frames
+        self.started = time.time()
+        self.frames_processed = 0
+        self.batches = 0
+
+    def __call__(self, line: str) -> None:
+        if not line:
+            return
+        range_match = _VIDEO_RANGE_RE.search(line)
+        batch_match = _BATCH_RE.search(line)
+        if range_match:
+            interval, start, end = (int(g) for g in range_match.groups())
+            frames_total = math.ceil((end - start) / max(interval, 1))
+            if self.max_frames:
+                frames_total = min(frames_total, self.max_frames)
+            self.job.update_progress(frames_total=frames_total)
+        elif batch_match:
+            self.batches += 1
+            self.frames_processed += len(batch_match.group(1).split(","))
+            elapsed = time.time() - self.started
+            self.job.update_progress(
+                frames_processed=self.frames_processed,
+                batches=self.batches,
+                last_batch_ms=float(batch_match.group(2)),
+                fps=round(self.frames_processed / elapsed, 2) if elapsed > 0 else None,
+                elapsed_secs=round(elapsed, 1),
+            )
+        else:
+            self.job.publish("log", {"line": line[-500:]})
+
+
+def _make_job_runner(model_name: str, request: TestInferRequest, namespace: str, use_protocol: str):
+    async def runner(job: Job) -> Dict[str, Any]:
+        key = await result_cache_key(model_name, request, namespace, use_protocol)
+        cached = lookup_cached_result(key, request)
+        if cached is not None:
+            job.update_progress(cached=True)
+            return cached.model_dump()
+
+        plan = build_inference_plan(model_name, request, namespace, use_protocol, max_frames=JOB_MAX_FRAMES)
+        if plan is None:
+            response = await run_direct_inference(model_name, request, namespace)
+            return response.model_dump()
+        max_frames_match = _MAX_FRAMES_RE.search(" ".join(plan.cmd))
+        progress = ClientProgress(job, int(max_frames_match.group(1)) if max_frames_match else None)
+        try:
+            returncode, stdout, stderr = await run_client_process(
+                plan, JOB_TIMEOUT_SECS, on_stderr_line=progress
+            )
+            response = build_inference_response(plan, returncode, stdout, stderr)
+        except asyncio.TimeoutError:
+            response = _error_response(plan, "Inference timed out")
+        except asyncio.CancelledError:
+            result_cache.cache.discard_run(plan.run_dir)
+            raise
+        store_result(key, plan, response)
+        return response.model_dump()
+
+    return runner
+
+
+@router.post("/jobs/{model_name}")
+async def submit_inference_job(
+    model_name: str,
+    request: TestInferRequest,
+    namespace: str = Query(default="local"),
+    protocol: str = Query(default="rest"),
+):
+    """Submit a test inference as a background job.
+
+    Returns immediately with a job ID. Follow progress via
+    GET /jobs/{job_id}/events (SSE) and fetch the result via GET /jobs/{job_id}.
+    """
+    use_protocol = protocol if protocol else request.protocol
+    # Unknown models and missing gRPC client scripts fail with a 400 here
+    # rather than as a failed job
+    resolve_client_script(model_name, request, use_protocol)
+    job = job_manager.submit(
+        namespace,
+        model_name,
+        {"protocol": use_protocol, **request.model_dump(exclude_none=True)},
+        _make_job_runner(model_name, request, namespace, use_protocol),
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "queue_position": job_manager.queue_position(job),
+    }
+
+
+@router.get("/jobs")
+async def list_inference_jobs(namespace: Optional[str] = Query(default=None)):
+    """List jobs (newest first) without their results, plus scheduler state."""
+    return {
+        "jobs": [
+            {**job.to_dict(include_result=False), "queue_position": job_manager.queue_position(job)}
+            for job in job_manager.list(namespace)
+        ],
+        "scheduler": job_manager.stats(),
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_inference_job(job_id: str):
+    """Get a job's status, progress and (once finished) its result."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {**job.to_dict(), "queue_position": job_manager.queue_position(job)}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_inference_job(job_id: str):
+    """Cancel a queued or running job (running client scripts are killed)."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_inference_job_events(job_id: str, request: Request):
+    """Stream a job's events as Server-Sent Events.
+
+    Event types: status, progress (frames_processed, frames_total, fps, ...),
+    log, and a final done event carrying the full job. Reconnecting clients
+    resume after the Last-Event-ID header.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    try:
+        last_id = int(request.headers.get("last-event-id") or 0)
+    except ValueError:
+        last_id = 0
+
+    async def event_stream():
+        after = last_id
+        while not (job.finished and after >= job.last_event_id):
+            events = await job.wait_for_events(after, SSE_KEEPALIVE_SECS)
+            if not events:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                after = event["id"]
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def format_result(parsed_result: Any, result_type: str, raw_output: str) -> Any:
@@ -857,7 +1263,12 @@ async def run_direct_inference(
     model_config = MODEL_INPUT_TYPES.get(model_name, {})
     result_type = model_config.get("result_type", "text")
 
-    async with httpx.AsyncClient(base_url=proxy_url, timeout=120.0, headers=get_local_auth_headers()) as client:
+    async with httpx.AsyncClient(
+        base_url=proxy_url,
+        timeout=120.0,
+        headers=get_local_auth_headers(),
+        transport=telemetry.instrumented_transport("proxy"),
+    ) as client:
         try:
             if request.input_type == "text":
                 # For text models, use the generate endpoint if available
@@ -940,6 +1351,26 @@ async def run_direct_inference(
             )
 
 
+# Result cache endpoints
+@router.get("/cache")
+async def get_result_cache(namespace: Optional[str] = Query(default=None)):
+    """Result-cache stats and entries (most recently used first)."""
+    return {
+        "stats": result_cache.cache.stats(),
+        "entries": result_cache.cache.entries(namespace),
+    }
+
+
+@router.delete("/cache")
+async def clear_result_cache(
+    namespace: Optional[str] = Query(default=None),
+    model: Optional[str] = Query(default=None),
+):
+    """Drop cached results for a namespace and/or model (all if neither given)."""
+    removed = result_cache.cache.invalidate(namespace, model)
+    return {"removed": removed, "stats": result_cache.cache.stats()}
+
+
 # Results endpoints
 @router.get("/results")
 async def list_results():
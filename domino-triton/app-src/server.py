@@ -14,9 +14,11 @@ For Domino deployment behind reverse proxy:
     e.g., ROOT_PATH=/app/triton-admin
 """
 
+import asyncio
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -24,6 +26,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+import telemetry
 from routes import dashboard, testing, admin, placement
 from config import settings, load_namespaces
 
@@ -73,6 +76,15 @@ tags_metadata = [
     },
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background self-instrumentation for the app's lifetime."""
+    telemetry.setup_tracing(settings.tracing_enabled, settings.tracing_exporter)
+    lag_task = asyncio.create_task(telemetry.monitor_event_loop_lag())
+    yield
+    lag_task.cancel()
+
+
 app = FastAPI(
     title="Triton Admin Dashboard",
     version="1.0.0",
@@ -101,6 +113,7 @@ A comprehensive dashboard for managing NVIDIA Triton Inference Server deployment
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
     # Note: Don't set root_path here - Domino's gateway strips the path prefix,
     # and setting root_path interferes with StaticFiles mounts.
 )
@@ -115,6 +128,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, in-flight requests and (optional) tracing spans
+app.add_middleware(telemetry.TelemetryMiddleware)
+
 # Mount static files
 static_dir = Path(__file__).parent / "static"
 if static_dir.exists():
@@ -147,7 +163,7 @@ app.include_router(placement.router)
 
 # HTML page routes
 from fastapi import Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 
 @app.get("/results-page", response_class=HTMLResponse)
 async def results_page(request: Request, namespace: str = Query(default=None)):
@@ -249,6 +265,32 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Dashboard self-metrics in Prometheus text format.
+
+    Per-route and per-upstream latency histograms, in-flight gauges,
+    event-loop lag and cache hit ratios.
+    """
+    return PlainTextResponse(
+        telemetry.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/api/telemetry/spans")
+async def telemetry_spans(limit: int = Query(default=100, ge=1, le=telemetry.MAX_RECENT_SPANS)):
+    """Recent OpenTelemetry spans from the in-process exporter (newest first)."""
+    spans = telemetry.recent_spans(limit)
+    if spans is None:
+        return {
+            "enabled": False,
+            "message": "Set TRACING_ENABLED=true (exporter 'memory') with opentelemetry-sdk installed",
+            "spans": [],
+        }
+    return {"enabled": True, "spans": spans}
+
+
 @app.get("/api/namespaces")
 async def get_namespaces():
     """Get available deployment namespaces."""
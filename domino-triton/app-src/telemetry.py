@@ -0,0 +1,452 @@
+"""
+Self-instrumentation for the Triton Admin Dashboard.
+
+Exposes the dashboard's own request metrics in Prometheus text format so a
+slow page can be attributed to the dashboard, the proxy/admin API, or Triton:
+
+- dashboard_http_request_duration_seconds{method,route,status}: per-route
+  latency, labeled by the route template (e.g. /api/dashboard/models/{model_name})
+- dashboard_upstream_request_duration_seconds{upstream,method,endpoint,status}:
+  every outgoing httpx call, labeled by normalized endpoint
+  (e.g. /v2/repository/index, /v2/repository/models/{model}/load)
+- dashboard_http_requests_in_flight / dashboard_upstream_requests_in_flight
+- dashboard_event_loop_lag_seconds: how late the event loop wakes up a
+  periodic sleeper; sustained lag means handlers are blocking the loop
+- dashboard_cache_lookups_total{cache,result} and dashboard_cache_hit_ratio
+
+Optionally (TRACING_ENABLED=true and opentelemetry-sdk installed) each
+request and upstream call is also recorded as an OpenTelemetry span, and the
+W3C trace context is injected into requests to the proxy so its spans join
+the same trace. The default "memory" exporter keeps the most recent spans in
+process (GET /api/telemetry/spans); "console" and "otlp" are also supported.
+
+Metrics are in-memory only (single-replica dashboard) and reset on restart.
+"""
+
+import asyncio
+import contextlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds); upper end covers slow model loads via the proxy
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Event-loop lag buckets (seconds)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# How often the event-loop lag probe wakes up
+LAG_PROBE_INTERVAL_SECS = 0.5
+
+# Spans kept by the in-process exporter
+MAX_RECENT_SPANS = 1000
+
+# Path segments that carry identifiers, collapsed so endpoint labels stay bounded
+_ENDPOINT_PATTERNS = [
+    (re.compile(r"/models/[^/]+"), "/models/{model}"),
+    (re.compile(r"/versions/[^/]+"), "/versions/{version}"),
+    (re.compile(r"/placement/[^/]+"), "/placement/{pod}"),
+]
+
+
+def normalize_endpoint(path: str) -> str:
+    """Collapse model/version/pod names in an upstream path into placeholders."""
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path or "/"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed label set."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_values] = series
+            counts, total = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(c), s[0]) for k, (c, s) in self._series.items()]
+        for label_values, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a fixed label set."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Settable gauge keyed by a fixed label set."""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+http_request_duration = Histogram(
+    "dashboard_http_request_duration_seconds",
+    "Dashboard request latency by route template.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = Gauge(
+    "dashboard_http_requests_in_flight",
+    "Dashboard requests currently being handled.",
+)
+upstream_request_duration = Histogram(
+    "dashboard_upstream_request_duration_seconds",
+    "Outgoing request latency (to response headers) by upstream and endpoint.",
+    ("upstream", "method", "endpoint", "status"),
+)
+upstream_requests_in_flight = Gauge(
+    "dashboard_upstream_requests_in_flight",
+    "Outgoing requests currently waiting on an upstream.",
+    ("upstream",),
+)
+event_loop_lag = Histogram(
+    "dashboard_event_loop_lag_seconds",
+    "How late the event loop woke a periodic probe.",
+    (),
+    buckets=LAG_BUCKETS,
+)
+event_loop_lag_last = Gauge(
+    "dashboard_event_loop_lag_last_seconds",
+    "Most recent event-loop lag sample.",
+)
+cache_lookups = Counter(
+    "dashboard_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a lookup against one of the dashboard's in-memory caches."""
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+
+
+def _render_cache_hit_ratio() -> List[str]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in cache_lookups.values().items():
+        entry = totals.setdefault(cache, [0.0, 0.0])
+        entry[0 if result == "hit" else 1] += value
+    lines = [
+        "# HELP dashboard_cache_hit_ratio Hits / lookups since start, per cache.",
+        "# TYPE dashboard_cache_hit_ratio gauge",
+    ]
+    for cache, (hits, misses) in sorted(totals.items()):
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f'dashboard_cache_hit_ratio{{cache="{cache}"}} {round(ratio, 6)}')
+    return lines
+
+
+def render_metrics() -> str:
+    """All dashboard metrics in Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in (
+        http_request_duration,
+        http_requests_in_flight,
+        upstream_request_duration,
+        upstream_requests_in_flight,
+        event_loop_lag,
+        event_loop_lag_last,
+        cache_lookups,
+    ):
+        lines.extend(metric.render())
+    lines.extend(_render_cache_hit_ratio())
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Tracing (optional)
+# =============================================================================
+
+_tracer = None
+_span_store: Optional[Deque[Dict[str, Any]]] = None
+
+
+def setup_tracing(enabled: bool, exporter: str = "memory",
+                  service_name: str = "triton-admin-dashboard") -> bool:
+    """Configure OpenTelemetry tracing if enabled and the SDK is installed.
+
+    Returns True if spans will be recorded.
+    """
+    global _tracer, _span_store
+
+    if not enabled:
+        return False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+            SimpleSpanProcessor,
+            SpanExporter,
+            SpanExportResult,
+        )
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+
+    if exporter == "console":
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("OTLP exporter requested but opentelemetry-exporter-otlp is not installed")
+            return False
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    else:
+        store: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_SPANS)
+
+        class RecentSpanExporter(SpanExporter):
+            """Keeps the most recent finished spans in memory."""
+
+            def export(self, spans):
+                for span in spans:
+                    store.append({
+                        "name": span.name,
+                        "trace_id": format(span.context.trace_id, "032x"),
+                        "span_id": format(span.context.span_id, "016x"),
+                        "parent_span_id": format(span.parent.span_id, "016x") if span.parent else None,
+                        "kind": span.kind.name,
+                        "start_time": span.start_time / 1e9,
+                        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+                        "attributes": dict(span.attributes or {}),
+                    })
+                return SpanExportResult.SUCCESS
+
+            def shutdown(self):
+                pass
+
+        provider.add_span_processor(SimpleSpanProcessor(RecentSpanExporter()))
+        _span_store = store
+
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    logger.info(f"OpenTelemetry tracing enabled (exporter={exporter})")
+    return True
+
+
+def recent_spans(limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+    """Most recent spans from the in-process exporter, newest first.
+
+    Returns None when the in-process exporter is not active.
+    """
+    if _span_store is None:
+        return None
+    return list(reversed(list(_span_store)))[:limit]
+
+
+# =============================================================================
+# Instrumentation
+# =============================================================================
+
+class TelemetryMiddleware:
+    """ASGI middleware recording per-route latency, in-flight count and spans."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        span_cm = contextlib.nullcontext()
+        if _tracer is not None:
+            from opentelemetry import propagate, trace
+
+            carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+            span_cm = _tracer.start_as_current_span(
+                f"{scope['method']} {scope['path']}",
+                context=propagate.extract(carrier),
+                kind=trace.SpanKind.SERVER,
+            )
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        with span_cm as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                http_requests_in_flight.dec()
+                route = scope.get("route")
+                route_path = getattr(route, "path", None) or "unmatched"
+                http_request_duration.observe(elapsed, scope["method"], route_path, str(status["code"]))
+                if span is not None:
+                    span.update_name(f"{scope['method']} {route_path}")
+                    span.set_attribute("http.route", route_path)
+                    span.set_attribute("http.status_code", status["code"])
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that times upstream calls and propagates trace context."""
+
+    def __init__(self, upstream: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.upstream = upstream
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = normalize_endpoint(request.url.path)
+        status = "error"
+
+        span_cm = contextlib.nullcontext()
+        if _tracer is not None:
+            from opentelemetry import propagate, trace
+
+            span_cm = _tracer.start_as_current_span(
+                f"{request.method} {endpoint}", kind=trace.SpanKind.CLIENT
+            )
+
+        with span_cm as span:
+            if span is not None:
+                span.set_attribute("upstream", self.upstream)
+                span.set_attribute("http.url", str(request.url))
+                propagate.inject(request.headers)
+
+            upstream_requests_in_flight.inc(self.upstream)
+            start = time.perf_counter()
+            try:
+                response = await self._transport.handle_async_request(request)
+                status = str(response.status_code)
+                return response
+            finally:
+                upstream_request_duration.observe(
+                    time.perf_counter() - start, self.upstream, request.method, endpoint, status
+                )
+                upstream_requests_in_flight.dec(self.upstream)
+                if span is not None:
+                    span.set_attribute("http.status_code", status)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def instrumented_transport(upstream: str) -> InstrumentedTransport:
+    """Transport for httpx.AsyncClient(transport=...) labeled with an upstream name."""
+    return InstrumentedTransport(upstream)
+
+
+async def monitor_event_loop_lag(interval: float = LAG_PROBE_INTERVAL_SECS) -> None:
+    """Sample event-loop lag forever; run as a background task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        event_loop_lag.observe(lag)
+        event_loop_lag_last.set(lag)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+benchmark_bert_pipeline.py
+
+Client-side vs server-side tokenization for bert-base-uncased under
+concurrent load, one text per request:
+  - client:   the client tokenizes and pads every text to 128 tokens and
+              calls bert-base-uncased (bert_text_grpc_client.py)
+  - pipeline: the client sends the raw text to bert-base-uncased-pipeline;
+              bert-base-uncased-tokenizer pads each dynamic batch only to
+              its longest text (bert_text_grpc_client.py --pipeline)
+
+Each mode runs three text-length distributions:
+  - short: one sentence (~10-15 tokens)
+  - long:  ten sentences, truncated at 128 tokens
+  - mixed: 75% short / 25% long, shuffled with a fixed seed
+
+Reported per (distribution, mode):
+  - texts/s (aggregate over --concurrency client threads)
+  - latency p50 / p95 per request (client-side tokenization included)
+  - prediction agreement between the two modes
+
+Usage:
+    python scripts/benchmarks/benchmark_bert_pipeline.py
+    python scripts/benchmarks/benchmark_bert_pipeline.py --concurrency 16 --requests 256
+    python scripts/benchmarks/benchmark_bert_pipeline.py --distributions short mixed
+
+Environment variables:
+    TRITON_GRPC_URL  - gRPC URL (default: localhost:50051)
+    DOMINO_USER_API_KEY - API key for authentication
+
+Requirements:
+    - bert-base-uncased, bert-base-uncased-tokenizer and
+      bert-base-uncased-pipeline loaded (scripts/download/download_bert.py)
+    - transformers (client-side tokenization for the client mode)
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import tritonclient.grpc as grpcclient
+
+# Add clients directory to path for auth_helper / bert client imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "clients"))
+from auth_helper import get_auth_headers
+from bert_text_grpc_client import PIPELINE_MODEL, build_inputs, get_tokenizer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "bert"
+
+DEFAULT_GRPC_URL = os.environ.get("TRITON_GRPC_URL", "localhost:50051")
+MODES = {"client": "bert-base-uncased", "pipeline": PIPELINE_MODEL}
+
+SENTENCES = [
+    "I absolutely loved this movie, it was fantastic from start to finish.",
+    "This product is terrible and a complete waste of money.",
+    "The weather is nice today, so we walked along the river.",
+    "I'm not sure how I feel about the ending of the book.",
+    "Best experience ever, the staff were friendly and quick to help.",
+    "The battery died after two days and support never answered.",
+    "It was fine, nothing special, but it did the job well enough.",
+    "The soundtrack was beautiful but the plot dragged in the middle.",
+    "Delivery was late and the box arrived crushed on one side.",
+    "Honestly one of the best meals I have had in years.",
+]
+
+
+def make_texts(distribution: str, count: int, seed: int = 0) -> list:
+    """`count` texts drawn from one length distribution."""
+    rng = np.random.default_rng(seed)
+
+    def short():
+        return str(rng.choice(SENTENCES))
+
+    def long():
+        return " ".join(rng.permutation(SENTENCES))
+
+    if distribution == "short":
+        return [short() for _ in range(count)]
+    if distribution == "long":
+        return [long() for _ in range(count)]
+    return [long() if rng.random() < 0.25 else short() for _ in range(count)]
+
+
+def run_mode(url: str, headers: dict, mode: str, texts: list, concurrency: int) -> dict:
+    """Send every text as its own request with `concurrency` in flight."""
+    model_name = MODES[mode]
+    local = threading.local()
+
+    def infer(client, text: str) -> dict:
+        start = time.perf_counter()
+        try:
+            tokenizer = None
+            if mode == "client":
+                # HF fast tokenizers are not safe to share across threads
+                if not hasattr(local, "tokenizer"):
+                    local.tokenizer = get_tokenizer()
+                tokenizer = local.tokenizer
+            response = client.infer(
+                model_name,
+                inputs=build_inputs(grpcclient, [text], tokenizer),
+                outputs=[grpcclient.InferRequestedOutput("logits")],
+                headers=headers,
+            )
+            label = int(np.argmax(response.as_numpy("logits")[0]))
+            return {"success": True, "latency": time.perf_counter() - start, "label": label}
+        except Exception as e:
+            return {"success": False, "latency": time.perf_counter() - start, "error": str(e)}
+
+    def worker(offset: int) -> list:
+        client = grpcclient.InferenceServerClient(url=url)
+        try:
+            return [(i, infer(client, texts[i])) for i in range(offset, len(texts), concurrency)]
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for batch in pool.map(worker, range(concurrency)) for r in batch]
+    wall = time.perf_counter() - start
+
+    results.sort(key=lambda r: r[0])
+    ok = [r for _, r in results if r["success"]]
+    for _, r in results:
+        if not r["success"]:
+            logger.warning(f"  request failed: {r['error']}")
+    latencies = [r["latency"] for r in ok]
+    return {
+        "model": model_name,
+        "requests": len(texts),
+        "succeeded": len(ok),
+        "wall_secs": round(wall, 3),
+        "texts_per_sec": round(len(ok) / wall, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else None,
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else None,
+        "_labels": [r.get("label") for _, r in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bert-base-uncased: client-side vs server-side tokenization")
+    parser.add_argument("--grpc-url", "-u", default=DEFAULT_GRPC_URL, help="gRPC URL (env: TRITON_GRPC_URL)")
+    parser.add_argument("--distributions", nargs="+", choices=["short", "mixed", "long"],
+                        default=["short", "mixed", "long"], help="Text-length distributions (default: all)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (default: 8)")
+    parser.add_argument("--requests", type=int, default=128, help="Texts per distribution and mode (default: 128)")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "bert_pipeline.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    headers = get_auth_headers()
+    tokenizer = get_tokenizer()
+
+    # Warmup both paths
+    client = grpcclient.InferenceServerClient(url=args.grpc_url)
+    try:
+        for mode, model_name in MODES.items():
+            client.infer(model_name, inputs=build_inputs(grpcclient, [SENTENCES[0]],
+                                                         tokenizer if mode == "client" else None),
+                         headers=headers)
+    finally:
+        client.close()
+
+    results = {}
+    for distribution in args.distributions:
+        texts = make_texts(distribution, args.requests)
+        lengths = [len(ids) for ids in tokenizer(texts, truncation=True, max_length=128)["input_ids"]]
+        runs = {}
+        for mode in MODES:
+            logger.info(f"[{distribution}] {mode}: {len(texts)} texts, concurrency {args.concurrency}...")
+            runs[mode] = run_mode(args.grpc_url, headers, mode, texts, args.concurrency)
+        client_labels, pipeline_labels = runs["client"].pop("_labels"), runs["pipeline"].pop("_labels")
+        agree = sum(1 for a, b in zip(client_labels, pipeline_labels) if a is not None and a == b)
+        results[distribution] = {
+            "avg_tokens": round(float(np.mean(lengths)), 1),
+            "modes": runs,
+            "prediction_agreement": f"{agree}/{len(texts)}",
+        }
+
+    print()
+    print(f"{args.requests} texts per run, one text per request, concurrency {args.concurrency}")
+    print(f"{'texts':>6} | {'tokens':>6} | {'mode':>8} | {'texts/s':>8} | {'p50 ms':>7} | {'p95 ms':>7} | {'speedup':>7}")
+    print("-" * 68)
+    for distribution, r in results.items():
+        baseline = r["modes"]["client"]["texts_per_sec"]
+        for mode, m in r["modes"].items():
+            speedup = f"{m['texts_per_sec'] / baseline:.2f}x" if baseline else "-"
+            print(f"{distribution:>6} | {r['avg_tokens']:>6.1f} | {mode:>8} | {m['texts_per_sec']:>8.1f} | "
+                  f"{m['latency_p50_ms'] or 0:>7.1f} | {m['latency_p95_ms'] or 0:>7.1f} | {speedup:>7}")
+        print(f"{'':>6} | {'':>6} | {'agree':>8} | {r['prediction_agreement']:>8}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "grpc_url": args.grpc_url,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "timestamp": datetime.now().isoformat(),
+            "distributions": results,
+        }, f, indent=2)
+    logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
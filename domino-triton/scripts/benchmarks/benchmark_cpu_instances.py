@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+benchmark_cpu_instances.py
+
+CPU throughput as a function of instance count, with and without the
+per-instance thread partitioning of triton-repo-reference/shared/cpu_threads.py
+(config.pbtxt cpu_thread_partitioning).
+
+Each Triton KIND_CPU instance of a Python backend model is its own process.
+This script reproduces that without Triton: for each instance count N
+(default 1 2 4) it starts N worker processes that each load the model,
+wait at a barrier, then generate back to back for --seconds. Modes:
+  - default:     torch's default threads (one per core in every process)
+  - partitioned: partition_cpu_threads() with the same instance_group,
+                 as initialize() does (add --affinity to also pin CPUs)
+
+Reported per (mode, instances): aggregate tokens/s, tokens/s per instance
+and threads per instance.
+
+Usage:
+    python scripts/benchmarks/benchmark_cpu_instances.py
+    python scripts/benchmarks/benchmark_cpu_instances.py --instances 1 2 4 8 --seconds 60
+    python scripts/benchmarks/benchmark_cpu_instances.py --model TinyLlama/TinyLlama-1.1B-Chat-v1.0 --max-tokens 32
+
+Requirements:
+    - torch, transformers (see smollm-135m-python/requirements.txt)
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+SHARED_DIR = PROJECT_ROOT / "triton-repo-reference" / "shared"
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "cpu"
+
+PROMPT = "Explain in a few sentences why the sky is blue."
+
+
+def run_worker(args) -> dict:
+    """One emulated instance: load, wait at the barrier, generate for args.seconds."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    threads = torch.get_num_threads()
+    if args.mode == "partitioned":
+        sys.path.insert(0, str(SHARED_DIR))
+        from cpu_threads import partition_cpu_threads
+
+        model_config = {"instance_group": [{"name": "bench_0", "kind": "KIND_CPU", "count": args.count}]}
+        parameters = {
+            "cpu_thread_partitioning": {"string_value": "true"},
+            "cpu_affinity": {"string_value": "true" if args.affinity else "false"},
+        }
+        threads = partition_cpu_threads(model_config, f"bench_0_{args.index}", "CPU", parameters, "bench")["threads"]
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).eval()
+    inputs = tokenizer(PROMPT, return_tensors="pt")
+
+    def generate() -> int:
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=args.max_tokens, min_new_tokens=args.max_tokens,
+                                    do_sample=False, pad_token_id=tokenizer.eos_token_id)
+        return output.shape[1] - inputs["input_ids"].shape[1]
+
+    generate()  # warmup
+
+    barrier = Path(args.barrier)
+    (barrier / f"ready-{args.index}").touch()
+    while not (barrier / "go").exists():
+        time.sleep(0.05)
+
+    tokens = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        tokens += generate()
+    elapsed = time.perf_counter() - started
+    return {"index": args.index, "threads": threads, "tokens": tokens, "seconds": round(elapsed, 2)}
+
+
+def run_level(args, mode: str, count: int) -> dict:
+    """Start `count` workers together and aggregate their throughput."""
+    barrier = tempfile.mkdtemp(prefix="cpu-instances-")
+    command = [sys.executable, __file__, "--worker", "--mode", mode, "--count", str(count),
+               "--barrier", barrier, "--model", args.model, "--seconds", str(args.seconds),
+               "--max-tokens", str(args.max_tokens)] + (["--affinity"] if args.affinity else [])
+    workers = [
+        subprocess.Popen(command + ["--index", str(index)], stdout=subprocess.PIPE, text=True)
+        for index in range(count)
+    ]
+    while sum(1 for path in Path(barrier).iterdir() if path.name.startswith("ready-")) < count:
+        if any(worker.poll() not in (None, 0) for worker in workers):
+            raise RuntimeError("A worker failed before the barrier")
+        time.sleep(0.1)
+    (Path(barrier) / "go").touch()
+
+    results = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+    tokens_per_sec = sum(r["tokens"] / r["seconds"] for r in results)
+    return {
+        "mode": mode,
+        "instances": count,
+        "threads_per_instance": results[0]["threads"],
+        "tokens_per_sec": round(tokens_per_sec, 1),
+        "tokens_per_sec_per_instance": round(tokens_per_sec / count, 1),
+        "workers": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU throughput vs instance count (thread partitioning on/off)")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM-135M-Instruct", help="Hugging Face model id")
+    parser.add_argument("--instances", type=int, nargs="+", default=[1, 2, 4], help="Instance counts (default: 1 2 4)")
+    parser.add_argument("--modes", nargs="+", default=["default", "partitioned"], choices=["default", "partitioned"])
+    parser.add_argument("--affinity", action="store_true", help="Also pin partitioned instances (cpu_affinity)")
+    parser.add_argument("--seconds", type=float, default=30, help="Measurement time per level (default: 30)")
+    parser.add_argument("--max-tokens", type=int, default=64, help="Tokens per generate() (default: 64)")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "cpu_instances.json"),
+                        help="Results JSON path")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="default", help=argparse.SUPPRESS)
+    parser.add_argument("--index", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--count", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--barrier", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    sys.path.insert(0, str(SHARED_DIR))
+    from cpu_threads import available_cores, cgroup_cpu_quota
+
+    print(f"Model: {args.model}, {available_cores()} cores (quota {cgroup_cpu_quota() or 'none'})")
+    levels = []
+    for mode in args.modes:
+        for count in args.instances:
+            print(f"{mode}: {count} instance(s)...", flush=True)
+            levels.append(run_level(args, mode, count))
+
+    print()
+    print(f"{'mode':>11} | {'instances':>9} | {'threads':>7} | {'tok/s':>8} | {'tok/s/inst':>10}")
+    print("-" * 58)
+    for level in levels:
+        print(f"{level['mode']:>11} | {level['instances']:>9} | {level['threads_per_instance']:>7} | "
+              f"{level['tokens_per_sec']:>8.1f} | {level['tokens_per_sec_per_instance']:>10.1f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": args.model,
+            "cores": available_cores(),
+            "affinity": args.affinity,
+            "timestamp": datetime.now().isoformat(),
+            "levels": levels,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
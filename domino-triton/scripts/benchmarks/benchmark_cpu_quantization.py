@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+benchmark_cpu_quantization.py
+
+float32 vs int8 vs bf16 CPU inference for the causal LMs served by
+smollm-135m-python and tinyllama-python, loaded through
+triton-repo-reference/shared/cpu_quantization.py exactly as initialize()
+does (config.pbtxt cpu_quantization).
+
+Each mode runs in its own worker process so resident memory is measured
+in isolation. Per mode:
+  - load seconds (first load builds the cached artifact, --reload measures
+    a second load from the cache)
+  - resident memory (VmRSS) after load and peak (VmHWM) after generation
+  - tokens/s of greedy generation over the prompts
+  - agreement with float32: prompts with identical output and the share of
+    generated tokens that match float32 position by position
+
+Usage:
+    python scripts/benchmarks/benchmark_cpu_quantization.py
+    python scripts/benchmarks/benchmark_cpu_quantization.py --modes none int8 --max-tokens 128
+    python scripts/benchmarks/benchmark_cpu_quantization.py --model TinyLlama/TinyLlama-1.1B-Chat-v1.0 --max-tokens 32
+
+Requirements:
+    - torch, transformers (see smollm-135m-python/requirements.txt)
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+SHARED_DIR = PROJECT_ROOT / "triton-repo-reference" / "shared"
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "cpu"
+
+PROMPTS = [
+    "Explain in a few sentences why the sky is blue.",
+    "Write a short poem about the ocean.",
+    "What are the three primary colors?",
+    "List the steps to make a cup of tea.",
+    "Summarize the plot of Romeo and Juliet in two sentences.",
+]
+
+
+def memory_mb() -> dict:
+    """Resident (VmRSS) and peak resident (VmHWM) memory of this process in MB."""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = round(int(value.split()[0]) / 1024, 1)
+    return values
+
+
+def run_worker(args) -> dict:
+    """Load one mode, then generate greedily for every prompt."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    sys.path.insert(0, str(SHARED_DIR))
+    from cpu_quantization import load_cpu_model
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    parameters = {
+        "cpu_quantization": {"string_value": args.mode},
+        "cpu_quantization_dir": {"string_value": args.cache_dir},
+    }
+    load_float32 = lambda: AutoModelForCausalLM.from_pretrained(
+        args.model, torch_dtype=torch.float32, low_cpu_mem_usage=True
+    )
+
+    load = lambda: load_cpu_model(parameters, "benchmark", "1", load_float32)
+    started = time.perf_counter()
+    model, applied = load()
+    load_secs = time.perf_counter() - started
+    cached_load_secs = None
+    if args.reload:
+        del model
+        started = time.perf_counter()
+        model, applied = load()
+        cached_load_secs = round(time.perf_counter() - started, 2)
+    model.eval()
+    loaded = memory_mb()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    encoded = [tokenizer(prompt, return_tensors="pt") for prompt in PROMPTS]
+
+    def generate(inputs):
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=args.max_tokens, do_sample=False,
+                                    pad_token_id=tokenizer.eos_token_id)
+        return output[0, inputs["input_ids"].shape[1]:].tolist()
+
+    generate(encoded[0])  # warmup
+    outputs, tokens = [], 0
+    started = time.perf_counter()
+    for inputs in encoded:
+        ids = generate(inputs)
+        outputs.append(ids)
+        tokens += len(ids)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": args.mode,
+        "applied": applied,
+        "load_secs": round(load_secs, 2),
+        "cached_load_secs": cached_load_secs,
+        "rss_mb": loaded["VmRSS"],
+        "peak_rss_mb": memory_mb()["VmHWM"],
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / elapsed, 1),
+        "outputs": outputs,
+    }
+
+
+def agreement(outputs, reference) -> dict:
+    """Exact-match prompts and position-wise token agreement against the reference outputs."""
+    exact = sum(1 for ids, ref in zip(outputs, reference) if ids == ref)
+    matched = sum(sum(1 for a, b in zip(ids, ref) if a == b) for ids, ref in zip(outputs, reference))
+    total = sum(max(len(ids), len(ref)) for ids, ref in zip(outputs, reference))
+    return {
+        "exact_match": f"{exact}/{len(reference)}",
+        "token_agreement": round(matched / total, 3) if total else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 vs int8 vs bf16 CPU inference (cpu_quantization)")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM-135M-Instruct", help="Hugging Face model id")
+    parser.add_argument("--modes", nargs="+", default=["none", "int8", "bf16"], choices=["none", "int8", "bf16"])
+    parser.add_argument("--max-tokens", type=int, default=64, help="Tokens per prompt (default: 64)")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads (default: torch's)")
+    parser.add_argument("--cache-dir", default=None, help="cpu_quantization_dir (default: a temporary directory)")
+    parser.add_argument("--reload", action="store_true", help="Also time a second load from the cache")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "cpu_quantization.json"),
+                        help="Results JSON path")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="none", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="cpu-quantization-")
+    modes = ["none"] + [mode for mode in args.modes if mode != "none"]  # float32 is the reference
+    results = []
+    for mode in modes:
+        print(f"{mode}...", flush=True)
+        command = [sys.executable, __file__, "--worker", "--mode", mode, "--model", args.model,
+                   "--max-tokens", str(args.max_tokens), "--threads", str(args.threads),
+                   "--cache-dir", cache_dir] + (["--reload"] if args.reload else [])
+        output = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    reference = results[0]["outputs"]
+    for result in results:
+        result.update(agreement(result["outputs"], reference))
+
+    print()
+    print(f"Model: {args.model}, {len(PROMPTS)} prompts x {args.max_tokens} tokens")
+    print(f"{'mode':>5} | {'applied':>7} | {'load s':>6} | {'RSS MB':>7} | {'peak MB':>7} | "
+          f"{'tok/s':>7} | {'exact':>5} | {'tokens':>6}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['mode']:>5} | {r['applied']:>7} | {r['load_secs']:>6.1f} | {r['rss_mb']:>7.0f} | "
+              f"{r['peak_rss_mb']:>7.0f} | {r['tokens_per_sec']:>7.1f} | {r['exact_match']:>5} | "
+              f"{r['token_agreement']:>6.1%}")
+    if args.reload:
+        print("Cached load s: " + ", ".join(f"{r['mode']}={r['cached_load_secs']}" for r in results))
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({
+            "model": args.model,
+            "prompts": PROMPTS,
+            "max_tokens": args.max_tokens,
+            "timestamp": datetime.now().isoformat(),
+            "modes": results,
+        }, f, indent=2)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+benchmark_grammar_cache.py
+
+Cold vs warm load time of tinyllama-python version 2 (Outlines) with the
+persistent grammar cache (triton-repo-reference/shared/grammar_cache.py).
+
+Each run initializes version 2 in a fresh process, exactly as Triton would
+after a reload or on a new replica:
+  - cold: empty cache directory -- every schema is compiled
+  - warm: the same directory again -- indexes come from the cache
+
+Reported per run: seconds per schema (qa, entity, sentiment, regex_phone),
+total grammar build time, and total initialize() time (includes loading
+the model weights, which the cache does not change).
+
+Usage:
+    python scripts/benchmarks/benchmark_grammar_cache.py
+    python scripts/benchmarks/benchmark_grammar_cache.py --warm-runs 3 --output results.json
+
+Requirements:
+    - torch, transformers, outlines (see tinyllama-python/requirements-model.txt)
+"""
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_FILE = PROJECT_ROOT / "triton-repo-reference" / "models" / "tinyllama-python" / "2" / "model.py"
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "tinyllama"
+
+
+def run_worker(cache_dir: str) -> dict:
+    """Initialize version 2 once in this process and return its timings."""
+    if "triton_python_backend_utils" not in sys.modules:
+        sys.modules["triton_python_backend_utils"] = types.ModuleType("triton_python_backend_utils")
+    spec = importlib.util.spec_from_file_location("tinyllama_python_v2", MODEL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    model_config = {
+        "parameters": {
+            "grammar_cache": {"string_value": "true"},
+            "grammar_cache_dir": {"string_value": cache_dir},
+        }
+    }
+    model = module.TritonPythonModel()
+    started = time.perf_counter()
+    model.initialize({"model_config": json.dumps(model_config)})
+    initialize_secs = time.perf_counter() - started
+
+    stats = model.grammar_cache.stats()
+    return {
+        "initialize_seconds": round(initialize_secs, 2),
+        "grammar_seconds": stats["total_build_seconds"],
+        "schemas": {label: build["seconds"] for label, build in stats["builds"].items()},
+        "warm": all(build["warm"] for build in stats["builds"].values()),
+    }
+
+
+def spawn(cache_dir: str) -> dict:
+    """Run the worker in a fresh interpreter (no in-process caches)."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", "--cache-dir", cache_dir],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm grammar cache load time (tinyllama-python v2)")
+    parser.add_argument("--warm-runs", type=int, default=2, help="Warm reloads to time (default: 2)")
+    parser.add_argument("--cache-dir", default=None, help="Cache root (default: a new temporary directory)")
+    parser.add_argument("--output", default=None,
+                        help=f"Write results JSON (e.g. {MODEL_RESULTS_DIR}/benchmark/grammar_cache.json)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.cache_dir)))
+        return
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix="grammar-cache-")
+    print(f"Cache directory: {cache_dir}")
+    runs = [("cold", spawn(cache_dir))]
+    for index in range(args.warm_runs):
+        runs.append((f"warm {index + 1}", spawn(cache_dir)))
+
+    labels = list(runs[0][1]["schemas"])
+    print()
+    print(f"{'run':>7} | " + " | ".join(f"{label:>11}" for label in labels) + f" | {'grammars':>8} | {'init':>7}")
+    print("-" * (24 + 14 * len(labels) + 10))
+    for name, run in runs:
+        print(f"{name:>7} | " + " | ".join(f"{run['schemas'][label]:>10.2f}s" for label in labels)
+              + f" | {run['grammar_seconds']:>7.2f}s | {run['initialize_seconds']:>6.1f}s")
+
+    cold = runs[0][1]["grammar_seconds"]
+    warm = min(run["grammar_seconds"] for _, run in runs[1:]) if len(runs) > 1 else None
+    if warm:
+        print(f"\nGrammar build speedup (cold / best warm): {cold / warm:.1f}x")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(),
+                "cache_dir": cache_dir,
+                "runs": [{"run": name, **run} for name, run in runs],
+            }, f, indent=2)
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+benchmark_json_constraints.py
+
+CPU benchmark of the JSON-mode constraint in tinyllama-python version 1
+(triton-repo-reference/models/tinyllama-python/1/model.py), comparing the
+previous regex/decode-based JsonPrefixLogitsProcessor ("legacy") with the
+precomputed-mask automaton ("automaton").
+
+Modes:
+  processor  - Replays a fixed JSON answer token by token through each
+               processor with random logits, for several output lengths.
+               Isolates constraint overhead (no model forward pass), so the
+               per-token cost growth of the legacy processor is visible.
+  stop       - Same replay through the JSON stop criteria: the previous
+               full-decode check vs the incremental per-row detector, for
+               several output lengths and --batch-size rows. The incremental
+               check's cost per token should stay flat as outputs grow.
+  generate   - Runs model.generate() on CPU with each processor (greedy,
+               up to --max-tokens) and reports end-to-end tokens/s.
+
+Usage:
+    python scripts/benchmarks/benchmark_json_constraints.py
+    python scripts/benchmarks/benchmark_json_constraints.py --mode generate --max-tokens 64
+    python scripts/benchmarks/benchmark_json_constraints.py --lengths 32 128 512 --output results.json
+    python scripts/benchmarks/benchmark_json_constraints.py --mode stop --lengths 64 256 1024 --batch-size 4
+
+Requirements:
+    - torch, transformers (CPU is fine)
+    - TinyLlama tokenizer (and weights for --mode generate), from the
+      Hugging Face hub or a local path via --model
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import re
+import sys
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, LogitsProcessor, LogitsProcessorList
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_FILE = PROJECT_ROOT / "triton-repo-reference" / "models" / "tinyllama-python" / "1" / "model.py"
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "tinyllama"
+
+DEFAULT_MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+DEFAULT_PROMPT = "What is the capital of France? Explain briefly."
+JSON_INSTRUCTION = 'Return ONLY JSON: {"answer":"string","confidence":0.0}'
+
+
+def load_model_module():
+    """
+    Import tinyllama-python/1/model.py outside Triton.
+
+    The module imports triton_python_backend_utils at top level; the classes
+    benchmarked here never use it, so an empty module is registered under
+    that name when the real one is not available.
+    """
+    if "triton_python_backend_utils" not in sys.modules:
+        sys.modules["triton_python_backend_utils"] = types.ModuleType("triton_python_backend_utils")
+    spec = importlib.util.spec_from_file_location("tinyllama_python_v1", MODEL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LegacyJsonPrefixLogitsProcessor(LogitsProcessor):
+    """The previous processor: decode + regex state detection + per-step re-encoding."""
+
+    def __init__(self, tokenizer, prompt_length: int):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+
+    def _mask(self, scores, allowed_strings):
+        allowed_ids = set()
+        for s in allowed_strings:
+            for tid in self.tokenizer.encode(s, add_special_tokens=False):
+                allowed_ids.add(tid)
+        if not allowed_ids:
+            return scores
+        masked = scores.clone()
+        masked[:] = float("-inf")
+        for tid in allowed_ids:
+            masked[:, tid] = scores[:, tid]
+        return masked
+
+    def __call__(self, input_ids, scores):
+        text = self.tokenizer.decode(input_ids[0][self.prompt_length:], skip_special_tokens=True).rstrip()
+        if "{" not in text:
+            return self._mask(scores, ["{"])
+        if text.endswith("{"):
+            return self._mask(scores, ['"answer"', ' "answer"'])
+        if '"answer"' in text and not re.search(r'"answer"\s*:', text):
+            return self._mask(scores, [":"])
+        if re.search(r'"answer"\s*:\s*$', text):
+            return self._mask(scores, ['"', ' "'])
+        if re.search(r'"answer"\s*:\s*"[^"]*"$', text):
+            return self._mask(scores, [","])
+        if text.rstrip().endswith(","):
+            return self._mask(scores, ['"confidence"', ' "confidence"'])
+        if '"confidence"' in text and not re.search(r'"confidence"\s*:', text):
+            return self._mask(scores, [":"])
+        if re.search(r'"confidence"\s*:\s*-?\d+(\.\d+)?$', text):
+            return self._mask(scores, ["}"])
+        return scores
+
+
+class LegacyJsonStopCriteria:
+    """The previous stop check: decode the full sequence and count braces."""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def __call__(self, input_ids, scores, **kwargs):
+        text = self.tokenizer.decode(input_ids[0], skip_special_tokens=True)
+        return (
+            text.count("{") > 0
+            and text.count("{") == text.count("}")
+            and text.strip().endswith("}")
+        )
+
+
+def answer_token_ids(tokenizer, length: int) -> list:
+    """Token ids of a JSON answer roughly `length` tokens long."""
+    words = []
+    while True:
+        words.append("Paris is the capital and largest city of France.")
+        text = '{"answer": "' + " ".join(words) + '", "confidence": 0.95}'
+        ids = tokenizer.encode(text, add_special_tokens=False)
+        if len(ids) >= length:
+            return ids
+
+
+def bench_processor(name: str, make_processor, tokenizer, prompt_ids, answer_ids, vocab_size, repeats):
+    """Tokens/s of one processor replaying answer_ids (teacher-forced, random logits)."""
+    torch.manual_seed(0)
+    scores = torch.randn(1, vocab_size)
+    best = None
+    for _ in range(repeats):
+        processor = make_processor(len(prompt_ids))
+        ids = torch.tensor([prompt_ids], dtype=torch.long)
+        started = time.perf_counter()
+        for token_id in answer_ids:
+            processor(ids, scores)
+            ids = torch.cat([ids, torch.tensor([[token_id]])], dim=1)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "processor": name,
+        "tokens": len(answer_ids),
+        "seconds": round(best, 4),
+        "tokens_per_sec": round(len(answer_ids) / best, 1),
+        "us_per_token": round(best / len(answer_ids) * 1e6, 1),
+    }
+
+
+def run_processor_mode(args, module, tokenizer):
+    vocab_size = len(tokenizer)
+    automaton = module.JsonSchemaAutomaton(tokenizer, vocab_size=vocab_size)
+    logger.info(f"Automaton: {automaton.num_states} states, compiled in {automaton.compile_secs:.2f}s")
+
+    prompt_ids = prompt_token_ids(tokenizer, args.prompt)
+    processors = {
+        "legacy": lambda n: LegacyJsonPrefixLogitsProcessor(tokenizer, n),
+        "automaton": lambda n: module.JsonPrefixLogitsProcessor(automaton, n),
+    }
+
+    results = []
+    for length in args.lengths:
+        answer_ids = answer_token_ids(tokenizer, length)
+        for name, make in processors.items():
+            result = bench_processor(name, make, tokenizer, prompt_ids, answer_ids, vocab_size, args.repeats)
+            results.append(result)
+            logger.info(
+                f"{name:>9} | {result['tokens']:>5} tokens | {result['tokens_per_sec']:>10.1f} tok/s"
+                f" | {result['us_per_token']:>8.1f} us/token"
+            )
+    return {"compile_secs": round(automaton.compile_secs, 3), "results": results}
+
+
+def bench_stop(name: str, make_criteria, prompt_ids, answer_ids, batch_size, repeats):
+    """Per-check cost of one stop criteria replaying answer_ids on batch_size rows."""
+    prompt = torch.tensor([prompt_ids] * batch_size, dtype=torch.long)
+    answer = torch.tensor([answer_ids] * batch_size, dtype=torch.long)
+    # Leave the closing brace out so every check runs to the end
+    steps = len(answer_ids) - 1
+    best = None
+    for _ in range(repeats):
+        criteria = make_criteria(len(prompt_ids))
+        started = time.perf_counter()
+        for step in range(1, steps + 1):
+            criteria(torch.cat([prompt, answer[:, :step]], dim=1), None)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # Time spent slicing input_ids is the same for both and included
+    return {
+        "criteria": name,
+        "tokens": steps,
+        "batch_size": batch_size,
+        "seconds": round(best, 4),
+        "us_per_check": round(best / steps * 1e6, 1),
+    }
+
+
+def run_stop_mode(args, module, tokenizer):
+    automaton = module.JsonSchemaAutomaton(tokenizer, vocab_size=len(tokenizer))
+    prompt_ids = prompt_token_ids(tokenizer, args.prompt)
+    criteria = {
+        "legacy": lambda n: LegacyJsonStopCriteria(tokenizer),
+        "incremental": lambda n: module.JsonStopCriteria(automaton.token_texts, n, tokenizer),
+    }
+
+    results = []
+    for length in args.lengths:
+        answer_ids = answer_token_ids(tokenizer, length)
+        for name, make in criteria.items():
+            result = bench_stop(name, make, prompt_ids, answer_ids, args.batch_size, args.repeats)
+            results.append(result)
+            logger.info(
+                f"{name:>11} | {result['tokens']:>5} tokens x {args.batch_size} rows"
+                f" | {result['us_per_check']:>8.1f} us/check"
+            )
+    return {"results": results}
+
+
+def run_generate_mode(args, module, tokenizer):
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32)
+    model.eval()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    automaton = module.JsonSchemaAutomaton(tokenizer, vocab_size=model.config.vocab_size)
+    logger.info(f"Automaton: {automaton.num_states} states, compiled in {automaton.compile_secs:.2f}s")
+
+    prompt_ids = prompt_token_ids(tokenizer, args.prompt)
+    inputs = torch.tensor([prompt_ids], dtype=torch.long)
+    processors = {
+        "none": None,
+        "legacy": lambda n: LegacyJsonPrefixLogitsProcessor(tokenizer, n),
+        "automaton": lambda n: module.JsonPrefixLogitsProcessor(automaton, n),
+    }
+
+    results = []
+    for name, make in processors.items():
+        best = None
+        for _ in range(args.repeats):
+            logits_processor = LogitsProcessorList([make(inputs.shape[1])]) if make else None
+            started = time.perf_counter()
+            with torch.no_grad():
+                output = model.generate(
+                    inputs,
+                    attention_mask=torch.ones_like(inputs),
+                    max_new_tokens=args.max_tokens,
+                    do_sample=False,
+                    pad_token_id=tokenizer.eos_token_id,
+                    logits_processor=logits_processor,
+                )
+            elapsed = time.perf_counter() - started
+            generated = output.shape[1] - inputs.shape[1]
+            if best is None or elapsed < best[0]:
+                best = (elapsed, generated, tokenizer.decode(output[0][inputs.shape[1]:], skip_special_tokens=True))
+        elapsed, generated, text = best
+        result = {
+            "processor": name,
+            "tokens": generated,
+            "seconds": round(elapsed, 3),
+            "tokens_per_sec": round(generated / elapsed, 2),
+            "sample": text[:120],
+        }
+        results.append(result)
+        logger.info(f"{name:>9} | {generated:>4} tokens | {result['tokens_per_sec']:>7.2f} tok/s | {text[:60]!r}")
+    return {"compile_secs": round(automaton.compile_secs, 3), "results": results}
+
+
+def prompt_token_ids(tokenizer, prompt: str) -> list:
+    messages = [
+        {"role": "system", "content": JSON_INSTRUCTION},
+        {"role": "user", "content": prompt},
+    ]
+    formatted = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    return tokenizer.encode(formatted, add_special_tokens=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU benchmark of tinyllama-python v1 JSON constraint processors",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--mode", choices=["processor", "stop", "generate"], default="processor",
+                        help="processor: constraint overhead; stop: stop-check overhead; "
+                             "generate: end-to-end model.generate()")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Model id or local path (default: {DEFAULT_MODEL})")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT, help="User prompt")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[32, 128, 512],
+                        help="Output lengths in tokens for --mode processor/stop (default: 32 128 512)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Rows per check for --mode stop (default: 1)")
+    parser.add_argument("--max-tokens", type=int, default=64, help="Tokens to generate for --mode generate (default: 64)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per configuration; best is reported (default: 3)")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads for --mode generate")
+    parser.add_argument("--output", default=None,
+                        help=f"Write results JSON (e.g. {MODEL_RESULTS_DIR}/benchmark/json_constraints.json)")
+    args = parser.parse_args()
+
+    module = load_model_module()
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+
+    if args.mode == "processor":
+        summary = run_processor_mode(args, module, tokenizer)
+    elif args.mode == "stop":
+        summary = run_stop_mode(args, module, tokenizer)
+    else:
+        summary = run_generate_mode(args, module, tokenizer)
+
+    summary.update({"mode": args.mode, "model": args.model, "timestamp": datetime.now().isoformat()})
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
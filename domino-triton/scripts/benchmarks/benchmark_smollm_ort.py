@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+benchmark_smollm_ort.py
+
+Head-to-head CPU comparison of the two smollm-135m-python versions,
+in-process and without Triton, so the numbers isolate the generation path:
+  - pytorch (version 1): transformers generate() on the float32 weights
+  - onnx    (version 2): the ONNX Runtime decode loop with KV-cache IO
+                         binding (triton-repo-reference/shared/ort_causal_lm.py)
+                         on the export from scripts/download/export_smollm_onnx.py
+
+Both use the same chat-formatted prompts, greedy decoding and thread count
+(--threads; torch intra-op threads / ort_intra_op_threads).
+
+Reported per version:
+  - TTFT p50 / p95 (prefill + first token)
+  - decode tokens/s (tokens after the first / time after the first)
+  - end-to-end tokens/s
+  - greedy outputs identical to PyTorch
+
+Usage:
+    python scripts/benchmarks/benchmark_smollm_ort.py
+    python scripts/benchmarks/benchmark_smollm_ort.py --threads 4 --max-tokens 128 --iterations 5
+    python scripts/benchmarks/benchmark_smollm_ort.py --onnx-weights triton-repo/weights/smollm-135m-python/2
+
+Requirements:
+    - torch, transformers, onnxruntime (see smollm-135m-python/requirements.txt)
+    - the ONNX export (scripts/download/export_smollm_onnx.py)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "llm"
+WEIGHTS_DIR = PROJECT_ROOT / "triton-repo" / "weights" / "smollm-135m-python"
+sys.path.insert(0, str(PROJECT_ROOT / "triton-repo-reference" / "shared"))
+
+MODEL_ID = "HuggingFaceTB/SmolLM-135M-Instruct"
+PROMPTS = [
+    "Explain in a few sentences why the sky is blue.",
+    "Write a short poem about the ocean.",
+    "What are the three primary colors?",
+    "List the steps to make a cup of tea.",
+    "Summarize the plot of Romeo and Juliet in two sentences.",
+]
+
+
+def pytorch_generate(weights: str):
+    """generate(prompt_ids, max_tokens) -> (token ids, TTFT seconds) for version 1's path."""
+    import torch
+    from transformers import AutoModelForCausalLM
+    from transformers.generation.streamers import BaseStreamer
+
+    model = AutoModelForCausalLM.from_pretrained(weights, torch_dtype=torch.float32, low_cpu_mem_usage=True).eval()
+
+    class FirstTokenTimer(BaseStreamer):
+        """Records when generate() emits its first new token."""
+
+        def __init__(self):
+            self.prompt_seen = False
+            self.first_token_at = None
+
+        def put(self, value):
+            if not self.prompt_seen:
+                self.prompt_seen = True  # the first put() is the prompt
+            elif self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+
+        def end(self):
+            pass
+
+    def generate(prompt_ids, max_tokens):
+        timer = FirstTokenTimer()
+        started = time.perf_counter()
+        with torch.no_grad():
+            output = model.generate(torch.tensor([prompt_ids]), max_new_tokens=max_tokens, do_sample=False,
+                                    pad_token_id=model.generation_config.eos_token_id, streamer=timer)
+        return output[0, len(prompt_ids):].tolist(), (timer.first_token_at or time.perf_counter()) - started
+
+    return generate
+
+
+def onnx_generate(weights: str, threads: int):
+    """generate(prompt_ids, max_tokens) -> (token ids, TTFT seconds) for version 2's path."""
+    from ort_causal_lm import OrtCausalLM
+
+    parameters = {"ort_graph_optimization_level": {"string_value": "all"}}
+    if threads:
+        parameters["ort_intra_op_threads"] = {"string_value": str(threads)}
+    lm = OrtCausalLM(weights, parameters, "benchmark")
+
+    def generate(prompt_ids, max_tokens):
+        first = []
+        started = time.perf_counter()
+        ids = lm.generate(prompt_ids, max_tokens,
+                          on_token=lambda ids: first.append(time.perf_counter()) if not first else None)
+        return ids, first[0] - started
+
+    return generate
+
+
+def run(generate, prompt_ids, max_tokens: int, iterations: int) -> dict:
+    generate(prompt_ids[0], max_tokens)  # warmup
+    ttfts, decode_rates, totals, outputs = [], [], [], []
+    for _ in range(iterations):
+        for ids in prompt_ids:
+            started = time.perf_counter()
+            generated, ttft = generate(ids, max_tokens)
+            elapsed = time.perf_counter() - started
+            ttfts.append(ttft)
+            if len(generated) > 1 and elapsed > ttft:
+                decode_rates.append((len(generated) - 1) / (elapsed - ttft))
+            totals.append((len(generated), elapsed))
+            outputs.append(generated)
+    tokens = sum(count for count, _ in totals)
+    seconds = sum(elapsed for _, elapsed in totals)
+    return {
+        "ttft_p50_ms": round(float(np.percentile(ttfts, 50)) * 1000, 1),
+        "ttft_p95_ms": round(float(np.percentile(ttfts, 95)) * 1000, 1),
+        "decode_tokens_per_sec": round(float(np.mean(decode_rates)), 1) if decode_rates else 0.0,
+        "tokens_per_sec": round(tokens / seconds, 1) if seconds else 0.0,
+        "tokens": tokens,
+        "outputs": outputs[: len(prompt_ids)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="smollm-135m-python version 1 (PyTorch) vs 2 (ONNX Runtime) on CPU")
+    parser.add_argument("--pytorch-weights", default=str(WEIGHTS_DIR / "1"),
+                        help="Version 1 weights (default: triton-repo/weights/smollm-135m-python/1, else the Hub)")
+    parser.add_argument("--onnx-weights", default=str(WEIGHTS_DIR / "2"), help="Version 2 ONNX export")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads for both (default: one per core)")
+    parser.add_argument("--max-tokens", type=int, default=64, help="Tokens per prompt (default: 64)")
+    parser.add_argument("--iterations", type=int, default=3, help="Passes over the prompts (default: 3)")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "smollm_ort_cpu.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    import torch
+    from transformers import AutoTokenizer
+
+    if not os.path.isfile(os.path.join(args.onnx_weights, "model.onnx")):
+        sys.exit(f"{args.onnx_weights}/model.onnx not found; run scripts/download/export_smollm_onnx.py")
+    pytorch_weights = args.pytorch_weights if os.path.isdir(args.pytorch_weights) else MODEL_ID
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.onnx_weights)
+    prompt_ids = [
+        tokenizer(tokenizer.apply_chat_template([{"role": "user", "content": prompt}], tokenize=False,
+                                                add_generation_prompt=True))["input_ids"]
+        for prompt in PROMPTS
+    ]
+
+    results = {}
+    for version, factory in (("pytorch", lambda: pytorch_generate(pytorch_weights)),
+                             ("onnx", lambda: onnx_generate(args.onnx_weights, args.threads))):
+        print(f"{version}...", flush=True)
+        results[version] = run(factory(), prompt_ids, args.max_tokens, args.iterations)
+
+    reference = results["pytorch"]["outputs"]
+    for result in results.values():
+        result["exact_match"] = f"{sum(1 for a, b in zip(result['outputs'], reference) if a == b)}/{len(reference)}"
+
+    print()
+    print(f"{torch.get_num_threads()} threads, {len(PROMPTS)} prompts x {args.max_tokens} tokens x {args.iterations}")
+    print(f"{'version':>8} | {'TTFT p50':>8} | {'TTFT p95':>8} | {'decode tok/s':>12} | {'tok/s':>7} | {'exact':>5}")
+    print("-" * 64)
+    for version, r in results.items():
+        print(f"{version:>8} | {r['ttft_p50_ms']:>6.1f}ms | {r['ttft_p95_ms']:>6.1f}ms | "
+              f"{r['decode_tokens_per_sec']:>12.1f} | {r['tokens_per_sec']:>7.1f} | {r['exact_match']:>5}")
+    speedup = results["onnx"]["tokens_per_sec"] / max(results["pytorch"]["tokens_per_sec"], 1e-9)
+    print(f"\nONNX Runtime vs PyTorch: {speedup:.2f}x tokens/s")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": "smollm-135m-python",
+            "threads": torch.get_num_threads(),
+            "max_tokens": args.max_tokens,
+            "timestamp": datetime.now().isoformat(),
+            "versions": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
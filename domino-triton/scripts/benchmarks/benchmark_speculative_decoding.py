@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+benchmark_speculative_decoding.py
+
+CPU benchmark of speculative decoding for tinyllama-python version 1
+(triton-repo-reference/shared/speculative.py): TinyLlama verifies tokens
+proposed by a small draft model (default SmolLM-135M-Instruct, whose
+tokenizer differs and is mapped through text).
+
+For each prompt, greedy generation runs:
+  - baseline:     model.generate(do_sample=False), JSON processor in --json
+  - speculative:  SpeculativeDecoder.generate(), once per --k value
+
+Reported per configuration: tokens/s, speedup over baseline, draft token
+acceptance rate, tokens per target forward pass, and whether the output
+matches the baseline token for token (it should, for every k).
+
+Usage:
+    python scripts/benchmarks/benchmark_speculative_decoding.py
+    python scripts/benchmarks/benchmark_speculative_decoding.py --k 2 4 6 --max-tokens 128
+    python scripts/benchmarks/benchmark_speculative_decoding.py --json --output results.json
+    python scripts/benchmarks/benchmark_speculative_decoding.py --draft JackFram/llama-68m
+
+Requirements:
+    - torch, transformers (CPU is fine)
+    - TinyLlama and draft weights, from the Hugging Face hub or local paths
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import sys
+import time
+import types
+from datetime import datetime
+from pathlib import Path
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer, LogitsProcessorList
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_FILE = PROJECT_ROOT / "triton-repo-reference" / "models" / "tinyllama-python" / "1" / "model.py"
+SHARED_DIR = PROJECT_ROOT / "triton-repo-reference" / "shared"
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "tinyllama"
+
+DEFAULT_MODEL = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+DEFAULT_DRAFT = "HuggingFaceTB/SmolLM-135M-Instruct"
+JSON_INSTRUCTION = 'Return ONLY JSON: {"answer":"string","confidence":0.0}'
+
+PROMPTS = [
+    "What is the capital of France? Explain briefly.",
+    "Explain how photosynthesis works in about three sentences.",
+    "List three benefits of unit testing.",
+]
+
+
+def load_model_module():
+    """Import tinyllama-python/1/model.py outside Triton (see benchmark_json_constraints.py)."""
+    if "triton_python_backend_utils" not in sys.modules:
+        sys.modules["triton_python_backend_utils"] = types.ModuleType("triton_python_backend_utils")
+    spec = importlib.util.spec_from_file_location("tinyllama_python_v1", MODEL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def chat_ids(tokenizer, prompt: str, json_mode: bool) -> list:
+    messages = []
+    if json_mode:
+        messages.append({"role": "system", "content": JSON_INSTRUCTION})
+    messages.append({"role": "user", "content": prompt})
+    formatted = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    return tokenizer.encode(formatted, add_special_tokens=False)
+
+
+def run_baseline(model, tokenizer, module, automaton, prompt_ids, max_tokens, json_mode):
+    inputs = torch.tensor([prompt_ids], dtype=torch.long)
+    logits_processor = None
+    if json_mode:
+        logits_processor = LogitsProcessorList([module.JsonPrefixLogitsProcessor(automaton, inputs.shape[1])])
+    started = time.perf_counter()
+    with torch.no_grad():
+        output = model.generate(
+            inputs,
+            attention_mask=torch.ones_like(inputs),
+            max_new_tokens=max_tokens,
+            do_sample=False,
+            pad_token_id=tokenizer.eos_token_id,
+            logits_processor=logits_processor,
+        )
+    elapsed = time.perf_counter() - started
+    return output[0][inputs.shape[1]:].tolist(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU benchmark of speculative decoding for tinyllama-python v1",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Target model (default: {DEFAULT_MODEL})")
+    parser.add_argument("--draft", default=DEFAULT_DRAFT, help=f"Draft model (default: {DEFAULT_DRAFT})")
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 4, 6],
+                        help="Draft tokens per round to compare (default: 2 4 6)")
+    parser.add_argument("--max-tokens", type=int, default=96, help="Tokens to generate (default: 96)")
+    parser.add_argument("--json", action="store_true", help="Constrain output with the JSON automaton")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads")
+    parser.add_argument("--output", default=None,
+                        help=f"Write results JSON (e.g. {MODEL_RESULTS_DIR}/benchmark/speculative_decoding.json)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    module = load_model_module()
+    sys.path.insert(0, str(SHARED_DIR))
+    from speculative import SpeculativeDecoder
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).eval()
+    draft_tokenizer = AutoTokenizer.from_pretrained(args.draft)
+    draft = AutoModelForCausalLM.from_pretrained(args.draft, torch_dtype=torch.float32).eval()
+    automaton = module.JsonSchemaAutomaton(tokenizer, vocab_size=model.config.vocab_size) if args.json else None
+
+    results = []
+    for prompt in PROMPTS:
+        prompt_ids = chat_ids(tokenizer, prompt, args.json)
+        draft_prompt_ids = chat_ids(draft_tokenizer, prompt, args.json)
+
+        # Warmup, then baseline
+        run_baseline(model, tokenizer, module, automaton, prompt_ids, 4, args.json)
+        baseline_ids, baseline_secs = run_baseline(
+            model, tokenizer, module, automaton, prompt_ids, args.max_tokens, args.json
+        )
+        baseline_tps = len(baseline_ids) / baseline_secs
+        logger.info(f"{prompt[:40]!r}: baseline {len(baseline_ids)} tokens, {baseline_tps:.2f} tok/s")
+        row = {
+            "prompt": prompt,
+            "baseline": {"tokens": len(baseline_ids), "tokens_per_sec": round(baseline_tps, 2)},
+            "speculative": [],
+        }
+
+        for k in args.k:
+            decoder = SpeculativeDecoder(model, tokenizer, draft, draft_tokenizer, num_draft_tokens=k)
+            constraint = module.JsonSequenceConstraint(automaton) if args.json else None
+            generated = decoder.generate(
+                prompt_ids, args.max_tokens, draft_prompt_ids=draft_prompt_ids, constraint=constraint
+            )
+            stats = decoder.stats()
+            result = {
+                "k": k,
+                "tokens": len(generated),
+                "tokens_per_sec": stats["tokens_per_sec"],
+                "speedup": round(stats["tokens_per_sec"] / baseline_tps, 2) if baseline_tps else None,
+                "acceptance_rate": stats["acceptance_rate"],
+                "tokens_per_target_pass": stats["tokens_per_target_pass"],
+                # The EOS generate() stops on is part of both outputs
+                "matches_baseline": generated == baseline_ids[:len(generated)]
+                and len(generated) == len(baseline_ids),
+            }
+            row["speculative"].append(result)
+            logger.info(
+                f"  k={k}: {result['tokens_per_sec']:.2f} tok/s ({result['speedup']}x), "
+                f"acceptance {result['acceptance_rate']:.0%}, "
+                f"{result['tokens_per_target_pass']:.2f} tokens/pass, matches={result['matches_baseline']}"
+            )
+        results.append(row)
+
+    print()
+    print(f"{'k':>3} | {'tok/s':>8} | {'speedup':>7} | {'accept':>6} | {'tok/pass':>8} | {'match':>5}")
+    print("-" * 52)
+    for k_index, k in enumerate(args.k):
+        runs = [row["speculative"][k_index] for row in results]
+        print(f"{k:>3} | {sum(r['tokens_per_sec'] for r in runs) / len(runs):>8.2f} | "
+              f"{sum(r['speedup'] or 0 for r in runs) / len(runs):>6.2f}x | "
+              f"{sum(r['acceptance_rate'] for r in runs) / len(runs):>6.0%} | "
+              f"{sum(r['tokens_per_target_pass'] for r in runs) / len(runs):>8.2f} | "
+              f"{all(r['matches_baseline'] for r in runs)!s:>5}")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump({
+                "model": args.model,
+                "draft": args.draft,
+                "json_mode": args.json,
+                "max_tokens": args.max_tokens,
+                "timestamp": datetime.now().isoformat(),
+                "results": results,
+            }, f, indent=2)
+        logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+benchmark_tinyllama_batching.py
+
+Throughput of tinyllama-python (version 1) under concurrent load, to show
+the effect of batched generation in execute(). For each concurrency level
+(default 1-8), that many client threads send requests back to back; Triton's
+dynamic batcher (max_batch_size 8, 100ms window) groups them and execute()
+generates each group in one generate() call.
+
+Reported per concurrency level:
+  - requests/s and generated tokens/s (aggregate)
+  - latency p50 / p95 per request
+  - speedup in tokens/s over concurrency 1
+
+Run against a KIND_CPU instance (the default in config.pbtxt) with all
+requests using the same sampling settings and max_tokens, so they land in
+the same generate() batch. Keep generation_cache_memory_mb disabled (the
+default): with --temperature 0 the repeated prompts would otherwise be
+answered from the greedy result cache.
+
+Usage:
+    python scripts/benchmarks/benchmark_tinyllama_batching.py
+    python scripts/benchmarks/benchmark_tinyllama_batching.py --concurrency 1 2 4 8 --requests 16
+    python scripts/benchmarks/benchmark_tinyllama_batching.py --json --max-tokens 48
+
+Environment variables:
+    TRITON_REST_URL  - REST proxy URL (default: http://localhost:8080)
+    DOMINO_USER_API_KEY - API key for authentication
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import requests
+
+# Add clients directory to path for auth_helper import
+sys.path.insert(0, str(Path(__file__).parent.parent / "clients"))
+from auth_helper import get_auth_headers
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "tinyllama"
+
+DEFAULT_REST_URL = os.environ.get("TRITON_REST_URL", "http://localhost:8080")
+MODEL_NAME = "tinyllama-python"
+
+PROMPTS = [
+    "What is the capital of France?",
+    "Explain machine learning in one sentence.",
+    "Write a haiku about coding.",
+    "What is 2 + 2?",
+    "Say hello in Spanish, French, and German.",
+    "Name three primary colors.",
+    "What does a CPU do?",
+    "Give one tip for writing clean code.",
+]
+
+
+def build_payload(prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> dict:
+    inputs = [
+        {"name": "prompt", "shape": [1, 1], "datatype": "BYTES", "data": [prompt]},
+        {"name": "max_tokens", "shape": [1, 1], "datatype": "INT32", "data": [max_tokens]},
+        {"name": "temperature", "shape": [1, 1], "datatype": "FP32", "data": [temperature]},
+    ]
+    if json_mode:
+        inputs.append({"name": "response_format", "shape": [1, 1], "datatype": "BYTES", "data": ["json"]})
+    return {"inputs": inputs}
+
+
+def infer(session: requests.Session, url: str, headers: dict, payload: dict) -> dict:
+    start = time.perf_counter()
+    try:
+        resp = session.post(url, json=payload, headers=headers, timeout=600)
+        latency = time.perf_counter() - start
+        if resp.status_code != 200:
+            return {"success": False, "latency": latency, "error": f"HTTP {resp.status_code}: {resp.text[:200]}"}
+        outputs = {o["name"]: o["data"] for o in resp.json().get("outputs", [])}
+        tokens = int(outputs.get("token_count", [0])[0])
+        return {"success": True, "latency": latency, "tokens": tokens}
+    except Exception as e:
+        return {"success": False, "latency": time.perf_counter() - start, "error": str(e)}
+
+
+def run_level(rest_url: str, headers: dict, concurrency: int, total_requests: int,
+              max_tokens: int, temperature: float, json_mode: bool) -> dict:
+    """Send total_requests with `concurrency` in flight; return aggregate stats."""
+    url = f"{rest_url}/v2/models/{MODEL_NAME}/infer"
+    payloads = [
+        build_payload(PROMPTS[i % len(PROMPTS)], max_tokens, temperature, json_mode)
+        for i in range(total_requests)
+    ]
+
+    def worker(offset: int) -> list:
+        session = requests.Session()
+        return [infer(session, url, headers, p) for p in payloads[offset::concurrency]]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for batch in pool.map(worker, range(concurrency)) for r in batch]
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["success"]]
+    for r in results:
+        if not r["success"]:
+            logger.warning(f"  request failed: {r['error']}")
+    latencies = [r["latency"] for r in ok]
+    tokens = sum(r["tokens"] for r in ok)
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "succeeded": len(ok),
+        "wall_secs": round(wall, 3),
+        "requests_per_sec": round(len(ok) / wall, 3),
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / wall, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else None,
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent-load throughput of tinyllama-python batched generation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default=DEFAULT_REST_URL, help=f"REST URL (default: {DEFAULT_REST_URL})")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(range(1, 9)),
+                        help="Concurrency levels (default: 1-8)")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per level (default: 16)")
+    parser.add_argument("--max-tokens", type=int, default=64, help="max_tokens per request (default: 64)")
+    parser.add_argument("--temperature", type=float, default=0.0, help="Temperature (default: 0.0, greedy)")
+    parser.add_argument("--json", action="store_true", help="Use response_format=json")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "tinyllama_batching.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    rest_url = args.url.rstrip("/")
+    headers = {"Content-Type": "application/json"}
+    headers.update(get_auth_headers())
+
+    # Warmup (first generate() call is slower)
+    warm = infer(requests.Session(), f"{rest_url}/v2/models/{MODEL_NAME}/infer", headers,
+                 build_payload("Hello", 5, args.temperature, args.json))
+    if not warm["success"]:
+        logger.error(f"Warmup failed: {warm['error']}")
+        sys.exit(1)
+
+    levels = []
+    for concurrency in args.concurrency:
+        logger.info(f"Concurrency {concurrency}: {args.requests} requests...")
+        level = run_level(rest_url, headers, concurrency, args.requests,
+                          args.max_tokens, args.temperature, args.json)
+        levels.append(level)
+
+    baseline = next((lv["tokens_per_sec"] for lv in levels if lv["concurrency"] == 1), None)
+    print()
+    print(f"{'conc':>4} | {'req/s':>7} | {'tok/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'speedup':>7}")
+    print("-" * 58)
+    for lv in levels:
+        speedup = f"{lv['tokens_per_sec'] / baseline:.2f}x" if baseline else "-"
+        lv["speedup"] = round(lv["tokens_per_sec"] / baseline, 2) if baseline else None
+        print(f"{lv['concurrency']:>4} | {lv['requests_per_sec']:>7.2f} | {lv['tokens_per_sec']:>8.1f} | "
+              f"{lv['latency_p50_ms'] or 0:>8.0f} | {lv['latency_p95_ms'] or 0:>8.0f} | {speedup:>7}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": MODEL_NAME,
+            "url": rest_url,
+            "max_tokens": args.max_tokens,
+            "temperature": args.temperature,
+            "json_mode": args.json,
+            "timestamp": datetime.now().isoformat(),
+            "levels": levels,
+        }, f, indent=2)
+    logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
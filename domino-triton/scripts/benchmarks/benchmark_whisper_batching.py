@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+benchmark_whisper_batching.py
+
+Throughput of whisper-tiny-python under concurrent load, to show the effect
+of batched decoding in execute(). For each concurrency level (default
+1/4/8/16), that many client threads send one 30-second window per request
+back to back. Triton's dynamic batcher (max_batch_size 16, 20ms window)
+groups them, and execute() decodes each (language, task) group in one
+generate() call.
+
+Reported per concurrency level:
+  - requests/s and audio seconds transcribed per second (aggregate)
+  - latency p50 / p95 per request
+  - speedup in requests/s over concurrency 1
+
+Run once per inference path on a KIND_CPU instance and compare the result
+files: use_onnx "true" (ONNX Runtime) and "false" (PyTorch) in
+config.pbtxt, reloading the model in between, with --label ort / pytorch.
+
+Usage:
+    python scripts/benchmarks/benchmark_whisper_batching.py --label ort
+    python scripts/benchmarks/benchmark_whisper_batching.py --label pytorch --concurrency 1 4 8 16 --requests 32
+    python scripts/benchmarks/benchmark_whisper_batching.py --audio samples/audio_sample.wav
+
+Environment variables:
+    TRITON_REST_URL  - REST proxy URL (default: http://localhost:8080)
+    DOMINO_USER_API_KEY - API key for authentication
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import tritonclient.http as httpclient
+
+# Add clients directory to path for auth_helper / whisper client imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "clients"))
+from auth_helper import get_auth_headers
+from whisper_audio_rest_client import SAMPLE_RATE, get_processor, load_audio, preprocess_audio
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "whisper"
+
+DEFAULT_REST_URL = os.environ.get("TRITON_REST_URL", "http://localhost:8080")
+MODEL_NAME = "whisper-tiny-python"
+
+
+def infer(client, headers: dict, features: np.ndarray) -> dict:
+    inputs = [httpclient.InferInput("input_features", list(features.shape), "FP32")]
+    inputs[0].set_data_from_numpy(features, binary_data=True)
+    outputs = [httpclient.InferRequestedOutput("transcription", binary_data=True)]
+    start = time.perf_counter()
+    try:
+        response = client.infer(MODEL_NAME, inputs=inputs, outputs=outputs, headers=headers)
+        text = response.as_numpy("transcription")[0]
+        return {"success": True, "latency": time.perf_counter() - start, "text": text}
+    except Exception as e:
+        return {"success": False, "latency": time.perf_counter() - start, "error": str(e)}
+
+
+def run_level(url: str, headers: dict, features: np.ndarray, audio_secs: float,
+              concurrency: int, total_requests: int) -> dict:
+    """Send total_requests with `concurrency` in flight; return aggregate stats."""
+
+    def worker(offset: int) -> list:
+        client = httpclient.InferenceServerClient(url=url, network_timeout=600)
+        return [infer(client, headers, features) for _ in range(offset, total_requests, concurrency)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for batch in pool.map(worker, range(concurrency)) for r in batch]
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["success"]]
+    for r in results:
+        if not r["success"]:
+            logger.warning(f"  request failed: {r['error']}")
+    latencies = [r["latency"] for r in ok]
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "succeeded": len(ok),
+        "wall_secs": round(wall, 3),
+        "requests_per_sec": round(len(ok) / wall, 3),
+        "audio_secs_per_sec": round(len(ok) * audio_secs / wall, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else None,
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent-load throughput of whisper-tiny-python batched decoding",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default=DEFAULT_REST_URL, help=f"REST URL (default: {DEFAULT_REST_URL})")
+    parser.add_argument("--audio", default=str(PROJECT_ROOT / "samples" / "audio_sample.wav"),
+                        help="Audio file sent by every request (first 30s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16],
+                        help="Concurrency levels (default: 1 4 8 16)")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level (default: 32)")
+    parser.add_argument("--label", default="ort",
+                        help="Inference path being measured, matching use_onnx (e.g. ort, pytorch)")
+    parser.add_argument("--output", default=None,
+                        help=f"Results JSON path (default: {MODEL_RESULTS_DIR}/benchmark/whisper_batching_<label>.json)")
+    args = parser.parse_args()
+
+    url = args.url.replace("http://", "").replace("https://", "").rstrip("/")
+    headers = get_auth_headers()
+
+    audio, _ = load_audio(args.audio)
+    audio = audio[:30 * SAMPLE_RATE]
+    audio_secs = len(audio) / SAMPLE_RATE
+    features = preprocess_audio(get_processor(), audio)
+
+    # Warmup (first generate() call is slower)
+    warm = infer(httpclient.InferenceServerClient(url=url, network_timeout=600), headers, features)
+    if not warm["success"]:
+        logger.error(f"Warmup failed: {warm['error']}")
+        sys.exit(1)
+
+    levels = []
+    for concurrency in args.concurrency:
+        logger.info(f"[{args.label}] Concurrency {concurrency}: {args.requests} requests...")
+        levels.append(run_level(url, headers, features, audio_secs, concurrency, args.requests))
+
+    baseline = next((lv["requests_per_sec"] for lv in levels if lv["concurrency"] == 1), None)
+    print()
+    print(f"{args.label}: {audio_secs:.1f}s audio per request")
+    print(f"{'conc':>4} | {'req/s':>7} | {'audio s/s':>9} | {'p50 ms':>8} | {'p95 ms':>8} | {'speedup':>7}")
+    print("-" * 60)
+    for lv in levels:
+        lv["speedup"] = round(lv["requests_per_sec"] / baseline, 2) if baseline else None
+        speedup = f"{lv['speedup']:.2f}x" if baseline else "-"
+        print(f"{lv['concurrency']:>4} | {lv['requests_per_sec']:>7.2f} | {lv['audio_secs_per_sec']:>9.1f} | "
+              f"{lv['latency_p50_ms'] or 0:>8.0f} | {lv['latency_p95_ms'] or 0:>8.0f} | {speedup:>7}")
+
+    output = Path(args.output or MODEL_RESULTS_DIR / "benchmark" / f"whisper_batching_{args.label}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": MODEL_NAME,
+            "label": args.label,
+            "url": args.url,
+            "audio": args.audio,
+            "audio_secs": round(audio_secs, 2),
+            "timestamp": datetime.now().isoformat(),
+            "levels": levels,
+        }, f, indent=2)
+    logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
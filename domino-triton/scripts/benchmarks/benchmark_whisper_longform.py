@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+benchmark_whisper_longform.py
+
+Long-form transcription of whisper-tiny-python: one long_form=true request
+vs the client splitting the audio into 30-second windows and sending them
+one request at a time.
+
+The audio file is repeated to --minutes (default 10) and sent as 16-bit
+WAV bytes through the `audio` input in both modes:
+  - sequential: one request per 30 s window, back to back (20 for 10 min)
+  - long_form:  one request; the server decodes overlapping windows in
+                batches of long_form_batch_size per generate() call
+
+Reported per mode: requests, wall time, real-time factor and words.
+
+Usage:
+    python scripts/benchmarks/benchmark_whisper_longform.py
+    python scripts/benchmarks/benchmark_whisper_longform.py --audio lecture.wav --minutes 0
+
+Environment variables:
+    TRITON_REST_URL  - REST proxy URL (default: http://localhost:8080)
+    DOMINO_USER_API_KEY - API key for authentication
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+import wave
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import tritonclient.http as httpclient
+
+# Add clients directory to path for auth_helper / whisper client imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "clients"))
+from auth_helper import get_auth_headers
+from whisper_audio_rest_client import SAMPLE_RATE, load_audio
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "whisper"
+
+DEFAULT_REST_URL = os.environ.get("TRITON_REST_URL", "http://localhost:8080")
+MODEL_NAME = "whisper-tiny-python"
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
+
+
+def wav_bytes(audio: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def transcribe(client, headers: dict, data: bytes, long_form: bool) -> str:
+    audio = np.array([[data]], dtype=np.object_)
+    inputs = [httpclient.InferInput("audio", list(audio.shape), "BYTES")]
+    inputs[0].set_data_from_numpy(audio, binary_data=True)
+    if long_form:
+        inputs.append(httpclient.InferInput("long_form", [1, 1], "BOOL"))
+        inputs[1].set_data_from_numpy(np.array([[True]]), binary_data=True)
+    outputs = [httpclient.InferRequestedOutput("transcription", binary_data=True)]
+    response = client.infer(MODEL_NAME, inputs=inputs, outputs=outputs, headers=headers)
+    text = response.as_numpy("transcription")[0]
+    return text.decode("utf-8") if isinstance(text, bytes) else text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="whisper-tiny-python long_form vs sequential 30s windows",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default=DEFAULT_REST_URL, help=f"REST URL (default: {DEFAULT_REST_URL})")
+    parser.add_argument("--audio", default=str(PROJECT_ROOT / "samples" / "audio_sample.wav"),
+                        help="Audio file (repeated to --minutes)")
+    parser.add_argument("--minutes", type=float, default=10,
+                        help="Repeat the audio to this length (0: use it as is; default: 10)")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "whisper_longform.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    url = args.url.replace("http://", "").replace("https://", "").rstrip("/")
+    headers = get_auth_headers()
+    client = httpclient.InferenceServerClient(url=url, network_timeout=1800)
+
+    audio, _ = load_audio(args.audio)
+    if args.minutes > 0:
+        target = int(args.minutes * 60 * SAMPLE_RATE)
+        audio = np.tile(audio, -(-target // len(audio)))[:target]
+    audio_secs = len(audio) / SAMPLE_RATE
+    logger.info(f"Audio: {audio_secs:.0f}s from {args.audio}")
+
+    # Warmup
+    transcribe(client, headers, wav_bytes(audio[:WINDOW_SAMPLES]), long_form=False)
+
+    runs = []
+
+    windows = [audio[start:start + WINDOW_SAMPLES] for start in range(0, len(audio), WINDOW_SAMPLES)]
+    logger.info(f"sequential: {len(windows)} requests...")
+    start = time.perf_counter()
+    text = " ".join(transcribe(client, headers, wav_bytes(window), long_form=False).strip() for window in windows)
+    runs.append({"mode": "sequential", "requests": len(windows), "wall_secs": time.perf_counter() - start,
+                 "words": len(text.split())})
+
+    logger.info("long_form: 1 request...")
+    start = time.perf_counter()
+    text = transcribe(client, headers, wav_bytes(audio), long_form=True)
+    runs.append({"mode": "long_form", "requests": 1, "wall_secs": time.perf_counter() - start,
+                 "words": len(text.split())})
+
+    print()
+    print(f"{audio_secs:.0f}s of audio")
+    print(f"{'mode':>10} | {'requests':>8} | {'wall s':>8} | {'RTF':>6} | {'words':>6}")
+    print("-" * 50)
+    for run in runs:
+        run["wall_secs"] = round(run["wall_secs"], 2)
+        run["realtime_factor"] = round(run["wall_secs"] / audio_secs, 4)
+        print(f"{run['mode']:>10} | {run['requests']:>8} | {run['wall_secs']:>8.1f} | "
+              f"{run['realtime_factor']:>6.3f} | {run['words']:>6}")
+    print(f"\nSpeedup (sequential / long_form): {runs[0]['wall_secs'] / runs[1]['wall_secs']:.1f}x")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": MODEL_NAME,
+            "url": args.url,
+            "audio": args.audio,
+            "audio_secs": round(audio_secs, 2),
+            "timestamp": datetime.now().isoformat(),
+            "runs": runs,
+        }, f, indent=2)
+    logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
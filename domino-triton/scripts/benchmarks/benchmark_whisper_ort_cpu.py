@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+benchmark_whisper_ort_cpu.py
+
+CPU matrix of ONNX Runtime session options for whisper-tiny-python. Each
+configuration is loaded exactly as the model's initialize() does
+(triton-repo-reference/shared/ort_session.py with the same config.pbtxt
+parameter names), in-process and without Triton, so the numbers isolate
+the session options:
+
+  - ort_intra_op_threads       (--threads, default 1 2 4 <cores>)
+  - ort_graph_optimization_level (--levels, default basic all)
+  - ort_execution_mode         (--modes, default sequential parallel)
+  - ort_enable_cpu_mem_arena   (--arena, default true)
+
+Reported per configuration:
+  - load seconds (graph optimization included)
+  - latency p50 / p95 of one 30-second window (batch 1)
+  - throughput in windows/s at --batch-size (default 8)
+
+Usage:
+    python scripts/benchmarks/benchmark_whisper_ort_cpu.py
+    python scripts/benchmarks/benchmark_whisper_ort_cpu.py --threads 2 4 --levels all --modes sequential
+    python scripts/benchmarks/benchmark_whisper_ort_cpu.py --weights triton-repo/weights/whisper-tiny-python/1
+
+Requirements:
+    - optimum[onnxruntime], transformers, torch, numpy (see whisper-tiny-python/requirements.txt)
+    - exported weights (scripts/download/download_whisper.py), else the
+      model is exported from the Hub on every load
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "whisper"
+sys.path.insert(0, str(PROJECT_ROOT / "triton-repo-reference" / "shared"))
+
+from ort_session import load_ort_model  # noqa: E402
+import whisper_features  # noqa: E402
+
+
+def sample_features(processor, audio_path: str) -> np.ndarray:
+    """[1, 80, 3000] features of the first 30 s of audio_path (a tone if missing)."""
+    if os.path.exists(audio_path):
+        waveform = whisper_features.decode_audio(Path(audio_path).read_bytes())
+    else:
+        t = np.arange(whisper_features.N_SAMPLES) / whisper_features.SAMPLE_RATE
+        waveform = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return whisper_features.log_mel_spectrogram([waveform], processor.feature_extractor.mel_filters)
+
+
+def run_config(weights: str, parameters: dict, features: np.ndarray, batch_size: int,
+               iterations: int, prompt_ids) -> dict:
+    import torch
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+
+    start = time.perf_counter()
+    model = load_ort_model(ORTModelForSpeechSeq2Seq, parameters, weights, "benchmark")
+    load_secs = time.perf_counter() - start
+
+    single = torch.from_numpy(features)
+    batch = torch.from_numpy(np.repeat(features, batch_size, axis=0))
+    generate = lambda inputs: model.generate(inputs, forced_decoder_ids=prompt_ids, max_length=448)
+
+    generate(single)  # warmup
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        generate(single)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(max(1, iterations // 2)):
+        generate(batch)
+    batch_secs = (time.perf_counter() - started) / max(1, iterations // 2)
+
+    return {
+        "load_secs": round(load_secs, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+        "windows_per_sec": round(batch_size / batch_secs, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX Runtime session option matrix for whisper-tiny-python (CPU)")
+    parser.add_argument("--weights", default=str(PROJECT_ROOT / "triton-repo" / "weights" / "whisper-tiny-python" / "1"),
+                        help="Exported ONNX weights directory")
+    parser.add_argument("--audio", default=str(PROJECT_ROOT / "samples" / "audio_sample.wav"),
+                        help="Audio whose first 30s is transcribed")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="ort_intra_op_threads values (default: 1 2 4 <cores>)")
+    parser.add_argument("--levels", nargs="+", default=["basic", "all"],
+                        help="ort_graph_optimization_level values (default: basic all)")
+    parser.add_argument("--modes", nargs="+", default=["sequential", "parallel"],
+                        help="ort_execution_mode values (default: sequential parallel)")
+    parser.add_argument("--arena", nargs="+", default=["true"],
+                        help="ort_enable_cpu_mem_arena values (default: true)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Windows per throughput call (default: 8)")
+    parser.add_argument("--iterations", type=int, default=10, help="Latency samples per configuration (default: 10)")
+    parser.add_argument("--output", default=str(MODEL_RESULTS_DIR / "benchmark" / "whisper_ort_cpu.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    from transformers import WhisperProcessor
+
+    weights = args.weights if os.path.isdir(args.weights) else "openai/whisper-tiny"
+    processor = WhisperProcessor.from_pretrained(weights)
+    features = sample_features(processor, args.audio)
+    prompt_ids = processor.get_decoder_prompt_ids(language="en", task="transcribe")
+
+    cores = len(os.sched_getaffinity(0))
+    threads = args.threads or sorted({1, 2, 4, cores})
+
+    rows = []
+    for intra, level, mode, arena in itertools.product(threads, args.levels, args.modes, args.arena):
+        parameters = {
+            "ort_intra_op_threads": {"string_value": str(intra)},
+            "ort_graph_optimization_level": {"string_value": level},
+            "ort_execution_mode": {"string_value": mode},
+            "ort_enable_cpu_mem_arena": {"string_value": arena},
+        }
+        print(f"threads={intra} level={level} mode={mode} arena={arena} ...", flush=True)
+        result = run_config(weights, parameters, features, args.batch_size, args.iterations, prompt_ids)
+        rows.append({"intra_op_threads": intra, "optimization_level": level,
+                     "execution_mode": mode, "cpu_mem_arena": arena, **result})
+
+    print()
+    print(f"{cores} cores, batch {args.batch_size}")
+    print(f"{'threads':>7} | {'level':>8} | {'mode':>10} | {'arena':>5} | {'load s':>6} | "
+          f"{'p50 ms':>7} | {'p95 ms':>7} | {'win/s':>6}")
+    print("-" * 80)
+    for row in rows:
+        print(f"{row['intra_op_threads']:>7} | {row['optimization_level']:>8} | {row['execution_mode']:>10} | "
+              f"{row['cpu_mem_arena']:>5} | {row['load_secs']:>6.1f} | {row['latency_p50_ms']:>7.0f} | "
+              f"{row['latency_p95_ms']:>7.0f} | {row['windows_per_sec']:>6.2f}")
+
+    best_latency = min(rows, key=lambda row: row["latency_p50_ms"])
+    best_throughput = max(rows, key=lambda row: row["windows_per_sec"])
+    print(f"\nLowest latency:   threads={best_latency['intra_op_threads']} "
+          f"level={best_latency['optimization_level']} mode={best_latency['execution_mode']}")
+    print(f"Best throughput:  threads={best_throughput['intra_op_threads']} "
+          f"level={best_throughput['optimization_level']} mode={best_throughput['execution_mode']}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "model": "whisper-tiny-python",
+            "weights": weights,
+            "cores": cores,
+            "batch_size": args.batch_size,
+            "timestamp": datetime.now().isoformat(),
+            "configurations": rows,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 """
 Benchmark Script for YOLOv8n Video Inference Clients
 
-Runs all three client implementations (REST JSON, REST Base64, gRPC) with
-identical parameters and compares their performance.
+Runs all client implementations (REST JSON, REST Base64, gRPC, and gRPC
+against the server-side yolov8n-pipeline ensemble) with identical parameters
+and compares their performance.
 
 Usage:
     python scripts/benchmark_yolov8_clients.py --video samples/video.avi
@@ -117,6 +118,13 @@ CLIENTS = [
         "description": "gRPC with binary tensor transfer (~5MB/frame payload)",
         "extra_args": []
     },
+    {
+        "name": "gRPC (pipeline)",
+        "script": "yolov8n_video_grpc_client.py",
+        "output": "yolov8_grpc_pipeline.json",
+        "description": "gRPC with JPEG frames, server-side pre/post-processing + NMS (~50KB/frame payload)",
+        "extra_args": ["--pipeline"]
+    },
 ]
 
 
@@ -303,6 +311,7 @@ def format_summary(benchmark_results: dict) -> str:
     rest_json = benchmark_results["clients"].get("REST (JSON)", {})
     rest_binary = benchmark_results["clients"].get("REST (Binary)", {})
     grpc = benchmark_results["clients"].get("gRPC", {})
+    grpc_pipeline = benchmark_results["clients"].get("gRPC (pipeline)", {})
 
     def get_avg_time(client_data):
         if not client_data.get("success"):
@@ -313,6 +322,7 @@ def format_summary(benchmark_results: dict) -> str:
     rest_json_time = get_avg_time(rest_json)
     rest_binary_time = get_avg_time(rest_binary)
     grpc_time = get_avg_time(grpc)
+    grpc_pipeline_time = get_avg_time(grpc_pipeline)
 
     if rest_json_time and rest_binary_time:
         speedup = rest_json_time / rest_binary_time
@@ -326,6 +336,14 @@ def format_summary(benchmark_results: dict) -> str:
         speedup = rest_json_time / grpc_time
         lines.append(f"  gRPC is {speedup:.1f}x faster than REST (JSON)")
 
+    if grpc_time and grpc_pipeline_time:
+        speedup = grpc_time / grpc_pipeline_time
+        lines.append(f"  gRPC (pipeline) is {speedup:.1f}x faster than gRPC")
+        grpc_payload = grpc["results"].get("stats", {}).get("total_payload_mb")
+        pipeline_payload = grpc_pipeline["results"].get("stats", {}).get("total_payload_mb")
+        if grpc_payload and pipeline_payload:
+            lines.append(f"  gRPC (pipeline) sends {grpc_payload / pipeline_payload:.0f}x less payload than gRPC")
+
     lines.extend([
         "",
         "=" * 80,
@@ -407,6 +425,7 @@ def format_markdown(benchmark_results: dict) -> str:
     rest_json = benchmark_results["clients"].get("REST (JSON)", {})
     rest_binary = benchmark_results["clients"].get("REST (Binary)", {})
     grpc = benchmark_results["clients"].get("gRPC", {})
+    grpc_pipeline = benchmark_results["clients"].get("gRPC (pipeline)", {})
 
     def get_stats(client_data):
         if not client_data.get("success"):
@@ -419,11 +438,14 @@ def format_markdown(benchmark_results: dict) -> str:
     rest_json_time, rest_json_payload = get_stats(rest_json)
     rest_binary_time, rest_binary_payload = get_stats(rest_binary)
     grpc_time, grpc_payload = get_stats(grpc)
+    grpc_pipeline_time, grpc_pipeline_payload = get_stats(grpc_pipeline)
 
-    lines.append("| Metric | REST (JSON) | REST (Binary) | gRPC |")
-    lines.append("|--------|-------------|---------------|------|")
-    lines.append(f"| Avg frame (ms) | {rest_json_time} | {rest_binary_time} | {grpc_time} |")
-    lines.append(f"| Total payload (MB) | {rest_json_payload} | {rest_binary_payload} | {grpc_payload} |")
+    lines.append("| Metric | REST (JSON) | REST (Binary) | gRPC | gRPC (pipeline) |")
+    lines.append("|--------|-------------|---------------|------|-----------------|")
+    lines.append(f"| Avg frame (ms) | {rest_json_time} | {rest_binary_time} | {grpc_time} | {grpc_pipeline_time} |")
+    lines.append(
+        f"| Total payload (MB) | {rest_json_payload} | {rest_binary_payload} | {grpc_payload} | {grpc_pipeline_payload} |"
+    )
 
     lines.append("")
     lines.append("### Speedup Summary")
@@ -441,6 +463,12 @@ def format_markdown(benchmark_results: dict) -> str:
         speedup = rest_json_time / grpc_time
         lines.append(f"- **gRPC is {speedup:.1f}x faster** than REST (JSON)")
 
+    if grpc_time and grpc_pipeline_time and isinstance(grpc_time, (int, float)) and isinstance(grpc_pipeline_time, (int, float)):
+        speedup = grpc_time / grpc_pipeline_time
+        lines.append(f"- **gRPC (pipeline) is {speedup:.1f}x faster** than gRPC")
+        if isinstance(grpc_payload, (int, float)) and isinstance(grpc_pipeline_payload, (int, float)) and grpc_pipeline_payload:
+            lines.append(f"- **gRPC (pipeline) sends {grpc_payload / grpc_pipeline_payload:.0f}x less payload** than gRPC")
+
     lines.extend([
         "",
         "## Client Descriptions",
@@ -450,6 +478,7 @@ def format_markdown(benchmark_results: dict) -> str:
         "| REST (JSON) | HTTP/REST | JSON arrays |",
         "| REST (Binary) | HTTP/REST | Binary tensor data |",
         "| gRPC | gRPC | Binary protobuf |",
+        "| gRPC (pipeline) | gRPC | JPEG bytes in, detections out (yolov8n-pipeline ensemble) |",
         "",
         "---",
         "",
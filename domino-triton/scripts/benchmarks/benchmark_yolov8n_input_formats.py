@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+benchmark_yolov8n_input_formats.py
+
+Compares the yolov8n input variants exported by
+scripts/download/download_yolov8n.py over gRPC, on the same video frames:
+  - fp32  (yolov8n)        float32 [3, 640, 640], client normalizes
+  - fp16  (yolov8n-fp16)   float16 [3, 640, 640], client normalizes
+  - uint8 (yolov8n-uint8)  uint8 BGR [640, 640, 3], normalized in the ONNX graph
+
+Frames are sent one per request so every variant sees identical inputs.
+
+Reported per variant:
+  - request / response payload per frame (KB)
+  - client CPU time per frame (time.process_time): preprocessing + request
+    serialization, and response decoding + detection postprocessing
+  - latency p50 / p95 per request
+  - accuracy parity with fp32: max / mean |output0 - fp32| and detection
+    agreement (same class, IoU >= 0.5) as precision / recall against fp32
+
+Usage:
+    python scripts/benchmarks/benchmark_yolov8n_input_formats.py --video samples/video.avi
+    python scripts/benchmarks/benchmark_yolov8n_input_formats.py --video samples/video.avi --max-frames 50 --formats fp32 uint8
+
+Environment variables:
+    TRITON_GRPC_URL  - gRPC URL (default: localhost:50051)
+    DOMINO_USER_API_KEY - API key for authentication
+
+Requirements:
+    - yolov8n and the variants to compare loaded in Triton
+      (python scripts/download/download_yolov8n.py --variants uint8 fp16)
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import tritonclient.grpc as grpcclient
+
+# Add clients directory to path for auth_helper / yolov8n client imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "clients"))
+from auth_helper import get_auth_headers
+from yolov8n_video_grpc_client import INPUT_FORMATS, extract_frames, postprocess_yolo, preprocess_frame, scale_boxes
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPTS_DIR.parent.parent
+MODEL_RESULTS_DIR = PROJECT_ROOT / "results" / "yolov8"
+
+DEFAULT_GRPC_URL = os.environ.get("TRITON_GRPC_URL", "localhost:50051")
+MATCH_IOU = 0.5
+
+
+def iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """IoU of one xyxy box with each of `boxes`."""
+    w = (np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0])).clip(0)
+    h = (np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1])).clip(0)
+    inter = w * h
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (area + areas - inter + 1e-9)
+
+
+def match_detections(reference, candidate) -> int:
+    """Number of reference detections with an unmatched same-class candidate at IoU >= MATCH_IOU."""
+    ref_boxes, _, ref_classes = reference
+    boxes, _, classes = candidate
+    used = np.zeros(len(boxes), dtype=bool)
+    matched = 0
+    for box, cls in zip(ref_boxes, ref_classes):
+        free = (~used) & (classes == cls)
+        if not free.any():
+            continue
+        overlaps = np.where(free, iou(box, boxes), 0.0)
+        best = int(np.argmax(overlaps))
+        if overlaps[best] >= MATCH_IOU:
+            used[best] = True
+            matched += 1
+    return matched
+
+
+def run_format(client, headers: dict, frames: list, input_format: str, conf_thres: float) -> dict:
+    """Send every frame to the variant; return timings, payloads, raw outputs and detections."""
+    model_name, datatype = INPUT_FORMATS[input_format]
+    pre_cpu, post_cpu, latencies, request_bytes, response_bytes = [], [], [], [], []
+    outputs, detections = [], []
+
+    # Warmup
+    tensor, _, _ = preprocess_frame(frames[0], input_format)
+    warmup = grpcclient.InferInput("images", [1, *tensor.shape], datatype)
+    warmup.set_data_from_numpy(tensor[np.newaxis, ...])
+    client.infer(model_name, inputs=[warmup], headers=headers)
+
+    for frame in frames:
+        cpu_start = time.process_time()
+        tensor, scale, pad = preprocess_frame(frame, input_format)
+        batch = np.ascontiguousarray(tensor[np.newaxis, ...])
+        input_tensor = grpcclient.InferInput("images", batch.shape, datatype)
+        input_tensor.set_data_from_numpy(batch)
+        pre_cpu.append(time.process_time() - cpu_start)
+
+        start = time.perf_counter()
+        response = client.infer(
+            model_name,
+            inputs=[input_tensor],
+            outputs=[grpcclient.InferRequestedOutput("output0")],
+            headers=headers,
+        )
+        latencies.append(time.perf_counter() - start)
+
+        cpu_start = time.process_time()
+        output = response.as_numpy("output0")
+        boxes, scores, class_ids = postprocess_yolo(output, conf_thres)[0]
+        boxes = scale_boxes(boxes, scale, pad, frame.shape[:2])
+        post_cpu.append(time.process_time() - cpu_start)
+
+        request_bytes.append(batch.nbytes)
+        response_bytes.append(output.nbytes)
+        outputs.append(output.astype(np.float32))
+        detections.append((boxes, scores, class_ids))
+
+    return {
+        "model": model_name,
+        "request_kb": round(float(np.mean(request_bytes)) / 1024, 1),
+        "response_kb": round(float(np.mean(response_bytes)) / 1024, 1),
+        "client_preprocess_cpu_ms": round(float(np.mean(pre_cpu)) * 1000, 2),
+        "client_postprocess_cpu_ms": round(float(np.mean(post_cpu)) * 1000, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+        "_outputs": outputs,
+        "_detections": detections,
+    }
+
+
+def parity(result: dict, reference: dict) -> dict:
+    """Output and detection agreement of one variant with the fp32 run."""
+    diffs = [np.abs(out - ref) for out, ref in zip(result["_outputs"], reference["_outputs"])]
+    matched = sum(match_detections(ref, det) for ref, det in zip(reference["_detections"], result["_detections"]))
+    ref_total = sum(len(d[0]) for d in reference["_detections"])
+    total = sum(len(d[0]) for d in result["_detections"])
+    return {
+        "output_max_abs_diff": round(float(max(d.max() for d in diffs)), 4),
+        "output_mean_abs_diff": round(float(np.mean([d.mean() for d in diffs])), 5),
+        "detections": total,
+        "detection_precision": round(matched / total, 4) if total else 1.0,
+        "detection_recall": round(matched / ref_total, 4) if ref_total else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="yolov8n fp32 vs fp16 vs uint8 input variants (gRPC)")
+    parser.add_argument("--video", "-v", required=True, help="Input video file")
+    parser.add_argument("--grpc-url", "-u", default=DEFAULT_GRPC_URL, help="gRPC URL (env: TRITON_GRPC_URL)")
+    parser.add_argument("--max-frames", "-n", type=int, default=30, help="Frames to send per variant (default: 30)")
+    parser.add_argument("--fps", "-f", type=float, help="Target FPS when sampling the video")
+    parser.add_argument("--formats", nargs="+", choices=sorted(INPUT_FORMATS), default=["fp32", "fp16", "uint8"],
+                        help="Variants to compare; fp32 is always included as the reference")
+    parser.add_argument("--conf-thres", "-c", type=float, default=0.25, help="Confidence threshold (default: 0.25)")
+    parser.add_argument("--output", "-o", default=str(MODEL_RESULTS_DIR / "benchmark" / "yolov8n_input_formats.json"),
+                        help="Results JSON path")
+    args = parser.parse_args()
+
+    frames = [frame for _, frame in extract_frames(args.video, args.fps, args.max_frames)]
+    if not frames:
+        sys.exit(f"No frames read from {args.video}")
+
+    client = grpcclient.InferenceServerClient(url=args.grpc_url)
+    headers = get_auth_headers()
+
+    formats = ["fp32"] + [f for f in args.formats if f != "fp32"]
+    results = {}
+    try:
+        for input_format in formats:
+            model_name = INPUT_FORMATS[input_format][0]
+            try:
+                ready = client.is_model_ready(model_name, headers=headers)
+            except Exception:
+                ready = False
+            if not ready:
+                if input_format == "fp32":
+                    sys.exit(f"{model_name} is not ready; it is the accuracy reference")
+                logger.warning(f"Skipping {input_format}: {model_name} is not ready "
+                               f"(python scripts/download/download_yolov8n.py --variants {input_format})")
+                continue
+            logger.info(f"{input_format} ({model_name}): {len(frames)} frames...")
+            results[input_format] = run_format(client, headers, frames, input_format, args.conf_thres)
+    finally:
+        client.close()
+
+    for result in results.values():
+        result.update(parity(result, results["fp32"]))
+    for result in results.values():
+        del result["_outputs"], result["_detections"]
+
+    print()
+    print(f"{len(frames)} frames from {args.video}, conf_thres={args.conf_thres}, client CPU = process_time per frame")
+    print(f"{'format':>6} | {'request':>9} | {'response':>9} | {'pre CPU':>8} | {'post CPU':>8} | "
+          f"{'p50':>7} | {'p95':>7} | {'max diff':>8} | {'prec':>5} | {'recall':>6}")
+    print("-" * 103)
+    for input_format, r in results.items():
+        print(f"{input_format:>6} | {r['request_kb']:>6.0f} KB | {r['response_kb']:>6.0f} KB | "
+              f"{r['client_preprocess_cpu_ms']:>6.2f}ms | {r['client_postprocess_cpu_ms']:>6.2f}ms | "
+              f"{r['latency_p50_ms']:>5.1f}ms | {r['latency_p95_ms']:>5.1f}ms | {r['output_max_abs_diff']:>8.4f} | "
+              f"{r['detection_precision']:>5.3f} | {r['detection_recall']:>6.3f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "video": args.video,
+            "frames": len(frames),
+            "conf_thres": args.conf_thres,
+            "grpc_url": args.grpc_url,
+            "timestamp": datetime.now().isoformat(),
+            "formats": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
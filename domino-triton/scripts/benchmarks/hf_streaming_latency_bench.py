@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+TTFT and inter-token latency of the HF Python LLMs with and without streaming.
+
+Targets tinyllama-python (version 1) or smollm-135m-python deployed with the
+decoupled transaction policy (see their config.pbtxt). Every request goes over
+gRPC stream_infer; the same prompts are sent twice:
+
+  - before: stream=false -- one response with the whole completion, so
+            time-to-first-token (TTFT) equals total generation time
+  - after:  stream=true  -- one response per new piece of text, then an
+            empty response flagged final
+
+Reported per mode (same layout as s3_fuse_latency_bench.py):
+  - ttft_s: time until the first non-empty text
+  - itl_ms: inter-token latency, the gaps between consecutive text responses
+            divided by the tokens each one carried (token_count is a running
+            total)
+  - tokens_per_sec: steady-state throughput after the first text
+
+Keep generation_cache_memory_mb disabled (the default): prompts repeat at
+temperature 0, and the result cache would answer the stream=false requests
+(streamed requests bypass it) and skew the comparison.
+
+Usage:
+    python scripts/benchmarks/hf_streaming_latency_bench.py --model tinyllama-python
+    python scripts/benchmarks/hf_streaming_latency_bench.py --model smollm-135m-python --n-per-prompt 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import numpy as np
+import tritonclient.grpc.aio as grpcclient
+
+PROMPTS = {
+    "short": "What is the capital of France?",
+    "medium": "Explain how photosynthesis works in about three sentences.",
+    "long": (
+        "Write a detailed explanation of how neural networks learn through "
+        "backpropagation, covering forward pass, loss computation, gradient "
+        "computation, and weight updates. Include why the chain rule is central."
+    ),
+}
+
+# tinyllama-python batches on the first dimension (max_batch_size 8),
+# smollm-135m-python does not (max_batch_size 0)
+BATCHED_MODELS = {"tinyllama-python"}
+
+
+def build_inputs(model: str, prompt: str, max_tokens: int, temperature: float, stream: bool):
+    shape = [1, 1] if model in BATCHED_MODELS else [1]
+
+    def tensor(name, datatype, value, dtype):
+        t = grpcclient.InferInput(name, shape, datatype)
+        t.set_data_from_numpy(np.array([value], dtype=dtype).reshape(shape))
+        return t
+
+    return [
+        tensor("prompt", "BYTES", prompt, np.object_),
+        tensor("max_tokens", "INT32", max_tokens, np.int32),
+        tensor("temperature", "FP32", temperature, np.float32),
+        tensor("stream", "BOOL", stream, bool),
+    ]
+
+
+async def single_request(client, model: str, prompt: str, max_tokens: int,
+                         temperature: float, stream: bool) -> dict:
+    inputs = build_inputs(model, prompt, max_tokens, temperature, stream)
+    outputs = [
+        grpcclient.InferRequestedOutput("generated_text"),
+        grpcclient.InferRequestedOutput("token_count"),
+    ]
+
+    async def request_iterator():
+        yield {"model_name": model, "inputs": inputs, "outputs": outputs}
+
+    start = time.time()
+    ttft = None
+    last_time = None
+    last_count = 0
+    token_count = 0
+    itls = []
+    async for result, error in client.stream_infer(request_iterator()):
+        if error:
+            raise error
+        text = result.as_numpy("generated_text").flatten()[0]
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        token_count = int(result.as_numpy("token_count").flatten()[0])
+        # Without streaming the one response is complete; with streaming the
+        # final response is the empty one
+        if not text:
+            break
+        now = time.time()
+        if ttft is None:
+            ttft = now - start
+        elif token_count > last_count:
+            itls.append((now - last_time) / (token_count - last_count))
+        last_time, last_count = now, token_count
+        if not stream:
+            break
+
+    total = time.time() - start
+    gen_time = max(total - (ttft or 0), 1e-6)
+    # Tokens produced after the first text arrived (see s3_fuse_latency_bench.py);
+    # none without streaming, where everything arrives at once
+    steady_state_tokens = max(last_count - 1, 0) if stream else 0
+    return {
+        "ttft_s": round(ttft or total, 4),
+        "total_s": round(total, 4),
+        "token_count": token_count,
+        "itl_ms": round(statistics.mean(itls) * 1000, 2) if itls else None,
+        "tokens_per_sec": round(steady_state_tokens / gen_time, 2) if steady_state_tokens else 0,
+    }
+
+
+async def run_battery(model: str, grpc_url: str, n_per_prompt: int, max_tokens: int,
+                      temperature: float, stream: bool):
+    client = grpcclient.InferenceServerClient(url=grpc_url)
+    # Throwaway request first -- the first generate() after load is slower
+    await single_request(client, model, PROMPTS["short"], max_tokens, temperature, stream)
+    results = []
+    for label, prompt in PROMPTS.items():
+        for _ in range(n_per_prompt):
+            r = await single_request(client, model, prompt, max_tokens, temperature, stream)
+            r["prompt_label"] = label
+            results.append(r)
+    await client.close()
+    return results
+
+
+def _stats(values: list, digits: int) -> dict:
+    if not values:
+        return {"mean": None, "median": None, "p95": None}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.mean(values), digits),
+        "median": round(statistics.median(values), digits),
+        "p95": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], digits),
+    }
+
+
+def summarize(results: list) -> dict:
+    ttfts = [r["ttft_s"] for r in results]
+    itls = [r["itl_ms"] for r in results if r["itl_ms"] is not None]
+    tps = [r["tokens_per_sec"] for r in results if r["tokens_per_sec"] > 0]
+    summary = {
+        "n": len(results),
+        "ttft_s": _stats(ttfts, 4),
+        "itl_ms": _stats(itls, 2),
+        "tokens_per_sec": _stats(tps, 2),
+        "raw": results,
+    }
+    summary["ttft_s"]["min"] = round(min(ttfts), 4) if ttfts else None
+    summary["ttft_s"]["max"] = round(max(ttfts), 4) if ttfts else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare TTFT / inter-token latency of an HF Python LLM with stream=false vs stream=true"
+    )
+    parser.add_argument(
+        "--model",
+        default="tinyllama-python",
+        help="Triton model name (decoupled tinyllama-python or smollm-135m-python) (default: tinyllama-python)",
+    )
+    parser.add_argument(
+        "--grpc-url",
+        default="localhost:8001",
+        help="Triton gRPC endpoint (default: localhost:8001)",
+    )
+    parser.add_argument(
+        "--n-per-prompt",
+        type=int,
+        default=5,
+        help="Number of requests per prompt label (short/medium/long) and mode (default: 5)",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=128,
+        help="Max tokens to generate per request (default: 128)",
+    )
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=0.0,
+        help="Sampling temperature (default: 0.0, greedy, so both modes generate the same text)",
+    )
+    parser.add_argument(
+        "--output",
+        default="/tmp/hf_streaming_bench.json",
+        help="Path to write the JSON summary to (default: /tmp/hf_streaming_bench.json)",
+    )
+    args = parser.parse_args()
+
+    summary = {"model": args.model, "max_tokens": args.max_tokens}
+    for label, stream in (("before", False), ("after", True)):
+        results = asyncio.run(run_battery(
+            args.model, args.grpc_url, args.n_per_prompt, args.max_tokens,
+            args.temperature, stream,
+        ))
+        summary[label] = summarize(results)
+
+    before, after = summary["before"], summary["after"]
+    print(f"{'mode':>7} | {'TTFT p50 s':>10} | {'TTFT p95 s':>10} | {'ITL p50 ms':>10} | {'tok/s p50':>9}")
+    print("-" * 58)
+    for label, s in (("before", before), ("after", after)):
+        print(f"{label:>7} | {s['ttft_s']['median']:>10.3f} | {s['ttft_s']['p95']:>10.3f} | "
+              f"{s['itl_ms']['median'] or 0:>10.1f} | {s['tokens_per_sec']['median'] or 0:>9.1f}")
+    if after["ttft_s"]["median"]:
+        print(f"\nTTFT speedup (median): {before['ttft_s']['median'] / after['ttft_s']['median']:.1f}x")
+
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
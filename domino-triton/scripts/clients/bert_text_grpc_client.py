@@ -9,6 +9,12 @@ Usage:
     python bert_text_grpc_client.py --texts "I love this movie" "This is terrible"
     python bert_text_grpc_client.py --texts-file inputs.txt --batch-size 8
     python bert_text_grpc_client.py --texts "Great!" --async  # Async mode
+    python bert_text_grpc_client.py --texts-file inputs.txt --pipeline  # Server-side tokenization
+
+--pipeline sends the raw texts to the bert-base-uncased-pipeline ensemble,
+which tokenizes on the server and pads each dynamic batch only to its
+longest text instead of to 128 tokens; transformers is then not needed on
+the client.
 """
 
 import argparse
@@ -34,6 +40,7 @@ SCRIPTS_DIR = Path(__file__).parent
 RESULTS_DIR = SCRIPTS_DIR.parent.parent / "results" / "bert"
 
 MAX_SEQ_LENGTH = 128
+PIPELINE_MODEL = "bert-base-uncased-pipeline"
 
 
 def get_tokenizer():
@@ -61,20 +68,31 @@ def tokenize_texts(tokenizer, texts: List[str], max_length: int = MAX_SEQ_LENGTH
     }
 
 
-def process_batch(client, headers, model, batch_texts, batch_indices, tokenizer, results, times):
-    """Process a batch of texts (sync version)."""
-    if not batch_texts:
-        return
+def build_inputs(client_module, batch_texts: List[str], tokenizer) -> list:
+    """Input tensors for one batch: raw texts for the pipeline (tokenizer None), else token IDs."""
+    if tokenizer is None:
+        text = client_module.InferInput("text", [len(batch_texts), 1], "BYTES")
+        text.set_data_from_numpy(np.array([[t.encode("utf-8")] for t in batch_texts], dtype=np.object_))
+        return [text]
 
     # Tokenize batch
     tokens = tokenize_texts(tokenizer, batch_texts)
 
     # Build input tensors
-    input_ids = grpcclient.InferInput("input_ids", tokens["input_ids"].shape, "INT64")
+    input_ids = client_module.InferInput("input_ids", tokens["input_ids"].shape, "INT64")
     input_ids.set_data_from_numpy(tokens["input_ids"])
 
-    attention_mask = grpcclient.InferInput("attention_mask", tokens["attention_mask"].shape, "INT64")
+    attention_mask = client_module.InferInput("attention_mask", tokens["attention_mask"].shape, "INT64")
     attention_mask.set_data_from_numpy(tokens["attention_mask"])
+    return [input_ids, attention_mask]
+
+
+def process_batch(client, headers, model, batch_texts, batch_indices, tokenizer, results, times):
+    """Process a batch of texts (sync version)."""
+    if not batch_texts:
+        return
+
+    inputs = build_inputs(grpcclient, batch_texts, tokenizer)
 
     # Build output request
     output_tensor = grpcclient.InferRequestedOutput("logits")
@@ -83,7 +101,7 @@ def process_batch(client, headers, model, batch_texts, batch_indices, tokenizer,
     try:
         response = client.infer(
             model_name=model,
-            inputs=[input_ids, attention_mask],
+            inputs=inputs,
             outputs=[output_tensor],
             headers=headers,
         )
@@ -142,15 +160,7 @@ async def process_batch_async(client, headers, model, batch_texts, batch_indices
     if not batch_texts:
         return [], 0
 
-    # Tokenize batch
-    tokens = tokenize_texts(tokenizer, batch_texts)
-
-    # Build input tensors
-    input_ids = grpcclient_aio.InferInput("input_ids", tokens["input_ids"].shape, "INT64")
-    input_ids.set_data_from_numpy(tokens["input_ids"])
-
-    attention_mask = grpcclient_aio.InferInput("attention_mask", tokens["attention_mask"].shape, "INT64")
-    attention_mask.set_data_from_numpy(tokens["attention_mask"])
+    inputs = build_inputs(grpcclient_aio, batch_texts, tokenizer)
 
     # Build output request
     output_tensor = grpcclient_aio.InferRequestedOutput("logits")
@@ -159,7 +169,7 @@ async def process_batch_async(client, headers, model, batch_texts, batch_indices
     try:
         response = await client.infer(
             model_name=model,
-            inputs=[input_ids, attention_mask],
+            inputs=inputs,
             outputs=[output_tensor],
             headers=headers,
         )
@@ -363,8 +373,13 @@ def main():
     parser.add_argument("--batch-size", "-b", type=int, default=1, help="Batch size (default: 1)")
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "bert_grpc.json"), help=f"Output JSON file (default: {RESULTS_DIR}/bert_grpc.json)")
     parser.add_argument("--async", dest="async_mode", action="store_true", help="Use async mode for concurrent batch processing")
+    parser.add_argument("--pipeline", action="store_true",
+                        help=f"Send raw texts to {PIPELINE_MODEL} (server-side tokenization, dynamic-length batching)")
     args = parser.parse_args()
 
+    if args.pipeline:
+        args.model = PIPELINE_MODEL
+
     # Get texts
     if args.texts:
         texts = args.texts
@@ -381,7 +396,7 @@ def main():
         ]
         logger.info("Using default sample texts")
 
-    tokenizer = get_tokenizer()
+    tokenizer = None if args.pipeline else get_tokenizer()
 
     if args.async_mode:
         asyncio.run(run_async(args, texts, tokenizer))
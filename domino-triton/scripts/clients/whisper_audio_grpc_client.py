@@ -4,12 +4,20 @@ Whisper Audio Transcription Client (gRPC)
 
 Uses standard tritonclient.grpc library for Triton inference.
 Audio is preprocessed client-side to mel spectrogram, then sent to server.
+With --server-audio the compressed file bytes are sent instead and the server
+decodes and featurizes them (no librosa/transformers needed on the client).
+--long-form (implies --server-audio) transcribes whole files longer than 30s
+in batched overlapping windows on the server; add --stream to print segments
+as they are decoded (requires the decoupled transaction policy).
 Supports async mode for concurrent file processing.
 
 Usage:
     python whisper_audio_grpc_client.py --audio sample.wav
     python whisper_audio_grpc_client.py --audio-dir audio_files/ --batch-size 4
     python whisper_audio_grpc_client.py --audio file1.wav file2.wav --async  # Async mode
+    python whisper_audio_grpc_client.py --audio sample.flac --server-audio  # Send file bytes
+    python whisper_audio_grpc_client.py --audio lecture.mp3 --long-form  # Whole file
+    python whisper_audio_grpc_client.py --audio lecture.mp3 --long-form --stream  # Decoupled model
 """
 
 import argparse
@@ -17,6 +25,7 @@ import asyncio
 import json
 import logging
 import os
+import queue
 import time
 from pathlib import Path
 from typing import List, Tuple
@@ -75,32 +84,71 @@ def preprocess_audio(processor, audio: np.ndarray) -> np.ndarray:
     return inputs.input_features.astype(np.float32)
 
 
-def process_file_sync(client, headers, processor, audio_path, model):
+def audio_file_input(audio_path: str) -> Tuple[np.ndarray, float]:
+    """
+    Read an audio file for the server-side `audio` input.
+
+    Returns:
+        Tuple of (BYTES array [1, 1] with the file contents, duration in
+        seconds or 0.0 if soundfile is not installed)
+    """
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    try:
+        import soundfile
+        duration = soundfile.info(audio_path).duration
+    except Exception:
+        duration = 0.0
+    return np.array([[data]], dtype=np.object_), duration
+
+
+def long_form_input(module, stream: bool = False) -> list:
+    """long_form (and stream) BOOL inputs for tritonclient.grpc or its aio module."""
+    inputs = []
+    for name, value in (("long_form", True), ("stream", stream)):
+        tensor = module.InferInput(name, [1, 1], "BOOL")
+        tensor.set_data_from_numpy(np.array([[value]]))
+        inputs.append(tensor)
+    return inputs
+
+
+def process_file_sync(client, headers, processor, audio_path, model, long_form=False):
     """Process a single audio file (sync version). Returns result dict and time."""
     file_start = time.time()
     try:
-        # Load and preprocess audio
-        audio, sr = load_audio(audio_path)
-        duration = len(audio) / sr
+        if processor is None:
+            # Send the compressed file; the server decodes and featurizes it
+            preprocess_start = time.time()
+            audio_bytes, duration = audio_file_input(audio_path)
+            preprocess_time = time.time() - preprocess_start
+            input_tensor = grpcclient.InferInput("audio", list(audio_bytes.shape), "BYTES")
+            input_tensor.set_data_from_numpy(audio_bytes)
+        else:
+            # Load and preprocess audio
+            audio, sr = load_audio(audio_path)
+            duration = len(audio) / sr
 
-        # Convert to mel spectrogram
-        preprocess_start = time.time()
-        input_features = preprocess_audio(processor, audio)
-        preprocess_time = time.time() - preprocess_start
+            # Convert to mel spectrogram
+            preprocess_start = time.time()
+            input_features = preprocess_audio(processor, audio)
+            preprocess_time = time.time() - preprocess_start
 
-        # Build input tensor
-        input_tensor = grpcclient.InferInput("input_features", input_features.shape, "FP32")
-        input_tensor.set_data_from_numpy(input_features)
+            # Build input tensor
+            input_tensor = grpcclient.InferInput("input_features", input_features.shape, "FP32")
+            input_tensor.set_data_from_numpy(input_features)
 
-        # Build output request
-        output_tensor = grpcclient.InferRequestedOutput("transcription")
+        inputs = [input_tensor]
+        outputs = [grpcclient.InferRequestedOutput("transcription")]
+        if long_form:
+            inputs.extend(long_form_input(grpcclient))
+            outputs.append(grpcclient.InferRequestedOutput("segments"))
 
         # Send to Triton server
         inference_start = time.time()
         response = client.infer(
             model_name=model,
-            inputs=[input_tensor],
-            outputs=[output_tensor],
+            inputs=inputs,
+            outputs=outputs,
             headers=headers,
         )
         inference_time = time.time() - inference_start
@@ -121,11 +169,14 @@ def process_file_sync(client, headers, processor, audio_path, model):
             "total_ms": round(total_time * 1000, 2),
             "realtime_factor": round(total_time / duration, 3) if duration > 0 else None
         }
+        if long_form:
+            segments = response.as_numpy("segments")[0]
+            result["segments"] = json.loads(segments.decode("utf-8") if isinstance(segments, bytes) else segments)
 
         logger.info(f"  {Path(audio_path).name}: "
                    f"preprocess={preprocess_time*1000:.1f}ms, "
                    f"inference={inference_time*1000:.1f}ms, "
-                   f"RTF={total_time/duration:.2f}x")
+                   f"RTF={total_time/duration if duration > 0 else 0:.2f}x")
         logger.info(f"    -> \"{transcription[:80]}{'...' if len(transcription) > 80 else ''}\"")
 
         return result, total_time
@@ -135,10 +186,72 @@ def process_file_sync(client, headers, processor, audio_path, model):
         return {"file": str(audio_path), "error": str(e)}, 0
 
 
+def stream_file(client, headers, audio_path, model):
+    """
+    Transcribe a whole file with streamed long-form segments (decoupled model).
+
+    Prints each batch of segments as it arrives; the final response has an
+    empty transcription. Returns result dict and time.
+    """
+    file_start = time.time()
+    responses = queue.Queue()
+    try:
+        audio_bytes, duration = audio_file_input(audio_path)
+        input_tensor = grpcclient.InferInput("audio", list(audio_bytes.shape), "BYTES")
+        input_tensor.set_data_from_numpy(audio_bytes)
+
+        client.start_stream(callback=lambda result, error: responses.put((result, error)), headers=headers)
+        try:
+            client.async_stream_infer(
+                model_name=model,
+                inputs=[input_tensor] + long_form_input(grpcclient, stream=True),
+                outputs=[grpcclient.InferRequestedOutput("transcription"),
+                         grpcclient.InferRequestedOutput("segments")],
+                enable_empty_final_response=True,
+            )
+            texts, segments = [], []
+            first_segment_time = None
+            while True:
+                result, error = responses.get()
+                if error is not None:
+                    raise error
+                if result.get_response().parameters["triton_final_response"].bool_param:
+                    break
+                text = result.as_numpy("transcription")[0]
+                text = text.decode("utf-8") if isinstance(text, bytes) else text
+                if first_segment_time is None:
+                    first_segment_time = time.time() - file_start
+                batch = json.loads(result.as_numpy("segments")[0])
+                for segment in batch:
+                    logger.info(f"    [{segment['start']:7.2f} - {segment['end']:7.2f}] {segment['text']}")
+                texts.append(text)
+                segments.extend(batch)
+        finally:
+            client.stop_stream()
+
+        total_time = time.time() - file_start
+        result = {
+            "file": str(audio_path),
+            "duration_sec": round(duration, 2),
+            "transcription": " ".join(texts),
+            "segments": segments,
+            "first_segment_ms": round(first_segment_time * 1000, 2) if first_segment_time else None,
+            "total_ms": round(total_time * 1000, 2),
+            "realtime_factor": round(total_time / duration, 3) if duration > 0 else None
+        }
+        logger.info(f"  {Path(audio_path).name}: {len(segments)} segments, "
+                   f"first after {result['first_segment_ms']}ms, total={total_time*1000:.1f}ms")
+        return result, total_time
+
+    except Exception as e:
+        logger.error(f"  {audio_path}: Error - {e}")
+        return {"file": str(audio_path), "error": str(e)}, 0
+
+
 # ==================== Async Implementation ====================
 
 
-async def process_file_async(client, headers, processor, audio_path, model):
+async def process_file_async(client, headers, processor, audio_path, model, long_form=False):
     """Process a single audio file (async version). Returns result dict and time."""
     import tritonclient.grpc.aio as grpcclient_aio
 
@@ -146,26 +259,37 @@ async def process_file_async(client, headers, processor, audio_path, model):
     try:
         # Load and preprocess audio (CPU-bound, run in executor)
         loop = asyncio.get_event_loop()
-        audio, sr = await loop.run_in_executor(None, load_audio, audio_path)
-        duration = len(audio) / sr
+        if processor is None:
+            # Send the compressed file; the server decodes and featurizes it
+            preprocess_start = time.time()
+            audio_bytes, duration = await loop.run_in_executor(None, audio_file_input, audio_path)
+            preprocess_time = time.time() - preprocess_start
+            input_tensor = grpcclient_aio.InferInput("audio", list(audio_bytes.shape), "BYTES")
+            input_tensor.set_data_from_numpy(audio_bytes)
+        else:
+            audio, sr = await loop.run_in_executor(None, load_audio, audio_path)
+            duration = len(audio) / sr
 
-        preprocess_start = time.time()
-        input_features = await loop.run_in_executor(None, preprocess_audio, processor, audio)
-        preprocess_time = time.time() - preprocess_start
+            preprocess_start = time.time()
+            input_features = await loop.run_in_executor(None, preprocess_audio, processor, audio)
+            preprocess_time = time.time() - preprocess_start
 
-        # Build input tensor
-        input_tensor = grpcclient_aio.InferInput("input_features", input_features.shape, "FP32")
-        input_tensor.set_data_from_numpy(input_features)
+            # Build input tensor
+            input_tensor = grpcclient_aio.InferInput("input_features", input_features.shape, "FP32")
+            input_tensor.set_data_from_numpy(input_features)
 
-        # Build output request
-        output_tensor = grpcclient_aio.InferRequestedOutput("transcription")
+        inputs = [input_tensor]
+        outputs = [grpcclient_aio.InferRequestedOutput("transcription")]
+        if long_form:
+            inputs.extend(long_form_input(grpcclient_aio))
+            outputs.append(grpcclient_aio.InferRequestedOutput("segments"))
 
         # Send to Triton server
         inference_start = time.time()
         response = await client.infer(
             model_name=model,
-            inputs=[input_tensor],
-            outputs=[output_tensor],
+            inputs=inputs,
+            outputs=outputs,
             headers=headers,
         )
         inference_time = time.time() - inference_start
@@ -186,11 +310,14 @@ async def process_file_async(client, headers, processor, audio_path, model):
             "total_ms": round(total_time * 1000, 2),
             "realtime_factor": round(total_time / duration, 3) if duration > 0 else None
         }
+        if long_form:
+            segments = response.as_numpy("segments")[0]
+            result["segments"] = json.loads(segments.decode("utf-8") if isinstance(segments, bytes) else segments)
 
         logger.info(f"  {Path(audio_path).name}: "
                    f"preprocess={preprocess_time*1000:.1f}ms, "
                    f"inference={inference_time*1000:.1f}ms, "
-                   f"RTF={total_time/duration:.2f}x")
+                   f"RTF={total_time/duration if duration > 0 else 0:.2f}x")
         logger.info(f"    -> \"{transcription[:80]}{'...' if len(transcription) > 80 else ''}\"")
 
         return result, total_time
@@ -231,7 +358,7 @@ async def run_async(args, audio_files, processor):
     logger.info(f"Processing {len(audio_files)} files concurrently...")
 
     tasks = [
-        process_file_async(client, headers, processor, audio_path, args.model)
+        process_file_async(client, headers, processor, audio_path, args.model, args.long_form)
         for audio_path in audio_files
     ]
 
@@ -269,7 +396,7 @@ async def run_async(args, audio_files, processor):
         logger.info(f"Transcribed {len(successful)} files, "
                    f"total audio: {total_duration:.1f}s, "
                    f"total time: {total_time:.1f}s, "
-                   f"RTF: {total_time/total_duration:.2f}x (async)")
+                   f"RTF: {total_time/total_duration if total_duration > 0 else 0:.2f}x (async)")
 
     # Save results
     if args.output:
@@ -307,7 +434,12 @@ def run_sync(args, audio_files, processor):
 
     try:
         for audio_path in audio_files:
-            result, total_time = process_file_sync(client, headers, processor, audio_path, args.model)
+            if args.stream:
+                result, total_time = stream_file(client, headers, audio_path, args.model)
+            else:
+                result, total_time = process_file_sync(
+                    client, headers, processor, audio_path, args.model, args.long_form
+                )
             results["files"].append(result)
             if total_time > 0:
                 times.append(total_time)
@@ -337,7 +469,7 @@ def run_sync(args, audio_files, processor):
         logger.info(f"Transcribed {len(successful)} files, "
                    f"total audio: {total_duration:.1f}s, "
                    f"total time: {total_time:.1f}s, "
-                   f"RTF: {total_time/total_duration:.2f}x")
+                   f"RTF: {total_time/total_duration if total_duration > 0 else 0:.2f}x")
 
     # Save results
     if args.output:
@@ -381,8 +513,20 @@ def main():
                        help="Task: transcribe or translate - Note: currently uses server default")
     parser.add_argument("--batch-size", "-b", type=int, default=1, help="Batch size (default: 1)")
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "whisper_grpc.json"), help=f"Output JSON file (default: {RESULTS_DIR}/whisper_grpc.json)")
+    parser.add_argument("--server-audio", action="store_true",
+                        help="Send compressed audio bytes; the server computes the mel features")
+    parser.add_argument("--long-form", action="store_true",
+                        help="Transcribe whole files in overlapping 30s windows on the server (implies --server-audio)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream long-form segments (implies --long-form; model must be decoupled)")
     parser.add_argument("--async", dest="async_mode", action="store_true", help="Use async mode for concurrent file processing")
     args = parser.parse_args()
+    if args.stream:
+        if args.async_mode:
+            parser.error("--stream is not supported with --async")
+        args.long_form = True
+    if args.long_form:
+        args.server_audio = True
 
     # Collect audio files
     audio_files = []
@@ -406,9 +550,11 @@ def main():
 
     logger.info(f"Found {len(audio_files)} audio file(s)")
 
-    # Load processor for audio preprocessing
-    logger.info("Loading Whisper processor...")
-    processor = get_processor()
+    # Load processor for audio preprocessing (not needed when the server does it)
+    processor = None
+    if not args.server_audio:
+        logger.info("Loading Whisper processor...")
+        processor = get_processor()
 
     if args.async_mode:
         asyncio.run(run_async(args, audio_files, processor))
@@ -4,6 +4,10 @@ Whisper Audio Transcription Client (REST)
 
 Uses standard tritonclient.http library for Triton inference.
 Audio is preprocessed client-side to mel spectrogram, then sent to server.
+With --server-audio the compressed file bytes are sent instead and the server
+decodes and featurizes them (no librosa/transformers needed on the client).
+--long-form (implies --server-audio) transcribes whole files longer than 30s
+in batched overlapping windows on the server.
 Supports both binary and JSON encoding for tensor data.
 
 Usage:
@@ -11,6 +15,8 @@ Usage:
     python whisper_audio_rest_client.py --audio-dir audio_files/ --batch-size 4
     python whisper_audio_rest_client.py --audio file1.wav file2.wav --output results.json
     python whisper_audio_rest_client.py --audio sample.wav --no-binary  # Use JSON arrays instead of binary
+    python whisper_audio_rest_client.py --audio sample.flac --server-audio  # Send file bytes
+    python whisper_audio_rest_client.py --audio lecture.mp3 --long-form  # Whole file, timestamped segments
 """
 
 import argparse
@@ -93,6 +99,24 @@ def preprocess_audio(processor, audio: np.ndarray) -> np.ndarray:
     return inputs.input_features.astype(np.float32)
 
 
+def audio_file_input(audio_path: str) -> Tuple[np.ndarray, float]:
+    """
+    Read an audio file for the server-side `audio` input.
+
+    Returns:
+        Tuple of (BYTES array [1, 1] with the file contents, duration in
+        seconds or 0.0 if soundfile is not installed)
+    """
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    try:
+        import soundfile
+        duration = soundfile.info(audio_path).duration
+    except Exception:
+        duration = 0.0
+    return np.array([[data]], dtype=np.object_), duration
+
+
 def process_batch(
     client: httpclient.InferenceServerClient,
     headers: dict,
@@ -103,7 +127,8 @@ def process_batch(
     language: str = "en",
     task: str = "transcribe",
     model: str = MODEL_NAME,
-    use_binary: bool = True
+    use_binary: bool = True,
+    long_form: bool = False
 ):
     """Process a batch of audio files via remote inference."""
     if not audio_files:
@@ -112,31 +137,45 @@ def process_batch(
     for audio_path in audio_files:
         file_start = time.time()
         try:
-            # Load and preprocess audio
-            audio, sr = load_audio(audio_path)
-            duration = len(audio) / sr
-
-            # Convert to mel spectrogram
-            preprocess_start = time.time()
-            input_features = preprocess_audio(processor, audio)
-            preprocess_time = time.time() - preprocess_start
-
-            # Calculate payload size
-            payload_bytes = input_features.nbytes
-
-            # Build input tensor
-            input_tensor = httpclient.InferInput("input_features", input_features.shape, "FP32")
-            input_tensor.set_data_from_numpy(input_features, binary_data=use_binary)
-
-            # Build output request
-            output_tensor = httpclient.InferRequestedOutput("transcription", binary_data=use_binary)
+            if processor is None:
+                # Send the compressed file; the server decodes and featurizes it
+                preprocess_start = time.time()
+                audio_bytes, duration = audio_file_input(audio_path)
+                preprocess_time = time.time() - preprocess_start
+                payload_bytes = len(audio_bytes[0, 0])
+                input_tensor = httpclient.InferInput("audio", list(audio_bytes.shape), "BYTES")
+                input_tensor.set_data_from_numpy(audio_bytes, binary_data=use_binary)
+            else:
+                # Load and preprocess audio
+                audio, sr = load_audio(audio_path)
+                duration = len(audio) / sr
+
+                # Convert to mel spectrogram
+                preprocess_start = time.time()
+                input_features = preprocess_audio(processor, audio)
+                preprocess_time = time.time() - preprocess_start
+
+                # Calculate payload size
+                payload_bytes = input_features.nbytes
+
+                # Build input tensor
+                input_tensor = httpclient.InferInput("input_features", input_features.shape, "FP32")
+                input_tensor.set_data_from_numpy(input_features, binary_data=use_binary)
+
+            inputs = [input_tensor]
+            outputs = [httpclient.InferRequestedOutput("transcription", binary_data=use_binary)]
+            if long_form:
+                long_form_tensor = httpclient.InferInput("long_form", [1, 1], "BOOL")
+                long_form_tensor.set_data_from_numpy(np.array([[True]]), binary_data=use_binary)
+                inputs.append(long_form_tensor)
+                outputs.append(httpclient.InferRequestedOutput("segments", binary_data=use_binary))
 
             # Send to Triton server
             inference_start = time.time()
             response = client.infer(
                 model_name=model,
-                inputs=[input_tensor],
-                outputs=[output_tensor],
+                inputs=inputs,
+                outputs=outputs,
                 headers=headers,
             )
             inference_time = time.time() - inference_start
@@ -148,7 +187,7 @@ def process_batch(
 
             total_time = time.time() - file_start
 
-            results["files"].append({
+            file_result = {
                 "file": str(audio_path),
                 "duration_sec": round(duration, 2),
                 "transcription": transcription,
@@ -157,7 +196,11 @@ def process_batch(
                 "total_ms": round(total_time * 1000, 2),
                 "payload_mb": round(payload_bytes / (1024 * 1024), 2),
                 "realtime_factor": round(total_time / duration, 3) if duration > 0 else None
-            })
+            }
+            if long_form:
+                segments = response.as_numpy("segments")[0]
+                file_result["segments"] = json.loads(segments.decode("utf-8") if isinstance(segments, bytes) else segments)
+            results["files"].append(file_result)
 
             times.append(total_time)
 
@@ -165,7 +208,7 @@ def process_batch(
                        f"preprocess={preprocess_time*1000:.1f}ms, "
                        f"inference={inference_time*1000:.1f}ms, "
                        f"payload={payload_bytes/(1024*1024):.2f}MB, "
-                       f"RTF={total_time/duration:.2f}x")
+                       f"RTF={total_time/duration if duration > 0 else 0:.2f}x")
             logger.info(f"    -> \"{transcription[:80]}{'...' if len(transcription) > 80 else ''}\"")
 
         except InferenceServerException as e:
@@ -215,8 +258,14 @@ def main():
     parser.add_argument("--batch-size", "-b", type=int, default=1, help="Batch size (default: 1)")
     parser.add_argument("--no-binary", action="store_true",
                        help="Use JSON arrays instead of binary encoding (slower, larger payload)")
+    parser.add_argument("--server-audio", action="store_true",
+                       help="Send compressed audio bytes; the server computes the mel features")
+    parser.add_argument("--long-form", action="store_true",
+                       help="Transcribe whole files in overlapping 30s windows on the server (implies --server-audio)")
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "whisper_rest.json"), help=f"Output JSON file (default: {RESULTS_DIR}/whisper_rest.json)")
     args = parser.parse_args()
+    if args.long_form:
+        args.server_audio = True
 
     # Collect audio files
     audio_files = []
@@ -240,9 +289,11 @@ def main():
 
     logger.info(f"Found {len(audio_files)} audio file(s)")
 
-    # Load processor for audio preprocessing
-    logger.info("Loading Whisper processor...")
-    processor = get_processor()
+    # Load processor for audio preprocessing (not needed when the server does it)
+    processor = None
+    if not args.server_audio:
+        logger.info("Loading Whisper processor...")
+        processor = get_processor()
 
     # Determine encoding mode
     use_binary = not args.no_binary
@@ -262,6 +313,8 @@ def main():
         "task": args.task,
         "transport": "REST",
         "encoding": encoding_mode,
+        "input": "audio" if args.server_audio else "input_features",
+        "long_form": args.long_form,
         "server": args.rest_url,
         "batch_size": args.batch_size,
         "files": [],
@@ -281,13 +334,13 @@ def main():
 
         if len(batch_files) >= args.batch_size:
             process_batch(client, headers, processor, batch_files, results, times,
-                         args.language, args.task, args.model, use_binary)
+                         args.language, args.task, args.model, use_binary, args.long_form)
             batch_files = []
 
     # Process remaining
     if batch_files:
         process_batch(client, headers, processor, batch_files, results, times,
-                     args.language, args.task, args.model, use_binary)
+                     args.language, args.task, args.model, use_binary, args.long_form)
 
     # Calculate stats
     successful = [f for f in results["files"] if "transcription" in f]
@@ -313,7 +366,7 @@ def main():
         logger.info(f"Transcribed {len(successful)} files, "
                    f"total audio: {total_duration:.1f}s, "
                    f"total time: {total_time:.1f}s, "
-                   f"RTF: {total_time/total_duration:.2f}x")
+                   f"RTF: {total_time/total_duration if total_duration > 0 else 0:.2f}x")
         logger.info(f"Total payload: {total_payload:.2f}MB")
 
     # Save results
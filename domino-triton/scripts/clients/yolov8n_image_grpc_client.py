@@ -9,6 +9,12 @@ Usage:
     python yolov8n_image_grpc_client.py --image input.jpg
     python yolov8n_image_grpc_client.py --images img1.jpg img2.jpg img3.jpg
     python yolov8n_image_grpc_client.py --image input.jpg --output-image annotated.jpg
+    python yolov8n_image_grpc_client.py --image input.jpg --pipeline
+    python yolov8n_image_grpc_client.py --image input.jpg --input-format uint8
+
+--pipeline sends the image file bytes to the yolov8n-pipeline ensemble, which
+decodes, letterboxes, runs yolov8n and applies NMS on the server; the client
+only receives the final detections.
 """
 
 import argparse
@@ -34,6 +40,13 @@ RESULTS_DIR = SCRIPTS_DIR.parent.parent / "results" / "yolov8"
 
 INPUT_SIZE = (640, 640)
 
+# --input-format -> (Triton model, input datatype); see scripts/download/download_yolov8n.py
+INPUT_FORMATS = {
+    "fp32": ("yolov8n", "FP32"),          # float32 [3, 640, 640], 4.9 MB/frame
+    "fp16": ("yolov8n-fp16", "FP16"),     # float16 [3, 640, 640], 2.5 MB/frame
+    "uint8": ("yolov8n-uint8", "UINT8"),  # uint8 BGR [640, 640, 3], 1.2 MB/frame, normalized in-graph
+}
+
 # COCO 80 class names for YOLOv8
 COCO_CLASSES = [
     "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
@@ -49,7 +62,7 @@ COCO_CLASSES = [
 ]
 
 
-def preprocess_image(image: np.ndarray):
+def preprocess_image(image: np.ndarray, input_format: str = "fp32"):
     """
     Preprocess image for YOLOv8n with letterbox resize.
     Returns: (tensor, ratio, padding)
@@ -64,9 +77,15 @@ def preprocess_image(image: np.ndarray):
     pad_h, pad_w = (INPUT_SIZE[0] - new_h) // 2, (INPUT_SIZE[1] - new_w) // 2
     img[pad_h:pad_h+new_h, pad_w:pad_w+new_w] = resized
 
+    # yolov8n-uint8 runs BGR -> RGB, /255 and HWC -> CHW inside its graph
+    if input_format == "uint8":
+        return img, scale, (pad_w, pad_h)
+
     # BGR -> RGB, normalize, HWC -> CHW
     tensor = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
     tensor = np.transpose(tensor, (2, 0, 1))
+    if input_format == "fp16":
+        tensor = tensor.astype(np.float16)
 
     return tensor, scale, (pad_w, pad_h)
 
@@ -79,6 +98,9 @@ def postprocess_yolo(output: np.ndarray, conf_thres: float = 0.25):
     """
     results = []
 
+    # yolov8n-fp16 returns float16
+    output = output.astype(np.float32, copy=False)
+
     # Handle batch dimension
     if output.ndim == 2:
         output = output[np.newaxis, ...]
@@ -153,21 +175,20 @@ def draw_boxes(image: np.ndarray, boxes: np.ndarray, scores: np.ndarray, class_i
     return image
 
 
-def process_image(client, headers, image_path: str, conf_thres: float, output_image: str = None):
-    """Process a single image and return results."""
-    # Load image
-    image = cv2.imread(image_path)
-    if image is None:
-        raise ValueError(f"Could not load image: {image_path}")
-
+def infer_raw(client, headers, image: np.ndarray, conf_thres: float, input_format: str = "fp32"):
+    """
+    Preprocess on the client, run yolov8n (or its --input-format variant) and decode its raw output.
+    Returns (boxes, scores, class_ids, payload_bytes, inference_time).
+    """
     orig_shape = image.shape[:2]
 
     # Preprocess
-    tensor, scale, pad = preprocess_image(image)
+    tensor, scale, pad = preprocess_image(image, input_format)
     tensor = tensor[np.newaxis, ...]  # Add batch dimension
+    model_name, datatype = INPUT_FORMATS[input_format]
 
     # Create input tensor
-    input_tensor = grpcclient.InferInput("images", tensor.shape, "FP32")
+    input_tensor = grpcclient.InferInput("images", tensor.shape, datatype)
     input_tensor.set_data_from_numpy(tensor)
 
     # Create output tensor
@@ -176,7 +197,7 @@ def process_image(client, headers, image_path: str, conf_thres: float, output_im
     # Run inference
     start = time.time()
     response = client.infer(
-        model_name="yolov8n",
+        model_name=model_name,
         inputs=[input_tensor],
         outputs=[output_tensor],
         headers=headers,
@@ -193,6 +214,58 @@ def process_image(client, headers, image_path: str, conf_thres: float, output_im
     # Scale boxes to original image coordinates
     boxes = scale_boxes(boxes, scale, pad, orig_shape)
 
+    return boxes, scores, class_ids, tensor.nbytes, inference_time
+
+
+def infer_pipeline(client, headers, image_path: str, conf_thres: float):
+    """
+    Run the yolov8n-pipeline ensemble on the encoded image file.
+    Returns (boxes, scores, class_ids, payload_bytes, inference_time); boxes are
+    already NMS-filtered and in original image coordinates.
+    """
+    with open(image_path, "rb") as f:
+        encoded = f.read()
+
+    input_tensor = grpcclient.InferInput("image", [1, 1], "BYTES")
+    input_tensor.set_data_from_numpy(np.array([[encoded]], dtype=np.object_))
+
+    start = time.time()
+    response = client.infer(
+        model_name="yolov8n-pipeline",
+        inputs=[input_tensor],
+        outputs=[
+            grpcclient.InferRequestedOutput("detections"),
+            grpcclient.InferRequestedOutput("num_detections"),
+        ],
+        headers=headers,
+    )
+    inference_time = time.time() - start
+
+    count = int(response.as_numpy("num_detections")[0, 0])
+    detections = response.as_numpy("detections")[0, :count]
+    # The server applies its own conf_threshold; --conf-thres can only raise it
+    detections = detections[detections[:, 4] >= conf_thres]
+    return (detections[:, :4], detections[:, 4], detections[:, 5].astype(int),
+            len(encoded), inference_time)
+
+
+def process_image(client, headers, image_path: str, conf_thres: float, output_image: str = None,
+                  pipeline: bool = False, input_format: str = "fp32"):
+    """Process a single image and return results."""
+    # Load image
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Could not load image: {image_path}")
+
+    if pipeline:
+        boxes, scores, class_ids, payload_bytes, inference_time = infer_pipeline(
+            client, headers, image_path, conf_thres
+        )
+    else:
+        boxes, scores, class_ids, payload_bytes, inference_time = infer_raw(
+            client, headers, image, conf_thres, input_format
+        )
+
     # Build detection list
     detection_list = []
     for box, score, cls_id in zip(boxes.astype(int), scores, class_ids):
@@ -208,6 +281,7 @@ def process_image(client, headers, image_path: str, conf_thres: float, output_im
         "image": image_path,
         "detections": len(detection_list),
         "inference_ms": round(inference_time * 1000, 2),
+        "payload_bytes": payload_bytes,
         "objects": detection_list
     }
 
@@ -233,8 +307,15 @@ def main():
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "yolov8_image_grpc.json"),
                         help=f"Output JSON file (default: {RESULTS_DIR}/yolov8_image_grpc.json)")
     parser.add_argument("--output-image", help="Output annotated image (for single image mode)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Send the encoded image to yolov8n-pipeline (server-side pre/post-processing + NMS)")
+    parser.add_argument("--input-format", choices=sorted(INPUT_FORMATS), default="fp32",
+                        help="yolov8n input tensor: fp32 (yolov8n), fp16 (yolov8n-fp16) or uint8 (yolov8n-uint8) (default: fp32)")
     args = parser.parse_args()
 
+    if args.pipeline and args.input_format != "fp32":
+        parser.error("--input-format does not apply to --pipeline (the ensemble takes encoded images)")
+
     # Get image list
     if args.image:
         images = [args.image]
@@ -250,7 +331,7 @@ def main():
     headers = get_auth_headers()
 
     results = {
-        "model": "yolov8n",
+        "model": "yolov8n-pipeline" if args.pipeline else INPUT_FORMATS[args.input_format][0],
         "conf_thres": args.conf_thres,
         "images": [],
         "stats": {}
@@ -274,7 +355,7 @@ def main():
                 output_image = None
 
             result, inference_time = process_image(
-                client, headers, image_path, args.conf_thres, output_image
+                client, headers, image_path, args.conf_thres, output_image, args.pipeline, args.input_format
             )
             results["images"].append(result)
             times.append(inference_time)
@@ -298,6 +379,7 @@ def main():
             "total_detections": sum(r["detections"] for r in results["images"]),
             "total_time_sec": round(sum(times), 2),
             "avg_inference_ms": round(np.mean(times) * 1000, 2),
+            "total_payload_mb": round(sum(r["payload_bytes"] for r in results["images"]) / 1e6, 2),
             "images_per_sec": round(len(times) / sum(times), 2) if sum(times) > 0 else 0
         }
         logger.info("-" * 60)
@@ -9,6 +9,7 @@ Usage:
     python yolov8n_image_rest_client.py --image input.jpg
     python yolov8n_image_rest_client.py --images img1.jpg img2.jpg img3.jpg
     python yolov8n_image_rest_client.py --image input.jpg --output-image annotated.jpg
+    python yolov8n_image_rest_client.py --image input.jpg --input-format uint8
 """
 
 import argparse
@@ -34,6 +35,13 @@ RESULTS_DIR = SCRIPTS_DIR.parent.parent / "results" / "yolov8"
 
 INPUT_SIZE = (640, 640)
 
+# --input-format -> (Triton model, input datatype); see scripts/download/download_yolov8n.py
+INPUT_FORMATS = {
+    "fp32": ("yolov8n", "FP32"),          # float32 [3, 640, 640], 4.9 MB/frame
+    "fp16": ("yolov8n-fp16", "FP16"),     # float16 [3, 640, 640], 2.5 MB/frame
+    "uint8": ("yolov8n-uint8", "UINT8"),  # uint8 BGR [640, 640, 3], 1.2 MB/frame, normalized in-graph
+}
+
 # COCO 80 class names for YOLOv8
 COCO_CLASSES = [
     "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
@@ -49,7 +57,7 @@ COCO_CLASSES = [
 ]
 
 
-def preprocess_image(image: np.ndarray):
+def preprocess_image(image: np.ndarray, input_format: str = "fp32"):
     """
     Preprocess image for YOLOv8n with letterbox resize.
     Returns: (tensor, ratio, padding)
@@ -64,9 +72,15 @@ def preprocess_image(image: np.ndarray):
     pad_h, pad_w = (INPUT_SIZE[0] - new_h) // 2, (INPUT_SIZE[1] - new_w) // 2
     img[pad_h:pad_h+new_h, pad_w:pad_w+new_w] = resized
 
+    # yolov8n-uint8 runs BGR -> RGB, /255 and HWC -> CHW inside its graph
+    if input_format == "uint8":
+        return img, scale, (pad_w, pad_h)
+
     # BGR -> RGB, normalize, HWC -> CHW
     tensor = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
     tensor = np.transpose(tensor, (2, 0, 1))
+    if input_format == "fp16":
+        tensor = tensor.astype(np.float16)
 
     return tensor, scale, (pad_w, pad_h)
 
@@ -79,6 +93,9 @@ def postprocess_yolo(output: np.ndarray, conf_thres: float = 0.25):
     """
     results = []
 
+    # yolov8n-fp16 returns float16
+    output = output.astype(np.float32, copy=False)
+
     # Handle batch dimension
     if output.ndim == 2:
         output = output[np.newaxis, ...]
@@ -153,7 +170,8 @@ def draw_boxes(image: np.ndarray, boxes: np.ndarray, scores: np.ndarray, class_i
     return image
 
 
-def process_image(client, headers, image_path: str, conf_thres: float, output_image: str = None, use_binary: bool = True):
+def process_image(client, headers, image_path: str, conf_thres: float, output_image: str = None, use_binary: bool = True,
+                  input_format: str = "fp32"):
     """Process a single image and return results."""
     # Load image
     image = cv2.imread(image_path)
@@ -163,11 +181,12 @@ def process_image(client, headers, image_path: str, conf_thres: float, output_im
     orig_shape = image.shape[:2]
 
     # Preprocess
-    tensor, scale, pad = preprocess_image(image)
+    tensor, scale, pad = preprocess_image(image, input_format)
     tensor = tensor[np.newaxis, ...]  # Add batch dimension
+    model_name, datatype = INPUT_FORMATS[input_format]
 
     # Create input tensor
-    input_tensor = httpclient.InferInput("images", tensor.shape, "FP32")
+    input_tensor = httpclient.InferInput("images", tensor.shape, datatype)
     input_tensor.set_data_from_numpy(tensor, binary_data=use_binary)
 
     # Create output tensor
@@ -176,7 +195,7 @@ def process_image(client, headers, image_path: str, conf_thres: float, output_im
     # Run inference
     start = time.time()
     response = client.infer(
-        model_name="yolov8n",
+        model_name=model_name,
         inputs=[input_tensor],
         outputs=[output_tensor],
         headers=headers,
@@ -234,8 +253,13 @@ def main():
                         help=f"Output JSON file (default: {RESULTS_DIR}/yolov8_image_rest.json)")
     parser.add_argument("--output-image", help="Output annotated image (for single image mode)")
     parser.add_argument("--json-encoding", action="store_true", help="Use JSON arrays instead of binary")
+    parser.add_argument("--input-format", choices=sorted(INPUT_FORMATS), default="fp32",
+                        help="yolov8n input tensor: fp32 (yolov8n), fp16 (yolov8n-fp16) or uint8 (yolov8n-uint8) (default: fp32)")
     args = parser.parse_args()
 
+    if args.json_encoding and args.input_format == "fp16":
+        parser.error("--input-format fp16 requires binary encoding (JSON has no float16 type)")
+
     use_binary = not args.json_encoding
 
     # Get image list
@@ -257,7 +281,7 @@ def main():
     headers = get_auth_headers()
 
     results = {
-        "model": "yolov8n",
+        "model": INPUT_FORMATS[args.input_format][0],
         "conf_thres": args.conf_thres,
         "images": [],
         "stats": {}
@@ -282,7 +306,7 @@ def main():
                 output_image = None
 
             result, inference_time = process_image(
-                client, headers, image_path, args.conf_thres, output_image, use_binary
+                client, headers, image_path, args.conf_thres, output_image, use_binary, args.input_format
             )
             results["images"].append(result)
             times.append(inference_time)
@@ -10,6 +10,13 @@ Usage:
     python yolov8n_video_grpc_client.py --video input.mp4 --batch-size 4
     python yolov8n_video_grpc_client.py --video input.mp4 --output-video annotated.mp4
     python yolov8n_video_grpc_client.py --video input.mp4 --async  # Async mode
+    python yolov8n_video_grpc_client.py --video input.mp4 --pipeline  # Server-side pre/post-processing
+    python yolov8n_video_grpc_client.py --video input.mp4 --input-format uint8  # yolov8n-uint8
+
+--pipeline JPEG-encodes each frame (--jpeg-quality) and sends it to the
+yolov8n-pipeline ensemble, which decodes, letterboxes, runs yolov8n and
+applies NMS on the server. The request carries tens of KB per frame instead
+of a 4.9 MB float32 tensor, and the response carries only the detections.
 """
 
 import argparse
@@ -38,6 +45,14 @@ RESULTS_DIR = SCRIPTS_DIR.parent.parent / "results" / "yolov8"
 
 INPUT_SIZE = (640, 640)
 
+# --input-format -> (Triton model, input datatype); see scripts/download/download_yolov8n.py
+INPUT_FORMATS = {
+    "fp32": ("yolov8n", "FP32"),          # float32 [3, 640, 640], 4.9 MB/frame
+    "fp16": ("yolov8n-fp16", "FP16"),     # float16 [3, 640, 640], 2.5 MB/frame
+    "uint8": ("yolov8n-uint8", "UINT8"),  # uint8 BGR [640, 640, 3], 1.2 MB/frame, normalized in-graph
+}
+PIPELINE_MODEL = "yolov8n-pipeline"
+
 # COCO 80 class names for YOLOv8
 COCO_CLASSES = [
     "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
@@ -53,7 +68,7 @@ COCO_CLASSES = [
 ]
 
 
-def preprocess_frame(frame: np.ndarray):
+def preprocess_frame(frame: np.ndarray, input_format: str = "fp32"):
     """
     Preprocess frame for YOLOv8n with letterbox resize.
     Returns: (tensor, ratio, padding)
@@ -68,9 +83,15 @@ def preprocess_frame(frame: np.ndarray):
     pad_h, pad_w = (INPUT_SIZE[0] - new_h) // 2, (INPUT_SIZE[1] - new_w) // 2
     img[pad_h:pad_h+new_h, pad_w:pad_w+new_w] = resized
 
+    # yolov8n-uint8 runs BGR -> RGB, /255 and HWC -> CHW inside its graph
+    if input_format == "uint8":
+        return img, scale, (pad_w, pad_h)
+
     # BGR -> RGB, normalize, HWC -> CHW
     tensor = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
     tensor = np.transpose(tensor, (2, 0, 1))
+    if input_format == "fp16":
+        tensor = tensor.astype(np.float16)
 
     return tensor, scale, (pad_w, pad_h)
 
@@ -83,6 +104,9 @@ def postprocess_yolo(output: np.ndarray, conf_thres: float = 0.25):
     """
     results = []
 
+    # yolov8n-fp16 returns float16
+    output = output.astype(np.float32, copy=False)
+
     # Handle batch dimension
     if output.ndim == 2:
         output = output[np.newaxis, ...]
@@ -157,6 +181,70 @@ def draw_boxes(frame: np.ndarray, boxes: np.ndarray, scores: np.ndarray, class_i
     return frame
 
 
+def prepare_frame(frame_num: int, frame: np.ndarray, pipeline: bool, jpeg_quality: int,
+                  input_format: str = "fp32") -> dict:
+    """Batch entry for one frame: the input tensor for --input-format, or JPEG bytes for --pipeline."""
+    data = {"frame_num": frame_num, "orig_frame": frame, "orig_shape": frame.shape[:2]}
+    if pipeline:
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        if not ok:
+            raise ValueError(f"Could not JPEG-encode frame {frame_num}")
+        data["encoded"] = encoded.tobytes()
+    else:
+        data["tensor"], data["scale"], data["pad"] = preprocess_frame(frame, input_format)
+    return data
+
+
+def build_request(client_module, batch_data, pipeline: bool, input_format: str = "fp32"):
+    """(model_name, inputs, outputs, payload_bytes) for one batch."""
+    if pipeline:
+        encoded = np.array([[d["encoded"]] for d in batch_data], dtype=np.object_)
+        input_tensor = client_module.InferInput("image", list(encoded.shape), "BYTES")
+        input_tensor.set_data_from_numpy(encoded)
+        outputs = [
+            client_module.InferRequestedOutput("detections"),
+            client_module.InferRequestedOutput("num_detections"),
+        ]
+        payload_size_bytes = sum(len(d["encoded"]) for d in batch_data)
+        return PIPELINE_MODEL, [input_tensor], outputs, payload_size_bytes
+
+    # Stack tensors into batch: [N, 3, 640, 640] ([N, 640, 640, 3] uint8 for yolov8n-uint8)
+    batch = np.ascontiguousarray(np.stack([d["tensor"] for d in batch_data], axis=0))
+    model_name, datatype = INPUT_FORMATS[input_format]
+
+    # Build input tensor
+    input_tensor = client_module.InferInput("images", batch.shape, datatype)
+    input_tensor.set_data_from_numpy(batch)
+
+    # Build output request
+    outputs = [client_module.InferRequestedOutput("output0")]
+
+    # Calculate payload size (gRPC binary tensor transfer)
+    return model_name, [input_tensor], outputs, batch.nbytes
+
+
+def parse_response(response, batch_data, pipeline: bool, conf_thres: float):
+    """Per-frame (boxes, scores, class_ids) in original frame coordinates."""
+    if pipeline:
+        counts = response.as_numpy("num_detections")[:, 0]
+        detections = []
+        for count, dets in zip(counts, response.as_numpy("detections")):
+            dets = dets[:int(count)]
+            # The server applies its own conf_threshold; --conf-thres can only raise it
+            dets = dets[dets[:, 4] >= conf_thres]
+            detections.append((dets[:, :4], dets[:, 4], dets[:, 5].astype(int)))
+        return detections
+
+    # Postprocess detections
+    detections = postprocess_yolo(response.as_numpy("output0"), conf_thres)
+
+    # Scale boxes back to original frame coordinates
+    return [
+        (scale_boxes(boxes, data["scale"], data["pad"], data["orig_shape"]), scores, class_ids)
+        for (boxes, scores, class_ids), data in zip(detections, batch_data)
+    ]
+
+
 def extract_frames(video_path: str, fps: float = None, max_frames: int = None, start_time: float = 0.0, end_time: float = None):
     """Extract frames from video, optionally restricted to [start_time, end_time) seconds."""
     cap = cv2.VideoCapture(video_path)
@@ -192,51 +280,31 @@ def extract_frames(video_path: str, fps: float = None, max_frames: int = None, s
     cap.release()
 
 
-def process_batch(client, headers, batch_data, results, times, conf_thres, video_writer=None):
+def process_batch(client, headers, batch_data, results, times, conf_thres, video_writer=None, pipeline=False,
+                  input_format="fp32"):
     """Process a batch of frames (sync version)."""
     if not batch_data:
         return 0  # Return payload size
 
-    batch_tensors = [d["tensor"] for d in batch_data]
     batch_frame_nums = [d["frame_num"] for d in batch_data]
-
-    # Stack tensors into batch: [N, 3, 640, 640]
-    batch = np.stack(batch_tensors, axis=0).astype(np.float32)
-    batch = np.ascontiguousarray(batch)
-
-    # Calculate payload size (gRPC binary tensor transfer)
-    payload_size_bytes = batch.nbytes
-
-    # Build input tensor
-    input_tensor = grpcclient.InferInput("images", batch.shape, "FP32")
-    input_tensor.set_data_from_numpy(batch)
-
-    # Build output request
-    output_tensor = grpcclient.InferRequestedOutput("output0")
+    model_name, inputs, outputs, payload_size_bytes = build_request(grpcclient, batch_data, pipeline, input_format)
 
     start = time.time()
     try:
         response = client.infer(
-            model_name="yolov8n",
-            inputs=[input_tensor],
-            outputs=[output_tensor],
+            model_name=model_name,
+            inputs=inputs,
+            outputs=outputs,
             headers=headers,
         )
         inference_time = time.time() - start
         per_frame_time = inference_time / len(batch_data)
 
-        # Get output as numpy
-        output = response.as_numpy("output0")
-
-        # Postprocess detections
-        detections = postprocess_yolo(output, conf_thres)
+        detections = parse_response(response, batch_data, pipeline, conf_thres)
 
         for i, (frame_num, det, data) in enumerate(zip(batch_frame_nums, detections, batch_data)):
             boxes, scores, class_ids = det
 
-            # Scale boxes back to original frame coordinates
-            boxes = scale_boxes(boxes, data["scale"], data["pad"], data["orig_shape"])
-
             frame_result = {
                 "frame": frame_num,
                 "batch_size": len(batch_data),
@@ -268,7 +336,7 @@ def process_batch(client, headers, batch_data, results, times, conf_thres, video
         payload_mb = payload_size_bytes / (1024 * 1024)
         logger.info(
             f"Batch [{','.join(str(f) for f in batch_frame_nums)}]: "
-            f"inference={inference_time*1000:6.1f}ms, payload={payload_mb:.1f}MB, detections={det_counts}"
+            f"inference={inference_time*1000:6.1f}ms, payload={payload_mb:.2f}MB, detections={det_counts}"
         )
         return payload_size_bytes
 
@@ -282,47 +350,32 @@ def process_batch(client, headers, batch_data, results, times, conf_thres, video
 # ==================== Async Implementation ====================
 
 
-async def process_batch_async(client, headers, batch_data, conf_thres):
+async def process_batch_async(client, headers, batch_data, conf_thres, pipeline=False, input_format="fp32"):
     """Process a batch of frames (async version). Returns (results, inference_time, payload_bytes)."""
     import tritonclient.grpc.aio as grpcclient_aio
 
     if not batch_data:
         return [], 0, 0
 
-    batch_tensors = [d["tensor"] for d in batch_data]
     batch_frame_nums = [d["frame_num"] for d in batch_data]
-
-    # Stack tensors into batch: [N, 3, 640, 640]
-    batch = np.stack(batch_tensors, axis=0).astype(np.float32)
-    batch = np.ascontiguousarray(batch)
-
-    payload_size_bytes = batch.nbytes
-
-    # Build input tensor
-    input_tensor = grpcclient_aio.InferInput("images", batch.shape, "FP32")
-    input_tensor.set_data_from_numpy(batch)
-
-    # Build output request
-    output_tensor = grpcclient_aio.InferRequestedOutput("output0")
+    model_name, inputs, outputs, payload_size_bytes = build_request(grpcclient_aio, batch_data, pipeline, input_format)
 
     start = time.time()
     try:
         response = await client.infer(
-            model_name="yolov8n",
-            inputs=[input_tensor],
-            outputs=[output_tensor],
+            model_name=model_name,
+            inputs=inputs,
+            outputs=outputs,
             headers=headers,
         )
         inference_time = time.time() - start
         per_frame_time = inference_time / len(batch_data)
 
-        output = response.as_numpy("output0")
-        detections = postprocess_yolo(output, conf_thres)
+        detections = parse_response(response, batch_data, pipeline, conf_thres)
 
         frame_results = []
         for frame_num, det, data in zip(batch_frame_nums, detections, batch_data):
             boxes, scores, class_ids = det
-            boxes = scale_boxes(boxes, data["scale"], data["pad"], data["orig_shape"])
 
             frame_result = {
                 "frame": frame_num,
@@ -347,7 +400,7 @@ async def process_batch_async(client, headers, batch_data, conf_thres):
         payload_mb = payload_size_bytes / (1024 * 1024)
         logger.info(
             f"Batch [{','.join(str(f) for f in batch_frame_nums)}]: "
-            f"inference={inference_time*1000:6.1f}ms, payload={payload_mb:.1f}MB, detections={det_counts}"
+            f"inference={inference_time*1000:6.1f}ms, payload={payload_mb:.2f}MB, detections={det_counts}"
         )
 
         return frame_results, inference_time, payload_size_bytes
@@ -390,12 +443,14 @@ async def run_async(args):
         "video": args.video,
         "batch_size": args.batch_size,
         "conf_thres": args.conf_thres,
+        "model": PIPELINE_MODEL if args.pipeline else INPUT_FORMATS[args.input_format][0],
         "async_mode": True,
         "frames": [],
         "stats": {}
     }
     times = []
     total_payload_bytes = 0
+    preprocess_time = 0.0
 
     logger.info(f"Starting async inference via gRPC: {args.grpc_url}")
     logger.info(f"Batch size: {args.batch_size}, Confidence threshold: {args.conf_thres}")
@@ -406,16 +461,9 @@ async def run_async(args):
     batch_data = []
 
     for frame_num, frame in extract_frames(args.video, args.fps, args.max_frames, args.start_time, args.end_time):
-        tensor, scale, pad = preprocess_frame(frame)
-
-        batch_data.append({
-            "frame_num": frame_num,
-            "tensor": tensor,
-            "scale": scale,
-            "pad": pad,
-            "orig_frame": frame,
-            "orig_shape": frame.shape[:2]
-        })
+        prep_start = time.perf_counter()
+        batch_data.append(prepare_frame(frame_num, frame, args.pipeline, args.jpeg_quality, args.input_format))
+        preprocess_time += time.perf_counter() - prep_start
 
         if len(batch_data) >= args.batch_size:
             batches.append(batch_data)
@@ -428,7 +476,7 @@ async def run_async(args):
     logger.info(f"Processing {len(batches)} batches concurrently...")
 
     tasks = [
-        process_batch_async(client, headers, batch, args.conf_thres)
+        process_batch_async(client, headers, batch, args.conf_thres, args.pipeline, args.input_format)
         for batch in batches
     ]
 
@@ -493,6 +541,7 @@ async def run_async(args):
             "total_payload_mb": round(total_payload_mb, 2),
             "avg_batch_ms": round(np.mean(times) * 1000, 2),
             "avg_frame_ms": round(total_time / total_frames * 1000, 2),
+            "client_preprocess_ms": round(preprocess_time / total_frames * 1000, 2),
             "fps": round(total_frames / total_time, 2),
             "async_mode": True
         }
@@ -540,12 +589,14 @@ def run_sync(args):
         "video": args.video,
         "batch_size": args.batch_size,
         "conf_thres": args.conf_thres,
+        "model": PIPELINE_MODEL if args.pipeline else INPUT_FORMATS[args.input_format][0],
         "async_mode": False,
         "frames": [],
         "stats": {}
     }
     times = []
     total_payload_bytes = 0
+    preprocess_time = 0.0
 
     logger.info(f"Starting inference via gRPC: {args.grpc_url}")
     logger.info(f"Batch size: {args.batch_size}, Confidence threshold: {args.conf_thres}")
@@ -555,26 +606,21 @@ def run_sync(args):
 
     try:
         for frame_num, frame in extract_frames(args.video, args.fps, args.max_frames, args.start_time, args.end_time):
-            tensor, scale, pad = preprocess_frame(frame)
-
-            batch_data.append({
-                "frame_num": frame_num,
-                "tensor": tensor,
-                "scale": scale,
-                "pad": pad,
-                "orig_frame": frame,
-                "orig_shape": frame.shape[:2]
-            })
+            prep_start = time.perf_counter()
+            batch_data.append(prepare_frame(frame_num, frame, args.pipeline, args.jpeg_quality, args.input_format))
+            preprocess_time += time.perf_counter() - prep_start
 
             # Process when batch is full
             if len(batch_data) >= args.batch_size:
-                payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, video_writer)
+                payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, video_writer,
+                                              args.pipeline, args.input_format)
                 total_payload_bytes += payload_bytes
                 batch_data = []
 
         # Process remaining frames
         if batch_data:
-            payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, video_writer)
+            payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, video_writer,
+                                          args.pipeline, args.input_format)
             total_payload_bytes += payload_bytes
 
     finally:
@@ -618,6 +664,7 @@ def run_sync(args):
             "total_payload_mb": round(total_payload_mb, 2),
             "avg_batch_ms": round(np.mean(times) * 1000, 2),
             "avg_frame_ms": round(total_time / total_frames * 1000, 2),
+            "client_preprocess_ms": round(preprocess_time / total_frames * 1000, 2),
             "fps": round(total_frames / total_time, 2)
         }
         logger.info("-" * 60)
@@ -653,8 +700,16 @@ def main():
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "yolov8n_grpc.json"), help=f"Output JSON file (default: {RESULTS_DIR}/yolov8n_grpc.json)")
     parser.add_argument("--output-video", default=str(RESULTS_DIR / "annotated_grpc.mp4"), help=f"Output annotated video file (default: {RESULTS_DIR}/annotated_grpc.mp4)")
     parser.add_argument("--async", dest="async_mode", action="store_true", help="Use async mode for concurrent batch processing")
+    parser.add_argument("--pipeline", action="store_true",
+                        help=f"Send JPEG frames to {PIPELINE_MODEL} (server-side pre/post-processing + NMS)")
+    parser.add_argument("--jpeg-quality", type=int, default=90, help="JPEG quality for --pipeline (default: 90)")
+    parser.add_argument("--input-format", choices=sorted(INPUT_FORMATS), default="fp32",
+                        help="yolov8n input tensor: fp32 (yolov8n), fp16 (yolov8n-fp16) or uint8 (yolov8n-uint8) (default: fp32)")
     args = parser.parse_args()
 
+    if args.pipeline and args.input_format != "fp32":
+        parser.error("--input-format does not apply to --pipeline (the ensemble takes JPEG bytes)")
+
     if args.async_mode:
         asyncio.run(run_async(args))
     else:
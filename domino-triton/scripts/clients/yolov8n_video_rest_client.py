@@ -9,6 +9,7 @@ Usage:
     python yolov8n_video_rest_client.py --video input.mp4 --output results.json
     python yolov8n_video_rest_client.py --video input.mp4 --batch-size 4
     python yolov8n_video_rest_client.py --video input.mp4 --output-video annotated.mp4
+    python yolov8n_video_rest_client.py --video input.mp4 --input-format uint8  # yolov8n-uint8
 """
 
 import argparse
@@ -36,6 +37,13 @@ RESULTS_DIR = SCRIPTS_DIR.parent.parent / "results" / "yolov8"
 
 INPUT_SIZE = (640, 640)
 
+# --input-format -> (Triton model, input datatype); see scripts/download/download_yolov8n.py
+INPUT_FORMATS = {
+    "fp32": ("yolov8n", "FP32"),          # float32 [3, 640, 640], 4.9 MB/frame
+    "fp16": ("yolov8n-fp16", "FP16"),     # float16 [3, 640, 640], 2.5 MB/frame
+    "uint8": ("yolov8n-uint8", "UINT8"),  # uint8 BGR [640, 640, 3], 1.2 MB/frame, normalized in-graph
+}
+
 # COCO 80 class names for YOLOv8
 COCO_CLASSES = [
     "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
@@ -51,7 +59,7 @@ COCO_CLASSES = [
 ]
 
 
-def preprocess_frame(frame: np.ndarray):
+def preprocess_frame(frame: np.ndarray, input_format: str = "fp32"):
     """
     Preprocess frame for YOLOv8n with letterbox resize.
     Returns: (tensor, ratio, padding)
@@ -66,9 +74,15 @@ def preprocess_frame(frame: np.ndarray):
     pad_h, pad_w = (INPUT_SIZE[0] - new_h) // 2, (INPUT_SIZE[1] - new_w) // 2
     img[pad_h:pad_h+new_h, pad_w:pad_w+new_w] = resized
 
+    # yolov8n-uint8 runs BGR -> RGB, /255 and HWC -> CHW inside its graph
+    if input_format == "uint8":
+        return img, scale, (pad_w, pad_h)
+
     # BGR -> RGB, normalize, HWC -> CHW
     tensor = cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
     tensor = np.transpose(tensor, (2, 0, 1))
+    if input_format == "fp16":
+        tensor = tensor.astype(np.float16)
 
     return tensor, scale, (pad_w, pad_h)
 
@@ -81,6 +95,9 @@ def postprocess_yolo(output: np.ndarray, conf_thres: float = 0.25):
     """
     results = []
 
+    # yolov8n-fp16 returns float16
+    output = output.astype(np.float32, copy=False)
+
     # Handle batch dimension
     if output.ndim == 2:
         output = output[np.newaxis, ...]
@@ -190,7 +207,8 @@ def extract_frames(video_path: str, fps: float = None, max_frames: int = None, s
     cap.release()
 
 
-def process_batch(client, headers, batch_data, results, times, conf_thres, use_binary=True, video_writer=None):
+def process_batch(client, headers, batch_data, results, times, conf_thres, use_binary=True, video_writer=None,
+                  input_format="fp32"):
     """Process a batch of frames."""
     if not batch_data:
         return 0  # Return payload size
@@ -198,9 +216,9 @@ def process_batch(client, headers, batch_data, results, times, conf_thres, use_b
     batch_tensors = [d["tensor"] for d in batch_data]
     batch_frame_nums = [d["frame_num"] for d in batch_data]
 
-    # Stack tensors into batch: [N, 3, 640, 640]
-    batch = np.stack(batch_tensors, axis=0).astype(np.float32)
-    batch = np.ascontiguousarray(batch)
+    # Stack tensors into batch: [N, 3, 640, 640] ([N, 640, 640, 3] uint8 for yolov8n-uint8)
+    batch = np.ascontiguousarray(np.stack(batch_tensors, axis=0))
+    model_name, datatype = INPUT_FORMATS[input_format]
 
     # Calculate payload size based on encoding mode
     # Binary mode: raw tensor bytes (similar to gRPC)
@@ -209,12 +227,12 @@ def process_batch(client, headers, batch_data, results, times, conf_thres, use_b
         payload_size_bytes = batch.nbytes
     else:
         # JSON encoding: estimate string representation size
-        # Each float32 averages ~10 chars + comma/space overhead
+        # Each float32 averages ~10 chars + comma/space overhead; a uint8 pixel ~4 chars
         num_floats = batch.size
-        payload_size_bytes = int(num_floats * 12)  # ~12 bytes per float in JSON
+        payload_size_bytes = int(num_floats * (4 if input_format == "uint8" else 12))
 
     # Build input tensor
-    input_tensor = httpclient.InferInput("images", batch.shape, "FP32")
+    input_tensor = httpclient.InferInput("images", batch.shape, datatype)
     input_tensor.set_data_from_numpy(batch, binary_data=use_binary)
 
     # Build output request
@@ -223,7 +241,7 @@ def process_batch(client, headers, batch_data, results, times, conf_thres, use_b
     start = time.time()
     try:
         response = client.infer(
-            model_name="yolov8n",
+            model_name=model_name,
             inputs=[input_tensor],
             outputs=[output_tensor],
             headers=headers,
@@ -300,8 +318,13 @@ def main():
     parser.add_argument("--output", "-o", default=str(RESULTS_DIR / "yolov8n_rest.json"), help=f"Output JSON file (default: {RESULTS_DIR}/yolov8n_rest.json)")
     parser.add_argument("--output-video", default=str(RESULTS_DIR / "annotated_rest.mp4"), help=f"Output annotated video file (default: {RESULTS_DIR}/annotated_rest.mp4)")
     parser.add_argument("--json-encoding", action="store_true", help="Use JSON arrays instead of binary")
+    parser.add_argument("--input-format", choices=sorted(INPUT_FORMATS), default="fp32",
+                        help="yolov8n input tensor: fp32 (yolov8n), fp16 (yolov8n-fp16) or uint8 (yolov8n-uint8) (default: fp32)")
     args = parser.parse_args()
 
+    if args.json_encoding and args.input_format == "fp16":
+        parser.error("--input-format fp16 requires binary encoding (JSON has no float16 type)")
+
     # Setup video writer
     video_writer = None
     if args.output_video:
@@ -330,6 +353,7 @@ def main():
         "video": args.video,
         "batch_size": args.batch_size,
         "conf_thres": args.conf_thres,
+        "model": INPUT_FORMATS[args.input_format][0],
         "frames": [],
         "stats": {}
     }
@@ -345,7 +369,7 @@ def main():
 
     try:
         for frame_num, frame in extract_frames(args.video, args.fps, args.max_frames, args.start_time, args.end_time):
-            tensor, scale, pad = preprocess_frame(frame)
+            tensor, scale, pad = preprocess_frame(frame, args.input_format)
 
             batch_data.append({
                 "frame_num": frame_num,
@@ -358,13 +382,15 @@ def main():
 
             # Process when batch is full
             if len(batch_data) >= args.batch_size:
-                payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, use_binary, video_writer)
+                payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, use_binary, video_writer,
+                                              args.input_format)
                 total_payload_bytes += payload_bytes
                 batch_data = []
 
         # Process remaining frames
         if batch_data:
-            payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, use_binary, video_writer)
+            payload_bytes = process_batch(client, headers, batch_data, results, times, args.conf_thres, use_binary, video_writer,
+                                          args.input_format)
             total_payload_bytes += payload_bytes
 
     finally:
@@ -19,9 +19,14 @@ Output:
         ├── tokenizer.json
         ├── vocab.txt
         └── ... (tokenizer files)
+    models/bert-base-uncased-tokenizer/, bert-base-uncased-pipeline/
+        (server-side tokenization ensemble, copied from triton-repo-reference)
+    weights/bert-base-uncased-tokenizer/1/
+        └── tokenizer files (loaded by bert-base-uncased-tokenizer)
 """
 
 import os
+import shutil
 import sys
 from pathlib import Path
 
@@ -30,6 +35,10 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# Server-side tokenization ensemble around bert-base-uncased
+TOKENIZER_MODEL = "bert-base-uncased-tokenizer"
+PIPELINE_MODELS = [TOKENIZER_MODEL, "bert-base-uncased-pipeline"]
+
 
 def check_dependencies():
     """Check if required packages are installed."""
@@ -211,32 +220,31 @@ def create_bert_config(
     """
     Create Triton config.pbtxt for BERT.
 
-    BERT for sequence classification:
-    - Input: input_ids [-1, -1] int64 (dynamic batch, dynamic sequence)
-    - Input: attention_mask [-1, -1] int64
-    - Output: logits [1, num_labels] float32 (static batch=1 from ONNX export)
+    BERT for sequence classification (export has dynamic batch and sequence axes):
+    - Input: input_ids [-1] int64 per row (batch dim via max_batch_size)
+    - Input: attention_mask [-1] int64
+    - Output: logits [num_labels] float32
 
-    Note: The output shape is [1, num_labels] because torch.onnx.export creates
-    a model with static batch size based on the dummy input. For dynamic batching,
-    you would need to re-export with proper dynamic_axes configuration.
+    Dynamic batching merges concurrent requests with the same sequence length:
+    clients padding to 128, or every row of one bert-base-uncased-tokenizer batch.
     """
     model_dir = models_dir / model_name
     config_path = model_dir / "config.pbtxt"
 
     config_content = f'''name: "{model_name}"
 platform: "onnxruntime_onnx"
-max_batch_size: 0
+max_batch_size: 16
 
 input [
   {{
     name: "input_ids"
     data_type: TYPE_INT64
-    dims: [ -1, -1 ]
+    dims: [ -1 ]
   }},
   {{
     name: "attention_mask"
     data_type: TYPE_INT64
-    dims: [ -1, -1 ]
+    dims: [ -1 ]
   }}
 ]
 
@@ -244,7 +252,7 @@ output [
   {{
     name: "logits"
     data_type: TYPE_FP32
-    dims: [ -1, {num_labels} ]
+    dims: [ {num_labels} ]
   }}
 ]
 
@@ -267,11 +275,11 @@ version_policy {{
   all {{ }}
 }}
 
-# Dynamic batching (recommended for NLP models)
-# dynamic_batching {{
-#   preferred_batch_size: [ 1, 2, 4, 8, 16 ]
-#   max_queue_delay_microseconds: 100
-# }}
+# Dynamic batching: merges concurrent requests whose sequence length matches
+dynamic_batching {{
+  preferred_batch_size: [ 1, 2, 4, 8, 16 ]
+  max_queue_delay_microseconds: 100
+}}
 
 # Optimization settings for ONNX Runtime
 # optimization {{
@@ -288,6 +296,27 @@ version_policy {{
     return config_path
 
 
+def setup_pipeline_models(models_dir: Path, weights_dir: Path, tokenizer):
+    """
+    Copy the bert-base-uncased-pipeline ensemble (tokenizer -> bert-base-uncased)
+    from triton-repo-reference/models and save the tokenizer to its weights
+    folder, so clients can send raw text.
+    """
+    tokenizer_dir = weights_dir / TOKENIZER_MODEL / "1"
+    tokenizer_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(str(tokenizer_dir))
+    print(f"  - tokenizer: SAVED to {tokenizer_dir}")
+
+    source_models = PROJECT_ROOT / "triton-repo-reference" / "models"
+    for name in PIPELINE_MODELS:
+        source_dir = source_models / name
+        if not source_dir.is_dir():
+            print(f"  - {name}: NOT FOUND in {source_models}, skipping")
+            continue
+        shutil.copytree(source_dir, models_dir / name, dirs_exist_ok=True)
+        print(f"  - {name}: COPIED")
+
+
 def main():
     """Main entry point."""
     print("=" * 60)
@@ -318,6 +347,9 @@ def main():
     # Create Triton config
     create_bert_config(models_dir, model_name, num_labels)
 
+    print("\nSetting up bert-base-uncased-pipeline ensemble:")
+    setup_pipeline_models(models_dir, PROJECT_ROOT / "triton-repo" / "weights", tokenizer)
+
     print("\n" + "=" * 60)
     print("SUCCESS!")
     print("=" * 60)
@@ -333,6 +365,8 @@ def main():
     print(f"      ├── tokenizer.json")
     print(f"      ├── vocab.txt")
     print(f"      └── ... (tokenizer files)")
+    print(f"\nServer-side tokenization (raw text in, logits out):")
+    print(f"  python scripts/clients/bert_text_grpc_client.py --texts \"I love this movie\" --pipeline")
     print(f"\nExample REST client usage:")
     print(f"  export MODEL_NAME=bert-base-uncased")
     print(f"  python src/rest_client.py")
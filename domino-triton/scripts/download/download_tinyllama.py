@@ -225,6 +225,13 @@ def setup_triton_model(models_dir: Path):
     shutil.copy2(source_model_py, target_model_py)
     print(f"  - {MODEL_VERSION}/model.py: COPIED")
 
+    # Shared Python backend modules (continuous batching, prefix cache), imported
+    # from triton-repo/shared/ when a model opts in
+    source_shared = PROJECT_ROOT / "triton-repo-reference" / "shared"
+    if source_shared.is_dir():
+        shutil.copytree(source_shared, models_dir.parent / "shared", dirs_exist_ok=True)
+        print(f"  - shared/: COPIED")
+
     # Display config summary
     print(f"\nModel configuration:")
     with open(target_config) as f:
@@ -214,6 +214,13 @@ def setup_triton_model(models_dir: Path):
         print(f"  - requirements-model.txt: COPIED")
         print(f"\n  NOTE: Run './scripts/build_model_packages.sh whisper' to install packages")
 
+    # Shared Python backend modules (server-side audio features), imported
+    # from triton-repo/shared/
+    source_shared = PROJECT_ROOT / "triton-repo-reference" / "shared"
+    if source_shared.is_dir():
+        shutil.copytree(source_shared, models_dir.parent / "shared", dirs_exist_ok=True)
+        print(f"  - shared/: COPIED")
+
     # Display config summary
     print(f"\nModel configuration:")
     with open(target_config) as f:
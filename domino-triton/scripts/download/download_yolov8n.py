@@ -7,17 +7,27 @@ for use with NVIDIA Triton Inference Server.
 
 Usage:
     python scripts/download_yolov8n.py
+    python scripts/download_yolov8n.py --variants uint8 fp16
 
 Requirements:
     pip install ultralytics onnx onnxruntime
+    pip install onnxconverter-common   # only for --variants fp16
 
 Output:
     models/yolov8n/
     ├── config.pbtxt
     └── 1/
         └── model.onnx
+    models/yolov8n-uint8/     (--variants uint8, default)
+        images: uint8 [batch, 640, 640, 3] letterboxed BGR frames; BGR -> RGB,
+        /255 and HWC -> CHW run inside the ONNX graph (1.2 MB/frame instead of 4.9 MB)
+    models/yolov8n-fp16/      (--variants fp16)
+        images/output0: float16, weights converted to float16 (2.5 MB/frame; for KIND_GPU)
+    models/yolov8n-preprocess/, yolov8n-postprocess/, yolov8n-pipeline/
+        (server-side pre/post-processing ensemble, copied from triton-repo-reference)
 """
 
+import argparse
 import os
 import sys
 import shutil
@@ -28,6 +38,15 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# Server-side pre/post-processing ensemble around yolov8n
+PIPELINE_MODELS = ["yolov8n-preprocess", "yolov8n-postprocess", "yolov8n-pipeline"]
+
+# Reduced-payload input variants, exported next to the FP32 model
+VARIANTS = {
+    "uint8": "yolov8n-uint8",
+    "fp16": "yolov8n-fp16",
+}
+
 
 def check_dependencies():
     """Check if required packages are installed."""
@@ -140,7 +159,107 @@ def verify_onnx_model(onnx_path: Path):
     return session.get_inputs(), session.get_outputs()
 
 
-def create_yolov8n_config(models_dir: Path, model_name: str = "yolov8n"):
+def export_uint8_variant(fp32_path: Path, models_dir: Path, imgsz: int = 640) -> Path:
+    """
+    Wrap the FP32 graph so it takes uint8 HWC BGR frames.
+
+    Prepends Gather (BGR -> RGB), Cast (uint8 -> float), Div (/255) and
+    Transpose (NHWC -> NCHW) to the exported graph, i.e. exactly the
+    normalization the clients otherwise run in NumPy. The client then only
+    letterboxes and sends the uint8 frame.
+    """
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+    import numpy as np
+
+    model = onnx.load(str(fp32_path))
+    graph = model.graph
+    original = graph.input[0]
+    batch_dim = original.type.tensor_type.shape.dim[0]
+    batch = batch_dim.dim_param or batch_dim.dim_value or "batch"
+
+    # The original graph now reads the normalized tensor instead of the input
+    nchw = f"{original.name}_nchw"
+    for node in graph.node:
+        for i, name in enumerate(node.input):
+            if name == original.name:
+                node.input[i] = nchw
+
+    graph.initializer.extend([
+        numpy_helper.from_array(np.array([2, 1, 0], dtype=np.int64), "bgr_to_rgb"),
+        numpy_helper.from_array(np.array(255.0, dtype=np.float32), "pixel_scale"),
+    ])
+    preprocess_nodes = [
+        helper.make_node("Gather", [original.name, "bgr_to_rgb"], ["images_rgb"], axis=3),
+        helper.make_node("Cast", ["images_rgb"], ["images_float"], to=TensorProto.FLOAT),
+        helper.make_node("Div", ["images_float", "pixel_scale"], ["images_scaled"]),
+        helper.make_node("Transpose", ["images_scaled"], [nchw], perm=[0, 3, 1, 2]),
+    ]
+    for index, node in enumerate(preprocess_nodes):
+        graph.node.insert(index, node)
+
+    graph.input.remove(original)
+    graph.input.insert(0, helper.make_tensor_value_info(
+        original.name, TensorProto.UINT8, [batch, imgsz, imgsz, 3]
+    ))
+    onnx.checker.check_model(model)
+
+    onnx_path = models_dir / VARIANTS["uint8"] / "1" / "model.onnx"
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    onnx.save(model, str(onnx_path))
+    print(f"Exported uint8 input variant to: {onnx_path}")
+    return onnx_path
+
+
+def export_fp16_variant(fp32_path: Path, models_dir: Path) -> Path:
+    """
+    Convert weights, activations and the images/output0 tensors to float16.
+
+    Halves the request and response payload. ONNX Runtime's CPU provider has
+    few float16 kernels, so this variant is meant for KIND_GPU instances.
+    """
+    import onnx
+    from onnxconverter_common import float16
+
+    model = float16.convert_float_to_float16(onnx.load(str(fp32_path)), keep_io_types=False)
+    onnx.checker.check_model(model)
+
+    onnx_path = models_dir / VARIANTS["fp16"] / "1" / "model.onnx"
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    onnx.save(model, str(onnx_path))
+    print(f"Exported fp16 variant to: {onnx_path}")
+    return onnx_path
+
+
+def verify_variant(variant: str, variant_path: Path, fp32_path: Path, imgsz: int = 640):
+    """Run one random letterboxed frame through FP32 and the variant and compare output0."""
+    import numpy as np
+    import onnxruntime as ort
+
+    frame = np.random.default_rng(0).integers(0, 256, (1, imgsz, imgsz, 3), dtype=np.uint8)
+    reference_input = np.ascontiguousarray(frame[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+    variant_input = frame if variant == "uint8" else reference_input.astype(np.float16)
+
+    reference = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).run(
+        None, {"images": reference_input})[0]
+    try:
+        output = ort.InferenceSession(str(variant_path), providers=["CPUExecutionProvider"]).run(
+            None, {"images": variant_input})[0]
+    except Exception as e:
+        # fp16 kernels may be missing on the CPU provider; Triton will run it on GPU
+        print(f"  - {variant}: could not run on CPU for verification ({e})")
+        return
+    max_diff = float(np.abs(output.astype(np.float32) - reference).max())
+    print(f"  - {variant}: max |output0 - fp32| = {max_diff:.4f}")
+
+
+def create_yolov8n_config(
+    models_dir: Path,
+    model_name: str = "yolov8n",
+    data_type: str = "TYPE_FP32",
+    input_dims: str = "3, 640, 640",
+    kind: str = "KIND_CPU",
+):
     """
     Create Triton config.pbtxt for YOLOv8n.
 
@@ -148,9 +267,14 @@ def create_yolov8n_config(models_dir: Path, model_name: str = "yolov8n"):
     - Input: images [-1, 3, 640, 640] float32 (batch dim is dynamic)
     - Output: output0 [-1, 84, -1] float32 (batch and anchors are dynamic)
       (84 = 4 bbox coords + 80 class probabilities)
+
+    The variants override data_type/input_dims: yolov8n-uint8 takes
+    images TYPE_UINT8 [640, 640, 3] (output0 stays FP32), yolov8n-fp16
+    takes and returns TYPE_FP16.
     """
     model_dir = models_dir / model_name
     config_path = model_dir / "config.pbtxt"
+    output_type = "TYPE_FP16" if data_type == "TYPE_FP16" else "TYPE_FP32"
 
     config_content = f'''name: "{model_name}"
 platform: "onnxruntime_onnx"
@@ -159,22 +283,22 @@ max_batch_size: 16
 input [
   {{
     name: "images"
-    data_type: TYPE_FP32
-    dims: [ 3, 640, 640 ]
+    data_type: {data_type}
+    dims: [ {input_dims} ]
   }}
 ]
 
 output [
   {{
     name: "output0"
-    data_type: TYPE_FP32
+    data_type: {output_type}
     dims: [ 84, -1 ]
   }}
 ]
 
 instance_group [
   {{
-    kind: KIND_CPU
+    kind: {kind}
     count: 1
   }}
 ]
@@ -205,8 +329,29 @@ dynamic_batching {{
     return config_path
 
 
+def setup_pipeline_models(models_dir: Path):
+    """
+    Copy the yolov8n-pipeline ensemble (preprocess -> yolov8n -> postprocess)
+    from triton-repo-reference/models, so clients can send JPEG bytes and
+    receive detections.
+    """
+    source_models = PROJECT_ROOT / "triton-repo-reference" / "models"
+    for name in PIPELINE_MODELS:
+        source_dir = source_models / name
+        if not source_dir.is_dir():
+            print(f"  - {name}: NOT FOUND in {source_models}, skipping")
+            continue
+        shutil.copytree(source_dir, models_dir / name, dirs_exist_ok=True)
+        print(f"  - {name}: COPIED")
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Download YOLOv8n and export it for Triton")
+    parser.add_argument("--variants", nargs="*", choices=sorted(VARIANTS), default=["uint8"],
+                        help="Reduced-payload input variants to export next to the FP32 model (default: uint8)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("YOLOv8n Model Downloader for Triton Inference Server")
     print("=" * 60)
@@ -231,6 +376,25 @@ def main():
     # Create Triton config
     create_yolov8n_config(models_dir, model_name)
 
+    # Reduced-payload variants (separate models: Triton fixes one input dtype per model)
+    variant_paths = {}
+    if "uint8" in args.variants:
+        variant_paths["uint8"] = export_uint8_variant(onnx_path, models_dir)
+        create_yolov8n_config(models_dir, VARIANTS["uint8"], data_type="TYPE_UINT8", input_dims="640, 640, 3")
+    if "fp16" in args.variants:
+        try:
+            variant_paths["fp16"] = export_fp16_variant(onnx_path, models_dir)
+            create_yolov8n_config(models_dir, VARIANTS["fp16"], data_type="TYPE_FP16", kind="KIND_GPU")
+        except ImportError:
+            print("Skipping fp16 variant: pip install onnxconverter-common")
+    if variant_paths:
+        print("\nComparing variants with the FP32 model:")
+        for variant, path in variant_paths.items():
+            verify_variant(variant, path, onnx_path)
+
+    print("\nSetting up yolov8n-pipeline ensemble:")
+    setup_pipeline_models(models_dir)
+
     print("\n" + "=" * 60)
     print("SUCCESS!")
     print("=" * 60)
@@ -243,6 +407,11 @@ def main():
     print(f"  ├── config.pbtxt")
     print(f"  └── 1/")
     print(f"      └── model.onnx")
+    if variant_paths:
+        print(f"\nInput variants: " + ", ".join(f"{VARIANTS[v]} (--input-format {v})" for v in variant_paths))
+        print(f"  python scripts/benchmarks/benchmark_yolov8n_input_formats.py --video samples/video.avi")
+    print(f"\nEnd-to-end pipeline (JPEG in, detections out):")
+    print(f"  python scripts/clients/yolov8n_image_grpc_client.py --image input.jpg --pipeline")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+export_smollm_onnx.py
+
+Exports SmolLM-135M-Instruct to ONNX with past key/value inputs and outputs
+for smollm-135m-python version 2 (ONNX Runtime decode loop with IO binding,
+triton-repo-reference/shared/ort_causal_lm.py).
+
+The export uses Optimum's "text-generation-with-past" task: one graph,
+model.onnx, taking input_ids, attention_mask, position_ids and
+past_key_values.<layer>.key/.value and returning logits and
+present.<layer>.key/.value.
+
+Usage:
+    python scripts/download/export_smollm_onnx.py
+    python scripts/download/export_smollm_onnx.py --skip-verify
+
+Requirements:
+    pip install transformers torch "optimum[onnxruntime]"
+
+Output:
+    triton-repo/
+    ├── models/smollm-135m-python/
+    │   ├── config.pbtxt
+    │   └── 2/model.py (ONNX Runtime Python backend)
+    └── weights/smollm-135m-python/
+        └── 2/
+            ├── model.onnx
+            ├── config.json, generation_config.json
+            └── tokenizer files
+
+config.pbtxt loads version 1 only; set
+    version_policy { specific { versions: [1, 2] } }
+to serve version 2 next to it.
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+MODEL_ID = "HuggingFaceTB/SmolLM-135M-Instruct"
+TRITON_MODEL_NAME = "smollm-135m-python"
+MODEL_VERSION = "2"
+
+
+def check_dependencies():
+    """Check if required packages are installed."""
+    missing = []
+
+    try:
+        import torch
+    except ImportError:
+        missing.append("torch")
+
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        missing.append("transformers")
+
+    try:
+        from optimum.exporters.onnx import main_export
+    except ImportError:
+        missing.append('"optimum[onnxruntime]"')
+
+    if missing:
+        print(f"Missing required packages: {', '.join(missing)}")
+        print(f"Install with: pip install {' '.join(missing)}")
+        sys.exit(1)
+
+
+def export_model(weights_dir: Path) -> Path:
+    """Export the model with past key/values to weights/<name>/2/model.onnx."""
+    from optimum.exporters.onnx import main_export
+    from transformers import AutoTokenizer
+
+    target_path = weights_dir / TRITON_MODEL_NAME / MODEL_VERSION
+    target_path.mkdir(parents=True, exist_ok=True)
+
+    print(f"\n{'='*60}")
+    print(f"Exporting {MODEL_ID} to ONNX (with past key/values)")
+    print(f"Destination: {target_path}")
+    print(f"{'='*60}\n")
+
+    main_export(MODEL_ID, output=str(target_path), task="text-generation-with-past")
+
+    # Older Optimum versions write decoder_model.onnx, decoder_with_past_model.onnx
+    # and decoder_model_merged.onnx instead of model.onnx; keep only the merged graph
+    merged = target_path / "decoder_model_merged.onnx"
+    if not (target_path / "model.onnx").exists() and merged.exists():
+        merged.rename(target_path / "model.onnx")
+        for legacy in ("decoder_model.onnx", "decoder_with_past_model.onnx"):
+            (target_path / legacy).unlink(missing_ok=True)
+    if not (target_path / "model.onnx").exists():
+        raise FileNotFoundError(f"Export did not produce {target_path / 'model.onnx'}")
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    tokenizer.save_pretrained(str(target_path))
+
+    size_mb = (target_path / "model.onnx").stat().st_size / 1e6
+    print(f"\nExported model.onnx ({size_mb:.0f} MB) to: {target_path}")
+    return target_path
+
+
+def verify_model(model_path: Path, max_tokens: int = 30):
+    """Compare greedy ONNX Runtime output with PyTorch generate() on one prompt."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    sys.path.insert(0, str(PROJECT_ROOT / "triton-repo-reference" / "shared"))
+    from ort_causal_lm import OrtCausalLM
+
+    print("\n" + "="*60)
+    print("Verifying ONNX model against PyTorch...")
+    print("="*60 + "\n")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    messages = [{"role": "user", "content": "What is the capital of France?"}]
+    formatted = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    prompt_ids = tokenizer(formatted)["input_ids"]
+
+    lm = OrtCausalLM(str(model_path), name=TRITON_MODEL_NAME)
+    onnx_ids = lm.generate(prompt_ids, max_tokens)
+
+    model = AutoModelForCausalLM.from_pretrained(MODEL_ID, torch_dtype=torch.float32).eval()
+    with torch.no_grad():
+        output = model.generate(torch.tensor([prompt_ids]), max_new_tokens=max_tokens, do_sample=False,
+                                pad_token_id=tokenizer.eos_token_id)
+    torch_ids = output[0, len(prompt_ids):].tolist()
+
+    print(f"ONNX Runtime: '{tokenizer.decode(onnx_ids, skip_special_tokens=True)[:100]}'")
+    print(f"PyTorch:      '{tokenizer.decode(torch_ids, skip_special_tokens=True)[:100]}'")
+    if onnx_ids == torch_ids:
+        print("\nModel verification: PASSED")
+    else:
+        matched = sum(1 for a, b in zip(onnx_ids, torch_ids) if a == b)
+        print(f"\nModel verification: outputs differ ({matched}/{max(len(onnx_ids), len(torch_ids))} tokens match)")
+
+
+def setup_triton_model(models_dir: Path):
+    """Copy config.pbtxt, 2/model.py and the shared modules to triton-repo/."""
+    source_dir = PROJECT_ROOT / "triton-repo-reference" / "models" / TRITON_MODEL_NAME
+    source_config = source_dir / "config.pbtxt"
+    source_model_py = source_dir / MODEL_VERSION / "model.py"
+
+    target_dir = models_dir / TRITON_MODEL_NAME
+    target_version_dir = target_dir / MODEL_VERSION
+
+    print(f"\n{'='*60}")
+    print(f"Setting up Triton model: {TRITON_MODEL_NAME} version {MODEL_VERSION}")
+    print(f"{'='*60}\n")
+
+    if not source_config.exists() or not source_model_py.exists():
+        print(f"ERROR: Source model files not found!")
+        print(f"  Expected: {source_config}")
+        print(f"  Expected: {source_model_py}")
+        raise FileNotFoundError(f"Source model files missing for {TRITON_MODEL_NAME}")
+
+    target_version_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source_config, target_dir / "config.pbtxt")
+    print(f"  - config.pbtxt: COPIED")
+    shutil.copy2(source_model_py, target_version_dir / "model.py")
+    print(f"  - {MODEL_VERSION}/model.py: COPIED")
+
+    # ort_causal_lm.py, ort_session.py, cpu_threads.py, ... from triton-repo/shared/
+    source_shared = PROJECT_ROOT / "triton-repo-reference" / "shared"
+    if source_shared.is_dir():
+        shutil.copytree(source_shared, models_dir.parent / "shared", dirs_exist_ok=True)
+        print(f"  - shared/: COPIED")
+
+    return target_dir
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Export SmolLM-135M to ONNX with KV-cache I/O")
+    parser.add_argument("--skip-verify", action="store_true", help="Skip the PyTorch comparison")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SmolLM ONNX export for Triton Inference Server")
+    print(f"Model: {MODEL_ID}")
+    print("=" * 60)
+
+    check_dependencies()
+
+    triton_repo = PROJECT_ROOT / "triton-repo"
+    models_dir = triton_repo / "models"
+    weights_dir = triton_repo / "weights"
+    weights_dir.mkdir(parents=True, exist_ok=True)
+
+    model_path = export_model(weights_dir)
+    if not args.skip_verify:
+        verify_model(model_path)
+    setup_triton_model(models_dir)
+
+    print("\n" + "=" * 60)
+    print("SUCCESS!")
+    print("=" * 60)
+    print(f"\nWeights exported to: {model_path}")
+    print(f"\nTo serve version {MODEL_VERSION}, set in triton-repo/models/{TRITON_MODEL_NAME}/config.pbtxt:")
+    print(f"  version_policy {{ specific {{ versions: [1, 2] }} }}")
+    print(f"\nTo compare with version 1 on CPU:")
+    print(f"  python scripts/benchmarks/benchmark_smollm_ort.py")
+
+
+if __name__ == "__main__":
+    main()
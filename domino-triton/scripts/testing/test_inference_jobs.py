@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Check the dashboard's background job scheduler (app-src/inference_jobs.py).
+
+Runs JobManager with stub runners (no Triton, no client scripts) and checks
+that every job releases its slot, in particular a running job cancelled
+before its task has taken its first step.
+
+Exits 1 if any check fails.
+
+Usage:
+    python scripts/testing/test_inference_jobs.py
+
+Requirements:
+    - Python 3.8+ (standard library only)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "app-src"))
+
+from inference_jobs import CANCELLED, RUNNING, SUCCEEDED, JobManager  # noqa: E402
+
+
+async def _succeed(job):
+    return {"success": True}
+
+
+async def _wait_forever(job):
+    await asyncio.Event().wait()
+
+
+async def _settle(manager: JobManager, rounds: int = 20) -> None:
+    """Let scheduled tasks and done callbacks run."""
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+async def _cancel_immediately_after_submit() -> None:
+    manager = JobManager(1, lambda ns: 1)
+    first = manager.submit("ns", "model", {}, _wait_forever)
+    assert first.status == RUNNING, first.status
+    manager.cancel(first.id)
+    second = manager.submit("ns", "model", {}, _succeed)
+    await _settle(manager)
+    assert first.status == CANCELLED, first.status
+    assert second.status == SUCCEEDED, second.status
+    assert manager.stats()["running"] == {"ns": 0}, manager.stats()
+
+
+async def _cancel_running_job() -> None:
+    manager = JobManager(1, lambda ns: 1)
+    first = manager.submit("ns", "model", {}, _wait_forever)
+    await _settle(manager)
+    manager.cancel(first.id)
+    second = manager.submit("other", "model", {}, _succeed)
+    await _settle(manager)
+    assert first.status == CANCELLED, first.status
+    assert second.status == SUCCEEDED, second.status
+    assert sum(manager.stats()["running"].values()) == 0, manager.stats()
+
+
+async def _cancel_queued_job() -> None:
+    manager = JobManager(1, lambda ns: 1)
+    first = manager.submit("ns", "model", {}, _succeed)
+    queued = manager.submit("ns", "model", {}, _succeed)
+    manager.cancel(queued.id)
+    await _settle(manager)
+    assert first.status == SUCCEEDED, first.status
+    assert queued.status == CANCELLED, queued.status
+    assert manager.stats()["running"] == {"ns": 0}, manager.stats()
+
+
+def test_cancel_immediately_after_submit():
+    asyncio.run(_cancel_immediately_after_submit())
+
+
+def test_cancel_running_job():
+    asyncio.run(_cancel_running_job())
+
+
+def test_cancel_queued_job():
+    asyncio.run(_cancel_queued_job())
+
+
+def main():
+    checks = [
+        ("cancel immediately after submit", test_cancel_immediately_after_submit),
+        ("cancel running job", test_cancel_running_job),
+        ("cancel queued job", test_cancel_queued_job),
+    ]
+    failures = 0
+    for name, check in checks:
+        try:
+            check()
+            print(f"{name:<34} | OK")
+        except AssertionError as e:
+            failures += 1
+            print(f"{name:<34} | FAIL ({e})")
+
+    print()
+    if failures:
+        print(f"{failures} check(s) failed")
+        sys.exit(1)
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
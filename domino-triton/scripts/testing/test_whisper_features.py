@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Check server-side Whisper features against WhisperProcessor.
+
+whisper-tiny-python computes log-mel features for its `audio` input with
+triton-repo-reference/shared/whisper_features.py (numpy only). This script
+compares them with transformers' WhisperProcessor -- what the clients send
+as input_features -- on:
+  - the sample audio (samples/audio_sample.wav, if present)
+  - synthetic tones, noise, silence and clips shorter / longer than 30 s
+  - decode_audio() of the same waveform as 16-bit WAV and FLAC bytes
+
+Exits 1 if any maximum absolute difference exceeds --tolerance.
+
+Usage:
+    python scripts/testing/test_whisper_features.py
+    python scripts/testing/test_whisper_features.py --audio my_clip.flac --tolerance 1e-3
+
+Requirements:
+    - numpy, transformers (processor), soundfile (FLAC / non-WAV files)
+"""
+
+import argparse
+import io
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "triton-repo-reference" / "shared"))
+
+import whisper_features  # noqa: E402
+
+SAMPLE_RATE = whisper_features.SAMPLE_RATE
+
+
+def synthetic_clips() -> dict:
+    """Named 16 kHz test waveforms."""
+    rng = np.random.default_rng(0)
+    t = np.arange(30 * SAMPLE_RATE) / SAMPLE_RATE
+    chirp = np.sin(2 * np.pi * (100 + 3000 * t / t[-1]) * t)
+    return {
+        "tone 440 Hz (30 s)": 0.5 * np.sin(2 * np.pi * 440 * t),
+        "chirp (30 s)": 0.3 * chirp,
+        "white noise (30 s)": 0.1 * rng.standard_normal(len(t)),
+        "tone + noise (7 s)": (0.4 * np.sin(2 * np.pi * 1000 * t) + 0.05 * rng.standard_normal(len(t)))[:7 * SAMPLE_RATE],
+        "short clip (0.5 s)": 0.2 * rng.standard_normal(SAMPLE_RATE // 2),
+        "silence (5 s)": np.zeros(5 * SAMPLE_RATE),
+        "long clip (45 s)": 0.2 * np.sin(2 * np.pi * 220 * np.arange(45 * SAMPLE_RATE) / SAMPLE_RATE),
+    }
+
+
+def wav_bytes(audio: np.ndarray) -> bytes:
+    """16-bit mono WAV of a waveform."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def flac_bytes(audio: np.ndarray):
+    """FLAC of a waveform, or None without soundfile."""
+    try:
+        import soundfile
+    except ImportError:
+        return None
+    buffer = io.BytesIO()
+    soundfile.write(buffer, audio, SAMPLE_RATE, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server-side Whisper features vs WhisperProcessor")
+    parser.add_argument("--model", default="openai/whisper-tiny", help="Processor to compare against")
+    parser.add_argument("--audio", nargs="*", default=None,
+                        help="Extra audio files (default: samples/audio_sample.wav if present)")
+    parser.add_argument("--tolerance", type=float, default=1e-3,
+                        help="Maximum absolute difference allowed (default: 1e-3)")
+    args = parser.parse_args()
+
+    from transformers import WhisperProcessor
+
+    processor = WhisperProcessor.from_pretrained(args.model)
+    mel_filters = processor.feature_extractor.mel_filters
+
+    def reference(audio: np.ndarray) -> np.ndarray:
+        return processor(audio, sampling_rate=SAMPLE_RATE, return_tensors="np").input_features[0]
+
+    clips = {name: audio.astype(np.float32) for name, audio in synthetic_clips().items()}
+    audio_files = args.audio
+    if audio_files is None:
+        sample = PROJECT_ROOT / "samples" / "audio_sample.wav"
+        audio_files = [str(sample)] if sample.exists() else []
+    for path in audio_files:
+        clips[Path(path).name] = whisper_features.decode_audio(Path(path).read_bytes())
+
+    failures = 0
+    print(f"{'input':<28} | {'max abs diff':>12} | result")
+    print("-" * 52)
+
+    def check(name: str, features: np.ndarray, expected: np.ndarray):
+        nonlocal failures
+        diff = float(np.abs(features - expected).max())
+        ok = features.shape == expected.shape and diff <= args.tolerance
+        failures += not ok
+        print(f"{name:<28} | {diff:>12.2e} | {'OK' if ok else 'FAIL'}")
+
+    # One batch of all clips, as execute() computes them
+    names = list(clips)
+    batch = whisper_features.log_mel_spectrogram([clips[n] for n in names], mel_filters)
+    for row, name in enumerate(names):
+        check(name, batch[row], reference(clips[name]))
+
+    # Decoding: WAV (stdlib or soundfile) and FLAC round trips of one clip
+    audio = clips["tone + noise (7 s)"]
+    quantized = (np.clip(audio, -1, 1) * 32767).astype(np.int16).astype(np.float32) / 32768
+    expected = reference(quantized)
+    check("decode WAV", whisper_features.log_mel_spectrogram(
+        [whisper_features.decode_audio(wav_bytes(audio))], mel_filters)[0], expected)
+    flac = flac_bytes(audio)
+    if flac is None:
+        print(f"{'decode FLAC':<28} | {'-':>12} | SKIPPED (soundfile not installed)")
+    else:
+        check("decode FLAC", whisper_features.log_mel_spectrogram(
+            [whisper_features.decode_audio(flac)], mel_filters)[0], expected)
+
+    print()
+    if failures:
+        print(f"{failures} check(s) exceeded tolerance {args.tolerance}")
+        sys.exit(1)
+    print(f"All checks within tolerance {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+BERT Tokenizer Triton Python Backend Model
+
+First step of the bert-base-uncased-pipeline ensemble: tokenizes raw text
+on the server, so clients send strings instead of input_ids/attention_mask
+padded to a fixed 128 tokens.
+
+Input:
+    - text: string [batch, 1] - raw text
+
+Output:
+    - input_ids: int64 [batch, seq_len]
+    - attention_mask: int64 [batch, seq_len]
+
+Dynamic-length batching: Triton's dynamic batcher hands execute() several
+requests at once. Their texts are tokenized together and padded to the
+longest sequence among them (capped at max_length), not to max_length.
+Every request of one execute() call therefore gets the same seq_len, so
+bert-base-uncased's dynamic batcher can merge them again; a batch of short
+sentences costs ~16 tokens per row instead of 128.
+"""
+
+# Add model-specific packages to path (if any exist)
+import sys
+import os
+_model_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_packages_dir = os.path.join(_model_dir, "packages")
+if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
+    sys.path.insert(0, _packages_dir)
+
+import json
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+
+class TritonPythonModel:
+    """Batch tokenizer for bert-base-uncased."""
+
+    def initialize(self, args):
+        """Load the tokenizer from the weights folder."""
+        from transformers import AutoTokenizer
+
+        self.model_config = json.loads(args["model_config"])
+        self.model_name = args["model_name"]
+        self.model_version = args.get("model_version", "1")
+
+        parameters = self.model_config.get("parameters", {})
+        self.max_length = int(parameters.get("max_length", {}).get("string_value", "128"))
+
+        # Model repo is at /triton-repo/models, weights are at /triton-repo/weights (sibling folder)
+        model_repo = os.environ.get("MODEL_REPO", "/triton-repo/models")
+        base_path = os.path.dirname(model_repo.rstrip("/"))
+        weights_path = os.path.join(base_path, "weights", self.model_name, self.model_version)
+
+        # Fallback to HuggingFace if weights folder doesn't exist
+        if not os.path.exists(weights_path):
+            weights_path = parameters.get("model_id", {}).get("string_value", "bert-base-uncased")
+            print(f"[{self.model_name}] Weights folder not found, using: {weights_path}")
+        else:
+            print(f"[{self.model_name}] Loading tokenizer from: {weights_path}")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(weights_path)
+        print(f"[{self.model_name}] max_length={self.max_length}")
+
+    def execute(self, requests):
+        """Tokenize all texts of the batched requests together; one response per request."""
+        texts, counts = [], []
+        for request in requests:
+            values = pb_utils.get_input_tensor_by_name(request, "text").as_numpy().flatten()
+            decoded = [v.decode("utf-8") if isinstance(v, bytes) else str(v) for v in values]
+            texts.extend(decoded)
+            counts.append(len(decoded))
+
+        try:
+            encoded = self.tokenizer(
+                texts,
+                padding="longest",
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+        except Exception as e:
+            error = pb_utils.TritonError(f"Tokenization error: {str(e)}")
+            return [pb_utils.InferenceResponse(output_tensors=[], error=error) for _ in requests]
+
+        input_ids = encoded["input_ids"].astype(np.int64)
+        attention_mask = encoded["attention_mask"].astype(np.int64)
+
+        responses = []
+        start = 0
+        for count in counts:
+            end = start + count
+            responses.append(pb_utils.InferenceResponse(output_tensors=[
+                pb_utils.Tensor("input_ids", input_ids[start:end]),
+                pb_utils.Tensor("attention_mask", attention_mask[start:end]),
+            ]))
+            start = end
+        return responses
+
+    def finalize(self):
+        """Clean up resources."""
+        print(f"[{self.model_name}] Finalizing model")
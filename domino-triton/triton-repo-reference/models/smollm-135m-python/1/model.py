@@ -22,10 +22,40 @@ Input:
     - temperature: float32 [batch] - sampling temperature (optional, default 0.7)
     - top_p: float32 [batch] - nucleus sampling parameter (optional, default 0.9)
     - system_prompt: string [batch] - system prompt (optional)
+    - stream: bool [1] - stream partial text (optional, decoupled mode only)
 
 Output:
     - generated_text: string [batch] - generated response text
     - token_count: int32 [batch] - number of tokens generated
+
+Continuous batching:
+    With parameter continuous_batching = "true" and the decoupled transaction
+    policy in config.pbtxt, prompts are run by the shared continuous batching
+    engine (<base>/shared/continuous_batching.py): they join and leave one
+    running decode batch at token boundaries, and each request gets a single
+    final response from the engine thread.
+
+Prefix cache:
+    With parameter prefix_cache_memory_mb > 0, the keys/values of prompt
+    prefixes (chat template, system prompt) are kept in a block-hashed LRU
+    (<base>/shared/prefix_cache.py) and prefill starts after the longest
+    cached prefix. Hit rate and saved prefill tokens are exported as
+    prefix_cache_* metrics.
+
+Result cache:
+    With parameter generation_cache_memory_mb > 0, results of greedy requests
+    (temperature 0) are kept in a byte-bounded LRU keyed by model version,
+    prompt token ids and decoding parameters
+    (<base>/shared/generation_cache.py). Sampled and streamed requests bypass
+    it. Hits and misses are exported as generation_cache_* metrics.
+
+Streaming:
+    With the decoupled transaction policy, a request with stream=true (one
+    prompt) gets one response per new piece of text -- generated_text holds
+    only the new text, token_count the running total -- and then an empty
+    response flagged final. Without continuous batching, generate() runs in a
+    worker thread feeding a TextIteratorStreamer. Other requests get their
+    usual single response, flagged final.
 """
 
 # Add model-specific packages to path (if any exist)
@@ -36,7 +66,17 @@ _packages_dir = os.path.join(_model_dir, "packages")
 if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
     sys.path.insert(0, _packages_dir)
 
+# Shared Python backend modules (continuous_batching, prefix_cache) live in <base>/shared
+_shared_dir = os.path.join(os.path.dirname(os.path.dirname(_model_dir)), "shared")
+
+
+def _use_shared_modules():
+    """Make the modules in <base>/shared importable."""
+    if os.path.isdir(_shared_dir) and _shared_dir not in sys.path:
+        sys.path.insert(0, _shared_dir)
+
 import json
+import threading
 import numpy as np
 import triton_python_backend_utils as pb_utils
 
@@ -80,6 +120,16 @@ class TritonPythonModel:
         print(f"[{self.model_name}] Max length: {self.max_length}")
         print(f"[{self.model_name}] Default max tokens: {self.default_max_tokens}")
 
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning)
+        self.cpu_layout = None
+        if os.path.isdir(_shared_dir):
+            _use_shared_modules()
+            from cpu_threads import partition_cpu_threads
+            self.cpu_layout = partition_cpu_threads(
+                self.model_config, self.model_instance_name,
+                args.get("model_instance_kind", ""), parameters, self.model_name,
+            )
+
         try:
             import torch
             from transformers import AutoModelForCausalLM, AutoTokenizer
@@ -94,13 +144,25 @@ class TritonPythonModel:
 
             # Load model
             print(f"[{self.model_name}] Loading model...")
-            self.model = AutoModelForCausalLM.from_pretrained(
+            load_model = lambda: AutoModelForCausalLM.from_pretrained(
                 weights_path,
                 torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
                 low_cpu_mem_usage=True,
             )
+            # Optional int8 / bf16 CPU weights (cpu_quantization), cached
+            # with the weights (or under cache/ when loaded by model_id)
+            self.cpu_quantization = "none"
+            if self.device == "cpu" and os.path.isdir(_shared_dir):
+                _use_shared_modules()
+                from cpu_quantization import load_cpu_model
+                self.model, self.cpu_quantization = load_cpu_model(
+                    parameters, self.model_name, self.model_version, load_model
+                )
+            else:
+                self.model = load_model()
             self.model.to(self.device)
             self.model.eval()
+            print(f"[{self.model_name}] CPU quantization: {self.cpu_quantization}")
 
             # Set pad token if not set
             if self.tokenizer.pad_token is None:
@@ -116,6 +178,341 @@ class TritonPythonModel:
             print(f"[{self.model_name}] Failed to load model: {e}")
             raise
 
+        # Decoupled mode: responses go through each request's response
+        # sender, which allows streaming partial text
+        self.decoupled = pb_utils.using_decoupled_model_transaction_policy(self.model_config)
+
+        # Optional continuous batching (the tokenizer is then used from both
+        # Triton's thread and the engine's, so access is serialized)
+        self.tokenizer_lock = threading.Lock()
+        # Optional shared-prefix KV cache (chat template / system prompt)
+        self.prefix_cache = self._create_prefix_cache(parameters)
+        # Optional result cache for greedy (deterministic) requests
+        self.result_cache = self._create_result_cache(parameters)
+        self.engine = self._create_engine(parameters)
+
+    def _create_engine(self, parameters):
+        """Start the continuous batching engine if config.pbtxt opts in."""
+        enabled = parameters.get("continuous_batching", {}).get("string_value", "false")
+        if enabled.strip().lower() != "true":
+            return None
+
+        if not self.decoupled:
+            raise ValueError(
+                "continuous_batching requires model_transaction_policy { decoupled: true }"
+            )
+
+        _use_shared_modules()
+        from continuous_batching import ContinuousBatchingEngine
+
+        engine = ContinuousBatchingEngine(
+            self.model,
+            self.tokenizer,
+            name=self.model_name,
+            max_active_sequences=int(
+                parameters.get("max_active_sequences", {}).get("string_value", "8")
+            ),
+            kv_cache_memory_mb=int(
+                parameters.get("kv_cache_memory_mb", {}).get("string_value", "1024")
+            ),
+            max_sequence_tokens=self.max_length,
+            prefix_cache=self.prefix_cache,
+        )
+        engine.start()
+        return engine
+
+    def _create_prefix_cache(self, parameters):
+        """Create the shared-prefix KV cache if prefix_cache_memory_mb > 0."""
+        memory_mb = int(parameters.get("prefix_cache_memory_mb", {}).get("string_value", "0"))
+        if memory_mb <= 0:
+            return None
+        try:
+            from transformers import DynamicCache  # noqa: F401
+        except ImportError:
+            print(f"[{self.model_name}] Prefix cache needs transformers >= 4.36; disabled")
+            return None
+
+        if not os.path.isdir(_shared_dir):
+            print(f"[{self.model_name}] {_shared_dir} not deployed; prefix cache disabled")
+            return None
+
+        _use_shared_modules()
+        from prefix_cache import create_prefix_cache
+
+        return create_prefix_cache(parameters, self.model_name, self.model_version)
+
+    def _create_result_cache(self, parameters):
+        """Create the greedy generation result cache if generation_cache_memory_mb > 0."""
+        memory_mb = int(parameters.get("generation_cache_memory_mb", {}).get("string_value", "0"))
+        if memory_mb <= 0:
+            return None
+        if not os.path.isdir(_shared_dir):
+            print(f"[{self.model_name}] {_shared_dir} not deployed; generation cache disabled")
+            return None
+
+        _use_shared_modules()
+        from generation_cache import create_generation_cache
+
+        return create_generation_cache(parameters, self.model_name, self.model_version)
+
+    def _result_key(self, prompt_ids, max_tokens, temperature, top_p):
+        """Result cache key, or None when disabled or sampling (not deterministic)."""
+        if self.result_cache is None or temperature > 0:
+            return None
+        return self.result_cache.key(
+            prompt_ids, max_tokens=int(max_tokens), temperature=float(temperature), top_p=float(top_p)
+        )
+
+    def _prefix_cache_kwargs(self, inputs):
+        """
+        generate() kwargs resuming from the longest cached prompt prefix.
+
+        generate() skips the prefill of the tokens already in the cache it
+        is given and fills it with the rest; _cache_prefix stores the new
+        blocks afterwards. Empty when the prefix cache is disabled.
+        """
+        if self.prefix_cache is None:
+            return {}
+        from transformers import DynamicCache
+
+        _, prefix = self.prefix_cache.lookup(inputs["input_ids"][0].tolist())
+        if prefix is None:
+            return {"past_key_values": DynamicCache()}
+        return {"past_key_values": DynamicCache.from_legacy_cache(prefix)}
+
+    def _cache_prefix(self, inputs, cache_kwargs):
+        """Store the prompt's prefix blocks after a generate() call."""
+        if cache_kwargs:
+            self.prefix_cache.insert(
+                inputs["input_ids"][0].tolist(), cache_kwargs["past_key_values"]
+            )
+
+    def _submit_to_engine(self, request, stream=False):
+        """
+        Queue a request's prompts on the engine; it sends the final response.
+
+        With stream=True (one prompt), new text is also sent after every token.
+        """
+        from continuous_batching import Sequence
+        from text_stream import TextDeltaDecoder
+
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+
+        def send_error(message):
+            sender.send(
+                pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(message)),
+                flags=final,
+            )
+
+        try:
+            prompt_tensor = pb_utils.get_input_tensor_by_name(request, "prompt")
+            if prompt_tensor is None:
+                raise ValueError("Missing required input: prompt")
+            max_tokens = int(self._get_optional_param(
+                request, "max_tokens", self.default_max_tokens
+            ))
+            temperature = float(self._get_optional_param(request, "temperature", 0.7))
+            top_p = float(self._get_optional_param(request, "top_p", 0.9))
+            system_prompt = self._get_optional_param(
+                request, "system_prompt", None, dtype=str
+            )
+
+            prompt_ids = []
+            for prompt in prompt_tensor.as_numpy().flatten():
+                if isinstance(prompt, bytes):
+                    prompt = prompt.decode("utf-8")
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                with self.tokenizer_lock:
+                    formatted = self.tokenizer.apply_chat_template(
+                        messages, tokenize=False, add_generation_prompt=True
+                    )
+                    prompt_ids.append(self.tokenizer(
+                        formatted, truncation=True, max_length=self.max_length - max_tokens
+                    )["input_ids"])
+            if stream and len(prompt_ids) != 1:
+                raise ValueError("stream=true supports one prompt per request")
+        except Exception as e:
+            send_error(f"Inference error: {str(e)}")
+            return
+
+        results = [None] * len(prompt_ids)
+        pending = {"remaining": len(prompt_ids), "failed": False}
+        pending_lock = threading.Lock()  # cache hits complete on this thread
+        decoder = TextDeltaDecoder(self.tokenizer, self.tokenizer_lock) if stream else None
+
+        def on_token(token_ids):
+            text = decoder.push(token_ids)
+            if text:
+                sender.send(self._text_response([text], [len(token_ids)]))
+
+        def complete(position, result):
+            with pending_lock:
+                results[position] = result
+                pending["remaining"] -= 1
+                if pending["remaining"] != 0 or pending["failed"]:
+                    return
+            sender.send(
+                self._text_response(
+                    [text for text, _ in results], [count for _, count in results]
+                ),
+                flags=final,
+            )
+
+        def on_finish(position, cache_key, token_ids, error):
+            if pending["failed"]:
+                return
+            if error:
+                with pending_lock:
+                    pending["failed"] = True
+                send_error(error)
+                return
+            if stream:
+                text = decoder.flush(token_ids)
+                if text:
+                    sender.send(self._text_response([text], [len(token_ids)]))
+                sender.send(self._text_response([""], [len(token_ids)]), flags=final)
+                return
+            with self.tokenizer_lock:
+                text = self.tokenizer.decode(token_ids, skip_special_tokens=True)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, (text, len(token_ids)))
+            complete(position, (text, len(token_ids)))
+
+        is_cancelled = getattr(request, "is_cancelled", None)
+        for position, ids in enumerate(prompt_ids):
+            cache_key = None if stream else self._result_key(ids, max_tokens, temperature, top_p)
+            if cache_key is not None:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    complete(position, cached)
+                    continue
+            self.engine.submit(Sequence(
+                prompt_ids=ids,
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                on_finish=lambda token_ids, error, position=position, key=cache_key: on_finish(
+                    position, key, token_ids, error
+                ),
+                on_token=on_token if stream else None,
+                is_cancelled=is_cancelled,
+            ))
+
+    def _stream_request(self, request):
+        """
+        Generate one prompt, sending text as it is produced.
+
+        generate() runs in a worker thread feeding a TextIteratorStreamer;
+        this thread sends each piece of text it yields, then the final
+        response. The instance is busy until generation finishes.
+        """
+        import torch
+        from transformers import TextIteratorStreamer
+
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+
+        def send_error(message):
+            sender.send(
+                pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(message)),
+                flags=final,
+            )
+
+        class CountingStreamer(TextIteratorStreamer):
+            """TextIteratorStreamer that also counts generated tokens."""
+
+            token_count = 0
+
+            def put(self, value):
+                if not self.next_tokens_are_prompt:
+                    self.token_count += value.numel()
+                super().put(value)
+
+        try:
+            prompt_tensor = pb_utils.get_input_tensor_by_name(request, "prompt")
+            if prompt_tensor is None:
+                raise ValueError("Missing required input: prompt")
+            prompts = prompt_tensor.as_numpy().flatten()
+            if len(prompts) != 1:
+                raise ValueError("stream=true supports one prompt per request")
+            prompt = prompts[0]
+            if isinstance(prompt, bytes):
+                prompt = prompt.decode("utf-8")
+
+            max_tokens = int(self._get_optional_param(
+                request, "max_tokens", self.default_max_tokens
+            ))
+            temperature = float(self._get_optional_param(request, "temperature", 0.7))
+            top_p = float(self._get_optional_param(request, "top_p", 0.9))
+            system_prompt = self._get_optional_param(
+                request, "system_prompt", None, dtype=str
+            )
+
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            formatted = self.tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+            inputs = self.tokenizer(
+                formatted,
+                return_tensors="pt",
+                truncation=True,
+                max_length=self.max_length - max_tokens,
+            )
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        except Exception as e:
+            send_error(f"Inference error: {str(e)}")
+            return
+
+        streamer = CountingStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        failure = []
+
+        def generate():
+            try:
+                cache_kwargs = self._prefix_cache_kwargs(inputs)
+                with torch.no_grad():
+                    self.model.generate(
+                        **inputs,
+                        **cache_kwargs,
+                        max_new_tokens=max_tokens,
+                        temperature=temperature if temperature > 0 else None,
+                        top_p=top_p if temperature > 0 else None,
+                        do_sample=temperature > 0,
+                        pad_token_id=self.tokenizer.eos_token_id,
+                        streamer=streamer,
+                    )
+                self._cache_prefix(inputs, cache_kwargs)
+            except Exception as e:
+                failure.append(f"Inference error: {str(e)}")
+                streamer.end()  # unblock the loop below
+
+        worker = threading.Thread(target=generate, name=f"{self.model_name}-stream", daemon=True)
+        worker.start()
+        for text in streamer:
+            if text:
+                sender.send(self._text_response([text], [streamer.token_count]))
+        worker.join()
+
+        if failure:
+            send_error(failure[0])
+            return
+        sender.send(self._text_response([""], [streamer.token_count]), flags=final)
+
+    @staticmethod
+    def _text_response(texts, token_counts):
+        """Response with generated_text / token_count outputs."""
+        return pb_utils.InferenceResponse(output_tensors=[
+            pb_utils.Tensor("generated_text", np.array(
+                [text.encode("utf-8") for text in texts], dtype=np.object_)),
+            pb_utils.Tensor("token_count", np.array(token_counts, dtype=np.int32)),
+        ])
+
     def _get_optional_param(self, request, name, default, dtype=None):
         """Get an optional parameter from the request."""
         tensor = pb_utils.get_input_tensor_by_name(request, name)
@@ -127,7 +524,33 @@ class TritonPythonModel:
         return value
 
     def execute(self, requests):
-        """Process inference requests."""
+        """
+        Process inference requests.
+
+        In decoupled mode responses are sent through each request's response
+        sender: streamed for stream=true, from the engine with continuous
+        batching, otherwise the _execute_batch response flagged final.
+        """
+        if not self.decoupled:
+            return self._execute_batch(requests)
+
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        for request in requests:
+            try:
+                stream = bool(self._get_optional_param(request, "stream", False))
+            except Exception:
+                stream = False
+            if self.engine is not None:
+                self._submit_to_engine(request, stream=stream)
+            elif stream:
+                self._stream_request(request)
+            else:
+                response = self._execute_batch([request])[0]
+                request.get_response_sender().send(response, flags=final)
+        return None
+
+    def _execute_batch(self, requests):
+        """Generate each request's prompts; one complete response per request."""
         import torch
 
         responses = []
@@ -186,16 +609,29 @@ class TritonPythonModel:
                     inputs = {k: v.to(self.device) for k, v in inputs.items()}
                     input_length = inputs["input_ids"].shape[1]
 
-                    # Generate
+                    # Greedy requests seen before skip generation
+                    cache_key = self._result_key(
+                        inputs["input_ids"][0].tolist(), max_tokens, temperature, top_p
+                    )
+                    cached = self.result_cache.get(cache_key) if cache_key is not None else None
+                    if cached is not None:
+                        generated_texts.append(cached[0].encode("utf-8"))
+                        token_counts.append(cached[1])
+                        continue
+
+                    # Generate (resuming from a cached prompt prefix, if any)
+                    cache_kwargs = self._prefix_cache_kwargs(inputs)
                     with torch.no_grad():
                         outputs = self.model.generate(
                             **inputs,
+                            **cache_kwargs,
                             max_new_tokens=int(max_tokens),
                             temperature=float(temperature) if temperature > 0 else None,
                             top_p=float(top_p) if temperature > 0 else None,
                             do_sample=temperature > 0,
                             pad_token_id=self.tokenizer.eos_token_id,
                         )
+                    self._cache_prefix(inputs, cache_kwargs)
 
                     # Decode only the generated part
                     generated_ids = outputs[0][input_length:]
@@ -205,6 +641,8 @@ class TritonPythonModel:
 
                     generated_texts.append(generated_text.encode("utf-8"))
                     token_counts.append(len(generated_ids))
+                    if cache_key is not None:
+                        self.result_cache.put(cache_key, (generated_text, len(generated_ids)))
 
                 # Prepare outputs
                 text_array = np.array(generated_texts, dtype=np.object_)
@@ -234,5 +672,8 @@ class TritonPythonModel:
     def finalize(self):
         """Clean up resources."""
         print(f"[{self.model_name}] Finalizing model")
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
         self.model = None
         self.tokenizer = None
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+SmolLM-135M Triton Python Backend Model -- ONNX Runtime (Version 2)
+
+Same inputs, outputs and chat formatting as version 1, but generation runs
+an ONNX export of SmolLM-135M-Instruct with past key/value inputs and
+outputs through ONNX Runtime. The decode loop (<base>/shared/ort_causal_lm.py)
+binds each step's present key/values as the next step's past with IO
+binding, so the KV cache stays inside ONNX Runtime between tokens. Intended
+for KIND_CPU.
+
+Model weights are exported to the weights folder by
+scripts/download/export_smollm_onnx.py:
+    <base>/weights/smollm-135m-python/2/
+        ├── model.onnx
+        ├── config.json, generation_config.json
+        └── tokenizer files
+
+Loading:
+    version_policy in config.pbtxt loads version 1 only; add 2 to load
+    this version next to it:
+        version_policy { specific { versions: [1, 2] } }
+
+Session options (threads, graph optimization level, optimized-graph
+cache) come from the ort_* parameters in config.pbtxt
+(<base>/shared/ort_session.py).
+
+Result cache and streaming (decoupled mode) work as in version 1.
+Continuous batching and the prefix cache are PyTorch-only and not used.
+"""
+
+import sys
+import os
+_model_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_packages_dir = os.path.join(_model_dir, "packages")
+if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
+    sys.path.insert(0, _packages_dir)
+
+# Shared Python backend modules (ort_causal_lm, ort_session, ...) live in <base>/shared
+_shared_dir = os.path.join(os.path.dirname(os.path.dirname(_model_dir)), "shared")
+
+
+def _use_shared_modules():
+    """Make the modules in <base>/shared importable."""
+    if os.path.isdir(_shared_dir) and _shared_dir not in sys.path:
+        sys.path.insert(0, _shared_dir)
+
+import json
+import threading
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+
+class TritonPythonModel:
+    """SmolLM model on ONNX Runtime for Triton Python backend."""
+
+    def initialize(self, args):
+        """Create the ONNX Runtime session and load the tokenizer."""
+        self.model_config = json.loads(args["model_config"])
+        self.model_instance_name = args["model_instance_name"]
+        self.model_name = args["model_name"]
+        self.model_version = args.get("model_version", "2")
+
+        parameters = self.model_config.get("parameters", {})
+        self.max_length = int(
+            parameters.get("max_length", {}).get("string_value", "2048")
+        )
+        self.default_max_tokens = int(
+            parameters.get("default_max_tokens", {}).get("string_value", "256")
+        )
+
+        model_repo = os.environ.get("MODEL_REPO", "/triton-repo/models")
+        base_path = os.path.dirname(model_repo.rstrip("/"))
+        weights_path = os.path.join(
+            base_path, "weights", self.model_name, self.model_version
+        )
+        if not os.path.isfile(os.path.join(weights_path, "model.onnx")):
+            raise FileNotFoundError(
+                f"{weights_path}/model.onnx not found; "
+                f"run scripts/download/export_smollm_onnx.py"
+            )
+        if not os.path.isdir(_shared_dir):
+            raise FileNotFoundError(f"{_shared_dir} not deployed (ort_causal_lm.py is required)")
+        print(f"[{self.model_name}] Loading ONNX model from: {weights_path}")
+
+        _use_shared_modules()
+
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning);
+        # ONNX Runtime gets the same thread count unless ort_intra_op_threads is set
+        from cpu_threads import partition_cpu_threads
+        self.cpu_layout = partition_cpu_threads(
+            self.model_config, self.model_instance_name,
+            args.get("model_instance_kind", ""), parameters, self.model_name,
+        )
+        if self.cpu_layout and "ort_intra_op_threads" not in parameters:
+            parameters["ort_intra_op_threads"] = {"string_value": str(self.cpu_layout["threads"])}
+
+        from transformers import AutoTokenizer
+        from ort_causal_lm import OrtCausalLM
+
+        self.tokenizer = AutoTokenizer.from_pretrained(weights_path)
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.lm = OrtCausalLM(weights_path, parameters, self.model_name)
+        if not self.lm.eos_token_ids and self.tokenizer.eos_token_id is not None:
+            self.lm.eos_token_ids = {self.tokenizer.eos_token_id}
+        print(f"[{self.model_name}] Model loaded successfully ({len(self.lm.past_names) // 2} layers)")
+
+        self.decoupled = pb_utils.using_decoupled_model_transaction_policy(self.model_config)
+        self.tokenizer_lock = threading.Lock()
+        self.result_cache = self._create_result_cache(parameters)
+
+    def _create_result_cache(self, parameters):
+        """Create the greedy generation result cache if generation_cache_memory_mb > 0."""
+        from generation_cache import create_generation_cache
+
+        return create_generation_cache(parameters, self.model_name, self.model_version)
+
+    def _result_key(self, prompt_ids, max_tokens, temperature, top_p):
+        """Result cache key, or None when disabled or sampling (not deterministic)."""
+        if self.result_cache is None or temperature > 0:
+            return None
+        return self.result_cache.key(
+            prompt_ids, max_tokens=int(max_tokens), temperature=float(temperature), top_p=float(top_p)
+        )
+
+    def _get_optional_param(self, request, name, default, dtype=None):
+        """Get an optional parameter from the request."""
+        tensor = pb_utils.get_input_tensor_by_name(request, name)
+        if tensor is None:
+            return default
+        value = tensor.as_numpy()[0]
+        if dtype == str:
+            return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+        return value
+
+    def _prompt_ids(self, request):
+        """Chat-formatted prompt token ids and decoding parameters of a request."""
+        prompt_tensor = pb_utils.get_input_tensor_by_name(request, "prompt")
+        if prompt_tensor is None:
+            raise ValueError("Missing required input: prompt")
+        max_tokens = int(self._get_optional_param(request, "max_tokens", self.default_max_tokens))
+        temperature = float(self._get_optional_param(request, "temperature", 0.7))
+        top_p = float(self._get_optional_param(request, "top_p", 0.9))
+        system_prompt = self._get_optional_param(request, "system_prompt", None, dtype=str)
+
+        prompt_ids = []
+        for prompt in prompt_tensor.as_numpy().flatten():
+            if isinstance(prompt, bytes):
+                prompt = prompt.decode("utf-8")
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            with self.tokenizer_lock:
+                formatted = self.tokenizer.apply_chat_template(
+                    messages, tokenize=False, add_generation_prompt=True
+                )
+                prompt_ids.append(self.tokenizer(
+                    formatted, truncation=True, max_length=self.max_length - max_tokens
+                )["input_ids"])
+        return prompt_ids, max_tokens, temperature, top_p
+
+    @staticmethod
+    def _text_response(texts, token_counts):
+        """Response with generated_text / token_count outputs."""
+        return pb_utils.InferenceResponse(output_tensors=[
+            pb_utils.Tensor("generated_text", np.array(
+                [text.encode("utf-8") for text in texts], dtype=np.object_)),
+            pb_utils.Tensor("token_count", np.array(token_counts, dtype=np.int32)),
+        ])
+
+    def execute(self, requests):
+        """
+        Process inference requests.
+
+        In decoupled mode responses are sent through each request's response
+        sender: streamed for stream=true, otherwise the _execute_batch
+        response flagged final.
+        """
+        if not self.decoupled:
+            return self._execute_batch(requests)
+
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        for request in requests:
+            try:
+                stream = bool(self._get_optional_param(request, "stream", False))
+            except Exception:
+                stream = False
+            if stream:
+                self._stream_request(request)
+            else:
+                response = self._execute_batch([request])[0]
+                request.get_response_sender().send(response, flags=final)
+        return None
+
+    def _stream_request(self, request):
+        """Generate one prompt, sending the new text after every token."""
+        from text_stream import TextDeltaDecoder
+
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        try:
+            prompt_ids, max_tokens, temperature, top_p = self._prompt_ids(request)
+            if len(prompt_ids) != 1:
+                raise ValueError("stream=true supports one prompt per request")
+
+            decoder = TextDeltaDecoder(self.tokenizer, self.tokenizer_lock)
+
+            def on_token(token_ids):
+                text = decoder.push(token_ids)
+                if text:
+                    sender.send(self._text_response([text], [len(token_ids)]))
+
+            token_ids = self.lm.generate(
+                prompt_ids[0], max_tokens, temperature=temperature, top_p=top_p,
+                on_token=on_token, max_length=self.max_length,
+            )
+            text = decoder.flush(token_ids)
+            if text:
+                sender.send(self._text_response([text], [len(token_ids)]))
+            sender.send(self._text_response([""], [len(token_ids)]), flags=final)
+        except Exception as e:
+            sender.send(
+                pb_utils.InferenceResponse(
+                    output_tensors=[], error=pb_utils.TritonError(f"Inference error: {str(e)}")
+                ),
+                flags=final,
+            )
+
+    def _execute_batch(self, requests):
+        """Generate each request's prompts; one complete response per request."""
+        responses = []
+
+        for request in requests:
+            try:
+                prompt_ids, max_tokens, temperature, top_p = self._prompt_ids(request)
+                texts, counts = [], []
+                for ids in prompt_ids:
+                    # Greedy requests seen before skip generation
+                    cache_key = self._result_key(ids, max_tokens, temperature, top_p)
+                    cached = self.result_cache.get(cache_key) if cache_key is not None else None
+                    if cached is not None:
+                        texts.append(cached[0])
+                        counts.append(cached[1])
+                        continue
+
+                    token_ids = self.lm.generate(
+                        ids, max_tokens, temperature=temperature, top_p=top_p,
+                        max_length=self.max_length,
+                    )
+                    with self.tokenizer_lock:
+                        text = self.tokenizer.decode(token_ids, skip_special_tokens=True)
+                    texts.append(text)
+                    counts.append(len(token_ids))
+                    if cache_key is not None:
+                        self.result_cache.put(cache_key, (text, len(token_ids)))
+
+                response = self._text_response(texts, counts)
+
+            except Exception as e:
+                error_msg = f"Inference error: {str(e)}"
+                print(f"[{self.model_name}] {error_msg}")
+                import traceback
+
+                traceback.print_exc()
+                response = pb_utils.InferenceResponse(
+                    output_tensors=[], error=pb_utils.TritonError(error_msg)
+                )
+
+            responses.append(response)
+
+        return responses
+
+    def finalize(self):
+        """Clean up resources."""
+        print(f"[{self.model_name}] Finalizing model")
+        self.lm = None
+        self.tokenizer = None
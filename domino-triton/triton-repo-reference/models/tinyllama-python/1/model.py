@@ -37,8 +37,8 @@ When JSON mode is enabled, two components work together to force valid JSON outp
     │   ┌─────────────────────────────────────────────────────────────┐   │
     │   │              JsonPrefixLogitsProcessor                       │   │
     │   │                                                              │   │
-    │   │   - Examines currently generated text                        │   │
-    │   │   - Determines which tokens are valid JSON continuations     │   │
+    │   │   - Advances each row's automaton state by the new token     │   │
+    │   │   - Looks up the precomputed mask for that state             │   │
     │   │   - Sets invalid token logits to -infinity (impossible)      │   │
     │   │   - Returns modified logits                                  │   │
     │   └─────────────────────────────────────────────────────────────┘   │
@@ -50,8 +50,8 @@ When JSON mode is enabled, two components work together to force valid JSON outp
     │   ┌─────────────────────────────────────────────────────────────┐   │
     │   │                  JsonStopCriteria                            │   │
     │   │                                                              │   │
-    │   │   - Checks if JSON is complete (balanced braces)             │   │
-    │   │   - Returns True to stop, False to continue                  │   │
+    │   │   - Scans only the new token: brace depth, string state      │   │
+    │   │   - Returns True per sequence once its JSON is complete      │   │
     │   └─────────────────────────────────────────────────────────────┘   │
     │                           │                                          │
     │                           ▼                                          │
@@ -63,20 +63,31 @@ When JSON mode is enabled, two components work together to force valid JSON outp
 JSON STATE MACHINE
 =============================================================================
 
-The JsonPrefixLogitsProcessor implements a state machine that tracks JSON structure:
+The output schema is compiled ONCE, in initialize(), into a character-level
+automaton (JsonSchemaAutomaton):
 
-    State 0: [empty]     -> Force "{"
-    State 1: {           -> Force '"answer"'
-    State 2: {"answer"   -> Force ':'
-    State 3: {"answer":  -> Force '"' (start of value string)
-    State 4: {"answer":"<value>"  -> Force ','
-    State 5: {"answer":"<value>", -> Force '"confidence"'
-    State 6: {"answer":"<value>","confidence" -> Force ':'
-    State 7: {"answer":"<value>","confidence":<number> -> Force '}'
-    State 8: COMPLETE    -> JsonStopCriteria stops generation
+    Segment          | Characters accepted
+    -----------------|------------------------------------------------
+    "{"              | optional whitespace, then "{"
+    '"answer"'       | optional whitespace, then '"answer"' char by char
+    ":"              | optional whitespace, then ":"
+    string value     | optional whitespace, '"', any chars/escapes, '"'
+    ","              | optional whitespace, then ","
+    '"confidence"'   | optional whitespace, then '"confidence"'
+    ":"              | optional whitespace, then ":"
+    number value     | optional whitespace, -?digits(.digits)?
+    "}"              | optional whitespace, then "}"
+    DONE             | end of sequence token only
 
-Each state transition only allows specific tokens, ensuring the output
-always matches the schema: {"answer": "...", "confidence": N}
+Every vocabulary token is simulated from every automaton state at compile
+time, which yields two tables:
+
+    transitions[state, token_id] -> next state (or ERROR)
+    blocked[state, token_id]     -> True if the token cannot continue the JSON
+
+Both are stored as tensors on the model's device, so a generation step is
+just one table lookup per sequence and one masked_fill -- no decoding,
+regexes or re-tokenization, and the cost does not grow with output length.
 
 =============================================================================
 TOKEN MASKING
@@ -96,7 +107,11 @@ This guarantees the model can ONLY generate tokens that continue valid JSON.
 """
 
 import json
+import os
 import re
+import sys
+import threading
+import time
 import numpy as np
 import triton_python_backend_utils as pb_utils
 
@@ -107,14 +122,271 @@ from transformers import (
     LogitsProcessorList,
     StoppingCriteria,
     StoppingCriteriaList,
+    TextIteratorStreamer,
 )
 
 import torch
+import transformers
+
+try:
+    from transformers import DynamicCache
+except ImportError:  # transformers < 4.36: no prefix cache in generate()
+    DynamicCache = None
 
 
 # Hugging Face model identifier
 MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
 
+# Shared Python backend modules (continuous_batching, prefix_cache, ...) live
+# in <base>/shared, next to <base>/models
+SHARED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "shared",
+)
+
+
+def _use_shared_modules() -> None:
+    """Make the modules in SHARED_DIR importable."""
+    if os.path.isdir(SHARED_DIR) and SHARED_DIR not in sys.path:
+        sys.path.insert(0, SHARED_DIR)
+
+# transformers >= 4.39 lets a StoppingCriteria stop each batch row on its own
+PER_SEQUENCE_STOPPING = tuple(
+    int(part) for part in transformers.__version__.split(".")[:2]
+) >= (4, 39)
+
+
+# =============================================================================
+# JSON SCHEMA AUTOMATON
+# =============================================================================
+
+# Schema for JSON mode: {"answer": "<string>", "confidence": <number>}
+# Each segment is (kind, literal); kind is "literal", "string" or "number".
+JSON_RESPONSE_SCHEMA = [
+    ("literal", "{"),
+    ("literal", '"answer"'),
+    ("literal", ":"),
+    ("string", None),
+    ("literal", ","),
+    ("literal", '"confidence"'),
+    ("literal", ":"),
+    ("number", None),
+    ("literal", "}"),
+]
+
+# Byte-fallback tokens in SentencePiece vocabularies, e.g. "<0x0A>"
+_BYTE_PIECE = re.compile(r"<0x([0-9A-Fa-f]{2})>")
+
+
+class JsonSchemaAutomaton:
+    """
+    A JSON schema compiled into per-state vocabulary masks and transitions.
+
+    Compilation happens once per model instance (in initialize). The schema
+    is first expanded into character-level states; then every vocabulary
+    token's text is run through the automaton from every state, recording
+    where it ends up (or ERROR if the token breaks the schema).
+
+    States per segment:
+    -------------------
+    - literal: one state per character; whitespace may precede the first
+    - string:  open (expects '"'), body, escape (after a backslash)
+    - number:  start, sign, integer, dot, fraction; a number ends on the
+               first character that cannot continue it, which is then fed
+               to the next segment
+
+    Token rules:
+    ------------
+    - Special tokens are blocked everywhere, except EOS once the object is
+      complete (DONE)
+    - Whitespace-only tokens are blocked outside string values, so the model
+      cannot stall between structural characters
+    - Partial UTF-8 byte tokens are only allowed inside string values
+    - A state with no allowed tokens (unusual tokenizer) is left
+      unconstrained, as is ERROR (only reachable if generation is steered
+      past the mask by something else)
+
+    Attributes:
+        transitions: LongTensor [num_states + 1, vocab_size] of next states
+        blocked: BoolTensor [num_states + 1, vocab_size], True = masked out
+        start_state: State before any token has been generated
+        done_state: State after the closing "}"
+        error_state: Sink state for sequences that left the schema
+        token_texts: Text each token id contributes (None for special tokens),
+                     shared with JsonStopCriteria
+        compile_secs: Time spent compiling (for logs/benchmarks)
+    """
+
+    WHITESPACE = " \t\n\r"
+    STRING_ESCAPES = '"\\/bfnrt'
+
+    def __init__(self, tokenizer, vocab_size: int = None, schema: list = None):
+        """
+        Compile the schema against a tokenizer's vocabulary.
+
+        Args:
+            tokenizer: Hugging Face tokenizer of the model being constrained
+            vocab_size: Width of the model's logits. Defaults to len(tokenizer);
+                       ids beyond the tokenizer's vocabulary are blocked.
+            schema: Segment list (defaults to JSON_RESPONSE_SCHEMA)
+        """
+        started = time.perf_counter()
+        self.vocab_size = vocab_size or len(tokenizer)
+
+        self._states = self._expand(schema or JSON_RESPONSE_SCHEMA)
+        self.start_state = 0
+        self.done_state = len(self._states) - 1
+        self.error_state = len(self._states)
+
+        self.token_texts = self._token_texts(tokenizer, self.vocab_size)
+        num_rows = len(self._states) + 1
+
+        transitions = np.full((num_rows, self.vocab_size), self.error_state, dtype=np.int64)
+        blocked = np.ones((num_rows, self.vocab_size), dtype=bool)
+
+        for state in range(self.done_state):
+            for token_id, text in enumerate(self.token_texts):
+                if not text:
+                    continue
+                if not text.strip(self.WHITESPACE) and self._states[state][0] != "string_body":
+                    continue
+                next_state = self._run(state, text)
+                if next_state != self.error_state:
+                    transitions[state, token_id] = next_state
+                    blocked[state, token_id] = False
+
+        # Once complete, only EOS may follow
+        if tokenizer.eos_token_id is not None and tokenizer.eos_token_id < self.vocab_size:
+            blocked[self.done_state, tokenizer.eos_token_id] = False
+            transitions[self.done_state, tokenizer.eos_token_id] = self.done_state
+
+        # Safety fallback: never mask out the whole vocabulary
+        for state in range(num_rows):
+            if blocked[state].all():
+                blocked[state] = False
+
+        self.transitions = torch.from_numpy(transitions)
+        self.blocked = torch.from_numpy(blocked)
+        self.compile_secs = time.perf_counter() - started
+
+    def to(self, device) -> "JsonSchemaAutomaton":
+        """Move the tables to the device the logits live on."""
+        self.transitions = self.transitions.to(device)
+        self.blocked = self.blocked.to(device)
+        return self
+
+    @property
+    def num_states(self) -> int:
+        return len(self._states)
+
+    @staticmethod
+    def _expand(schema: list) -> list:
+        """
+        Expand schema segments into character-level states.
+
+        Each state is (kind, expected_char, whitespace_allowed). States of a
+        segment are contiguous and the next segment starts right after, which
+        the transition arithmetic in _step relies on.
+        """
+        states = []
+        for kind, literal in schema:
+            if kind == "literal":
+                for i, ch in enumerate(literal):
+                    states.append(("literal", ch, i == 0))
+            elif kind == "string":
+                states.append(("string_open", '"', True))
+                states.append(("string_body", None, False))
+                states.append(("string_escape", None, False))
+            elif kind == "number":
+                states.append(("number_start", None, True))
+                states.append(("number_sign", None, False))
+                states.append(("number_int", None, False))
+                states.append(("number_dot", None, False))
+                states.append(("number_frac", None, False))
+            else:
+                raise ValueError(f"Unknown schema segment kind: {kind}")
+        states.append(("done", None, False))
+        return states
+
+    def _step(self, state: int, ch: str) -> int:
+        """Advance one character; returns the next state or error_state."""
+        if state == self.error_state:
+            return state
+        kind, expected, whitespace_allowed = self._states[state]
+
+        if whitespace_allowed and ch in self.WHITESPACE:
+            return state
+
+        if kind in ("literal", "string_open"):
+            return state + 1 if ch == expected else self.error_state
+
+        if kind == "string_body":
+            if ch == '"':
+                return state + 2                  # past string_escape: next segment
+            if ch == "\\":
+                return state + 1
+            return state if ch >= " " else self.error_state
+
+        if kind == "string_escape":
+            return state - 1 if ch in self.STRING_ESCAPES else self.error_state
+
+        if kind == "number_start":
+            if ch == "-":
+                return state + 1
+            return state + 2 if ch.isdigit() else self.error_state
+
+        if kind in ("number_sign", "number_dot"):
+            return state + 1 if ch.isdigit() else self.error_state
+
+        if kind == "number_int":
+            if ch.isdigit():
+                return state
+            if ch == ".":
+                return state + 1
+            return self._step(state + 3, ch)      # number ended: next segment
+
+        if kind == "number_frac":
+            return state if ch.isdigit() else self._step(state + 1, ch)
+
+        return self.error_state                   # nothing may follow DONE
+
+    def _run(self, state: int, text: str) -> int:
+        """Advance over a token's text."""
+        for ch in text:
+            state = self._step(state, ch)
+            if state == self.error_state:
+                break
+        return state
+
+    @staticmethod
+    def _token_texts(tokenizer, vocab_size: int) -> list:
+        """
+        The text each token id contributes when generated mid-sequence.
+
+        Special tokens map to None. SentencePiece pieces keep their word
+        boundary space ("▁answer" -> " answer"), which decoding a lone
+        piece would strip. Byte-fallback pieces for non-ASCII bytes map to
+        U+FFFD so they are only accepted inside string values.
+        """
+        special_ids = set(tokenizer.all_special_ids)
+        pieces = tokenizer.convert_ids_to_tokens(list(range(min(len(tokenizer), vocab_size))))
+        texts = [None] * vocab_size
+
+        for token_id, piece in enumerate(pieces):
+            if piece is None or token_id in special_ids:
+                continue
+            byte_piece = _BYTE_PIECE.fullmatch(piece)
+            if byte_piece:
+                value = int(byte_piece.group(1), 16)
+                texts[token_id] = chr(value) if value < 0x80 else "\ufffd"
+                continue
+            text = tokenizer.convert_tokens_to_string([piece])
+            if piece.startswith("\u2581") and not text.startswith(" "):
+                text = " " + text
+            texts[token_id] = text
+
+        return texts
+
 
 # =============================================================================
 # JSON LOGITS PROCESSOR
@@ -129,125 +401,61 @@ class JsonPrefixLogitsProcessor(LogitsProcessor):
 
     How it works:
     -------------
-    1. At each generation step, decode the tokens generated so far
-    2. Analyze the current text to determine the JSON state
-    3. Based on the state, determine which tokens are valid continuations
-    4. Mask all other tokens by setting their logits to -infinity
+    1. Each row of the batch carries its automaton state (a LongTensor)
+    2. On each call, the token appended since the previous call advances
+       every row's state with one lookup into automaton.transitions
+    3. The rows' masks are gathered from automaton.blocked and applied with
+       a single masked_fill
 
     Why track prompt_length:
     ------------------------
     The input_ids passed to __call__ include BOTH the original prompt AND
-    the generated tokens. We only want to analyze the generated portion
-    to determine JSON state. The system prompt contains JSON examples with
-    "{" characters, which would confuse our state detection.
+    the generated tokens. Only tokens from prompt_length onwards are fed to
+    the automaton. The system prompt contains JSON examples with "{"
+    characters, which must not count as generated output.
+
+    Rows are assumed to keep their position across steps (greedy or sampled
+    generation, as used by this model -- not beam search). In a mixed batch,
+    rows not listed in constrained_rows start in the automaton's
+    unconstrained sink state, so their logits pass through untouched.
 
     Example:
     --------
     If generated text so far is: '{"answer": "Paris"'
 
-    Valid continuations are: ',' (to continue to confidence field)
-    Invalid continuations are: anything else
-
-    So we mask all tokens except ',' and its variations.
+    The row is in the state expecting ',' (optionally preceded by whitespace),
+    so every token whose text is not ',' / ' ,' / ', "' ... is masked.
 
     Attributes:
-        tokenizer: The tokenizer used to decode tokens to text
+        automaton: The compiled JsonSchemaAutomaton (shared, read-only)
         prompt_length: Number of tokens in the original prompt (to skip)
+        constrained_rows: Per-row flags, None = every row is constrained
+        states: Per-row automaton states, created on the first call
     """
 
-    def __init__(self, tokenizer, prompt_length: int):
+    def __init__(self, automaton: JsonSchemaAutomaton, prompt_length: int,
+                 constrained_rows: list = None):
         """
-        Initialize the processor.
+        Initialize the processor. Create one per generate() call.
 
         Args:
-            tokenizer: Hugging Face tokenizer for decoding
+            automaton: JsonSchemaAutomaton compiled in initialize()
             prompt_length: Length of input prompt in tokens. Generation starts
-                          after this position, so we only analyze tokens from
+                          after this position, so we only feed tokens from
                           position prompt_length onwards.
+            constrained_rows: Optional list of bools, one per batch row;
+                          False rows are left unconstrained
         """
-        self.tokenizer = tokenizer
+        self.automaton = automaton
         self.prompt_length = prompt_length
-
-    def _decode_generated(self, input_ids: torch.Tensor) -> str:
-        """
-        Decode only the generated portion of input_ids to text.
-
-        Args:
-            input_ids: Full sequence including prompt + generated tokens
-                      Shape: [batch_size, sequence_length]
-
-        Returns:
-            The decoded text of ONLY the generated tokens (after prompt)
-
-        Example:
-            If input_ids represents: "<prompt tokens><generated tokens>"
-            And prompt_length is 50
-            This returns only the decoded "<generated tokens>" part
-        """
-        # Slice to get only generated tokens (everything after prompt)
-        generated_ids = input_ids[0][self.prompt_length:]
-        return self.tokenizer.decode(generated_ids, skip_special_tokens=True)
-
-    def _mask(self, scores: torch.Tensor, allowed_strings: list) -> torch.Tensor:
-        """
-        Mask logits to only allow specific string continuations.
-
-        This is the core masking function. It:
-        1. Encodes each allowed string to get its token IDs
-        2. Creates a mask tensor filled with -infinity
-        3. Copies original scores only for allowed token IDs
-
-        Args:
-            scores: Original logits from the model. Shape: [batch_size, vocab_size]
-            allowed_strings: List of strings that are valid continuations.
-                           Example: ['{', '{"'] or ['"answer"', ' "answer"']
-
-        Returns:
-            Modified scores where invalid tokens have -infinity logits
-
-        Why multiple allowed_strings:
-        -----------------------------
-        Tokenizers may encode the same concept differently based on context.
-        For example, '"answer"' might tokenize to [1234] or [5678, 9012].
-        By allowing ['"answer"', ' "answer"'], we handle both cases.
-
-        Example:
-            scores = [0.1, 0.5, 0.3, 0.8, 0.2]  # 5 tokens in vocab
-            allowed_strings = ["{"]             # Only allow "{"
-
-            If "{" encodes to token ID 2:
-            result = [-inf, -inf, 0.3, -inf, -inf]  # Only token 2 allowed
-        """
-        # Collect all token IDs that could produce the allowed strings
-        allowed_ids = set()
-        for s in allowed_strings:
-            # Encode string without special tokens
-            ids = self.tokenizer.encode(s, add_special_tokens=False)
-            # Add all token IDs (handles multi-token strings)
-            for tid in ids:
-                allowed_ids.add(tid)
-
-        # If no valid tokens found, return unchanged (safety fallback)
-        if not allowed_ids:
-            return scores
-
-        # Create mask: start with all -infinity
-        masked = scores.clone()
-        masked[:] = float("-inf")
-
-        # Restore original scores only for allowed tokens
-        for tid in allowed_ids:
-            masked[:, tid] = scores[:, tid]
-
-        return masked
+        self.constrained_rows = constrained_rows
+        self.states = None
+        self._consumed = prompt_length
 
     def __call__(self, input_ids: torch.Tensor, scores: torch.Tensor) -> torch.Tensor:
         """
         Process logits at each generation step to enforce JSON structure.
 
-        This method is called by the model's generate() function at each step.
-        It implements a state machine based on the current generated text.
-
         Args:
             input_ids: All token IDs so far (prompt + generated)
                       Shape: [batch_size, current_sequence_length]
@@ -255,66 +463,27 @@ class JsonPrefixLogitsProcessor(LogitsProcessor):
 
         Returns:
             Modified scores with invalid tokens masked to -infinity
-
-        State Machine:
-        --------------
-        The method checks the current generated text and determines which
-        JSON tokens are valid continuations:
-
-        Generated Text Pattern          | Allowed Next Tokens
-        ---------------------------------|--------------------
-        (no "{" yet)                     | "{"
-        ends with "{"                    | '"answer"'
-        has "answer" but no ":"          | ":"
-        ends with ":"                    | '"' (start value)
-        ends with complete "answer" val  | ","
-        ends with ","                    | '"confidence"'
-        has "confidence" but no ":"      | ":"
-        ends with number                 | "}"
-
-        Note: We allow both '"answer"' and ' "answer"' to handle tokenizer
-        variations where space might be separate or attached.
         """
-        # Get only the generated text (exclude prompt)
-        text = self._decode_generated(input_ids).rstrip()
-
-        # STATE 0: No JSON started yet -> Force opening brace
-        if "{" not in text:
-            return self._mask(scores, ["{"])
-
-        # STATE 1: Just opened brace -> Force "answer" key
-        if text.endswith("{"):
-            return self._mask(scores, ['"answer"', ' "answer"'])
-
-        # STATE 2: Have "answer" but no colon yet -> Force colon
-        if '"answer"' in text and not re.search(r'"answer"\s*:', text):
-            return self._mask(scores, [":"])
-
-        # STATE 3: Have "answer": but no value yet -> Force opening quote
-        if re.search(r'"answer"\s*:\s*$', text):
-            return self._mask(scores, ['"', ' "'])
-
-        # STATE 4: Have complete answer value -> Force comma
-        if re.search(r'"answer"\s*:\s*"[^"]*"$', text):
-            return self._mask(scores, [","])
-
-        # STATE 5: After comma -> Force "confidence" key
-        if text.rstrip().endswith(","):
-            return self._mask(scores, ['"confidence"', ' "confidence"'])
-
-        # STATE 6: Have "confidence" but no colon -> Force colon
-        if '"confidence"' in text and not re.search(r'"confidence"\s*:', text):
-            return self._mask(scores, [":"])
+        if self.states is None:
+            self.states = torch.full(
+                (input_ids.shape[0],), self.automaton.start_state,
+                dtype=torch.long, device=self.automaton.transitions.device,
+            )
+            if self.constrained_rows is not None:
+                free = torch.tensor(
+                    [not constrained for constrained in self.constrained_rows],
+                    dtype=torch.bool, device=self.states.device,
+                )
+                self.states[free] = self.automaton.error_state
 
-        # STATE 7: Have confidence number -> Force closing brace
-        # Matches: "confidence": 0, "confidence": 1, "confidence": 0.95, etc.
-        if re.search(r'"confidence"\s*:\s*-?\d+(\.\d+)?$', text):
-            return self._mask(scores, ["}"])
+        # Feed the token(s) generated since the last call (one per step)
+        for position in range(self._consumed, input_ids.shape[1]):
+            new_tokens = input_ids[:, position].to(self.states.device)
+            self.states = self.automaton.transitions[self.states, new_tokens]
+        self._consumed = input_ids.shape[1]
 
-        # DEFAULT: No constraint (model is filling in values freely)
-        # This allows the model to generate the actual answer content
-        # and confidence number without restriction
-        return scores
+        blocked = self.automaton.blocked[self.states].to(scores.device)
+        return scores.masked_fill(blocked, float("-inf"))
 
 
 # =============================================================================
@@ -325,11 +494,11 @@ class JsonStopCriteria(StoppingCriteria):
     """
     Stopping criteria that halts generation when JSON is complete.
 
-    This criteria checks if the generated text forms a complete JSON object
-    by verifying that:
-    1. At least one "{" has been generated (JSON started)
-    2. Braces are balanced (equal number of "{" and "}")
-    3. Text ends with "}" (JSON properly closed)
+    Each sequence in the batch is tracked independently and incrementally:
+    only the text of the token appended since the previous call is scanned,
+    updating that row's brace depth and string/escape state. A row is
+    complete when its top-level object closes (depth returns to 0 after the
+    first "{"). Braces inside string values are ignored.
 
     Why this is needed:
     -------------------
@@ -340,56 +509,170 @@ class JsonStopCriteria(StoppingCriteria):
 
     This ensures generation stops exactly when we have one complete JSON object.
 
+    Why incremental:
+    ----------------
+    Decoding and re-scanning the whole sequence on every step makes each
+    check O(n) and a generation O(n^2). Here a check costs one table lookup
+    and a scan of a few characters per row, independent of output length.
+
     Example:
-        Generated: '{"answer": "Paris", "confidence": 1}'
+        Generated: '{"answer": "a {b}", "confidence": 1}'
 
-        Checks:
-        - "{" count: 1, "}" count: 1 -> balanced ✓
-        - Ends with "}" -> ✓
-        - Result: STOP generation
+        Per-token updates:
+        - '{'           -> depth 1
+        - ' "a {b}"'    -> braces inside the string are skipped
+        - '}'           -> depth 0 -> row complete -> STOP
+
+    Batches:
+    --------
+    With transformers >= 4.39, a BoolTensor [batch_size] is returned and
+    generate() finishes each row on its own. Older versions only accept a
+    single bool, so generation stops once every row is complete (finished
+    rows may pick up trailing tokens, which post-processing discards).
 
     Attributes:
-        tokenizer: The tokenizer used to decode tokens to text
+        token_texts: Text per token id (see JsonSchemaAutomaton.token_texts)
+        prompt_length: Number of tokens in the (padded) prompt to skip
+        tokenizer: Fallback decoder for ids outside token_texts
+        constrained_rows: Per-row flags, None = every row is checked; other
+                          rows never stop here (only on EOS / max tokens)
     """
 
-    def __init__(self, tokenizer):
+    def __init__(self, token_texts: list, prompt_length: int, tokenizer=None,
+                 constrained_rows: list = None):
         """
-        Initialize the stop criteria.
+        Initialize the stop criteria. Create one per generate() call.
 
         Args:
-            tokenizer: Hugging Face tokenizer for decoding input_ids to text
+            token_texts: Text per token id, precomputed once per model
+            prompt_length: Length of input prompt in tokens. Only tokens from
+                          this position onwards are scanned.
+            tokenizer: Optional tokenizer used for ids not in token_texts
+            constrained_rows: Optional list of bools, one per batch row
         """
+        self.token_texts = token_texts
+        self.prompt_length = prompt_length
         self.tokenizer = tokenizer
-
-    def __call__(self, input_ids: torch.Tensor, scores: torch.Tensor, **kwargs) -> bool:
+        self.constrained_rows = constrained_rows
+        self._consumed = prompt_length
+        self._rows = None
+
+    def _text(self, token_id: int) -> str:
+        if token_id < len(self.token_texts):
+            return self.token_texts[token_id] or ""
+        if self.tokenizer is not None:
+            return self.tokenizer.decode([token_id], skip_special_tokens=True)
+        return ""
+
+    @staticmethod
+    def _scan(row: dict, text: str) -> None:
+        """Advance one row's brace/string state over a token's text."""
+        for ch in text:
+            if row["escape"]:
+                row["escape"] = False
+            elif row["in_string"]:
+                if ch == "\\":
+                    row["escape"] = True
+                elif ch == '"':
+                    row["in_string"] = False
+            elif ch == '"':
+                row["in_string"] = row["depth"] > 0
+            elif ch == "{":
+                row["depth"] += 1
+            elif ch == "}" and row["depth"] > 0:
+                row["depth"] -= 1
+                if row["depth"] == 0:
+                    row["done"] = True
+                    return
+
+    def __call__(self, input_ids: torch.Tensor, scores: torch.Tensor, **kwargs):
         """
-        Check if generation should stop.
-
-        This is called after each token is generated. It decodes the full
-        sequence and checks if the JSON is complete.
+        Check which sequences should stop.
 
         Args:
-            input_ids: All token IDs generated so far (including prompt)
+            input_ids: All token IDs so far (prompt + generated)
                       Shape: [batch_size, sequence_length]
             scores: Current logits (not used, but required by interface)
             **kwargs: Additional arguments (not used)
 
         Returns:
-            True if generation should stop (JSON is complete)
-            False if generation should continue
-
-        Note: Unlike the LogitsProcessor, this decodes the FULL text including
-        the prompt. This is fine because we're just counting braces and
-        checking the ending - the prompt doesn't contain unbalanced braces.
+            BoolTensor [batch_size], True where the JSON object is complete
+            (a single bool on transformers < 4.39, True once all rows are)
         """
-        text = self.tokenizer.decode(input_ids[0], skip_special_tokens=True)
+        if self._rows is None:
+            constrained = self.constrained_rows or [True] * input_ids.shape[0]
+            self._rows = [
+                {"depth": 0, "in_string": False, "escape": False, "done": False,
+                 "checked": checked}
+                for checked in constrained
+            ]
+
+        for position in range(self._consumed, input_ids.shape[1]):
+            new_tokens = input_ids[:, position].tolist()
+            for row, token_id in zip(self._rows, new_tokens):
+                if row["checked"] and not row["done"]:
+                    self._scan(row, self._text(token_id))
+        self._consumed = input_ids.shape[1]
+
+        done = [row["done"] for row in self._rows]
+        if PER_SEQUENCE_STOPPING:
+            return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+        return all(done)
 
-        # Check all three conditions for complete JSON:
-        return (
-            text.count("{") > 0                    # JSON has started
-            and text.count("{") == text.count("}") # Braces are balanced
-            and text.strip().endswith("}")         # Ends with closing brace
-        )
+
+# =============================================================================
+# JSON CONSTRAINT FOR CONTINUOUS BATCHING
+# =============================================================================
+
+class JsonSequenceConstraint:
+    """
+    The JSON constraint for one sequence in the continuous batching engine.
+
+    The engine decodes sequences that join and leave the batch at any step,
+    so instead of a LogitsProcessor over the whole batch, each sequence
+    carries its own automaton state (same compiled tables as above).
+
+    Engine protocol:
+        apply(scores)     -> scores [vocab_size] with invalid tokens at -inf
+        advance(token_id) -> True once the JSON object is complete
+    """
+
+    def __init__(self, automaton: JsonSchemaAutomaton):
+        self.automaton = automaton
+        self.state = automaton.start_state
+
+    def apply(self, scores: torch.Tensor) -> torch.Tensor:
+        blocked = self.automaton.blocked[self.state].to(scores.device)
+        return scores.masked_fill(blocked, float("-inf"))
+
+    def advance(self, token_id: int) -> bool:
+        self.state = int(self.automaton.transitions[self.state, token_id])
+        return self.state == self.automaton.done_state
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+class CountingTextIteratorStreamer(TextIteratorStreamer):
+    """
+    TextIteratorStreamer that also counts the generated tokens.
+
+    generate() runs in a worker thread and pushes token ids into the
+    streamer; the thread that iterates over it receives decoded text as
+    soon as it forms complete words. token_count is read alongside each
+    piece of text for the running total sent to the client.
+    """
+
+    def __init__(self, tokenizer, **kwargs):
+        super().__init__(tokenizer, skip_prompt=True, **kwargs)
+        self.token_count = 0
+
+    def put(self, value):
+        # The first call carries the prompt, which is not counted
+        if not self.next_tokens_are_prompt:
+            self.token_count += value.numel()
+        super().put(value)
 
 
 # =============================================================================
@@ -409,9 +692,9 @@ class TritonPythonModel:
        - Loads the TinyLlama model and tokenizer
        - Reads configuration parameters
 
-    2. execute() - Called for each inference request
-       - Processes prompts and generates responses
-       - Applies JSON constraints if requested
+    2. execute() - Called for each batch of requests
+       - Groups compatible prompts into batched generate() calls
+       - Applies JSON constraints per row if requested
 
     3. finalize() - Called when model unloads
        - Cleans up resources
@@ -424,12 +707,55 @@ class TritonPythonModel:
     - top_p (FP32, optional): Nucleus sampling parameter (default: 0.9)
     - max_tokens (INT32, optional): Maximum tokens to generate (default: 256)
     - system_prompt (STRING, optional): Custom system instruction
+    - stream (BOOL, optional): Send text as it is generated (decoupled only)
 
     Output Tensors:
     ---------------
     - generated_text (STRING): The model's response
     - token_count (INT32): Number of tokens generated
 
+    Streaming:
+    ----------
+    With model_transaction_policy { decoupled: true } and stream=true, a
+    request (one prompt) gets one response per new piece of text, with
+    generated_text holding only the new text and token_count the running
+    total, then an empty response flagged final. JSON-mode text is streamed
+    as generated (the constraint keeps it valid JSON) rather than
+    re-serialized. Requests without stream=true get their usual single
+    response, flagged final.
+
+    Prefix Cache:
+    -------------
+    With prefix_cache_memory_mb > 0, the keys/values of prompt prefixes
+    (chat template, system prompt, JSON instruction) are kept in a
+    block-hashed LRU (<base>/shared/prefix_cache.py). Single-prompt
+    generate() calls and continuous batching prefills start after the
+    longest cached prefix; left-padded multi-prompt batches do not use it.
+
+    Result Cache:
+    -------------
+    With generation_cache_memory_mb > 0, results of greedy requests
+    (temperature 0) are kept in a byte-bounded LRU keyed by model version,
+    prompt token ids and decoding parameters (<base>/shared/
+    generation_cache.py); identical requests skip generation. Sampled and
+    streamed requests always generate.
+
+    Speculative Decoding:
+    ---------------------
+    With speculative_draft_model set, greedy rows of the batched path are
+    generated by draft-and-verify (<base>/shared/speculative.py): a small
+    draft model proposes tokens, TinyLlama verifies them in one forward
+    pass with the JSON mask applied at every position. The output equals
+    plain greedy decoding; sampled rows use generate() as usual.
+
+    Shared Weights:
+    ---------------
+    With shared_weight_store="true" (default "false"), the weights are
+    memory-mapped from one safetensors copy under
+    <base>/weights/tinyllama-python/shared/ (<base>/shared/weight_store.py)
+    instead of loaded privately, so every loaded version shares the same
+    physical pages.
+
     JSON Mode Flow:
     ---------------
     When response_format="json":
@@ -459,6 +785,7 @@ class TritonPythonModel:
         2. Determines device (CPU/GPU)
         3. Loads the TinyLlama model and tokenizer from Hugging Face
         4. Sets the model to evaluation mode
+        5. Compiles the JSON-mode automaton (token masks per state)
         """
         # Parse model configuration from config.pbtxt
         self.model_config = json.loads(args["model_config"])
@@ -472,24 +799,381 @@ class TritonPythonModel:
             parameters.get("default_max_tokens", {}).get("string_value", "256")
         )
 
+        # Largest number of prompts per generate() call (defaults to the
+        # config's max_batch_size, i.e. one dynamic batch in one call)
+        self.max_generate_batch = int(
+            parameters.get("max_generate_batch_size", {}).get(
+                "string_value", str(self.model_config.get("max_batch_size") or 8)
+            )
+        )
+
         # Determine compute device
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
-        # Load tokenizer and model from Hugging Face
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning)
+        if os.path.isdir(SHARED_DIR):
+            _use_shared_modules()
+            from cpu_threads import partition_cpu_threads
+            partition_cpu_threads(
+                self.model_config, args["model_instance_name"],
+                args.get("model_instance_kind", ""), parameters, "tinyllama-python",
+            )
+
+        # Load tokenizer and model from Hugging Face (weights mapped from the
+        # shared store when enabled, see weight_store.py)
         self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        self.model = AutoModelForCausalLM.from_pretrained(
-            MODEL_NAME,
-            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-            device_map="auto" if self.device == "cuda" else None,
-        )
+        if os.path.isdir(SHARED_DIR):
+            _use_shared_modules()
+            from cpu_quantization import load_cpu_model
+            from weight_store import load_causal_lm
+            load_model = lambda: load_causal_lm(parameters, MODEL_NAME, "tinyllama-python")
+            if self.device == "cpu":
+                # Optional int8 / bf16 CPU weights (cpu_quantization), cached
+                # under cache/quantized/tinyllama-python/<version>
+                self.model, quantization = load_cpu_model(
+                    parameters, "tinyllama-python", args.get("model_version", "1"), load_model
+                )
+                print(f"[tinyllama-python] CPU quantization: {quantization}")
+            else:
+                self.model = load_model()
+        else:
+            self.model = AutoModelForCausalLM.from_pretrained(
+                MODEL_NAME,
+                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+                device_map="auto" if self.device == "cuda" else None,
+            )
 
         # Ensure pad token is set (required for batch generation)
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
 
+        # Decoder-only models continue from the last position, so batched
+        # prompts must be padded on the left
+        self.tokenizer.padding_side = "left"
+
+        # Compile the JSON-mode schema into per-state token masks once, so
+        # constrained generation steps are table lookups
+        self.json_automaton = JsonSchemaAutomaton(
+            self.tokenizer, vocab_size=self.model.config.vocab_size
+        ).to(self.model.device)
+
         # Set model to evaluation mode (disables dropout, etc.)
         self.model.eval()
 
+        # Decoupled transaction policy: responses go through each request's
+        # response sender, which allows streaming partial text
+        self.decoupled = pb_utils.using_decoupled_model_transaction_policy(self.model_config)
+
+        # Optional continuous batching (decoupled transaction policy). The
+        # tokenizer is then shared by Triton's thread (encode) and the
+        # engine's (decode); fast tokenizers must not be used concurrently.
+        self.tokenizer_lock = threading.Lock()
+        self.prefix_cache = self._create_prefix_cache(parameters, args.get("model_version", "1"))
+        self.result_cache = self._create_result_cache(parameters, args.get("model_version", "1"))
+        self.speculative = self._create_speculative_decoder(parameters, args.get("model_version", "1"))
+        self.engine = self._create_engine(parameters)
+
+    def _create_engine(self, parameters: dict):
+        """
+        Start the continuous batching engine if config.pbtxt opts in.
+
+        Opt in with parameter continuous_batching = "true" together with
+        model_transaction_policy { decoupled: true }. Sequences then join and
+        leave a running decode batch at token boundaries instead of each
+        execute() batch running to completion. Tuned with:
+          - max_active_sequences: sequences decoded together (default 8)
+          - kv_cache_memory_mb: total KV cache budget (default 1024)
+
+        Returns:
+            The running engine, or None when disabled
+        """
+        enabled = parameters.get("continuous_batching", {}).get("string_value", "false")
+        if enabled.strip().lower() != "true":
+            return None
+
+        if not self.decoupled:
+            raise ValueError(
+                "continuous_batching requires model_transaction_policy { decoupled: true }"
+            )
+
+        _use_shared_modules()
+        from continuous_batching import ContinuousBatchingEngine
+
+        engine = ContinuousBatchingEngine(
+            self.model,
+            self.tokenizer,
+            name="tinyllama-python",
+            max_active_sequences=int(
+                parameters.get("max_active_sequences", {}).get("string_value", "8")
+            ),
+            kv_cache_memory_mb=int(
+                parameters.get("kv_cache_memory_mb", {}).get("string_value", "1024")
+            ),
+            max_sequence_tokens=self.max_length,
+            prefix_cache=self.prefix_cache,
+        )
+        engine.start()
+        return engine
+
+    def _create_prefix_cache(self, parameters: dict, version: str):
+        """
+        Create the shared-prefix KV cache if config.pbtxt enables it.
+
+        With prefix_cache_memory_mb > 0, the keys/values of prompt prefixes
+        (chat template, system prompt, JSON instructions) are kept in an LRU
+        of prefix_cache_block_size-token blocks, and single-prompt prefills
+        start after the longest cached prefix. Hit rate and saved prefill
+        tokens are exported as prefix_cache_* metrics.
+
+        Returns:
+            prefix_cache.PrefixKVCache, or None when disabled
+        """
+        memory_mb = int(parameters.get("prefix_cache_memory_mb", {}).get("string_value", "0"))
+        if memory_mb <= 0:
+            return None
+        if DynamicCache is None:
+            print("[tinyllama-python] prefix cache needs transformers >= 4.36; disabled")
+            return None
+
+        if not os.path.isdir(SHARED_DIR):
+            print(f"[tinyllama-python] {SHARED_DIR} not deployed; prefix cache disabled")
+            return None
+
+        _use_shared_modules()
+        from prefix_cache import create_prefix_cache
+
+        return create_prefix_cache(parameters, "tinyllama-python", version)
+
+    def _create_result_cache(self, parameters: dict, version: str):
+        """
+        Create the generation result cache if config.pbtxt enables it.
+
+        With generation_cache_memory_mb > 0, results of greedy requests
+        (temperature 0) are kept in a byte-bounded LRU keyed by model
+        version, prompt token ids and decoding parameters, and identical
+        requests skip generation. Sampled and streamed requests bypass it.
+        Hits and misses are exported as generation_cache_* metrics.
+
+        Returns:
+            generation_cache.GenerationResultCache, or None when disabled
+        """
+        memory_mb = int(parameters.get("generation_cache_memory_mb", {}).get("string_value", "0"))
+        if memory_mb <= 0:
+            return None
+        if not os.path.isdir(SHARED_DIR):
+            print(f"[tinyllama-python] {SHARED_DIR} not deployed; generation cache disabled")
+            return None
+
+        _use_shared_modules()
+        from generation_cache import create_generation_cache
+
+        return create_generation_cache(parameters, "tinyllama-python", version)
+
+    def _create_speculative_decoder(self, parameters: dict, version: str):
+        """
+        Load the draft model for speculative decoding if config.pbtxt names one.
+
+        With speculative_draft_model set (a Hugging Face id or local path),
+        greedy rows are generated by draft-and-verify: the draft proposes
+        speculative_num_tokens tokens and TinyLlama checks them in one
+        forward pass. Output is identical to plain greedy decoding (JSON
+        constraint included). A draft with a different tokenizer (e.g.
+        SmolLM) is mapped through text. Acceptance rate and tokens/s are
+        exported as speculative_* metrics.
+
+        Returns:
+            speculative.SpeculativeDecoder, or None when disabled
+        """
+        draft_id = parameters.get("speculative_draft_model", {}).get("string_value", "").strip()
+        if not draft_id:
+            return None
+        if not os.path.isdir(SHARED_DIR):
+            print(f"[tinyllama-python] {SHARED_DIR} not deployed; speculative decoding disabled")
+            return None
+
+        _use_shared_modules()
+        from speculative import SpeculativeDecoder, SpeculativeMetrics
+
+        print(f"[tinyllama-python] Loading draft model: {draft_id}")
+        self.draft_tokenizer = AutoTokenizer.from_pretrained(draft_id)
+        draft = AutoModelForCausalLM.from_pretrained(draft_id, torch_dtype=self.model.dtype)
+        draft.to(self.model.device)
+        draft.eval()
+
+        return SpeculativeDecoder(
+            self.model,
+            self.tokenizer,
+            draft,
+            self.draft_tokenizer,
+            num_draft_tokens=int(
+                parameters.get("speculative_num_tokens", {}).get("string_value", "4")
+            ),
+            name="tinyllama-python",
+            metrics=SpeculativeMetrics("tinyllama-python", version),
+        )
+
+    def _submit_to_engine(self, request, stream: bool = False) -> None:
+        """
+        Hand a request's prompts to the continuous batching engine.
+
+        The response (all prompts of the request) is sent from the engine
+        thread through the request's response sender once every prompt has
+        finished, flagged as the final response. Any failure sends a single
+        error response instead.
+
+        With stream=True (one prompt per request), each new piece of text is
+        sent as soon as its token is decoded, followed by the final response.
+        """
+        from continuous_batching import Sequence
+        from text_stream import TextDeltaDecoder
+
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+
+        try:
+            rows = self._parse_request(request)
+            if stream and len(rows) != 1:
+                raise ValueError("stream=true supports one prompt per request")
+        except Exception as e:
+            sender.send(
+                pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(str(e))),
+                flags=final,
+            )
+            return
+
+        results = [None] * len(rows)
+        pending = {"remaining": len(rows), "failed": False}
+        pending_lock = threading.Lock()  # cache hits complete on this thread
+        decoder = TextDeltaDecoder(self.tokenizer, self.tokenizer_lock) if stream else None
+
+        def on_token(token_ids):
+            text = decoder.push(token_ids)
+            if text:
+                sender.send(self._text_response([text], [len(token_ids)]))
+
+        def complete(position, result):
+            with pending_lock:
+                results[position] = result
+                pending["remaining"] -= 1
+                if pending["remaining"] != 0 or pending["failed"]:
+                    return
+            sender.send(
+                self._text_response(
+                    [text for text, _ in results], [count for _, count in results]
+                ),
+                flags=final,
+            )
+
+        def on_finish(position, row, cache_key, token_ids, error):
+            if pending["failed"]:
+                return
+            if error:
+                with pending_lock:
+                    pending["failed"] = True
+                sender.send(
+                    pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(error)),
+                    flags=final,
+                )
+                return
+
+            if stream:
+                text = decoder.flush(token_ids)
+                if text:
+                    sender.send(self._text_response([text], [len(token_ids)]))
+                sender.send(self._text_response([""], [len(token_ids)]), flags=final)
+                return
+
+            with self.tokenizer_lock:
+                text = self.tokenizer.decode(token_ids, skip_special_tokens=True).strip()
+            if row["json"]:
+                text = self._clean_json(text)
+            if cache_key is not None:
+                self.result_cache.put(cache_key, (text, len(token_ids)))
+            complete(position, (text, len(token_ids)))
+
+        is_cancelled = getattr(request, "is_cancelled", None)
+        for position, row in enumerate(rows):
+            prompt_ids = self._prompt_ids(row)
+            cache_key = None if stream else self._result_key(row, prompt_ids)
+            if cache_key is not None:
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    complete(position, cached)
+                    continue
+            self.engine.submit(Sequence(
+                prompt_ids=prompt_ids,
+                max_new_tokens=row["max_tokens"],
+                temperature=row["temperature"],
+                top_p=row["top_p"],
+                constraint=JsonSequenceConstraint(self.json_automaton) if row["json"] else None,
+                on_finish=lambda token_ids, error, position=position, row=row, key=cache_key: on_finish(
+                    position, row, key, token_ids, error
+                ),
+                on_token=on_token if stream else None,
+                is_cancelled=is_cancelled,
+            ))
+
+    def _stream_request(self, request) -> None:
+        """
+        Generate one request's prompt, sending text as it is produced.
+
+        generate() runs in a worker thread feeding a
+        CountingTextIteratorStreamer; this thread sends every piece of text
+        the streamer yields as a partial response, then the final response.
+        The instance is busy until the generation finishes (use continuous
+        batching to interleave streams).
+        """
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+
+        try:
+            rows = self._parse_request(request)
+            if len(rows) != 1:
+                raise ValueError("stream=true supports one prompt per request")
+            generate_kwargs, _ = self._prepare_generation(rows)
+        except Exception as e:
+            sender.send(
+                pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(str(e))),
+                flags=final,
+            )
+            return
+
+        streamer = CountingTextIteratorStreamer(self.tokenizer, skip_special_tokens=True)
+        failure = []
+
+        def generate():
+            try:
+                with torch.no_grad():
+                    self.model.generate(**generate_kwargs, streamer=streamer)
+                self._cache_prefix(generate_kwargs)
+            except Exception as e:
+                failure.append(str(e))
+                streamer.end()  # unblock the iterating thread
+
+        worker = threading.Thread(target=generate, name="tinyllama-stream", daemon=True)
+        worker.start()
+        for text in streamer:
+            if text:
+                sender.send(self._text_response([text], [streamer.token_count]))
+        worker.join()
+
+        if failure:
+            sender.send(
+                pb_utils.InferenceResponse(output_tensors=[], error=pb_utils.TritonError(failure[0])),
+                flags=final,
+            )
+            return
+        sender.send(self._text_response([""], [streamer.token_count]), flags=final)
+
+    @staticmethod
+    def _text_response(texts: list, token_counts: list):
+        """Build a response with generated_text / token_count outputs."""
+        return pb_utils.InferenceResponse(output_tensors=[
+            pb_utils.Tensor("generated_text", np.array(
+                [text.encode("utf-8") for text in texts], dtype=object)),
+            pb_utils.Tensor("token_count", np.array(token_counts, dtype=np.int32)),
+        ])
+
     def _get_optional_param(self, request, name: str, default, dtype=None):
         """
         Safely extract an optional parameter from a Triton request.
@@ -522,213 +1206,421 @@ class TritonPythonModel:
 
         return value
 
-    def execute(self, requests: list) -> list:
+    def _parse_request(self, request) -> list:
         """
-        Execute inference on a batch of requests.
+        Extract one generation row per prompt in a request.
+
+        Args:
+            request: Triton InferenceRequest object
+
+        Returns:
+            List of row dicts (prompt plus the request's generation settings)
+
+        Note: With max_batch_size > 0, prompt has shape [batch, 1]; with
+        max_batch_size = 0 it has shape [N]. Flatten to handle both.
+        """
+        prompt_tensor = pb_utils.get_input_tensor_by_name(request, "prompt")
+        if prompt_tensor is None:
+            raise ValueError("Missing required input: prompt")
+
+        # Get optional parameters with defaults (shared by all prompts in the request)
+        max_tokens = int(self._get_optional_param(
+            request, "max_tokens", self.default_max_tokens
+        ))
+        temperature = float(self._get_optional_param(request, "temperature", 0.7))
+        top_p = float(self._get_optional_param(request, "top_p", 0.9))
+        system_prompt = self._get_optional_param(
+            request, "system_prompt", None, dtype=str
+        )
+        response_format = self._get_optional_param(
+            request, "response_format", None, dtype=str
+        )
 
-        This is the main inference method called by Triton for each request.
+        rows = []
+        for prompt in prompt_tensor.as_numpy().flatten():
+            if isinstance(prompt, bytes):
+                prompt = prompt.decode("utf-8")
+            rows.append({
+                "prompt": prompt,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+                "system_prompt": system_prompt,
+                "json": response_format == "json",
+            })
+        return rows
+
+    def _build_messages(self, row: dict) -> list:
+        """
+        Build the chat messages for one row.
+
+        If JSON mode is on, a JSON instruction is injected as a system
+        message. This guides the model to output JSON even before the
+        constraints kick in.
+        """
+        messages = []
+
+        # Add custom system prompt if provided
+        if row["system_prompt"]:
+            messages.append({"role": "system", "content": row["system_prompt"]})
+
+        # If JSON mode, inject JSON instruction
+        if row["json"]:
+            messages.append({
+                "role": "system",
+                "content": 'Return ONLY JSON: {"answer":"string","confidence":0.0}'
+            })
+
+        # Add the user's prompt
+        messages.append({"role": "user", "content": row["prompt"]})
+        return messages
+
+    def _prompt_ids(self, row: dict) -> list:
+        """Token ids of one row's chat-formatted prompt (unpadded)."""
+        with self.tokenizer_lock:
+            formatted = self.tokenizer.apply_chat_template(
+                self._build_messages(row), tokenize=False, add_generation_prompt=True
+            )
+            return self.tokenizer(
+                formatted, truncation=True, max_length=self.max_length - row["max_tokens"]
+            )["input_ids"]
+
+    def _result_key(self, row: dict, prompt_ids: list = None):
+        """
+        Generation cache key for a row, or None if it must not be cached.
+
+        Only greedy rows are cached (sampled output differs per call). The
+        key covers the prompt tokens -- which include the system prompt and
+        JSON instruction -- and every decoding parameter.
+        """
+        if self.result_cache is None or row["temperature"] > 0:
+            return None
+        return self.result_cache.key(
+            prompt_ids if prompt_ids is not None else self._prompt_ids(row),
+            max_tokens=row["max_tokens"],
+            temperature=row["temperature"],
+            top_p=row["top_p"],
+            json=row["json"],
+        )
+
+    @staticmethod
+    def _batch_key(row: dict) -> tuple:
+        """
+        Rows with the same key can share one generate() call.
+
+        generate() takes one temperature/top_p for the whole batch, so sampled
+        rows must agree on both (greedy rows ignore them). max_tokens is
+        bucketed by powers of two (..., 33-64, 65-128, ...) so short requests
+        are not held up by much longer ones. JSON and free-form rows mix
+        freely -- the constraints are applied per row.
+        """
+        bucket = max(row["max_tokens"] - 1, 0).bit_length()
+        if row["temperature"] > 0:
+            return ("sample", row["temperature"], row["top_p"], bucket)
+        return ("greedy", bucket)
+
+    def _plan_batches(self, rows: list) -> list:
+        """Group rows by _batch_key, in arrival order, capped at max_generate_batch."""
+        groups = {}
+        for row in rows:
+            groups.setdefault(self._batch_key(row), []).append(row)
+
+        batches = []
+        for group in groups.values():
+            for start in range(0, len(group), self.max_generate_batch):
+                batches.append(group[start:start + self.max_generate_batch])
+        return batches
+
+    def _prepare_generation(self, rows: list) -> tuple:
+        """
+        Tokenize rows and build the generate() arguments shared by them.
 
         Args:
-            requests: List of pb_utils.InferenceRequest objects
+            rows: Rows sharing a _batch_key
 
         Returns:
-            List of pb_utils.InferenceResponse objects (one per request)
+            (generate kwargs, input_length)
 
-        Processing Flow:
-        ----------------
-        For each request:
+        Prompts are left-padded to a common length (decoder-only models
+        continue from the last position, so padding must go on the left).
+        Every row then starts generating at the same column, which is the
+        prompt_length given to the JSON processor and stop criteria.
+        """
+        # Apply the model's chat template (adds special tokens, formatting)
+        formatted = [
+            self.tokenizer.apply_chat_template(
+                self._build_messages(row), tokenize=False, add_generation_prompt=True
+            )
+            for row in rows
+        ]
+        max_new_tokens = max(row["max_tokens"] for row in rows)
+
+        inputs = self.tokenizer(
+            formatted,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_length - max_new_tokens,
+        )
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        input_length = inputs["input_ids"].shape[1]
+
+        # Per-row JSON constraints (free-form rows pass through unconstrained)
+        logits_processors = LogitsProcessorList()
+        stopping_criteria = StoppingCriteriaList()
+        json_rows = [row["json"] for row in rows]
+        if any(json_rows):
+            logits_processors.append(
+                JsonPrefixLogitsProcessor(self.json_automaton, input_length, json_rows)
+            )
+            stopping_criteria.append(
+                JsonStopCriteria(
+                    self.json_automaton.token_texts, input_length, self.tokenizer, json_rows
+                )
+            )
+
+        temperature = rows[0]["temperature"]
+        generate_kwargs = dict(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=rows[0]["top_p"],
+            do_sample=temperature > 0,  # Greedy if temp=0
+            pad_token_id=self.tokenizer.pad_token_id,
+            logits_processor=logits_processors if len(logits_processors) else None,
+            stopping_criteria=stopping_criteria if len(stopping_criteria) else None,
+            use_cache=True,  # KV cache for faster generation
+        )
 
-        1. EXTRACT INPUTS
-           - Get prompt (required)
-           - Get optional parameters (temperature, response_format, etc.)
+        # Shared-prefix reuse: only for a single, unpadded prompt. generate()
+        # skips the prefill of the tokens already in the cache it is given,
+        # and fills it with the rest (stored by _cache_prefix afterwards).
+        if self.prefix_cache is not None and len(rows) == 1:
+            _, prefix = self.prefix_cache.lookup(inputs["input_ids"][0].tolist())
+            generate_kwargs["past_key_values"] = (
+                DynamicCache.from_legacy_cache(prefix) if prefix is not None else DynamicCache()
+            )
+        return generate_kwargs, input_length
+
+    def _cache_prefix(self, generate_kwargs: dict) -> None:
+        """Store the prompt's prefix blocks after a generate() call."""
+        if "past_key_values" in generate_kwargs:
+            self.prefix_cache.insert(
+                generate_kwargs["input_ids"][0].tolist(), generate_kwargs["past_key_values"]
+            )
+
+    def _generate_batch(self, rows: list) -> list:
+        """
+        Run one batched generate() call for compatible rows.
 
-        2. BUILD MESSAGES
-           - Create chat message list with system and user messages
-           - If JSON mode, inject JSON instruction system message
+        Args:
+            rows: Rows sharing a _batch_key
+
+        Returns:
+            List of (text, token_count), one per row, in the same order
+        """
+        generate_kwargs, input_length = self._prepare_generation(rows)
+        with torch.no_grad():  # Disable gradient computation for inference
+            outputs = self.model.generate(**generate_kwargs)
+        self._cache_prefix(generate_kwargs)
+
+        results = []
+        for row, output in zip(rows, outputs):
+            # Rows that finished early are padded; keep up to and including
+            # the first EOS, and at most the row's own max_tokens
+            generated_ids = output[input_length:].tolist()
+            if self.tokenizer.eos_token_id in generated_ids:
+                generated_ids = generated_ids[:generated_ids.index(self.tokenizer.eos_token_id) + 1]
+            generated_ids = generated_ids[:row["max_tokens"]]
+
+            text = self.tokenizer.decode(generated_ids, skip_special_tokens=True).strip()
+            if row["json"]:
+                text = self._clean_json(text)
+            results.append((text, len(generated_ids)))
+        return results
+
+    def _generate_speculative(self, row: dict) -> tuple:
+        """
+        Generate one greedy row with the speculative decoder.
+
+        Returns:
+            (text, token_count), as _generate_batch does for a row
+        """
+        draft_prompt_ids = None
+        if not self.speculative.same_vocab:
+            # The draft sees the same conversation in its own chat format
+            formatted = self.draft_tokenizer.apply_chat_template(
+                self._build_messages(row), tokenize=False, add_generation_prompt=True
+            )
+            draft_prompt_ids = self.draft_tokenizer(formatted)["input_ids"]
+
+        generated_ids = self.speculative.generate(
+            self._prompt_ids(row),
+            row["max_tokens"],
+            draft_prompt_ids=draft_prompt_ids,
+            constraint=JsonSequenceConstraint(self.json_automaton) if row["json"] else None,
+        )
+        text = self.tokenizer.decode(generated_ids, skip_special_tokens=True).strip()
+        if row["json"]:
+            text = self._clean_json(text)
+        return text, len(generated_ids)
 
-        3. TOKENIZE
-           - Apply chat template to format messages
-           - Tokenize the formatted text
-           - Track input_length for later use
+    @staticmethod
+    def _clean_json(text: str) -> str:
+        """
+        Parse and re-serialize JSON output; error JSON with debug info on failure.
+        """
+        try:
+            # Extract JSON from generated text
+            start = text.find("{")
+            end = text.rfind("}")
+            candidate = text[start:end+1] if start >= 0 and end >= 0 else ""
+
+            # Parse to validate and re-serialize for clean output
+            return json.dumps(json.loads(candidate))
+        except Exception:
+            return json.dumps({
+                "answer": "",
+                "confidence": 0.0,
+                "error": "invalid_json",
+                "raw_output": text[:200]  # First 200 chars for debugging
+            })
 
-        4. CONFIGURE GENERATION
-           - If JSON mode: add JsonPrefixLogitsProcessor and JsonStopCriteria
-           - Set up generation parameters (temperature, top_p, etc.)
+    def execute(self, requests: list) -> list:
+        """
+        Execute inference on a batch of requests.
 
-        5. GENERATE
-           - Call model.generate() with all configuration
-           - Extract only the generated portion (after input)
+        This is the main inference method called by Triton.
 
-        6. POST-PROCESS
-           - If JSON mode: parse and validate JSON, handle errors
-           - Encode result to bytes for Triton
+        Args:
+            requests: List of pb_utils.InferenceRequest objects
 
-        7. BUILD RESPONSE
-           - Create output tensors (generated_text, token_count)
-           - Return InferenceResponse
+        Returns:
+            List of pb_utils.InferenceResponse objects (one per request), or
+            None in decoupled mode, where responses go through each
+            request's response sender
+
+        In decoupled mode:
+          - stream=true requests are streamed (_submit_to_engine with
+            continuous batching, _stream_request otherwise)
+          - with continuous batching, other requests go to the engine too
+          - otherwise they are generated by _execute_batch and each response
+            is sent flagged final
         """
-        responses = []
+        if not self.decoupled:
+            return self._execute_batch(requests)
 
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        batched = []
         for request in requests:
             try:
-                # ============================================================
-                # STEP 1: Extract input tensors
-                # ============================================================
-                prompt_tensor = pb_utils.get_input_tensor_by_name(request, "prompt")
-                prompt_np = prompt_tensor.as_numpy()
-
-                # Get optional parameters with defaults
-                max_tokens = self._get_optional_param(
-                    request, "max_tokens", self.default_max_tokens
-                )
-                temperature = self._get_optional_param(request, "temperature", 0.7)
-                top_p = self._get_optional_param(request, "top_p", 0.9)
-                system_prompt = self._get_optional_param(
-                    request, "system_prompt", None, dtype=str
-                )
-                response_format = self._get_optional_param(
-                    request, "response_format", None, dtype=str
-                )
+                stream = bool(self._get_optional_param(request, "stream", False))
+            except Exception:
+                stream = False
+            if self.engine is not None:
+                self._submit_to_engine(request, stream=stream)
+            elif stream:
+                self._stream_request(request)
+            else:
+                batched.append(request)
+
+        if batched:
+            for request, response in zip(batched, self._execute_batch(batched)):
+                request.get_response_sender().send(response, flags=final)
+        return None
+
+    def _execute_batch(self, requests: list) -> list:
+        """
+        Generate a batch of requests, one complete response per request.
 
-                generated_texts = []
-                token_counts = []
-
-                # Process each prompt in the batch
-                # With max_batch_size > 0, prompt_np has shape [batch, 1]
-                # With max_batch_size = 0, prompt_np has shape [N]
-                # Flatten to handle both cases uniformly
-                prompts_flat = prompt_np.flatten()
-
-                for i in range(len(prompts_flat)):
-                    prompt = prompts_flat[i]
-                    if isinstance(prompt, bytes):
-                        prompt = prompt.decode("utf-8")
-
-                    # ========================================================
-                    # STEP 2: Build chat messages
-                    # ========================================================
-                    messages = []
-
-                    # Add custom system prompt if provided
-                    if system_prompt:
-                        messages.append({"role": "system", "content": system_prompt})
-
-                    # If JSON mode, inject JSON instruction
-                    # This guides the model to output JSON even before constraints kick in
-                    if response_format == "json":
-                        messages.append({
-                            "role": "system",
-                            "content": 'Return ONLY JSON: {"answer":"string","confidence":0.0}'
-                        })
-
-                    # Add the user's prompt
-                    messages.append({"role": "user", "content": prompt})
-
-                    # ========================================================
-                    # STEP 3: Tokenize with chat template
-                    # ========================================================
-                    # Apply the model's chat template (adds special tokens, formatting)
-                    formatted = self.tokenizer.apply_chat_template(
-                        messages, tokenize=False, add_generation_prompt=True
-                    )
-
-                    # Tokenize the formatted text
-                    inputs = self.tokenizer(
-                        formatted,
-                        return_tensors="pt",
-                        truncation=True,
-                        max_length=self.max_length - int(max_tokens),
-                    )
-
-                    # Move tensors to the correct device (CPU/GPU)
-                    inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-                    # Track input length - needed for:
-                    # 1. JsonPrefixLogitsProcessor to know where generation starts
-                    # 2. Extracting only generated tokens from output
-                    input_length = inputs["input_ids"].shape[1]
-
-                    # ========================================================
-                    # STEP 4: Configure generation constraints
-                    # ========================================================
-                    logits_processors = LogitsProcessorList()
-                    stopping_criteria = StoppingCriteriaList()
-
-                    if response_format == "json":
-                        # Add JSON constraints
-                        logits_processors.append(
-                            JsonPrefixLogitsProcessor(self.tokenizer, input_length)
-                        )
-                        stopping_criteria.append(
-                            JsonStopCriteria(self.tokenizer)
-                        )
-
-                    # ========================================================
-                    # STEP 5: Generate response
-                    # ========================================================
-                    with torch.no_grad():  # Disable gradient computation for inference
-                        outputs = self.model.generate(
-                            **inputs,
-                            max_new_tokens=int(max_tokens),
-                            temperature=float(temperature),
-                            top_p=float(top_p),
-                            do_sample=temperature > 0,  # Greedy if temp=0
-                            pad_token_id=self.tokenizer.eos_token_id,
-                            logits_processor=logits_processors if len(logits_processors) else None,
-                            stopping_criteria=stopping_criteria if len(stopping_criteria) else None,
-                            use_cache=True,  # KV cache for faster generation
-                        )
-
-                    # Extract only the generated tokens (exclude input prompt)
-                    generated_ids = outputs[0][input_length:]
-                    text = self.tokenizer.decode(
-                        generated_ids, skip_special_tokens=True
-                    ).strip()
-
-                    # ========================================================
-                    # STEP 6: Post-process JSON output
-                    # ========================================================
-                    if response_format == "json":
-                        try:
-                            # Extract JSON from generated text
-                            start = text.find("{")
-                            end = text.rfind("}")
-                            candidate = text[start:end+1] if start >= 0 and end >= 0 else ""
-
-                            # Parse to validate and re-serialize for clean output
-                            parsed = json.loads(candidate)
-                            text = json.dumps(parsed)
-                        except Exception as parse_err:
-                            # If JSON parsing fails, return error with debug info
-                            text = json.dumps({
-                                "answer": "",
-                                "confidence": 0.0,
-                                "error": "invalid_json",
-                                "raw_output": text[:200]  # First 200 chars for debugging
-                            })
-
-                    # Collect results
-                    generated_texts.append(text.encode("utf-8"))
-                    token_counts.append(len(generated_ids))
-
-                # ============================================================
-                # STEP 7: Build Triton response
-                # ============================================================
-                response = pb_utils.InferenceResponse(
-                    output_tensors=[
-                        pb_utils.Tensor("generated_text", np.array(generated_texts, dtype=object)),
-                        pb_utils.Tensor("token_count", np.array(token_counts, dtype=np.int32)),
-                    ]
-                )
+        With dynamic batching, Triton hands over up to max_batch_size
+        requests at once; they are generated together rather than one prompt
+        at a time.
+
+        Processing Flow:
+        ----------------
+        1. EXTRACT INPUTS
+           - One row per prompt, carrying its request's optional parameters
+           - A request with bad inputs gets an error response on its own
+
+        2. GROUP
+           - Rows with the same sampling settings and a similar max_tokens
+             are grouped (see _batch_key), up to max_generate_batch per group
 
+        3. GENERATE (per group)
+           - Build chat messages, apply the chat template, left-pad
+           - One model.generate() call, with per-row JSON constraints
+           - Trim each row at EOS / its own max_tokens, post-process JSON
+
+        4. SCATTER
+           - Results go back to their request, in prompt order
+           - A failed group fails only the requests it contained
+
+        5. BUILD RESPONSES
+           - Create output tensors (generated_text, token_count)
+        """
+        responses = [None] * len(requests)
+        results = [None] * len(requests)
+        errors = {}
+
+        # ============================================================
+        # STEP 1: Extract inputs into rows
+        # ============================================================
+        rows = []
+        for request_index, request in enumerate(requests):
+            try:
+                request_rows = self._parse_request(request)
+            except Exception as e:
+                errors[request_index] = str(e)
+                continue
+            results[request_index] = [None] * len(request_rows)
+            for position, row in enumerate(request_rows):
+                row["request"] = request_index
+                row["position"] = position
+                # Greedy rows seen before are answered from the result cache
+                row["cache_key"] = self._result_key(row)
+                if row["cache_key"] is not None:
+                    cached = self.result_cache.get(row["cache_key"])
+                    if cached is not None:
+                        results[request_index][position] = cached
+                        continue
+                rows.append(row)
+
+        # ============================================================
+        # STEPS 2-4: Group, generate, scatter
+        # ============================================================
+        for batch in self._plan_batches(rows):
+            try:
+                if self.speculative is not None and batch[0]["temperature"] <= 0:
+                    # Greedy rows: one draft-and-verify generation per row
+                    batch_results = [self._generate_speculative(row) for row in batch]
+                else:
+                    batch_results = self._generate_batch(batch)
             except Exception as e:
-                # Return error response if anything fails
-                response = pb_utils.InferenceResponse(
+                for row in batch:
+                    errors[row["request"]] = str(e)
+                continue
+            for row, result in zip(batch, batch_results):
+                results[row["request"]][row["position"]] = result
+                if row["cache_key"] is not None:
+                    self.result_cache.put(row["cache_key"], result)
+
+        # ============================================================
+        # STEP 5: Build Triton responses
+        # ============================================================
+        for request_index in range(len(requests)):
+            if request_index in errors:
+                # Return error response if anything failed for this request
+                responses[request_index] = pb_utils.InferenceResponse(
                     output_tensors=[],
-                    error=pb_utils.TritonError(str(e))
+                    error=pb_utils.TritonError(errors[request_index])
                 )
+                continue
 
-            responses.append(response)
+            responses[request_index] = self._text_response(
+                [text for text, _ in results[request_index]],
+                [count for _, count in results[request_index]],
+            )
 
         return responses
 
@@ -742,5 +1634,8 @@ class TritonPythonModel:
         This releases the model and tokenizer from memory, which is
         especially important for GPU memory.
         """
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
         self.model = None
         self.tokenizer = None
@@ -3,6 +3,9 @@ TinyLlama with Outlines Constrained Decoding (Version 2)
 
 This version uses Outlines for token-level constrained generation via JSON Schema.
 Outlines compiles schemas into finite state machines for efficient token masking.
+With grammar_cache="true" the compiled token indexes persist under
+<base>/cache/grammars (shared/grammar_cache.py), so reloads and new replicas
+skip compilation.
 
 Available schemas (set via schema_name input):
   - qa: Question-answering with confidence score
@@ -22,6 +25,7 @@ References:
     - https://github.com/outlines-dev/outlines
 """
 
+import contextlib
 import json
 import logging
 import os
@@ -38,9 +42,17 @@ PACKAGES_DIR = MODEL_DIR / "packages"
 if PACKAGES_DIR.exists() and str(PACKAGES_DIR) not in sys.path:
     sys.path.insert(0, str(PACKAGES_DIR))
 
+# Shared Python backend modules (weight_store, ...) live in <base>/shared,
+# next to <base>/models
+SHARED_DIR = MODEL_DIR.parent.parent / "shared"
+if SHARED_DIR.exists() and str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PHONE_REGEX = r"\(\d{3}\) \d{3}-\d{4}"
+
 
 class TritonPythonModel:
     """Triton Python Backend using Outlines for constrained generation."""
@@ -55,13 +67,43 @@ class TritonPythonModel:
 
         logger.info(f"[Outlines v2] Loading model: {self.model_id}")
 
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning)
+        if SHARED_DIR.exists():
+            from cpu_threads import partition_cpu_threads
+            partition_cpu_threads(
+                self.model_config, args["model_instance_name"],
+                args.get("model_instance_kind", ""), params, "tinyllama-python",
+            )
+
         try:
+            from transformers import AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+
+            # Persistent grammar cache (see grammar_cache.py). Outlines reads
+            # OUTLINES_CACHE_DIR when it is imported, so set it first.
+            self.grammar_cache = None
+            if SHARED_DIR.exists():
+                from grammar_cache import create_grammar_cache
+                self.grammar_cache = create_grammar_cache(params, "outlines", tokenizer, "tinyllama-python")
+            if self.grammar_cache is not None:
+                os.environ["OUTLINES_CACHE_DIR"] = self.grammar_cache.directory
+
             import outlines
             from outlines import models, generate
             from pydantic import BaseModel, Field
 
-            # Load model with Outlines wrapper
-            self.model = models.transformers(self.model_id)
+            # Load model with Outlines wrapper (weights mapped from the shared
+            # store when enabled, see weight_store.py)
+            if SHARED_DIR.exists():
+                from weight_store import load_causal_lm
+
+                self.model = models.Transformers(
+                    load_causal_lm(params, self.model_id, "tinyllama-python"),
+                    tokenizer,
+                )
+            else:
+                self.model = models.transformers(self.model_id)
 
             # Define Pydantic schemas
             class QAResponse(BaseModel):
@@ -83,15 +125,20 @@ class TritonPythonModel:
                 "sentiment": SentimentAnalysis,
             }
 
-            # Build generators
+            # Build generators (the vocabulary index of each schema comes from
+            # the grammar cache when warm)
             self.generators = {}
             for name, schema in self.schemas.items():
                 logger.info(f"[Outlines v2] Building generator for: {name}")
-                self.generators[name] = generate.json(self.model, schema)
+                with self._compiling(name, schema.model_json_schema()):
+                    self.generators[name] = generate.json(self.model, schema)
 
             # Regex generator for phone numbers
-            self.generators["regex_phone"] = generate.regex(self.model, r"\(\d{3}\) \d{3}-\d{4}")
+            with self._compiling("regex_phone", PHONE_REGEX):
+                self.generators["regex_phone"] = generate.regex(self.model, PHONE_REGEX)
 
+            if self.grammar_cache is not None:
+                logger.info(f"[Outlines v2] Grammar build time: {self.grammar_cache.stats()['total_build_seconds']}s")
             logger.info("[Outlines v2] Initialization complete")
 
         except ImportError as e:
@@ -128,6 +175,12 @@ class TritonPythonModel:
 
         return responses
 
+    def _compiling(self, name: str, schema):
+        """Times a generator build in the grammar cache (no-op when disabled)."""
+        if self.grammar_cache is None:
+            return contextlib.nullcontext()
+        return self.grammar_cache.compiling(name, schema)
+
     def _format_prompt(self, prompt: str, schema_name: str) -> str:
         instructions = {
             "qa": "Answer concisely with confidence score.",
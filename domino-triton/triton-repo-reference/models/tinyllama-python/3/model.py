@@ -36,6 +36,12 @@ PACKAGES_DIR = MODEL_DIR / "packages"
 if PACKAGES_DIR.exists() and str(PACKAGES_DIR) not in sys.path:
     sys.path.insert(0, str(PACKAGES_DIR))
 
+# Shared Python backend modules (weight_store, ...) live in <base>/shared,
+# next to <base>/models
+SHARED_DIR = MODEL_DIR.parent.parent / "shared"
+if SHARED_DIR.exists() and str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -53,11 +59,29 @@ class TritonPythonModel:
 
         logger.info(f"[Guidance v3] Loading model: {self.model_id}")
 
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning)
+        if SHARED_DIR.exists():
+            from cpu_threads import partition_cpu_threads
+            partition_cpu_threads(
+                self.model_config, args["model_instance_name"],
+                args.get("model_instance_kind", ""), params, "tinyllama-python",
+            )
+
         try:
             import guidance
             from guidance import models, gen, select
 
-            self.llm = models.Transformers(self.model_id)
+            # Weights mapped from the shared store when enabled (see weight_store.py)
+            if SHARED_DIR.exists():
+                from transformers import AutoTokenizer
+                from weight_store import load_causal_lm
+
+                self.llm = models.Transformers(
+                    model=load_causal_lm(params, self.model_id, "tinyllama-python"),
+                    tokenizer=AutoTokenizer.from_pretrained(self.model_id),
+                )
+            else:
+                self.llm = models.Transformers(self.model_id)
             self.guidance = guidance
             self.gen = gen
             self.select = select
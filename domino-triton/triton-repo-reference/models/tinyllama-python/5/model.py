@@ -37,6 +37,12 @@ PACKAGES_DIR = MODEL_DIR / "packages"
 if PACKAGES_DIR.exists() and str(PACKAGES_DIR) not in sys.path:
     sys.path.insert(0, str(PACKAGES_DIR))
 
+# Shared Python backend modules (weight_store, ...) live in <base>/shared,
+# next to <base>/models
+SHARED_DIR = MODEL_DIR.parent.parent / "shared"
+if SHARED_DIR.exists() and str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -54,17 +60,30 @@ class TritonPythonModel:
 
         logger.info(f"[Jsonformer v5] Loading model: {self.model_id}")
 
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning)
+        if SHARED_DIR.exists():
+            from cpu_threads import partition_cpu_threads
+            partition_cpu_threads(
+                self.model_config, args["model_instance_name"],
+                args.get("model_instance_kind", ""), params, "tinyllama-python",
+            )
+
         try:
             from jsonformer import Jsonformer
             from transformers import AutoModelForCausalLM, AutoTokenizer
             import torch
 
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_id,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None,
-            )
+            # Weights mapped from the shared store when enabled (see weight_store.py)
+            if SHARED_DIR.exists():
+                from weight_store import load_causal_lm
+                self.model = load_causal_lm(params, self.model_id, "tinyllama-python")
+            else:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_id,
+                    torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+                    device_map="auto" if torch.cuda.is_available() else None,
+                )
 
             self.Jsonformer = Jsonformer
 
@@ -2,18 +2,37 @@
 Whisper Triton Python Backend Model
 
 This model runs OpenAI Whisper tiny on the Triton server using the Python backend.
-It accepts mel spectrogram features and returns transcribed text.
+It accepts mel spectrogram features or compressed audio and returns
+transcribed text.
 
-Input:
+Input (input_features or audio):
     - input_features: float32 [batch, 80, 3000] - mel spectrogram
-    - decoder_input_ids: int64 [batch, seq] - decoder prompt tokens (optional)
+    - audio: string [batch] - WAV/FLAC/OGG/MP3 file bytes; decoded and
+      featurized on the server (shared/whisper_features.py), first 30s
+    - language: string [batch] - language code (optional, default "en")
+    - task: string [batch] - "transcribe" or "translate" (optional)
+    - long_form: bool [batch] - transcribe the whole audio input (optional)
+    - stream: bool [batch] - stream long-form segments (optional, decoupled mode only)
 
 Output:
     - transcription: string [batch] - transcribed text
-    - token_ids: int64 [batch, max_length] - generated token IDs (optional)
-
-Note: librosa/soundfile are CLIENT-side dependencies for audio preprocessing.
-      The model receives pre-processed mel spectrograms, not raw audio.
+    - token_ids: int64 [batch, max_length] - generated token IDs (optional;
+      zeros for long_form rows, whose tokens come from several windows)
+    - segments: string [batch] - JSON [{"start", "end", "text"}] in seconds
+      (long_form rows; "[]" otherwise)
+
+Long form: with long_form=true each audio row is transcribed in full: cut
+into overlapping 30s windows, decoded in batches of windows with timestamps
+and stitched at the window boundaries (shared/whisper_longform.py). With
+the decoupled transaction policy and stream=true the segments are sent as
+each batch of windows is decoded, then a final empty response.
+
+Batching: Triton's dynamic batcher hands execute() several requests at once;
+their rows are grouped by (language, task) and each group is decoded by a
+single generate() call.
+
+Note: with input_features, librosa/transformers are CLIENT-side dependencies
+      for audio preprocessing. With audio, the client only sends file bytes.
 """
 
 # Add model-specific packages to path (if any exist)
@@ -24,10 +43,19 @@ _packages_dir = os.path.join(_model_dir, "packages")
 if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
     sys.path.insert(0, _packages_dir)
 
+# Shared Python backend modules (whisper_features, ...) live in <base>/shared,
+# next to <base>/models
+_shared_dir = os.path.join(os.path.dirname(os.path.dirname(_model_dir)), "shared")
+if os.path.isdir(_shared_dir) and _shared_dir not in sys.path:
+    sys.path.insert(0, _shared_dir)
+
 import json
 import numpy as np
 import triton_python_backend_utils as pb_utils
 
+# Longest Whisper decode (decoder max_target_positions); token_ids is padded to it
+MAX_LENGTH = 448
+
 
 class TritonPythonModel:
     """Whisper model for Triton Python backend."""
@@ -62,102 +90,351 @@ class TritonPythonModel:
 
         print(f"[{self.model_name}] Use ONNX: {use_onnx}")
 
+        # Split the pod's cores across KIND_CPU instances (cpu_thread_partitioning);
+        # ONNX Runtime gets the same thread count unless ort_intra_op_threads is set
+        self.cpu_layout = None
+        if os.path.isdir(_shared_dir):
+            from cpu_threads import partition_cpu_threads
+            self.cpu_layout = partition_cpu_threads(
+                self.model_config, self.model_instance_name,
+                args.get("model_instance_kind", ""), parameters, self.model_name,
+            )
+        if self.cpu_layout and "ort_intra_op_threads" not in parameters:
+            parameters["ort_intra_op_threads"] = {"string_value": str(self.cpu_layout["threads"])}
+
         try:
             from transformers import WhisperProcessor
 
             if use_onnx:
                 from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
-                self.model = ORTModelForSpeechSeq2Seq.from_pretrained(weights_path)
+                # Session options (threads, optimization level, ...) from config.pbtxt
+                try:
+                    from ort_session import load_ort_model
+                except ImportError:
+                    load_ort_model = None
+                if load_ort_model is not None:
+                    self.model = load_ort_model(
+                        ORTModelForSpeechSeq2Seq, parameters, weights_path, self.model_name
+                    )
+                else:
+                    print(f"[{self.model_name}] {_shared_dir} not deployed; default ONNX Runtime session options")
+                    self.model = ORTModelForSpeechSeq2Seq.from_pretrained(weights_path)
             else:
                 from transformers import WhisperForConditionalGeneration
                 self.model = WhisperForConditionalGeneration.from_pretrained(weights_path)
 
             self.processor = WhisperProcessor.from_pretrained(weights_path)
+            # (language, task) -> forced decoder ids, see _decoder_prompt_ids
+            self._prompt_ids = {}
+
+            # Server-side featurization for the audio input
+            try:
+                import whisper_features
+                import whisper_longform
+                self.whisper_features = whisper_features
+                self.whisper_longform = whisper_longform
+            except ImportError:
+                self.whisper_features = None
+                self.whisper_longform = None
+                print(f"[{self.model_name}] {_shared_dir} not deployed; audio input disabled")
+
+            # Long form: window overlap and windows per generate() call
+            self.long_form_overlap = float(
+                parameters.get("long_form_overlap_seconds", {}).get("string_value", "5")
+            )
+            self.long_form_batch_size = int(
+                parameters.get("long_form_batch_size", {}).get("string_value", "16")
+            )
+            tokenizer = self.processor.tokenizer
+            self._timestamp_begin = tokenizer.convert_tokens_to_ids("<|0.00|>")
+            self._special_ids = list(tokenizer.all_special_ids)
             print(f"[{self.model_name}] Model loaded successfully")
 
         except Exception as e:
             print(f"[{self.model_name}] Failed to load model: {e}")
             raise
 
-    def execute(self, requests):
-        """Process inference requests."""
-        responses = []
+        # Decoupled mode: responses go through each request's response
+        # sender, which allows streaming long-form segments
+        self.decoupled = pb_utils.using_decoupled_model_transaction_policy(self.model_config)
 
+    def execute(self, requests):
+        """
+        Process a dynamic batch of requests.
+
+        In decoupled mode responses are sent through each request's response
+        sender: streamed for long_form + stream=true, otherwise the
+        _execute_batch response flagged final.
+        """
+        if not self.decoupled:
+            return self._execute_batch(requests)
+
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        batch = []
         for request in requests:
+            if self._bool_input(request, "long_form") and self._bool_input(request, "stream"):
+                self._stream_long_form(request)
+            else:
+                batch.append(request)
+        if batch:
+            for request, response in zip(batch, self._execute_batch(batch)):
+                request.get_response_sender().send(response, flags=final)
+        return None
+
+    def _execute_batch(self, requests):
+        """
+        Transcribe a dynamic batch; one complete response per request.
+
+        long_form requests are transcribed window by window (see
+        _transcribe_long_form).
+
+        Rows carry input_features or audio bytes (featurized here). The
+        rows of all requests are grouped by (language, task) and each
+        group is transcribed with one generate() call over its concatenated
+        [rows, 80, 3000] features. token_ids for every row are written into
+        one preallocated [rows, 448] array.
+        """
+        import torch
+
+        responses = [None] * len(requests)
+
+        # 1. Collect features and the (language, task) of every row
+        features = []
+        keys = []
+        spans = {}  # request index -> (first row, end row)
+        for index, request in enumerate(requests):
+            if self._bool_input(request, "long_form"):
+                responses[index] = self._long_form_response(request)
+                continue
             try:
-                # Get input features (mel spectrogram)
                 input_features = pb_utils.get_input_tensor_by_name(request, "input_features")
-                if input_features is None:
-                    raise ValueError("Missing required input: input_features")
-
-                input_features_np = input_features.as_numpy()
-
-                # Convert to torch tensor
-                import torch
-                input_features_tensor = torch.from_numpy(input_features_np)
-
-                # Get optional parameters
-                language = "en"
-                task = "transcribe"
-
-                language_tensor = pb_utils.get_input_tensor_by_name(request, "language")
-                if language_tensor is not None:
-                    language = language_tensor.as_numpy()[0].decode("utf-8")
-
-                task_tensor = pb_utils.get_input_tensor_by_name(request, "task")
-                if task_tensor is not None:
-                    task = task_tensor.as_numpy()[0].decode("utf-8")
-
-                # Get decoder prompt IDs for language/task
-                forced_decoder_ids = self.processor.get_decoder_prompt_ids(
-                    language=language,
-                    task=task
-                )
-
-                # Generate transcription
+                if input_features is not None:
+                    request_features = input_features.as_numpy()
+                else:
+                    request_features = self._audio_features(request)
+                rows = request_features.shape[0]
+                languages = self._string_rows(request, "language", rows, "en")
+                tasks = self._string_rows(request, "task", rows, "transcribe")
+            except Exception as e:
+                responses[index] = self._error_response(f"Inference error: {str(e)}")
+                continue
+            spans[index] = (len(keys), len(keys) + rows)
+            features.append(request_features)
+            keys.extend(zip(languages, tasks))
+
+        if not features:
+            return responses
+
+        features = np.concatenate(features) if len(features) > 1 else features[0]
+        texts = [""] * len(keys)
+        token_ids = np.zeros((len(keys), MAX_LENGTH), dtype=np.int64)
+        failed_rows = {}  # row -> error message
+
+        # 2. One generate() per (language, task) group
+        groups = {}
+        for row, key in enumerate(keys):
+            groups.setdefault(key, []).append(row)
+
+        for (language, task), rows in groups.items():
+            batch = features if len(rows) == len(keys) else features[rows]
+            try:
                 generated_ids = self.model.generate(
-                    input_features_tensor,
-                    forced_decoder_ids=forced_decoder_ids,
-                    max_length=448,
-                )
-
-                # Decode to text
-                transcriptions = self.processor.batch_decode(
-                    generated_ids,
-                    skip_special_tokens=True
+                    torch.from_numpy(batch),
+                    forced_decoder_ids=self._decoder_prompt_ids(language, task),
+                    max_length=MAX_LENGTH,
                 )
+            except Exception as e:
+                for row in rows:
+                    failed_rows[row] = f"Inference error: {str(e)}"
+                continue
+
+            generated_ids = generated_ids.numpy()[:, :MAX_LENGTH]
+            token_ids[rows, :generated_ids.shape[1]] = generated_ids
+            transcriptions = self.processor.batch_decode(generated_ids, skip_special_tokens=True)
+            for row, text in zip(rows, transcriptions):
+                texts[row] = text.strip()
+
+        # 3. Scatter rows back to their requests
+        for index, (start, end) in spans.items():
+            error = next((failed_rows[row] for row in range(start, end) if row in failed_rows), None)
+            if error is not None:
+                print(f"[{self.model_name}] {error}")
+                responses[index] = self._error_response(error)
+                continue
+
+            transcription_array = np.array(
+                [text.encode("utf-8") for text in texts[start:end]], dtype=np.object_
+            )
+            responses[index] = pb_utils.InferenceResponse(output_tensors=[
+                pb_utils.Tensor("transcription", transcription_array),
+                pb_utils.Tensor("token_ids", token_ids[start:end]),
+                pb_utils.Tensor("segments", np.array([b"[]"] * (end - start), dtype=np.object_)),
+            ])
 
-                # Prepare outputs
-                batch_size = input_features_np.shape[0]
+        return responses
 
-                # Transcription output (as bytes for string tensor)
-                transcription_list = [t.strip().encode("utf-8") for t in transcriptions]
-                transcription_array = np.array(transcription_list, dtype=np.object_)
-                transcription_tensor = pb_utils.Tensor("transcription", transcription_array)
+    def _long_form_waveforms(self, request):
+        """Decoded audio rows of a long_form request, with their (language, task)."""
+        audio = pb_utils.get_input_tensor_by_name(request, "audio")
+        if audio is None:
+            raise ValueError("long_form requires the audio input")
+        if self.whisper_longform is None:
+            raise ValueError("long_form needs shared/whisper_features.py and shared/whisper_longform.py")
+        waveforms = [self.whisper_features.decode_audio(data) for data in audio.as_numpy().reshape(-1)]
+        languages = self._string_rows(request, "language", len(waveforms), "en")
+        tasks = self._string_rows(request, "task", len(waveforms), "transcribe")
+        return waveforms, languages, tasks
+
+    def _long_form_response(self, request):
+        """Transcribe every audio row of a request in full; one response."""
+        try:
+            waveforms, languages, tasks = self._long_form_waveforms(request)
+            texts, segments = [], []
+            for waveform, language, task in zip(waveforms, languages, tasks):
+                stitcher = self._transcribe_long_form(waveform, language, task)
+                texts.append(stitcher.text)
+                segments.append(stitcher.segments)
+            return self._long_form_output(texts, segments)
+        except Exception as e:
+            print(f"[{self.model_name}] Inference error: {e}")
+            return self._error_response(f"Inference error: {str(e)}")
+
+    def _stream_long_form(self, request):
+        """
+        Transcribe one audio row, sending its segments as they are committed.
+
+        One response per batch of windows that added text, then a final
+        empty response.
+        """
+        sender = request.get_response_sender()
+        final = pb_utils.TRITONSERVER_RESPONSE_COMPLETE_FINAL
+        try:
+            waveforms, languages, tasks = self._long_form_waveforms(request)
+            if len(waveforms) != 1:
+                raise ValueError("stream=true supports one audio file per request")
 
-                # Token IDs output (padded to fixed length)
-                max_length = 448
-                token_ids_np = np.zeros((batch_size, max_length), dtype=np.int64)
-                for i, ids in enumerate(generated_ids.numpy()):
-                    length = min(len(ids), max_length)
-                    token_ids_np[i, :length] = ids[:length]
-                token_ids_tensor = pb_utils.Tensor("token_ids", token_ids_np)
+            def send(committed):
+                text = " ".join(segment["text"] for segment in committed)
+                sender.send(self._long_form_output([text], [committed]))
 
-                response = pb_utils.InferenceResponse(
-                    output_tensors=[transcription_tensor, token_ids_tensor]
-                )
+            self._transcribe_long_form(waveforms[0], languages[0], tasks[0], on_segments=send)
+        except Exception as e:
+            print(f"[{self.model_name}] Inference error: {e}")
+            sender.send(self._error_response(f"Inference error: {str(e)}"), flags=final)
+            return
+        sender.send(self._long_form_output([""], [[]]), flags=final)
+
+    def _transcribe_long_form(self, waveform, language, task, on_segments=None):
+        """
+        Transcribe a whole waveform with overlapping 30s windows.
+
+        The windows are featurized and decoded long_form_batch_size at a
+        time (one generate() call each, with timestamp tokens) and stitched
+        in order.
+
+        Args:
+            waveform: 16 kHz mono float32 audio
+            language: Language code
+            task: "transcribe" or "translate"
+            on_segments: Called with the segments committed by each batch
+
+        Returns:
+            The whisper_longform.TranscriptStitcher holding text and segments
+        """
+        import torch
+
+        features_module = self.whisper_features
+        sample_rate = features_module.SAMPLE_RATE
+        starts = self.whisper_longform.window_starts(len(waveform), sample_rate, self.long_form_overlap)
+        stitcher = self.whisper_longform.TranscriptStitcher(
+            [start / sample_rate for start in starts], self.long_form_overlap
+        )
+        duration = len(waveform) / sample_rate
 
-            except Exception as e:
-                error_msg = f"Inference error: {str(e)}"
-                print(f"[{self.model_name}] {error_msg}")
-                response = pb_utils.InferenceResponse(
-                    output_tensors=[],
-                    error=pb_utils.TritonError(error_msg)
+        for first in range(0, len(starts), self.long_form_batch_size):
+            batch_starts = starts[first:first + self.long_form_batch_size]
+            features = features_module.log_mel_spectrogram(
+                [waveform[start:start + features_module.N_SAMPLES] for start in batch_starts],
+                self.processor.feature_extractor.mel_filters,
+            )
+            generated_ids = self.model.generate(
+                torch.from_numpy(features),
+                language=language,
+                task=task,
+                return_timestamps=True,
+                max_length=MAX_LENGTH,
+            ).numpy()
+
+            committed = []
+            for offset, (start, ids) in enumerate(zip(batch_starts, generated_ids)):
+                window_start = start / sample_rate
+                segments = self.whisper_longform.timestamp_segments(
+                    ids,
+                    self._timestamp_begin,
+                    self._special_ids,
+                    lambda tokens: self.processor.tokenizer.decode(tokens, skip_special_tokens=True),
+                    window_start,
+                    min(window_start + self.whisper_longform.WINDOW_SECONDS, duration),
                 )
+                committed.extend(stitcher.add(first + offset, segments))
+            if on_segments is not None and committed:
+                on_segments(committed)
+
+        return stitcher
+
+    @staticmethod
+    def _long_form_output(texts, segments):
+        """Response with transcription / token_ids / segments for long-form rows."""
+        return pb_utils.InferenceResponse(output_tensors=[
+            pb_utils.Tensor("transcription", np.array(
+                [text.encode("utf-8") for text in texts], dtype=np.object_)),
+            pb_utils.Tensor("token_ids", np.zeros((len(texts), MAX_LENGTH), dtype=np.int64)),
+            pb_utils.Tensor("segments", np.array(
+                [json.dumps(rows).encode("utf-8") for rows in segments], dtype=np.object_)),
+        ])
+
+    @staticmethod
+    def _bool_input(request, name):
+        """An optional bool input (first value), False when absent."""
+        tensor = pb_utils.get_input_tensor_by_name(request, name)
+        return tensor is not None and bool(tensor.as_numpy().reshape(-1)[0])
+
+    def _audio_features(self, request):
+        """Decode the audio input (one file per row) and compute its log-mel features."""
+        audio = pb_utils.get_input_tensor_by_name(request, "audio")
+        if audio is None:
+            raise ValueError("Missing required input: input_features or audio")
+        if self.whisper_features is None:
+            raise ValueError("audio input needs shared/whisper_features.py; send input_features instead")
+        waveforms = [self.whisper_features.decode_audio(data) for data in audio.as_numpy().reshape(-1)]
+        return self.whisper_features.log_mel_spectrogram(
+            waveforms, self.processor.feature_extractor.mel_filters
+        )
 
-            responses.append(response)
-
-        return responses
+    def _decoder_prompt_ids(self, language: str, task: str):
+        """Forced decoder ids for a language/task pair (built once per pair)."""
+        key = (language, task)
+        if key not in self._prompt_ids:
+            self._prompt_ids[key] = self.processor.get_decoder_prompt_ids(language=language, task=task)
+        return self._prompt_ids[key]
+
+    @staticmethod
+    def _string_rows(request, name, rows, default):
+        """A string input per batch row (one value is used for every row)."""
+        tensor = pb_utils.get_input_tensor_by_name(request, name)
+        if tensor is None:
+            return [default] * rows
+        values = [
+            value.decode("utf-8") if isinstance(value, bytes) else str(value)
+            for value in tensor.as_numpy().reshape(-1)
+        ]
+        return values if len(values) == rows else [values[0]] * rows
+
+    def _error_response(self, error_msg):
+        return pb_utils.InferenceResponse(
+            output_tensors=[],
+            error=pb_utils.TritonError(error_msg)
+        )
 
     def finalize(self):
         """Clean up resources."""
@@ -0,0 +1,130 @@
+"""
+YOLOv8n Postprocessing Triton Python Backend Model
+
+Last step of the yolov8n-pipeline ensemble: turns the raw yolov8n head
+([84, 8400] per image) into a compact detection tensor, so clients receive
+a few hundred bytes instead of 2.7 MB per image and run no NMS.
+
+Input:
+    - output0: float32 [batch, 84, anchors] - yolov8n output (cx, cy, w, h + 80 class scores)
+    - letterbox: float32 [batch, 5] - scale, pad_w, pad_h, orig_h, orig_w (yolov8n-preprocess)
+
+Output:
+    - detections: float32 [batch, max_detections_in_request, 6] -
+      x1, y1, x2, y2 (original image pixels), score, class_id; rows past
+      num_detections are zero padding
+    - num_detections: int32 [batch, 1]
+
+Per image: best class per anchor, confidence filter (conf_threshold),
+class-aware NMS (iou_threshold; boxes are offset by class so one
+vectorized NMS pass never suppresses across classes), at most
+max_detections boxes, then letterbox undone and clipped to the image.
+"""
+
+# Add model-specific packages to path (if any exist)
+import sys
+import os
+_model_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_packages_dir = os.path.join(_model_dir, "packages")
+if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
+    sys.path.insert(0, _packages_dir)
+
+import json
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+# Class offset for class-aware NMS: larger than any box coordinate
+CLASS_OFFSET = 4096.0
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Indices kept by greedy NMS over xyxy boxes, highest score first."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = np.argsort(-scores)
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        # IoU of the best box with every remaining box at once
+        w = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        h = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        inter = w * h
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class TritonPythonModel:
+    """Confidence filter + NMS + letterbox undo for yolov8n."""
+
+    def initialize(self, args):
+        """Read thresholds from the config."""
+        self.model_config = json.loads(args["model_config"])
+        self.model_name = args["model_name"]
+        parameters = self.model_config.get("parameters", {})
+        self.conf_threshold = float(parameters.get("conf_threshold", {}).get("string_value", "0.25"))
+        self.iou_threshold = float(parameters.get("iou_threshold", {}).get("string_value", "0.45"))
+        self.max_detections = int(parameters.get("max_detections", {}).get("string_value", "300"))
+        print(
+            f"[{self.model_name}] conf_threshold={self.conf_threshold}, "
+            f"iou_threshold={self.iou_threshold}, max_detections={self.max_detections}"
+        )
+
+    def _detect(self, pred: np.ndarray, letterbox: np.ndarray) -> np.ndarray:
+        """[n, 6] detections of one image from its [84, anchors] head."""
+        pred = pred.T  # [anchors, 84]
+        class_scores = pred[:, 4:]
+        class_ids = np.argmax(class_scores, axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+
+        mask = scores >= self.conf_threshold
+        if not mask.any():
+            return np.zeros((0, 6), dtype=np.float32)
+        cxcywh, scores, class_ids = pred[mask, :4], scores[mask], class_ids[mask]
+
+        boxes = np.empty_like(cxcywh)
+        boxes[:, :2] = cxcywh[:, :2] - cxcywh[:, 2:] / 2
+        boxes[:, 2:] = cxcywh[:, :2] + cxcywh[:, 2:] / 2
+
+        keep = nms(boxes + (class_ids * CLASS_OFFSET)[:, None], scores, self.iou_threshold)
+        keep = keep[: self.max_detections]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # Letterbox space -> original image pixels
+        scale, pad_w, pad_h, orig_h, orig_w = letterbox
+        boxes[:, 0::2] = ((boxes[:, 0::2] - pad_w) / scale).clip(0, orig_w)
+        boxes[:, 1::2] = ((boxes[:, 1::2] - pad_h) / scale).clip(0, orig_h)
+
+        return np.concatenate(
+            [boxes, scores[:, None], class_ids[:, None].astype(np.float32)], axis=1
+        ).astype(np.float32)
+
+    def execute(self, requests):
+        """Detections for every image of every request."""
+        responses = []
+        for request in requests:
+            try:
+                output = pb_utils.get_input_tensor_by_name(request, "output0").as_numpy()
+                letterbox = pb_utils.get_input_tensor_by_name(request, "letterbox").as_numpy()
+                per_image = [self._detect(pred, info) for pred, info in zip(output, letterbox)]
+
+                # Pad to the request's largest detection count
+                counts = np.array([[len(d)] for d in per_image], dtype=np.int32)
+                detections = np.zeros((len(per_image), max(1, int(counts.max())), 6), dtype=np.float32)
+                for i, d in enumerate(per_image):
+                    detections[i, : len(d)] = d
+
+                responses.append(pb_utils.InferenceResponse(output_tensors=[
+                    pb_utils.Tensor("detections", detections),
+                    pb_utils.Tensor("num_detections", counts),
+                ]))
+            except Exception as e:
+                responses.append(pb_utils.InferenceResponse(
+                    output_tensors=[], error=pb_utils.TritonError(f"Postprocessing error: {str(e)}")
+                ))
+        return responses
+
+    def finalize(self):
+        """Clean up resources."""
+        print(f"[{self.model_name}] Finalizing model")
@@ -0,0 +1,103 @@
+"""
+YOLOv8n Preprocessing Triton Python Backend Model
+
+First step of the yolov8n-pipeline ensemble: turns compressed images into
+the yolov8n input tensor on the server, so clients send JPEG/PNG bytes
+(tens of KB) instead of a float32 [3, 640, 640] tensor (~4.9 MB).
+
+Input:
+    - image: string [batch, 1] - JPEG/PNG file bytes
+
+Output:
+    - images: float32 [batch, 3, 640, 640] - letterboxed, RGB, /255, CHW
+    - letterbox: float32 [batch, 5] - scale, pad_w, pad_h, orig_h, orig_w
+      (used by yolov8n-postprocess to map boxes back to the image)
+
+Preprocessing matches the yolov8n clients (cv2 decode, letterbox resize,
+pad value 114, BGR -> RGB, /255, HWC -> CHW). Decoding and letterboxing run
+per image; the normalization runs once over every image of the requests
+in the dynamic batch.
+"""
+
+# Add model-specific packages to path (if any exist)
+import sys
+import os
+_model_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_packages_dir = os.path.join(_model_dir, "packages")
+if os.path.isdir(_packages_dir) and _packages_dir not in sys.path:
+    sys.path.insert(0, _packages_dir)
+
+import json
+import cv2
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+PAD_VALUE = 114
+
+
+class TritonPythonModel:
+    """Decode + letterbox + normalize for yolov8n."""
+
+    def initialize(self, args):
+        """Read the input size from the config."""
+        self.model_config = json.loads(args["model_config"])
+        self.model_name = args["model_name"]
+        parameters = self.model_config.get("parameters", {})
+        self.input_size = int(parameters.get("input_size", {}).get("string_value", "640"))
+        print(f"[{self.model_name}] Input size: {self.input_size}")
+
+    def _letterbox(self, encoded: bytes):
+        """Decode one image and letterbox it: (uint8 [size, size, 3] BGR, [scale, pad_w, pad_h, h, w])."""
+        image = cv2.imdecode(np.frombuffer(encoded, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image (expected JPEG or PNG bytes)")
+
+        size = self.input_size
+        h, w = image.shape[:2]
+        scale = min(size / h, size / w)
+        new_w, new_h = int(w * scale), int(h * scale)
+        resized = cv2.resize(image, (new_w, new_h))
+
+        canvas = np.full((size, size, 3), PAD_VALUE, dtype=np.uint8)
+        pad_h, pad_w = (size - new_h) // 2, (size - new_w) // 2
+        canvas[pad_h:pad_h + new_h, pad_w:pad_w + new_w] = resized
+        return canvas, np.array([scale, pad_w, pad_h, h, w], dtype=np.float32)
+
+    def execute(self, requests):
+        """Preprocess every image of the batched requests; one response per request."""
+        responses = [None] * len(requests)
+        canvases, letterboxes, owners = [], [], []
+
+        for index, request in enumerate(requests):
+            try:
+                encoded = pb_utils.get_input_tensor_by_name(request, "image").as_numpy().reshape(-1)
+                for data in encoded:
+                    canvas, letterbox = self._letterbox(bytes(data))
+                    canvases.append(canvas)
+                    letterboxes.append(letterbox)
+                    owners.append(index)
+            except Exception as e:
+                responses[index] = pb_utils.InferenceResponse(
+                    output_tensors=[], error=pb_utils.TritonError(f"Preprocessing error: {str(e)}")
+                )
+
+        # One normalization for the whole batch: BGR -> RGB, HWC -> CHW, /255
+        owners = np.array(owners)
+        if canvases:
+            batch = np.ascontiguousarray(np.stack(canvases)[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32)
+            batch /= 255.0
+            letterboxes = np.stack(letterboxes)
+
+        for index in range(len(requests)):
+            if responses[index] is not None:
+                continue
+            rows = owners == index
+            responses[index] = pb_utils.InferenceResponse(output_tensors=[
+                pb_utils.Tensor("images", batch[rows]),
+                pb_utils.Tensor("letterbox", letterboxes[rows]),
+            ])
+        return responses
+
+    def finalize(self):
+        """Clean up resources."""
+        print(f"[{self.model_name}] Finalizing model")
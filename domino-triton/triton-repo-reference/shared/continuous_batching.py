@@ -0,0 +1,392 @@
+"""
+Iteration-level continuous batching for Hugging Face causal LMs on the
+Triton Python backend.
+
+Shared by the Python backend LLMs (tinyllama-python, smollm-135m-python).
+Deployed to <base>/shared/ next to <base>/models/ and <base>/weights/; a
+model.py adds that directory to sys.path when continuous batching is on.
+
+=============================================================================
+WHY
+=============================================================================
+
+With execute() running each batch to completion, a 512-token generation
+holds every request queued behind it. Here requests join and leave one
+running decode batch at token boundaries:
+
+    step:      1    2    3    4    5    6    7    8
+    seq A:   [pre] tok  tok  tok  tok  tok  tok  EOS      (long)
+    seq B:             [pre] tok  EOS                     (short, joins, leaves)
+    seq C:                       [pre] tok  tok  EOS      (joins when B's slot frees)
+
+=============================================================================
+HOW
+=============================================================================
+
+KV cache slots:
+    One preallocated key and value buffer per layer,
+    [num_slots, kv_heads, max_sequence_tokens, head_dim]. Each running
+    sequence owns one slot; its cache occupies positions [0, length).
+    Active sequences are kept in slots 0..B-1 (a finished sequence's slot is
+    refilled by moving the last one down), so a decode step can pass plain
+    views of the buffers to the model.
+
+Memory bound:
+    num_slots is derived from kv_cache_memory_mb and max_sequence_tokens
+    (capped by max_active_sequences), and all buffers are allocated up front.
+    The scheduler admits a waiting request only into a free slot and clamps
+    its prompt + max_new_tokens to the slot size, so the cache can never
+    grow past the budget and no running sequence is ever preempted.
+
+Scheduler loop (background thread):
+    1. Admit waiting requests (FIFO) into free slots: one prefill forward
+       pass each (starting after the longest cached prefix when a
+       prefix_cache.PrefixKVCache is given), cache copied into the slot,
+       first token sampled
+    2. One decode forward pass for all active sequences: each feeds its last
+       token at its own position (position_ids), attention masked to its
+       own cache length; the new K/V column is written into each slot
+    3. Sample per sequence (own temperature/top_p/constraint), finish
+       sequences on EOS, max_new_tokens, constraint completion or
+       cancellation, and free their slots
+
+Models use it with the decoupled transaction policy: execute() submits
+sequences and returns immediately, and callbacks send the responses from
+the engine thread.
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+import torch
+
+try:
+    from transformers.cache_utils import DynamicCache
+except ImportError:  # transformers < 4.36 uses tuple caches only
+    DynamicCache = None
+
+
+@dataclass
+class Sequence:
+    """One prompt being generated by the engine."""
+    prompt_ids: List[int]
+    max_new_tokens: int
+    temperature: float = 0.7
+    top_p: float = 0.9
+    # Optional per-sequence constraint with apply(scores[vocab]) -> scores
+    # and advance(token_id) -> True once the output is complete
+    constraint: Any = None
+    # Called once from the engine thread: on_finish(token_ids, error)
+    on_finish: Optional[Callable[[List[int], Optional[str]], None]] = None
+    # Optional, called from the engine thread after every generated token
+    # (before on_finish): on_token(token_ids) -- used for streaming
+    on_token: Optional[Callable[[List[int]], None]] = None
+    # Optional: is_cancelled() -> True to stop early (e.g. client went away)
+    is_cancelled: Optional[Callable[[], bool]] = None
+    generated: List[int] = field(default_factory=list)
+    slot: Optional[int] = None
+    length: int = 0
+    finished: bool = False
+    submitted_at: float = field(default_factory=time.time)
+
+
+class ContinuousBatchingEngine:
+    """Runs submitted sequences in one shared, continuously refilled decode batch."""
+
+    def __init__(self, model, tokenizer, name: str, max_active_sequences: int = 8,
+                 kv_cache_memory_mb: int = 1024, max_sequence_tokens: int = 2048,
+                 prefix_cache=None):
+        """
+        Size and allocate the KV slots. Call start() to run the loop.
+
+        Args:
+            model: Loaded AutoModelForCausalLM (eval mode, on its device)
+            tokenizer: Its tokenizer (for eos_token_id)
+            name: Model name for log lines
+            max_active_sequences: Upper bound on sequences decoded together
+            kv_cache_memory_mb: Total memory for the KV slot buffers
+            max_sequence_tokens: Prompt + generated tokens per slot
+            prefix_cache: Optional prefix_cache.PrefixKVCache; prefill then
+                          starts after the longest cached prompt prefix
+        """
+        self.model = model
+        self.prefix_cache = prefix_cache
+        self.name = name
+        self.eos_token_id = tokenizer.eos_token_id
+        self.max_sequence_tokens = max_sequence_tokens
+
+        config = model.config
+        self.num_layers = config.num_hidden_layers
+        num_heads = config.num_attention_heads
+        self.kv_heads = getattr(config, "num_key_value_heads", None) or num_heads
+        self.head_dim = getattr(config, "head_dim", None) or config.hidden_size // num_heads
+        self.device = next(model.parameters()).device
+        self.dtype = next(model.parameters()).dtype
+
+        element_size = torch.tensor([], dtype=self.dtype).element_size()
+        self.bytes_per_token = 2 * self.num_layers * self.kv_heads * self.head_dim * element_size
+        slot_bytes = self.bytes_per_token * max_sequence_tokens
+        self.num_slots = min(max_active_sequences, (kv_cache_memory_mb * 1024 * 1024) // slot_bytes)
+        if self.num_slots < 1:
+            raise ValueError(
+                f"kv_cache_memory_mb={kv_cache_memory_mb} cannot hold one sequence of "
+                f"{max_sequence_tokens} tokens ({slot_bytes / 1024 / 1024:.0f} MB needed)"
+            )
+
+        shape = (self.num_slots, self.kv_heads, max_sequence_tokens, self.head_dim)
+        self.key_cache = [torch.zeros(shape, dtype=self.dtype, device=self.device) for _ in range(self.num_layers)]
+        self.value_cache = [torch.zeros(shape, dtype=self.dtype, device=self.device) for _ in range(self.num_layers)]
+
+        self._waiting = deque()
+        self._active: List[Sequence] = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.steps = 0
+        self.completed = 0
+
+        print(
+            f"[{self.name}] Continuous batching: {self.num_slots} slots x {max_sequence_tokens} tokens, "
+            f"{self.num_slots * slot_bytes / 1024 / 1024:.0f} MB KV cache"
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name=f"{self.name}-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the loop; unfinished sequences are failed."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+        for seq in list(self._active) + list(self._waiting):
+            self._finish(seq, error="Model is shutting down")
+        self._active.clear()
+        self._waiting.clear()
+
+    def submit(self, seq: Sequence) -> None:
+        """
+        Queue a sequence; it joins the decode batch when a slot frees up.
+
+        max_new_tokens is clamped so prompt + output fit one slot; a prompt
+        that fills the slot on its own is failed immediately (callers
+        truncate prompts to max_sequence_tokens - max_new_tokens).
+        """
+        room = self.max_sequence_tokens - len(seq.prompt_ids)
+        if room < 1:
+            self._finish(seq, error=(
+                f"Prompt of {len(seq.prompt_ids)} tokens exceeds max_sequence_tokens={self.max_sequence_tokens}"
+            ))
+            return
+        seq.max_new_tokens = max(1, min(seq.max_new_tokens, room))
+        with self._cond:
+            self._waiting.append(seq)
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.num_slots,
+            "active": len(self._active),
+            "waiting": len(self._waiting),
+            "steps": self.steps,
+            "completed": self.completed,
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduler loop
+    # ------------------------------------------------------------------
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._waiting and not self._active:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                admitted = []
+                while self._waiting and len(self._active) + len(admitted) < self.num_slots:
+                    admitted.append(self._waiting.popleft())
+
+            try:
+                with torch.no_grad():
+                    for seq in admitted:
+                        self._prefill(seq)
+                    if self._active:
+                        self._decode_step()
+            except Exception as e:
+                # A failed forward pass leaves the batch in an unknown state:
+                # fail everything running and start over
+                traceback.print_exc()
+                for seq in list(self._active) + admitted:
+                    self._finish(seq, error=f"Generation error: {e}")
+                self._active.clear()
+
+    def _prefill(self, seq: Sequence) -> None:
+        """Run the prompt, copy its cache into a free slot, sample the first token."""
+        if seq.is_cancelled is not None and seq.is_cancelled():
+            self._finish(seq, error="Request cancelled")
+            return
+
+        cached, prefix = 0, None
+        if self.prefix_cache is not None:
+            cached, prefix = self.prefix_cache.lookup(seq.prompt_ids)
+
+        input_ids = torch.tensor([seq.prompt_ids[cached:]], dtype=torch.long, device=self.device)
+        if prefix is not None:
+            # Positions continue after the cached prefix
+            outputs = self.model(
+                input_ids=input_ids,
+                position_ids=torch.arange(cached, len(seq.prompt_ids), device=self.device)[None, :],
+                past_key_values=_model_cache(prefix),
+                use_cache=True,
+            )
+        else:
+            outputs = self.model(input_ids=input_ids, use_cache=True)
+        past = _legacy_cache(outputs.past_key_values)
+        if self.prefix_cache is not None:
+            self.prefix_cache.insert(seq.prompt_ids, past)
+
+        seq.slot = len(self._active)
+        seq.length = len(seq.prompt_ids)
+        for layer in range(self.num_layers):
+            self.key_cache[layer][seq.slot, :, :seq.length] = past[layer][0][0]
+            self.value_cache[layer][seq.slot, :, :seq.length] = past[layer][1][0]
+        self._active.append(seq)
+
+        token = self._sample(outputs.logits[:, -1, :], [seq])[0]
+        self._append_token(seq, token)
+
+    def _decode_step(self) -> None:
+        """One forward pass feeding each active sequence's last token."""
+        batch = len(self._active)
+        lengths = torch.tensor([s.length for s in self._active], dtype=torch.long, device=self.device)
+        max_length = int(lengths.max())
+
+        # Valid cache positions per row, plus the new token's column
+        attention_mask = torch.arange(max_length + 1, device=self.device)[None, :] < lengths[:, None]
+        attention_mask[:, max_length] = True
+
+        past = tuple(
+            (self.key_cache[layer][:batch, :, :max_length], self.value_cache[layer][:batch, :, :max_length])
+            for layer in range(self.num_layers)
+        )
+        input_ids = torch.tensor([[s.generated[-1]] for s in self._active], dtype=torch.long, device=self.device)
+
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask.long(),
+            position_ids=lengths[:, None],
+            past_key_values=_model_cache(past),
+            use_cache=True,
+        )
+        self.steps += 1
+
+        # The model appended the new K/V as the last column; move it to each
+        # row's own position in its slot
+        new_past = _legacy_cache(outputs.past_key_values)
+        rows = torch.arange(batch, device=self.device)
+        for layer in range(self.num_layers):
+            self.key_cache[layer][rows, :, lengths] = new_past[layer][0][:, :, -1]
+            self.value_cache[layer][rows, :, lengths] = new_past[layer][1][:, :, -1]
+
+        active = list(self._active)
+        tokens = self._sample(outputs.logits[:, -1, :], active)
+        # Update every length before retiring any sequence: _release moves
+        # the last sequence's cache up to its (new) length
+        for seq in active:
+            seq.length += 1
+        for seq, token in zip(active, tokens):
+            self._append_token(seq, token)
+
+    def _append_token(self, seq: Sequence, token: int) -> None:
+        """Record a sampled token and retire the sequence if it is done."""
+        seq.generated.append(token)
+        if seq.on_token is not None:
+            try:
+                seq.on_token(seq.generated)
+            except Exception:
+                traceback.print_exc()
+        done = token == self.eos_token_id or len(seq.generated) >= seq.max_new_tokens
+        if seq.constraint is not None and seq.constraint.advance(token):
+            done = True
+        if seq.is_cancelled is not None and seq.is_cancelled():
+            done = True
+        if done:
+            self._release(seq)
+            self._finish(seq)
+
+    def _release(self, seq: Sequence) -> None:
+        """Free a slot, moving the last active sequence into it to stay compact."""
+        slot = seq.slot
+        last = self._active[-1]
+        if last is not seq:
+            for layer in range(self.num_layers):
+                self.key_cache[layer][slot, :, :last.length] = self.key_cache[layer][last.slot, :, :last.length]
+                self.value_cache[layer][slot, :, :last.length] = self.value_cache[layer][last.slot, :, :last.length]
+            last.slot = slot
+            self._active[slot] = last
+        self._active.pop()
+        seq.slot = None
+
+    def _finish(self, seq: Sequence, error: Optional[str] = None) -> None:
+        """Report a sequence's result (once)."""
+        if seq.finished:
+            return
+        seq.finished = True
+        self.completed += 1
+        if seq.on_finish is None:
+            return
+        try:
+            seq.on_finish(seq.generated, error)
+        except Exception:
+            traceback.print_exc()
+
+    def _sample(self, logits: torch.Tensor, seqs: List[Sequence]) -> List[int]:
+        """Per-row constrained greedy / temperature + top-p sampling."""
+        logits = logits.float()
+        for i, seq in enumerate(seqs):
+            if seq.constraint is not None:
+                logits[i] = seq.constraint.apply(logits[i])
+
+        tokens = logits.argmax(dim=-1)
+        sampled = [i for i, seq in enumerate(seqs) if seq.temperature > 0]
+        if sampled:
+            index = torch.tensor(sampled, device=logits.device)
+            temperatures = torch.tensor([seqs[i].temperature for i in sampled], device=logits.device)
+            top_ps = torch.tensor([seqs[i].top_p for i in sampled], device=logits.device)
+
+            probs = torch.softmax(logits[index] / temperatures[:, None], dim=-1)
+            sorted_probs, sorted_ids = probs.sort(dim=-1, descending=True)
+            # Drop tokens outside the top-p nucleus (always keep the first)
+            outside = sorted_probs.cumsum(dim=-1) - sorted_probs > top_ps[:, None]
+            sorted_probs = sorted_probs.masked_fill(outside, 0.0)
+            choice = torch.multinomial(sorted_probs, num_samples=1)
+            tokens[index] = sorted_ids.gather(1, choice).squeeze(1)
+
+        return tokens.tolist()
+
+
+def _legacy_cache(past):
+    """Tuple-of-(key, value)-per-layer view of a model's returned cache."""
+    if hasattr(past, "to_legacy_cache"):
+        return past.to_legacy_cache()
+    return past
+
+
+def _model_cache(legacy):
+    """Cache object the model accepts as past_key_values."""
+    if DynamicCache is not None:
+        return DynamicCache.from_legacy_cache(legacy)
+    return legacy
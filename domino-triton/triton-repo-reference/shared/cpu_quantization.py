@@ -0,0 +1,161 @@
+"""
+Quantized CPU execution for Hugging Face causal LMs on the Triton Python
+backend: dynamic int8 Linear layers or bfloat16 weights, cached on the
+model repository volume.
+
+Used by smollm-135m-python and tinyllama-python version 1. Deployed to
+<base>/shared/ next to <base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+On CPU the decode step is bound by memory bandwidth: every generated token
+reads every weight once. float32 weights move 4 bytes per parameter; int8
+Linear weights move 1 and bfloat16 moves 2, with matching savings in
+resident memory.
+
+=============================================================================
+HOW
+=============================================================================
+
+Modes (parameter cpu_quantization, CPU instances only):
+    "int8"  torch.ao.quantization.quantize_dynamic on every nn.Linear except
+            lm_head (kept float32 for output agreement): int8 weights,
+            activations quantized per batch at run time.
+    "bf16"  bfloat16 weights, only when the CPU has native bf16 arithmetic
+            (avx512_bf16 / amx_bf16 / ARM bf16); otherwise float32 is kept,
+            since emulated bf16 is slower than float32.
+    "none"  float32 (default).
+
+Cache (<root>/<mode>-torch<version>/):
+    <root> is <base>/weights/<name>/<version>/quantized when that weights
+    folder holds the model, else <base>/cache/quantized/<name>/<version>
+    (models loaded by Hugging Face id): creating weights/<name>/<version>
+    would make the next start load its tokenizer from a folder holding
+    only quantized/. cpu_quantization_dir overrides <root>. <base> is the
+    parent of MODEL_REPO, as for the models' weights.
+    int8: the quantized module pickled with torch.save (loading skips both
+          the float32 load and the quantization pass).
+    bf16: save_pretrained() in bfloat16 (half the bytes to read).
+    Written into a staging directory and renamed into place, so instances
+    loading at the same time never read a partial artifact. torch's
+    version is part of the directory because a pickled module is only
+    valid for the torch / transformers that wrote it.
+"""
+
+import os
+import shutil
+from typing import Callable, Tuple
+
+import torch
+
+MODES = ("none", "int8", "bf16")
+INT8_FILE = "model.pt"
+
+
+def cpu_supports_bf16() -> bool:
+    """Whether the CPU has native bfloat16 arithmetic."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return any(flag in flags for flag in ("avx512_bf16", "amx_bf16", " bf16"))
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of every nn.Linear except lm_head."""
+    qconfig = torch.ao.quantization.default_dynamic_qconfig
+    spec = {
+        name: qconfig
+        for name, module in model.named_modules()
+        if isinstance(module, torch.nn.Linear) and name != "lm_head"
+    }
+    # In place: no float32 copy of the model is kept (and weights mapped
+    # from the shared weight store are not copied first)
+    return torch.ao.quantization.quantize_dynamic(model, spec, dtype=torch.qint8, inplace=True)
+
+
+def _cache_dir(parameters: dict, name: str, version: str, mode: str) -> str:
+    root = parameters.get("cpu_quantization_dir", {}).get("string_value", "")
+    if not root:
+        # Model repo is at <base>/models, weights are at <base>/weights (sibling folder)
+        model_repo = os.environ.get("MODEL_REPO", "/triton-repo/models")
+        base_path = os.path.dirname(model_repo.rstrip("/"))
+        weights_path = os.path.join(base_path, "weights", name, str(version))
+        if os.path.isfile(os.path.join(weights_path, "config.json")):
+            root = os.path.join(weights_path, "quantized")
+        else:
+            root = os.path.join(base_path, "cache", "quantized", name, str(version))
+    return os.path.join(root, f"{mode}-torch{torch.__version__.split('+')[0]}")
+
+
+def _publish(staging: str, target: str) -> None:
+    """Rename a finished staging directory into place (first writer wins)."""
+    try:
+        os.rename(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)  # another instance got there first
+
+
+def load_cpu_model(parameters: dict, name: str, version: str, load_float32: Callable) -> Tuple[object, str]:
+    """
+    The model for CPU serving in the configured quantization mode.
+
+    Parameters:
+        cpu_quantization: "none" (default), "int8" or "bf16"
+        cpu_quantization_dir: Cache root (default <base>/weights/<name>/<version>/quantized
+                              when that folder holds the model, else
+                              <base>/cache/quantized/<name>/<version>)
+
+    Args:
+        parameters: config.pbtxt parameters
+        name: Model name (weights directory and log lines)
+        version: Model version (weights directory)
+        load_float32: Returns the float32 model (used when there is no cache)
+
+    Returns:
+        Tuple of (model in eval mode, mode applied)
+    """
+    mode = parameters.get("cpu_quantization", {}).get("string_value", "none").strip().lower() or "none"
+    if mode not in MODES:
+        raise ValueError(f"cpu_quantization must be one of {MODES}, got {mode!r}")
+    if mode == "bf16" and not cpu_supports_bf16():
+        print(f"[{name}] cpu_quantization bf16: no native bf16 on this CPU; serving float32")
+        mode = "none"
+    if mode == "none":
+        return load_float32(), mode
+
+    cache_dir = _cache_dir(parameters, name, version, mode)
+    staging = f"{cache_dir}.tmp-{os.getpid()}"
+
+    if mode == "int8":
+        path = os.path.join(cache_dir, INT8_FILE)
+        if os.path.isfile(path):
+            print(f"[{name}] Loading int8 model from {path}")
+            return torch.load(path, weights_only=False).eval(), mode
+        model = quantize_int8(load_float32().eval())
+        try:
+            os.makedirs(staging, exist_ok=True)
+            torch.save(model, os.path.join(staging, INT8_FILE))
+            _publish(staging, cache_dir)
+            print(f"[{name}] int8 model cached at {path}")
+        except OSError as e:
+            print(f"[{name}] int8 model not cached ({e})")
+        return model, mode
+
+    from transformers import AutoModelForCausalLM
+
+    if os.path.isfile(os.path.join(cache_dir, "config.json")):
+        print(f"[{name}] Loading bf16 model from {cache_dir}")
+        model = AutoModelForCausalLM.from_pretrained(cache_dir, torch_dtype=torch.bfloat16, low_cpu_mem_usage=True)
+        return model.eval(), mode
+    model = load_float32().to(torch.bfloat16).eval()
+    try:
+        model.save_pretrained(staging, safe_serialization=True)
+        _publish(staging, cache_dir)
+        print(f"[{name}] bf16 model cached at {cache_dir}")
+    except OSError as e:
+        print(f"[{name}] bf16 model not cached ({e})")
+    return model, mode
@@ -0,0 +1,176 @@
+"""
+Instance-aware CPU thread partitioning for KIND_CPU Python backend models.
+
+Used by tinyllama-python, smollm-135m-python and whisper-tiny-python.
+Deployed to <base>/shared/ next to <base>/models/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Every Triton model instance runs in its own Python backend stub process,
+and torch (like ONNX Runtime) starts one thread per core it can see. With
+instance_group count > 1 on KIND_CPU, N instances run N x cores threads
+that fight over the same cores -- and inside a container the "cores" are
+the node's, not the pod's CPU quota -- so adding instances can lower
+throughput instead of raising it.
+
+=============================================================================
+HOW
+=============================================================================
+
+Cores:
+    The pod's CPU quota from the cgroup (v2 cpu.max, v1 cpu.cfs_quota_us /
+    cpu.cfs_period_us), rounded down, capped by the CPUs this process may
+    run on (sched_getaffinity). No quota: the affinity CPU count.
+
+Split:
+    The instance count is the sum of the KIND_CPU instance_group counts in
+    the model config; the instance index comes from model_instance_name
+    (<group name>_<index>) and the counts of the groups before it. Each
+    instance gets cores // instances threads (at least 1);
+    cpu_threads_per_instance overrides it. torch.set_num_threads()
+    (intra-op) and one inter-op thread are applied, and OMP_NUM_THREADS /
+    MKL_NUM_THREADS are set for libraries initialized later.
+
+Affinity (cpu_affinity "true"):
+    Instance i is pinned (sched_setaffinity) to its own slice of the
+    allowed CPUs, [i * threads, (i + 1) * threads), wrapping around when
+    instances x threads exceeds the CPUs, so instances stop migrating
+    across each other's cores.
+
+Instances of different model versions loaded at the same time each split
+the cores independently.
+"""
+
+import os
+import re
+from typing import List, Optional
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """CPUs allowed by the cgroup quota, or None when unlimited / unknown."""
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>" or "max <period>"
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")  # cgroup v1
+    period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        return list(range(os.cpu_count() or 1))
+
+
+def available_cores() -> int:
+    """Cores usable by the pod: the cgroup quota capped by the affinity CPUs."""
+    cpus = len(available_cpus())
+    quota = cgroup_cpu_quota()
+    if quota is None:
+        return cpus
+    return max(1, min(cpus, int(quota)))
+
+
+def instance_layout(model_config: dict, instance_name: str):
+    """
+    (index, count) of this instance among the KIND_CPU instances.
+
+    Args:
+        model_config: Parsed model config (args["model_config"])
+        instance_name: args["model_instance_name"], e.g. "whisper-tiny-python_0_1"
+    """
+    groups = [
+        group for group in model_config.get("instance_group", [])
+        if group.get("kind", "KIND_CPU") == "KIND_CPU"
+    ] or [{"count": 1}]
+    count = sum(int(group.get("count", 1)) for group in groups)
+
+    # Triton names instances <group name>_<index within the group>
+    match = re.search(r"_(\d+)$", instance_name or "")
+    index = int(match.group(1)) if match else 0
+    offset = 0
+    for group in groups:
+        if group.get("name") and (instance_name or "").startswith(f"{group['name']}_"):
+            index += offset
+            break
+        offset += int(group.get("count", 1))
+    return index % count, count
+
+
+def partition_cpu_threads(model_config: dict, instance_name: str, instance_kind: str,
+                          parameters: dict, name: str) -> Optional[dict]:
+    """
+    Split the pod's cores across this model's instances (config.pbtxt parameters).
+
+    Parameters:
+        cpu_thread_partitioning: "true" applies the split (default "false")
+        cpu_threads_per_instance: Threads per instance ("0" = cores // instances)
+        cpu_affinity: "true" pins the instance to its own CPUs (default "false")
+
+    Args:
+        model_config: Parsed model config
+        instance_name: args["model_instance_name"]
+        instance_kind: args["model_instance_kind"] ("CPU" / "GPU"); GPU
+                       instances are left alone
+        parameters: config.pbtxt parameters
+        name: Model name for log lines
+
+    Returns:
+        {"threads", "cpus", "instance", "instances", "cores"} when applied, else None
+    """
+    if parameters.get("cpu_thread_partitioning", {}).get("string_value", "false").lower() != "true":
+        return None
+    if instance_kind and instance_kind.upper() != "CPU":
+        return None
+
+    import torch
+
+    cores = available_cores()
+    index, count = instance_layout(model_config, instance_name)
+    threads = int(parameters.get("cpu_threads_per_instance", {}).get("string_value", "0") or 0)
+    if threads <= 0:
+        threads = max(1, cores // count)
+
+    pinned = None
+    if parameters.get("cpu_affinity", {}).get("string_value", "false").lower() == "true":
+        cpus = available_cpus()
+        pinned = [cpus[(index * threads + offset) % len(cpus)] for offset in range(threads)]
+        pinned = sorted(set(pinned))
+        try:
+            os.sched_setaffinity(0, pinned)
+        except (AttributeError, OSError) as e:
+            print(f"[{name}] CPU affinity not applied: {e}")
+            pinned = None
+
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # only settable before the first inter-op parallel work
+
+    layout = {"threads": threads, "cpus": pinned, "instance": index, "instances": count, "cores": cores}
+    print(
+        f"[{name}] CPU threads: instance {index + 1}/{count} of {instance_name}, "
+        f"{cores} cores (quota {cgroup_cpu_quota() or 'none'}), {threads} threads"
+        + (f", pinned to CPUs {pinned}" if pinned else "")
+    )
+    return layout
@@ -0,0 +1,165 @@
+"""
+Generation result cache for Hugging Face causal LMs on the Triton Python
+backend.
+
+Shared by the Python backend LLMs (tinyllama-python, smollm-135m-python).
+Deployed to <base>/shared/ next to <base>/models/ and <base>/weights/.
+
+Greedy decoding (temperature 0, do_sample=False) is deterministic: the same
+model, prompt tokens and decoding parameters always produce the same text.
+JSON-extraction workloads send the same prompts over and over, so their
+results are kept and returned without running generate() at all.
+
+Key:
+    (model name, model version, prompt token ids, decoding parameters) --
+    the caller passes every parameter that affects the output (max_tokens,
+    response format, ...). Sampled requests are never cached: callers only
+    look up and store requests with temperature 0.
+
+Memory bound:
+    An OrderedDict LRU bounded by the estimated bytes of keys and results
+    (max_memory_mb). Looked-up entries move to the end; the oldest are
+    evicted first.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from triton_metrics import COUNTER, GAUGE, create_metrics
+
+# Rough per-entry overhead (tuples, dict slot, result tuple)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+class GenerationResultCache:
+    """
+    Byte-bounded LRU of generation results (text, token_count).
+
+    Thread safe: used from Triton's execute() thread and the continuous
+    batching engine thread.
+    """
+
+    def __init__(self, model_name: str, model_version: str, max_memory_mb: int = 64,
+                 metrics: "GenerationCacheMetrics" = None):
+        """
+        Args:
+            model_name: Part of every key (and log lines)
+            model_version: Part of every key
+            max_memory_mb: Upper bound on the estimated size of all entries
+            metrics: Optional GenerationCacheMetrics updated on every lookup
+        """
+        self.model_name = model_name
+        self.model_version = str(model_version)
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self.metrics = metrics
+
+        # key -> (result, bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, prompt_ids, **params) -> tuple:
+        """Cache key for a prompt and its decoding parameters."""
+        return (
+            self.model_name,
+            self.model_version,
+            tuple(prompt_ids),
+            tuple(sorted(params.items())),
+        )
+
+    def get(self, key: tuple) -> Optional[Tuple[Any, ...]]:
+        """The cached result for key, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self.metrics is not None:
+            self.metrics.record(entry is not None, self._bytes)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: tuple, result: Tuple[Any, ...]) -> None:
+        """Store a result; evicts least recently used entries over budget."""
+        size = _ENTRY_OVERHEAD_BYTES + 8 * len(key[2]) + sum(_size(part) for part in result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_mb": round(self._bytes / 1024 / 1024, 2),
+            "max_memory_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
+
+
+class GenerationCacheMetrics:
+    """Result cache counters exported through Triton's metrics endpoint (see triton_metrics.py)."""
+
+    def __init__(self, model_name: str, model_version: str):
+        self._metrics = create_metrics(model_name, model_version, {
+            "hits": ("generation_cache_hits_total",
+                     "Greedy requests answered from the generation result cache", COUNTER),
+            "misses": ("generation_cache_misses_total",
+                       "Greedy requests not found in the generation result cache", COUNTER),
+            "bytes": ("generation_cache_bytes",
+                      "Estimated memory held by the generation result cache", GAUGE),
+        })
+
+    def record(self, hit: bool, cache_bytes: int) -> None:
+        if self._metrics is None:
+            return
+        self._metrics["hits" if hit else "misses"].increment(1)
+        self._metrics["bytes"].set(cache_bytes)
+
+
+def create_generation_cache(parameters: dict, name: str, version: str) -> Optional[GenerationResultCache]:
+    """
+    Build the result cache from config.pbtxt parameters.
+
+    Parameters:
+        generation_cache_memory_mb: Cache budget; "0" disables (default "0")
+
+    Returns:
+        The cache, or None when disabled
+    """
+    memory_mb = int(parameters.get("generation_cache_memory_mb", {}).get("string_value", "0"))
+    if memory_mb <= 0:
+        return None
+    print(f"[{name}] Generation result cache (greedy requests): {memory_mb} MB")
+    return GenerationResultCache(
+        name, version, max_memory_mb=memory_mb, metrics=GenerationCacheMetrics(name, version)
+    )
@@ -0,0 +1,172 @@
+"""
+Persistent cache of compiled constrained-decoding grammars for the Triton
+Python backend.
+
+Used by tinyllama-python version 2 (Outlines). Deployed to <base>/shared/
+next to <base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Outlines turns every JSON schema / regex into a finite state machine and
+then indexes it against the whole tokenizer vocabulary (which tokens are
+allowed in which state). That index is the expensive part of building a
+generator -- seconds per schema for a 32k vocabulary -- and it is rebuilt
+on every cold start: Outlines keeps its own disk cache under ~/.cache,
+which is lost whenever the Triton container restarts or a new replica is
+scheduled.
+
+=============================================================================
+HOW
+=============================================================================
+
+Directory per (library, library version, tokenizer):
+    <root>/<library>-<version>/<tokenizer sha256[:16]>/
+    The tokenizer hash covers the vocabulary and special tokens, so a new
+    library release or a different tokenizer never reads another one's
+    indexes. The default root is <base>/cache/grammars on the model
+    repository volume, shared by restarts and replicas.
+
+Library cache:
+    The library writes its compiled indexes into that directory (Outlines:
+    OUTLINES_CACHE_DIR, a diskcache keyed by the schema's regex), so a
+    warm directory skips the vocabulary index entirely.
+
+Manifest:
+    manifest.json records, per schema content hash (sha256 of the canonical
+    JSON of the schema or the regex), the label and compile time of the
+    cold build. compiling() times every build and reports cold vs warm.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from importlib import metadata
+from typing import Any, Optional
+
+# <base>/shared/grammar_cache.py -> <base>
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """sha256 of a Hugging Face tokenizer's vocabulary and special tokens."""
+    digest = hashlib.sha256()
+    digest.update(type(tokenizer).__name__.encode("utf-8"))
+    digest.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode("utf-8"))
+    digest.update(json.dumps(tokenizer.special_tokens_map, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def schema_hash(schema: Any) -> str:
+    """Content hash of a schema (dict / JSON-serialisable) or regex string."""
+    canonical = schema if isinstance(schema, str) else json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class GrammarCache:
+    """Persistent grammar directory for one library version and tokenizer."""
+
+    def __init__(self, root: str, library: str, library_version: str, tokenizer, name: str = "model"):
+        """
+        Args:
+            root: Cache root (shared by restarts and replicas)
+            library: Constrained decoding library (e.g. "outlines")
+            library_version: Its version (part of the directory)
+            tokenizer: Hugging Face tokenizer the grammars are indexed against
+            name: Model name for log lines
+        """
+        self.library = library
+        self.library_version = library_version
+        self.name = name
+        self.tokenizer_hash = tokenizer_fingerprint(tokenizer)
+        self.directory = os.path.join(root, f"{library}-{library_version}", self.tokenizer_hash[:16])
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._manifest_path = os.path.join(self.directory, "manifest.json")
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+
+        # label -> {"seconds": ..., "warm": ...} for this process
+        self.builds = {}
+
+    def is_cached(self, schema: Any) -> bool:
+        """Whether a schema has been compiled into this directory before."""
+        return schema_hash(schema) in self._manifest
+
+    @contextlib.contextmanager
+    def compiling(self, label: str, schema: Any):
+        """
+        Time one generator build and record it in the manifest.
+
+        Args:
+            label: Schema name for log lines and stats
+            schema: The schema (dict) or regex the build compiles
+        """
+        key = schema_hash(schema)
+        warm = key in self._manifest
+        started = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - started
+
+        self.builds[label] = {"seconds": round(seconds, 3), "warm": warm}
+        print(
+            f"[{self.name}] {self.library} grammar {label!r}: {seconds:.2f}s "
+            f"({'warm cache' if warm else 'compiled'})"
+        )
+        if not warm:
+            with self._lock:
+                self._manifest[key] = {"label": label, "compile_seconds": round(seconds, 3)}
+                self._write_manifest()
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "library": f"{self.library}=={self.library_version}",
+            "tokenizer_hash": self.tokenizer_hash[:16],
+            "schemas": len(self._manifest),
+            "builds": dict(self.builds),
+            "total_build_seconds": round(sum(b["seconds"] for b in self.builds.values()), 3),
+        }
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self) -> None:
+        # Atomic replace: replicas may read it while another one writes
+        tmp_path = f"{self._manifest_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path)
+
+
+def create_grammar_cache(parameters: dict, library: str, tokenizer, name: str) -> Optional[GrammarCache]:
+    """
+    Build the grammar cache from config.pbtxt parameters.
+
+    Parameters:
+        grammar_cache: "true" keeps compiled grammars on disk (default "false")
+        grammar_cache_dir: Cache root (default <base>/cache/grammars)
+
+    Returns:
+        The cache, or None when disabled or the directory is not writable
+    """
+    if parameters.get("grammar_cache", {}).get("string_value", "false").lower() != "true":
+        return None
+    root = parameters.get("grammar_cache_dir", {}).get("string_value", "") or os.path.join(
+        BASE_DIR, "cache", "grammars"
+    )
+    try:
+        cache = GrammarCache(root, library, metadata.version(library), tokenizer, name)
+    except OSError as e:
+        print(f"[{name}] Grammar cache disabled, {root} not writable: {e}")
+        return None
+    print(f"[{name}] Grammar cache: {cache.directory} ({len(cache._manifest)} schemas cached)")
+    return cache
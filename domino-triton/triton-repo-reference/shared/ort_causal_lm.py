@@ -0,0 +1,197 @@
+"""
+ONNX Runtime decode loop for causal LMs exported with past key/value
+inputs and outputs (scripts/download/export_smollm_onnx.py).
+
+Used by smollm-135m-python version 2 and
+scripts/benchmarks/benchmark_smollm_ort.py. Deployed to <base>/shared/ next
+to <base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+transformers' generate() runs the model eagerly in PyTorch: every decode
+step dispatches each layer's operators from Python and grows the KV cache
+with torch.cat. For a 135M-parameter model on CPU that per-token overhead
+is a large share of the step. The exported graph runs a whole step as one
+InferenceSession call with ONNX Runtime's fused kernels.
+
+=============================================================================
+HOW
+=============================================================================
+
+Graph (Optimum "text-generation-with-past" export, model.onnx):
+    inputs   input_ids, attention_mask, position_ids,
+             past_key_values.<layer>.key / .value  [batch, kv_heads, past, head_dim]
+    outputs  logits, present.<layer>.key / .value  [batch, kv_heads, past + new, head_dim]
+
+Loop:
+    Prefill runs the prompt against an empty (length 0) past; each decode
+    step then feeds the one new token. Merged exports
+    (decoder_model_merged.onnx) also get use_cache_branch.
+
+IO binding:
+    The present key/value OrtValues of one step are bound as the past
+    inputs of the next, so the cache stays in ONNX Runtime's buffers (no
+    numpy round trip per layer per token). The logits output is copied out
+    whole -- [1, seq, vocab], so prompt_len x vocab floats at prefill and
+    one row per decode step -- and only its last position is sampled.
+
+Session:
+    shared/ort_session.py load_ort_session (threads, graph optimization
+    level, optimized-graph cache from config.pbtxt).
+
+Sampling:
+    Greedy for temperature 0, otherwise temperature + top-p, in numpy.
+    One sequence per generate() call.
+"""
+
+import json
+import os
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ort_session import load_ort_session
+
+_NUMPY_TYPES = {"tensor(float)": np.float32, "tensor(float16)": np.float16}
+
+
+def read_eos_token_ids(model_dir: str) -> List[int]:
+    """End-of-sequence ids from generation_config.json (else config.json)."""
+    for filename in ("generation_config.json", "config.json"):
+        path = os.path.join(model_dir, filename)
+        if not os.path.isfile(path):
+            continue
+        with open(path) as f:
+            eos = json.load(f).get("eos_token_id")
+        if eos is not None:
+            return list(eos) if isinstance(eos, list) else [eos]
+    return []
+
+
+class OrtCausalLM:
+    """Token generation driving an exported with-past graph through IO binding."""
+
+    def __init__(self, model_dir: str, parameters: Optional[dict] = None, name: str = "model",
+                 eos_token_ids: Optional[List[int]] = None, filename: str = "model.onnx"):
+        """
+        Args:
+            model_dir: Exported model directory (model.onnx + config.json)
+            parameters: config.pbtxt parameters (ort_* session options)
+            name: Model name for log lines
+            eos_token_ids: Stop tokens (default: from the model directory)
+            filename: Graph file in model_dir
+        """
+        self.session = load_ort_session(parameters or {}, model_dir, filename, name)
+        inputs = {i.name: i for i in self.session.get_inputs()}
+        self.past_names = [n for n in inputs if n.startswith("past_key_values.")]
+        self.present_names = [n.replace("past_key_values.", "present.") for n in self.past_names]
+        if not self.past_names:
+            raise ValueError(f"{filename} has no past_key_values inputs; export it with past (text-generation-with-past)")
+        self.has_position_ids = "position_ids" in inputs
+        # Merged decoder exports (decoder_model_merged.onnx) select the
+        # with-past branch with an extra boolean input
+        self.has_cache_branch = "use_cache_branch" in inputs
+
+        # [batch, kv_heads, past_sequence_length, head_dim]: heads and head_dim are static
+        past = inputs[self.past_names[0]]
+        self.kv_heads, self.head_dim = int(past.shape[1]), int(past.shape[3])
+        self.kv_dtype = _NUMPY_TYPES.get(past.type, np.float32)
+        if eos_token_ids is None:
+            eos_token_ids = read_eos_token_ids(model_dir)
+        self.eos_token_ids = set(eos_token_ids)
+
+    def _bind_step(self, binding, token_ids: np.ndarray, past_length: int, past) -> list:
+        """
+        Bind one step's inputs and outputs.
+
+        past holds the present OrtValues of the previous step (None at
+        prefill). Returns the new input arrays, which must stay referenced
+        until the run: the binding points at their memory.
+        """
+        import onnxruntime as ort
+
+        length = token_ids.shape[1]
+        arrays = [token_ids, np.ones((1, past_length + length), dtype=np.int64)]
+        binding.bind_cpu_input("input_ids", arrays[0])
+        binding.bind_cpu_input("attention_mask", arrays[1])
+        if self.has_position_ids:
+            arrays.append(np.arange(past_length, past_length + length, dtype=np.int64)[None, :])
+            binding.bind_cpu_input("position_ids", arrays[-1])
+        if self.has_cache_branch:
+            arrays.append(np.array([past is not None]))
+            binding.bind_cpu_input("use_cache_branch", arrays[-1])
+        if past is None:
+            empty = ort.OrtValue.ortvalue_from_numpy(
+                np.zeros((1, self.kv_heads, 0, self.head_dim), dtype=self.kv_dtype)
+            )
+            arrays.append(empty)
+            past = [empty] * len(self.past_names)
+        for name, value in zip(self.past_names, past):
+            binding.bind_ortvalue_input(name, value)
+
+        binding.clear_binding_outputs()
+        binding.bind_output("logits", "cpu")
+        for name in self.present_names:
+            binding.bind_output(name, "cpu")
+        return arrays
+
+    @staticmethod
+    def _sample(logits: np.ndarray, temperature: float, top_p: float, rng) -> int:
+        if temperature <= 0:
+            return int(np.argmax(logits))
+        logits = logits.astype(np.float64) / temperature
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        if 0 < top_p < 1:
+            # Smallest set of tokens whose probability reaches top_p
+            order = np.argsort(-probs)
+            keep = order[: int(np.searchsorted(np.cumsum(probs[order]), top_p)) + 1]
+            mask = np.zeros_like(probs)
+            mask[keep] = 1.0
+            probs = probs * mask
+            probs /= probs.sum()
+        return int(rng.choice(len(probs), p=probs))
+
+    def generate(self, prompt_ids: List[int], max_new_tokens: int, temperature: float = 0.0,
+                 top_p: float = 1.0, on_token: Optional[Callable[[List[int]], None]] = None,
+                 max_length: Optional[int] = None, rng=None) -> List[int]:
+        """
+        Generate up to max_new_tokens after prompt_ids.
+
+        Args:
+            prompt_ids: Prompt token ids
+            max_new_tokens: Generation budget
+            temperature: 0 for greedy decoding
+            top_p: Nucleus sampling threshold (temperature > 0)
+            on_token: Called with all generated ids after every new token
+            max_length: Stop when prompt + generated reaches this many tokens
+            rng: numpy Generator for sampling
+
+        Returns:
+            Generated token ids (the stop token included, as generate() does)
+        """
+        rng = rng or np.random.default_rng()
+        binding = self.session.io_binding()
+        tokens = np.array([prompt_ids], dtype=np.int64)
+        past, past_length, generated = None, 0, []
+
+        while len(generated) < max_new_tokens:
+            if max_length and past_length + tokens.shape[1] >= max_length:
+                break
+            bound = self._bind_step(binding, tokens, past_length, past)  # noqa: F841 (kept alive for the run)
+            self.session.run_with_iobinding(binding)
+            outputs = binding.get_outputs()
+            past_length += tokens.shape[1]
+            past = outputs[1:]  # present.* -> next step's past_key_values.*
+
+            token = self._sample(outputs[0].numpy()[0, -1], temperature, top_p, rng)
+            generated.append(token)
+            if on_token is not None:
+                on_token(generated)
+            if token in self.eos_token_ids:
+                break
+            tokens = np.array([[token]], dtype=np.int64)
+
+        return generated
@@ -0,0 +1,244 @@
+"""
+ONNX Runtime session tuning from config.pbtxt parameters for Optimum
+(ORTModel*) models and plain InferenceSessions on the Triton Python backend.
+
+Used by whisper-tiny-python (load_ort_model) and smollm-135m-python
+version 2 (load_ort_session). Deployed to <base>/shared/ next to
+<base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+ORTModel*.from_pretrained() builds its sessions with default options: one
+intra-op thread per core, sequential execution, full graph optimization
+redone on every load, the CPU memory arena on. On KIND_CPU pods with
+several instances (or a cgroup CPU quota smaller than the node) the
+defaults oversubscribe cores, and the graph optimization time is paid again
+on every model load.
+
+=============================================================================
+HOW
+=============================================================================
+
+Parameters (all optional; unset keeps the ONNX Runtime / Optimum default):
+    ort_provider                execution provider (default CPUExecutionProvider)
+    ort_intra_op_threads        threads inside one operator ("0" = default)
+    ort_inter_op_threads        threads across operators (parallel mode)
+    ort_graph_optimization_level  disable | basic | extended | all
+    ort_execution_mode          sequential | parallel
+    ort_enable_cpu_mem_arena    "true" / "false"
+    ort_enable_mem_pattern      "true" / "false"
+    ort_use_io_binding          "true" / "false" (Optimum default: CUDA only)
+    ort_optimized_model_cache   "true" saves the optimized graphs once
+    ort_optimized_model_dir     cache root (default <weights>/ort_optimized)
+
+Optimized model cache:
+    Every .onnx file of the model is loaded once with the configured
+    optimization level and optimized_model_filepath, into
+    <root>/<onnxruntime version>-<level>-<provider>/ next to copies of the
+    other model files (config.json, generation_config.json, ...). Later loads
+    read the optimized graphs with optimization disabled. Optimized graphs
+    can be hardware specific (ONNX Runtime docs), hence the provider and
+    version in the directory; "all" should only be cached on the hardware
+    that serves it. Creation is serialized with a file lock and the
+    directory is renamed into place when complete.
+"""
+
+import fcntl
+import os
+import shutil
+from typing import Optional, Tuple
+
+import onnxruntime as ort
+
+_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+_EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def _param(parameters: dict, key: str, default: str = "") -> str:
+    return parameters.get(key, {}).get("string_value", default).strip().lower()
+
+
+def _flag(parameters: dict, key: str) -> Optional[bool]:
+    """A "true"/"false" parameter, None when unset."""
+    value = _param(parameters, key)
+    if not value:
+        return None
+    return value == "true"
+
+
+def create_session_options(parameters: dict) -> Tuple[ort.SessionOptions, dict]:
+    """
+    SessionOptions from config.pbtxt parameters.
+
+    Returns:
+        Tuple of (options, {parameter: value} of the settings applied)
+    """
+    options = ort.SessionOptions()
+    applied = {}
+
+    for key, attribute in (("ort_intra_op_threads", "intra_op_num_threads"),
+                           ("ort_inter_op_threads", "inter_op_num_threads")):
+        value = _param(parameters, key)
+        if value:
+            setattr(options, attribute, int(value))
+            applied[key] = int(value)
+
+    level = _param(parameters, "ort_graph_optimization_level")
+    if level:
+        if level not in _OPTIMIZATION_LEVELS:
+            raise ValueError(f"ort_graph_optimization_level must be one of {list(_OPTIMIZATION_LEVELS)}, got {level!r}")
+        options.graph_optimization_level = _OPTIMIZATION_LEVELS[level]
+        applied["ort_graph_optimization_level"] = level
+
+    mode = _param(parameters, "ort_execution_mode")
+    if mode:
+        if mode not in _EXECUTION_MODES:
+            raise ValueError(f"ort_execution_mode must be one of {list(_EXECUTION_MODES)}, got {mode!r}")
+        options.execution_mode = _EXECUTION_MODES[mode]
+        applied["ort_execution_mode"] = mode
+
+    for key, attribute in (("ort_enable_cpu_mem_arena", "enable_cpu_mem_arena"),
+                           ("ort_enable_mem_pattern", "enable_mem_pattern")):
+        value = _flag(parameters, key)
+        if value is not None:
+            setattr(options, attribute, value)
+            applied[key] = value
+
+    return options, applied
+
+
+def _optimization_label(options: ort.SessionOptions) -> str:
+    for label, level in _OPTIMIZATION_LEVELS.items():
+        if options.graph_optimization_level == level:
+            return label
+    return str(options.graph_optimization_level)
+
+
+def optimized_model_dir(model_dir: str, cache_root: str, options: ort.SessionOptions,
+                        provider: str, name: str = "model") -> str:
+    """
+    Directory holding the model with every .onnx graph already optimized.
+
+    Args:
+        model_dir: Exported Optimum model (config.json + *.onnx)
+        cache_root: Cache root; one subdirectory per version / level / provider
+        options: Session options whose optimization level is applied
+        provider: Execution provider the graphs are optimized for
+        name: Model name for log lines
+
+    Returns:
+        The cache directory (written on first use)
+    """
+    cache_dir = os.path.join(
+        cache_root, f"{ort.__version__}-{_optimization_label(options)}-{provider}"
+    )
+    if os.path.isfile(os.path.join(cache_dir, "config.json")):
+        return cache_dir
+
+    os.makedirs(cache_root, exist_ok=True)
+    with open(cache_dir + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Another instance may have written it while we waited
+            if os.path.isfile(os.path.join(cache_dir, "config.json")):
+                return cache_dir
+            print(f"[{name}] Writing optimized ONNX graphs to {cache_dir}")
+            staging = f"{cache_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            for entry in sorted(os.listdir(model_dir)):
+                source = os.path.join(model_dir, entry)
+                if not os.path.isfile(source):
+                    continue
+                if entry.endswith(".onnx"):
+                    session_options = _copy_options(options)
+                    session_options.optimized_model_filepath = os.path.join(staging, entry)
+                    ort.InferenceSession(source, sess_options=session_options, providers=[provider])
+                elif not entry.endswith(".onnx_data"):
+                    shutil.copy2(source, os.path.join(staging, entry))
+            # config.json marks the directory complete: it only appears with the rename
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.rename(staging, cache_dir)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return cache_dir
+
+
+def _copy_options(options: ort.SessionOptions) -> ort.SessionOptions:
+    copy = ort.SessionOptions()
+    for attribute in ("intra_op_num_threads", "inter_op_num_threads", "graph_optimization_level",
+                      "execution_mode", "enable_cpu_mem_arena", "enable_mem_pattern"):
+        setattr(copy, attribute, getattr(options, attribute))
+    return copy
+
+
+def _resolve(parameters: dict, model_path: str, name: str):
+    """Provider, session options and (optimized-graph cache) model path from parameters."""
+    provider = parameters.get("ort_provider", {}).get("string_value", "") or "CPUExecutionProvider"
+    options, applied = create_session_options(parameters)
+
+    if _flag(parameters, "ort_optimized_model_cache") and os.path.isdir(model_path):
+        root = parameters.get("ort_optimized_model_dir", {}).get("string_value", "") or os.path.join(
+            model_path, "ort_optimized"
+        )
+        try:
+            model_path = optimized_model_dir(model_path, root, options, provider, name)
+            # Already optimized: skip graph optimization on load
+            options = _copy_options(options)
+            options.graph_optimization_level = _OPTIMIZATION_LEVELS["disable"]
+            applied["ort_optimized_model_dir"] = model_path
+        except Exception as e:
+            print(f"[{name}] Optimized model cache unavailable ({e}); optimizing on load")
+
+    return provider, options, model_path, applied
+
+
+def load_ort_model(model_class, parameters: dict, model_path: str, name: str):
+    """
+    Load an Optimum ORTModel with session options from config.pbtxt parameters.
+
+    Args:
+        model_class: ORTModel* class (e.g. ORTModelForSpeechSeq2Seq)
+        parameters: config.pbtxt parameters
+        model_path: Exported model directory or Hugging Face id
+        name: Model name for log lines
+
+    Returns:
+        The model
+    """
+    provider, options, model_path, applied = _resolve(parameters, model_path, name)
+    kwargs = {"provider": provider, "session_options": options}
+    io_binding = _flag(parameters, "ort_use_io_binding")
+    if io_binding is not None:
+        kwargs["use_io_binding"] = io_binding
+        applied["ort_use_io_binding"] = io_binding
+
+    print(f"[{name}] ONNX Runtime {ort.__version__} on {provider}, session options: {applied or 'defaults'}")
+    return model_class.from_pretrained(model_path, **kwargs)
+
+
+def load_ort_session(parameters: dict, model_dir: str, filename: str, name: str) -> ort.InferenceSession:
+    """
+    An InferenceSession for one graph of an exported model directory, with
+    session options (and the optimized-graph cache) from config.pbtxt parameters.
+
+    Args:
+        parameters: config.pbtxt parameters
+        model_dir: Exported model directory (config.json + *.onnx)
+        filename: Graph to load, e.g. "model.onnx"
+        name: Model name for log lines
+    """
+    provider, options, model_dir, applied = _resolve(parameters, model_dir, name)
+    print(f"[{name}] ONNX Runtime {ort.__version__} on {provider}, session options: {applied or 'defaults'}")
+    return ort.InferenceSession(os.path.join(model_dir, filename), sess_options=options, providers=[provider])
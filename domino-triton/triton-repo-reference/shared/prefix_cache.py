@@ -0,0 +1,254 @@
+"""
+Shared-prefix KV cache for Hugging Face causal LMs on the Triton Python
+backend.
+
+Shared by the Python backend LLMs (tinyllama-python, smollm-135m-python).
+Deployed to <base>/shared/ next to <base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Every request of a chat model starts with the same tokens: the chat
+template, a system prompt, JSON-mode instructions. Their keys and values
+do not depend on what follows (attention is causal), yet prefill recomputes
+them for every request. This cache keeps them and lets prefill start at
+the first token it has not seen before.
+
+=============================================================================
+HOW
+=============================================================================
+
+Blocks:
+    A prompt is split into blocks of block_size tokens. Each full block is
+    keyed by a hash of its tokens chained with the previous block's key, so
+    a key identifies the whole prefix up to the end of that block (as in
+    vLLM's automatic prefix caching). An entry holds that block's slice of
+    past_key_values only; prefixes that share blocks share entries.
+
+Lookup:
+    Walk the prompt's blocks until the first miss, and concatenate the hit
+    blocks' keys/values along the sequence dimension. At least one prompt
+    token is always left uncached: its logits start generation.
+
+Memory bound:
+    Entries live in an LRU (OrderedDict) bounded by max_memory_mb. A lookup
+    refreshes every block it used; eviction drops least recently used
+    blocks first (a child whose parent was evicted can no longer be reached
+    and ages out the same way).
+
+Only unpadded single-sequence prefills can use it (left padding shifts a
+prefix to a different position per row): the continuous batching engine's
+prefill, and generate() calls for a single prompt.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from triton_metrics import COUNTER, GAUGE, create_metrics
+
+
+class PrefixKVCache:
+    """
+    LRU of past_key_values blocks keyed by chained token-block hashes.
+
+    Thread safe: used from Triton's execute() thread and the continuous
+    batching engine thread.
+    """
+
+    def __init__(self, max_memory_mb: int = 256, block_size: int = 32, name: str = "model",
+                 metrics: "PrefixCacheMetrics" = None):
+        """
+        Args:
+            max_memory_mb: Upper bound on the cached keys/values
+            block_size: Tokens per block (the reuse granularity)
+            name: Model name for log lines
+            metrics: Optional PrefixCacheMetrics updated on every lookup
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self.block_size = block_size
+        self.name = name
+        self.metrics = metrics
+
+        # key -> (block tokens, per-layer [(key, value)] slices, bytes)
+        self._blocks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.prompt_tokens = 0
+        self.saved_prefill_tokens = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def lookup(self, token_ids: List[int]) -> Tuple[int, Optional[tuple]]:
+        """
+        Longest cached prefix of a prompt.
+
+        Args:
+            token_ids: Prompt token ids
+
+        Returns:
+            (cached_tokens, past) -- past is a legacy cache (tuple of
+            (key, value) per layer, [1, kv_heads, cached_tokens, head_dim])
+            or None when nothing is cached
+        """
+        usable = (len(token_ids) - 1) // self.block_size
+        found = []
+        with self._lock:
+            for key, block in self._block_keys(token_ids, usable):
+                entry = self._blocks.get(key)
+                if entry is None or entry[0] != block:
+                    break
+                self._blocks.move_to_end(key)
+                found.append(entry[1])
+
+            cached = len(found) * self.block_size
+            self.lookups += 1
+            self.prompt_tokens += len(token_ids)
+            if cached:
+                self.hits += 1
+                self.saved_prefill_tokens += cached
+
+        if self.metrics is not None:
+            self.metrics.record(len(token_ids), cached, self._bytes)
+        if not found:
+            return 0, None
+
+        import torch
+        past = tuple(
+            (
+                torch.cat([layers[layer][0] for layers in found], dim=2),
+                torch.cat([layers[layer][1] for layers in found], dim=2),
+            )
+            for layer in range(len(found[0]))
+        )
+        return cached, past
+
+    def insert(self, token_ids: List[int], past) -> None:
+        """
+        Store the full blocks of a prompt that are not cached yet.
+
+        Args:
+            token_ids: Prompt token ids
+            past: Cache covering at least the prompt (legacy tuple or a
+                  Cache object with to_legacy_cache), batch size 1
+        """
+        if hasattr(past, "to_legacy_cache"):
+            past = past.to_legacy_cache()
+        if not past:
+            return
+        num_blocks = min(len(token_ids), past[0][0].shape[2]) // self.block_size
+
+        with self._lock:
+            for index, (key, block) in enumerate(self._block_keys(token_ids, num_blocks)):
+                if key in self._blocks:
+                    self._blocks.move_to_end(key)
+                    continue
+                start, end = index * self.block_size, (index + 1) * self.block_size
+                layers = [
+                    (k[:, :, start:end].clone(), v[:, :, start:end].clone())
+                    for k, v in past
+                ]
+                size = sum(
+                    k.numel() * k.element_size() + v.numel() * v.element_size()
+                    for k, v in layers
+                )
+                if size > self.max_bytes:
+                    return
+                self._blocks[key] = (block, layers, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._blocks.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "blocks": len(self._blocks),
+            "block_size": self.block_size,
+            "memory_mb": round(self._bytes / 1024 / 1024, 2),
+            "max_memory_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "saved_prefill_tokens": self.saved_prefill_tokens,
+            "evictions": self.evictions,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _block_keys(self, token_ids: List[int], num_blocks: int):
+        """(chained key, block tokens) for the first num_blocks full blocks."""
+        parent = None
+        for index in range(num_blocks):
+            block = tuple(token_ids[index * self.block_size:(index + 1) * self.block_size])
+            parent = hash((parent, block))
+            yield parent, block
+
+
+class PrefixCacheMetrics:
+    """
+    Prefix cache counters exported through Triton's metrics endpoint
+    (see triton_metrics.py). The hit rate is hits / lookups, the prefill
+    saving saved_prefill_tokens / prompt_tokens.
+    """
+
+    def __init__(self, model_name: str, model_version: str):
+        self._metrics = create_metrics(model_name, model_version, {
+            "lookups": ("prefix_cache_lookups_total", "Prefix cache lookups", COUNTER),
+            "hits": ("prefix_cache_hits_total", "Prefix cache lookups that reused a cached prefix", COUNTER),
+            "prompt_tokens": ("prefix_cache_prompt_tokens_total", "Prompt tokens looked up in the prefix cache",
+                              COUNTER),
+            "saved": ("prefix_cache_saved_prefill_tokens_total", "Prompt tokens whose prefill was skipped", COUNTER),
+            "bytes": ("prefix_cache_bytes", "Memory held by the prefix cache", GAUGE),
+        })
+
+    def record(self, prompt_tokens: int, cached_tokens: int, cache_bytes: int) -> None:
+        if self._metrics is None:
+            return
+        self._metrics["lookups"].increment(1)
+        self._metrics["prompt_tokens"].increment(prompt_tokens)
+        if cached_tokens:
+            self._metrics["hits"].increment(1)
+            self._metrics["saved"].increment(cached_tokens)
+        self._metrics["bytes"].set(cache_bytes)
+
+
+def create_prefix_cache(parameters: dict, name: str, version: str) -> Optional[PrefixKVCache]:
+    """
+    Build the prefix cache from config.pbtxt parameters.
+
+    Parameters:
+        prefix_cache_memory_mb: Cache budget; "0" disables (default "0")
+        prefix_cache_block_size: Tokens per block (default "32")
+
+    Returns:
+        The cache, or None when disabled
+    """
+    memory_mb = int(parameters.get("prefix_cache_memory_mb", {}).get("string_value", "0"))
+    if memory_mb <= 0:
+        return None
+    block_size = int(parameters.get("prefix_cache_block_size", {}).get("string_value", "32"))
+    print(f"[{name}] Prefix KV cache: {memory_mb} MB, {block_size}-token blocks")
+    return PrefixKVCache(
+        max_memory_mb=memory_mb,
+        block_size=block_size,
+        name=name,
+        metrics=PrefixCacheMetrics(name, version),
+    )
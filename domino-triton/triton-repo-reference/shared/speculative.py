@@ -0,0 +1,312 @@
+"""
+Greedy speculative decoding for Hugging Face causal LMs on the Triton
+Python backend.
+
+Used by tinyllama-python (version 1) with a small draft model such as
+SmolLM-135M-Instruct. Deployed to <base>/shared/ next to <base>/models/.
+
+=============================================================================
+HOW
+=============================================================================
+
+Each round:
+    1. The draft model proposes up to num_draft_tokens tokens greedily
+       (cheap: a 135M model, one token per forward pass)
+    2. The target model scores [last committed token, proposals...] in ONE
+       forward pass, giving its own next-token logits at every position
+    3. Walking the positions in order, the target's choice (argmax, after
+       the optional constraint mask) is committed; while it equals the
+       proposal the walk continues, on the first mismatch the target's
+       token replaces the proposal and the round ends. If every proposal
+       matches, the target's token after the last one is a bonus token.
+
+Every committed token is the target's own greedy choice, so the output is
+identical to plain greedy decoding of the target -- the draft only decides
+how many tokens one target forward pass yields. The KV caches of both
+models are cropped back to the committed tokens after each round.
+
+Constraints:
+    A constraint (apply(scores) / advance(token_id) -> done, as used by the
+    continuous batching engine) is applied to the target logits of every
+    verified position and advanced only by committed tokens, so constrained
+    output is also unchanged. The draft runs unconstrained: proposals the
+    constraint forbids are simply rejected.
+
+Vocabularies:
+    With the same tokenizer vocabulary, proposals are target token ids.
+    Otherwise (SmolLM's BPE vs TinyLlama's SentencePiece) proposals are
+    mapped through text: the draft's proposed text is re-encoded with the
+    target tokenizer after a short window of committed text (so word
+    boundaries tokenize as they would in context), and after each round
+    the committed text is re-encoded for the draft. A mapping that does not
+    line up only lowers the acceptance rate, never changes the output.
+
+Only greedy (temperature 0) decoding of one sequence is supported.
+"""
+
+import threading
+import time
+from typing import List
+
+import torch
+
+try:
+    from transformers import DynamicCache
+except ImportError:  # older transformers: models take legacy tuples
+    DynamicCache = None
+
+from triton_metrics import COUNTER, create_metrics
+
+# Committed target tokens re-decoded as context when mapping draft text
+_CONTEXT_TOKENS = 8
+
+
+class SpeculativeDecoder:
+    """Draft-and-verify greedy generation with a small draft model."""
+
+    def __init__(self, target, target_tokenizer, draft, draft_tokenizer,
+                 num_draft_tokens: int = 4, name: str = "model", metrics: "SpeculativeMetrics" = None):
+        """
+        Args:
+            target: Target AutoModelForCausalLM (eval mode, on its device)
+            target_tokenizer: Its tokenizer
+            draft: Draft AutoModelForCausalLM (eval mode, same device)
+            draft_tokenizer: Its tokenizer
+            num_draft_tokens: Tokens proposed per round (k)
+            name: Model name for log lines
+            metrics: Optional SpeculativeMetrics updated per generation
+        """
+        self.target = target
+        self.target_tokenizer = target_tokenizer
+        self.draft = draft
+        self.draft_tokenizer = draft_tokenizer
+        self.num_draft_tokens = max(1, num_draft_tokens)
+        self.name = name
+        self.metrics = metrics
+        self.device = next(target.parameters()).device
+        self.same_vocab = target_tokenizer.get_vocab() == draft_tokenizer.get_vocab()
+
+        self._lock = threading.Lock()
+        self.generations = 0
+        self.proposed_tokens = 0
+        self.accepted_tokens = 0
+        self.generated_tokens = 0
+        self.target_forward_passes = 0
+        self.generation_secs = 0.0
+
+        print(
+            f"[{self.name}] Speculative decoding: k={self.num_draft_tokens}, "
+            f"{'shared vocabulary' if self.same_vocab else 'vocabulary mapped through text'}"
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @torch.no_grad()
+    def generate(self, prompt_ids: List[int], max_new_tokens: int, draft_prompt_ids: List[int] = None,
+                 constraint=None) -> List[int]:
+        """
+        Greedy generation of one sequence.
+
+        Args:
+            prompt_ids: Target-tokenized prompt
+            max_new_tokens: Upper bound on generated tokens
+            draft_prompt_ids: Draft-tokenized prompt (required when the
+                              vocabularies differ; defaults to prompt_ids)
+            constraint: Optional constraint applied to the target logits
+
+        Returns:
+            Generated target token ids (up to and including EOS)
+        """
+        started = time.perf_counter()
+        eos = self.target_tokenizer.eos_token_id
+        draft_prompt_ids = list(draft_prompt_ids if draft_prompt_ids is not None else prompt_ids)
+
+        generated: List[int] = []
+        proposed = accepted = passes = 0
+
+        # Invariant: each cache covers its sequence except the last token
+        target_past = self._forward(self.target, prompt_ids[:-1], None)[1] if len(prompt_ids) > 1 else None
+        draft_ids = list(draft_prompt_ids)
+        draft_cached: List[int] = []
+        draft_past = None
+
+        done = False
+        while not done and len(generated) < max_new_tokens:
+            # 1. Draft proposals (in target token ids)
+            room = max_new_tokens - len(generated) - 1
+            draft_ids, draft_cached, draft_past, candidates = self._propose(
+                draft_ids, draft_cached, draft_past, min(self.num_draft_tokens, room), generated
+            )
+
+            # 2. One target pass over the last committed token + proposals
+            last = generated[-1] if generated else prompt_ids[-1]
+            logits, target_past = self._forward(self.target, [last] + candidates, target_past)
+            passes += 1
+            proposed += len(candidates)
+
+            # 3. Commit the target's choices up to the first mismatch
+            committed_before = len(generated)
+            for position in range(len(candidates) + 1):
+                scores = logits[position]
+                if constraint is not None:
+                    scores = constraint.apply(scores)
+                token = int(torch.argmax(scores))
+                generated.append(token)
+                if constraint is not None and constraint.advance(token):
+                    done = True
+                if token == eos or len(generated) >= max_new_tokens:
+                    done = True
+                if done or position == len(candidates) or token != candidates[position]:
+                    break
+                accepted += 1
+
+            # Keep the cache for the committed tokens except the newest one
+            keep = len(prompt_ids) + len(generated) - 1
+            target_past = _crop(target_past, keep)
+            if not self.same_vocab and len(generated) > committed_before:
+                draft_ids = draft_prompt_ids + self._to_draft(generated)
+            elif self.same_vocab:
+                draft_ids = draft_prompt_ids + generated
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.generations += 1
+            self.proposed_tokens += proposed
+            self.accepted_tokens += accepted
+            self.generated_tokens += len(generated)
+            self.target_forward_passes += passes
+            self.generation_secs += elapsed
+        if self.metrics is not None:
+            self.metrics.record(proposed, accepted, len(generated), elapsed)
+        return generated
+
+    def stats(self) -> dict:
+        return {
+            "num_draft_tokens": self.num_draft_tokens,
+            "same_vocab": self.same_vocab,
+            "generations": self.generations,
+            "proposed_tokens": self.proposed_tokens,
+            "accepted_tokens": self.accepted_tokens,
+            "acceptance_rate": round(self.accepted_tokens / self.proposed_tokens, 4)
+            if self.proposed_tokens else 0.0,
+            "generated_tokens": self.generated_tokens,
+            "tokens_per_target_pass": round(self.generated_tokens / self.target_forward_passes, 3)
+            if self.target_forward_passes else 0.0,
+            "tokens_per_sec": round(self.generated_tokens / self.generation_secs, 2)
+            if self.generation_secs else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _forward(self, model, token_ids: List[int], past):
+        """Run tokens after a cache; returns (logits [n, vocab], new cache)."""
+        input_ids = torch.tensor([token_ids], dtype=torch.long, device=self.device)
+        outputs = model(
+            input_ids=input_ids,
+            past_key_values=_model_cache(past) if past is not None else None,
+            use_cache=True,
+        )
+        return outputs.logits[0], _legacy_cache(outputs.past_key_values)
+
+    def _propose(self, draft_ids, draft_cached, draft_past, count, generated):
+        """
+        Greedy draft tokens after draft_ids, mapped to target token ids.
+
+        Returns:
+            (draft_ids, draft_cached, draft_past, candidates) -- the draft
+            sequence and its cache state, ready for the next round
+        """
+        if count < 1:
+            return draft_ids, draft_cached, draft_past, []
+
+        # Reuse the draft cache for the unchanged prefix of its sequence
+        common = 0
+        limit = min(len(draft_cached), len(draft_ids) - 1)
+        while common < limit and draft_cached[common] == draft_ids[common]:
+            common += 1
+        draft_past = _crop(draft_past, common) if common else None
+        draft_cached = draft_ids[:common]
+
+        proposals = []
+        pending = draft_ids[common:]
+        draft_eos = self.draft_tokenizer.eos_token_id
+        for _ in range(count):
+            logits, draft_past = self._forward(self.draft, pending, draft_past)
+            draft_cached = draft_cached + pending
+            token = int(torch.argmax(logits[-1]))
+            if token == draft_eos:
+                break
+            proposals.append(token)
+            pending = [token]
+
+        # draft_cached now covers draft_ids + proposals[:-1]; the next round
+        # crops it back to what was actually committed
+        if self.same_vocab:
+            return draft_ids, draft_cached, draft_past, proposals
+        return draft_ids, draft_cached, draft_past, self._to_target(proposals, generated, count)
+
+    def _to_target(self, proposals: List[int], generated: List[int], count: int) -> List[int]:
+        """Draft proposal ids -> target ids, tokenized after committed context."""
+        if not proposals:
+            return []
+        text = self.draft_tokenizer.decode(proposals, skip_special_tokens=True)
+        context = self.target_tokenizer.decode(generated[-_CONTEXT_TOKENS:], skip_special_tokens=True)
+        context_ids = self.target_tokenizer.encode(context, add_special_tokens=False)
+        full_ids = self.target_tokenizer.encode(context + text, add_special_tokens=False)
+        if full_ids[:len(context_ids)] != context_ids:
+            return []  # boundary re-tokenized differently; skip speculation this round
+        return full_ids[len(context_ids):][:count]
+
+    def _to_draft(self, generated: List[int]) -> List[int]:
+        """Committed target tokens -> draft ids (re-encoded as text)."""
+        text = self.target_tokenizer.decode(generated, skip_special_tokens=True)
+        return self.draft_tokenizer.encode(text, add_special_tokens=False)
+
+
+class SpeculativeMetrics:
+    """
+    Speculative decoding counters exported through Triton's metrics endpoint
+    (see triton_metrics.py). Acceptance rate is accepted / proposed draft
+    tokens; tokens/s is generated tokens / generation seconds.
+    """
+
+    def __init__(self, model_name: str, model_version: str):
+        self._metrics = create_metrics(model_name, model_version, {
+            "proposed": ("speculative_proposed_tokens_total", "Draft tokens proposed", COUNTER),
+            "accepted": ("speculative_accepted_tokens_total", "Draft tokens accepted by the target", COUNTER),
+            "generated": ("speculative_generated_tokens_total", "Tokens generated with speculation", COUNTER),
+            "secs": ("speculative_generation_seconds_total", "Time spent in speculative generation", COUNTER),
+        })
+
+    def record(self, proposed: int, accepted: int, generated: int, secs: float) -> None:
+        if self._metrics is None:
+            return
+        self._metrics["proposed"].increment(proposed)
+        self._metrics["accepted"].increment(accepted)
+        self._metrics["generated"].increment(generated)
+        self._metrics["secs"].increment(secs)
+
+
+def _legacy_cache(past):
+    """Tuple-of-(key, value)-per-layer view of a model's returned cache."""
+    if hasattr(past, "to_legacy_cache"):
+        return past.to_legacy_cache()
+    return past
+
+
+def _model_cache(legacy):
+    """Cache object the model accepts as past_key_values."""
+    if DynamicCache is not None:
+        return DynamicCache.from_legacy_cache(legacy)
+    return legacy
+
+
+def _crop(past, length: int):
+    """Keep the first length positions of a legacy cache."""
+    if past is None:
+        return None
+    return tuple((k[:, :, :length], v[:, :, :length]) for k, v in past)
@@ -0,0 +1,55 @@
+"""
+Incremental detokenization for token streaming on the Triton Python backend.
+
+Used by tinyllama-python and smollm-135m-python (versions 1 and 2) when a
+request sets stream=true. Deployed to <base>/shared/ next to <base>/models/.
+No torch dependency, so the ONNX Runtime version can stream without it.
+"""
+
+import threading
+from typing import List
+
+
+class TextDeltaDecoder:
+    """
+    Incremental detokenizer for streaming: token ids in, new text out.
+
+    Decoding token by token breaks on multi-token characters and on
+    tokenizers that merge leading spaces, and decoding the whole output on
+    every token is O(n). This keeps two offsets into the ids (the same
+    approach as text-generation-inference) and only decodes the short window
+    since the last emitted text, holding text back while it ends in an
+    incomplete character (U+FFFD).
+    """
+
+    def __init__(self, tokenizer, lock=None):
+        """
+        Args:
+            tokenizer: Hugging Face tokenizer
+            lock: Optional lock serializing tokenizer use across threads
+        """
+        self.tokenizer = tokenizer
+        self.lock = lock or threading.Lock()
+        self.prefix_offset = 0
+        self.read_offset = 0
+
+    def _decode(self, ids: List[int]) -> str:
+        with self.lock:
+            return self.tokenizer.decode(ids, skip_special_tokens=True)
+
+    def push(self, token_ids: List[int]) -> str:
+        """Text added by the tokens since the last call ("" if none yet)."""
+        prefix_text = self._decode(token_ids[self.prefix_offset:self.read_offset])
+        new_text = self._decode(token_ids[self.prefix_offset:])
+        if len(new_text) > len(prefix_text) and not new_text.endswith("\ufffd"):
+            self.prefix_offset = self.read_offset
+            self.read_offset = len(token_ids)
+            return new_text[len(prefix_text):]
+        return ""
+
+    def flush(self, token_ids: List[int]) -> str:
+        """Any text still held back, once generation has finished."""
+        prefix_text = self._decode(token_ids[self.prefix_offset:self.read_offset])
+        new_text = self._decode(token_ids[self.prefix_offset:])
+        self.prefix_offset = self.read_offset = len(token_ids)
+        return new_text[len(prefix_text):]
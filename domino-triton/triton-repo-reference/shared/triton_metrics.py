@@ -0,0 +1,44 @@
+"""
+Custom Triton metrics for the shared Python backend modules.
+
+Used by prefix_cache.py, generation_cache.py and speculative.py.
+Deployed to <base>/shared/ next to <base>/models/.
+
+Metrics are created through the Python backend's custom metrics API
+(pb_utils.MetricFamily, Triton 23.05+) and labelled by model and version.
+On older servers -- or outside Triton -- create_metrics() returns None and
+the callers skip recording.
+"""
+
+from typing import Dict, Optional, Tuple
+
+COUNTER = "counter"
+GAUGE = "gauge"
+
+
+def create_metrics(model_name: str, model_version: str,
+                   families: Dict[str, Tuple[str, str, str]]) -> Optional[Dict[str, object]]:
+    """
+    Create one labelled metric per family.
+
+    Args:
+        model_name: Value of the "model" label
+        model_version: Value of the "version" label
+        families: key -> (metric name, description, COUNTER or GAUGE)
+
+    Returns:
+        key -> pb_utils metric (increment() / set()), or None when the
+        custom metrics API is unavailable
+    """
+    try:
+        import triton_python_backend_utils as pb_utils
+
+        labels = {"model": model_name, "version": str(model_version)}
+        kinds = {COUNTER: pb_utils.MetricFamily.COUNTER, GAUGE: pb_utils.MetricFamily.GAUGE}
+        return {
+            key: pb_utils.MetricFamily(name=name, description=description, kind=kinds[kind]).Metric(labels=labels)
+            for key, (name, description, kind) in families.items()
+        }
+    except Exception as e:
+        print(f"[{model_name}] Custom metrics unavailable: {e}")
+        return None
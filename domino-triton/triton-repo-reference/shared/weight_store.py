@@ -0,0 +1,233 @@
+"""
+Shared weight store for Hugging Face causal LMs on the Triton Python
+backend.
+
+Used by the versions of tinyllama-python. Deployed to <base>/shared/ next to
+<base>/models/ and <base>/weights/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Triton runs every loaded model version in its own Python backend stub
+process. Versions 1-6 of tinyllama-python serve the same TinyLlama weights,
+but from_pretrained() reads and converts the checkpoint into private memory
+in each process: loading all versions for comparison (as
+tinyllama_json_client.py --test-all-versions does) holds one copy per version
+(~4.4 GB each in float32) and pays the load time each time.
+
+=============================================================================
+HOW
+=============================================================================
+
+Store:
+    The first version to load writes the model once, in the serving dtype,
+    as a single safetensors file under <base>/weights/<model>/shared/<dtype>/
+    (next to its config.json). Creation is serialized with a file lock and
+    the directory is renamed into place only when complete, so versions
+    loading at the same time wait for one writer.
+
+View:
+    Every version maps that file (torch.UntypedStorage.from_file, a private
+    mapping) and each parameter is a view into the mapping -- nothing is
+    read or copied. Mapped file pages live in the OS page cache, so all
+    processes mapping the store share one physical copy; a page would only
+    be duplicated if a process wrote to a weight, which inference never does.
+
+Model:
+    The module tree is built with meta (empty) parameters and the views are
+    assigned with load_state_dict(assign=True), torch 2.1+. Buffers (rotary
+    inv_freq) are created normally.
+
+On GPU the weights are copied to the device by each process (device memory
+is not shared); host memory and load time are still saved. Anything that
+prevents using the store (read-only weights volume, old torch) falls back
+to a private from_pretrained() load.
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import struct
+from typing import Dict
+
+import torch
+
+# <base>/shared/weight_store.py -> <base>
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WEIGHTS_FILE = "model.safetensors"
+
+# safetensors header dtype -> torch dtype
+_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+class SharedWeightStore:
+    """One model, in one dtype, stored once and memory-mapped by every process."""
+
+    def __init__(self, store_dir: str, name: str = "model"):
+        """
+        Args:
+            store_dir: Directory holding config.json and model.safetensors
+            name: Model name for log lines
+        """
+        self.store_dir = store_dir
+        self.name = name
+
+    @property
+    def weights_path(self) -> str:
+        return os.path.join(self.store_dir, WEIGHTS_FILE)
+
+    def ensure(self, model_id: str, dtype: torch.dtype) -> None:
+        """Write the store from model_id unless it exists (one writer at a time)."""
+        if os.path.isfile(self.weights_path):
+            return
+        os.makedirs(os.path.dirname(self.store_dir), exist_ok=True)
+        with open(self.store_dir + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another version may have written it while we waited
+                if os.path.isfile(self.weights_path):
+                    return
+                from transformers import AutoModelForCausalLM
+
+                print(f"[{self.name}] Writing shared weight store {self.store_dir} from {model_id}")
+                staging = f"{self.store_dir}.tmp-{os.getpid()}"
+                shutil.rmtree(staging, ignore_errors=True)
+                model = AutoModelForCausalLM.from_pretrained(
+                    model_id, torch_dtype=dtype, low_cpu_mem_usage=True
+                )
+                # One file, so a single mapping covers every tensor
+                model.save_pretrained(staging, safe_serialization=True, max_shard_size="1000GB")
+                del model
+                shutil.rmtree(self.store_dir, ignore_errors=True)
+                os.rename(staging, self.store_dir)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self, model_id: str, dtype: torch.dtype):
+        """
+        The model with every parameter mapped from the store.
+
+        Args:
+            model_id: Hugging Face id the store is written from if missing
+            dtype: Serving dtype (the store holds exactly this dtype)
+
+        Returns:
+            The model on CPU, in eval mode
+        """
+        from transformers import AutoConfig, AutoModelForCausalLM
+
+        self.ensure(model_id, dtype)
+        config = AutoConfig.from_pretrained(self.store_dir)
+        state = map_safetensors(self.weights_path)
+        with _meta_parameters():
+            model = AutoModelForCausalLM.from_config(config, torch_dtype=dtype)
+        model.load_state_dict(state, strict=False, assign=True)
+        # save_pretrained drops tied copies (e.g. lm_head = embed_tokens)
+        model.tie_weights()
+
+        missing = [name for name, param in model.named_parameters() if param.is_meta]
+        if missing:
+            raise RuntimeError(f"{self.weights_path} has no weights for {missing[:5]}")
+        return model.eval()
+
+
+def map_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Tensors of a safetensors file as views into one private file mapping.
+
+    Args:
+        path: safetensors file
+
+    Returns:
+        name -> tensor (CPU, backed by the mapping)
+    """
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+    header.pop("__metadata__", None)
+
+    size = os.path.getsize(path)
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=size)
+    data = torch.empty(0, dtype=torch.uint8).set_(storage)
+    begin = 8 + header_len
+
+    tensors = {}
+    for name, info in header.items():
+        dtype = _DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        raw = data[begin + start:begin + end]
+        # A view needs the offset aligned to the element size
+        if (begin + start) % torch.empty(0, dtype=dtype).element_size():
+            raw = raw.clone()
+        tensors[name] = raw.view(dtype).reshape(info["shape"])
+    return tensors
+
+
+@contextlib.contextmanager
+def _meta_parameters():
+    """Create module parameters on the meta device; buffers stay real."""
+    register_parameter = torch.nn.Module.register_parameter
+
+    def register_meta(module, name, param):
+        register_parameter(module, name, param)
+        if param is not None:
+            module._parameters[name] = torch.nn.Parameter(
+                module._parameters[name].to("meta"), requires_grad=param.requires_grad
+            )
+
+    torch.nn.Module.register_parameter = register_meta
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register_parameter
+
+
+def load_causal_lm(parameters: dict, model_id: str, name: str):
+    """
+    Load a causal LM for serving, through the shared store when enabled.
+
+    Parameters:
+        shared_weight_store: "true" maps the weights from the shared store
+                             (default "false": private from_pretrained())
+        shared_weight_store_dir: Store root (default <base>/weights/<name>/shared)
+
+    Returns:
+        The model (float16 on GPU, float32 on CPU)
+    """
+    from transformers import AutoModelForCausalLM
+
+    cuda = torch.cuda.is_available()
+    dtype = torch.float16 if cuda else torch.float32
+
+    if parameters.get("shared_weight_store", {}).get("string_value", "false").lower() == "true":
+        root = parameters.get("shared_weight_store_dir", {}).get("string_value", "") or os.path.join(
+            BASE_DIR, "weights", name, "shared"
+        )
+        store = SharedWeightStore(os.path.join(root, str(dtype).replace("torch.", "")), name)
+        try:
+            model = store.load(model_id, dtype)
+            print(f"[{name}] Weights mapped from shared store {store.store_dir}")
+            return model.to("cuda") if cuda else model
+        except Exception as e:
+            print(f"[{name}] Shared weight store unavailable ({e}); loading {model_id} privately")
+
+    return AutoModelForCausalLM.from_pretrained(
+        model_id,
+        torch_dtype=dtype,
+        device_map="auto" if cuda else None,
+    )
@@ -0,0 +1,161 @@
+"""
+Server-side audio decoding and Whisper log-mel features for the Triton
+Python backend.
+
+Used by whisper-tiny-python for its `audio` input (compressed audio bytes).
+Deployed to <base>/shared/ next to <base>/models/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Clients used to decode audio with librosa and compute the [1, 80, 3000]
+float32 log-mel features with transformers' WhisperProcessor: ~0.9 MB per
+30-second window on the wire (several MB as JSON on the REST path) and a
+transformers dependency on every client. A 30-second FLAC/OGG/MP3 clip is
+tens of KB; decoding it and computing the features next to the model
+shrinks the payload by an order of magnitude.
+
+=============================================================================
+HOW
+=============================================================================
+
+Decoding:
+    soundfile (libsndfile: WAV, FLAC, OGG/Vorbis, MP3 with libsndfile >=
+    1.1) to float32, downmixed to mono. Without soundfile only WAV (PCM,
+    stdlib wave) is accepted. Other sample rates are resampled to 16 kHz
+    (scipy.signal.resample_poly when available, else linear interpolation).
+
+Features (same as transformers' WhisperFeatureExtractor):
+    Each waveform is zero-padded / truncated to 30 s (480000 samples),
+    reflect-padded by n_fft // 2, and framed into [3001, 400] windows with
+    one strided view. A periodic Hann window and one batched rfft give the
+    power spectrum, the mel filters of the model's feature extractor give
+    [n_mels, 3000] (last frame dropped), then log10, clamp to max - 8 and
+    (x + 4) / 4. Computed in float32, _FEATURE_CHUNK windows at a time, so
+    the framing / FFT temporaries stay under ~100 MB however many windows
+    are featurized (a long_form_batch_size 16 batch in float64 in one pass
+    peaked at ~430 MB).
+
+scripts/testing/test_whisper_features.py checks the features against
+WhisperProcessor.
+"""
+
+import io
+import wave
+from math import gcd
+from typing import List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+CHUNK_SECONDS = 30
+N_SAMPLES = CHUNK_SECONDS * SAMPLE_RATE  # 480000
+N_FRAMES = N_SAMPLES // HOP_LENGTH  # 3000
+
+# Periodic Hann window (numpy's hanning is symmetric)
+_WINDOW = np.hanning(N_FFT + 1)[:-1].astype(np.float32)
+
+# Windows featurized per numpy pass (bounds the framing / FFT temporaries)
+_FEATURE_CHUNK = 2
+
+
+def decode_audio(data: bytes) -> np.ndarray:
+    """
+    Decode compressed audio bytes to a 16 kHz mono float32 waveform.
+
+    Args:
+        data: Contents of a WAV / FLAC / OGG / MP3 file
+
+    Returns:
+        float32 [samples] in [-1, 1]
+    """
+    try:
+        import soundfile
+    except ImportError:
+        soundfile = None
+
+    if soundfile is not None:
+        audio, sample_rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        audio = audio.mean(axis=1)
+    elif data[:4] == b"RIFF":
+        audio, sample_rate = _decode_wav(data)
+    else:
+        raise ValueError("Only WAV audio can be decoded without the soundfile package")
+
+    return resample(audio, sample_rate)
+
+
+def _decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """PCM WAV via the standard library (8/16/32-bit integer samples)."""
+    with wave.open(io.BytesIO(data)) as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+    if width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width in (2, 4):
+        dtype = np.int16 if width == 2 else np.int32
+        audio = np.frombuffer(frames, dtype=dtype).astype(np.float32) / float(np.iinfo(dtype).max + 1)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+    return audio.reshape(-1, channels).mean(axis=1), sample_rate
+
+
+def resample(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resample a waveform to SAMPLE_RATE."""
+    if sample_rate == SAMPLE_RATE:
+        return audio.astype(np.float32, copy=False)
+    try:
+        from scipy.signal import resample_poly
+        divisor = gcd(SAMPLE_RATE, sample_rate)
+        return resample_poly(audio, SAMPLE_RATE // divisor, sample_rate // divisor).astype(np.float32)
+    except ImportError:
+        duration = len(audio) / sample_rate
+        target = np.arange(int(round(duration * SAMPLE_RATE))) / SAMPLE_RATE
+        return np.interp(target, np.arange(len(audio)) / sample_rate, audio).astype(np.float32)
+
+
+def log_mel_spectrogram(waveforms: List[np.ndarray], mel_filters: np.ndarray) -> np.ndarray:
+    """
+    Whisper log-mel features of a batch of 16 kHz waveforms.
+
+    Args:
+        waveforms: float32 waveforms (each padded / truncated to 30 s)
+        mel_filters: [n_fft // 2 + 1, n_mels] filter bank
+                     (WhisperFeatureExtractor.mel_filters)
+
+    Returns:
+        float32 [batch, n_mels, 3000]
+    """
+    mel_filters = np.asarray(mel_filters, dtype=np.float32)
+    features = np.empty((len(waveforms), mel_filters.shape[1], N_FRAMES), dtype=np.float32)
+    for first in range(0, len(waveforms), _FEATURE_CHUNK):
+        chunk = waveforms[first:first + _FEATURE_CHUNK]
+        features[first:first + len(chunk)] = _log_mel_chunk(chunk, mel_filters)
+    return features
+
+
+def _log_mel_chunk(waveforms: List[np.ndarray], mel_filters: np.ndarray) -> np.ndarray:
+    """log_mel_spectrogram() of a few waveforms, in one set of float32 numpy ops."""
+    batch = np.zeros((len(waveforms), N_SAMPLES), dtype=np.float32)
+    for row, waveform in enumerate(waveforms):
+        length = min(len(waveform), N_SAMPLES)
+        batch[row, :length] = waveform[:length]
+
+    # center=True framing: reflect padding, then one strided view of all frames
+    padded = np.pad(batch, ((0, 0), (N_FFT // 2, N_FFT // 2)), mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT, axis=-1)[:, ::HOP_LENGTH]
+
+    spectrum = np.fft.rfft(frames * _WINDOW, axis=-1)  # [batch, 3001, 201]
+    power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32, copy=False)
+    del spectrum
+    mel = power @ mel_filters  # [batch, 3001, n_mels]
+    log_spec = np.log10(np.maximum(mel, 1e-10)).transpose(0, 2, 1)[:, :, :-1]
+
+    peak = log_spec.max(axis=(1, 2), keepdims=True)
+    log_spec = np.maximum(log_spec, peak - 8.0)
+    return (log_spec + 4.0) / 4.0
@@ -0,0 +1,192 @@
+"""
+Long-form Whisper transcription helpers for the Triton Python backend:
+overlapping 30-second windows and timestamp-aware stitching.
+
+Used by whisper-tiny-python for requests with long_form=true. Deployed to
+<base>/shared/ next to <base>/models/.
+
+=============================================================================
+WHY
+=============================================================================
+
+Whisper sees exactly 30 seconds per forward pass. Without a long-form mode
+a caller has to cut longer audio into windows itself and send them one
+round trip at a time (20 sequential calls for a 10-minute file), and words
+cut at a window edge are lost or garbled.
+
+=============================================================================
+HOW
+=============================================================================
+
+Windows:
+    30 s windows every 30 - overlap seconds (default overlap 5 s), so each
+    boundary region is heard twice. The model transcribes the windows in
+    batches of up to long_form_batch_size per generate() call (a 10-minute
+    file is 24 windows: two calls at batch size 16) with timestamp tokens.
+
+Segments:
+    timestamp_segments() turns a window's tokens (<|t0|> text <|t1|> ...)
+    into {"start", "end", "text"} segments in absolute seconds. Text after
+    the last timestamp (speech cut by the window end) ends at the window end.
+
+Stitching:
+    Each overlap region is split at its midpoint: a window keeps only the
+    segments that start between the cut before it and the cut after it,
+    which is fixed by the window geometry, so a window's segments can be
+    committed (and streamed) as soon as it is decoded. A segment straddling
+    a cut can be heard by both windows, so the first segment kept from a
+    window has any words that repeat the end of the transcript so far
+    removed (case and punctuation insensitive).
+"""
+
+import math
+import re
+from typing import Callable, Iterable, List, Sequence
+
+WINDOW_SECONDS = 30
+# Whisper timestamp tokens are 20 ms apart (<|0.00|> ... <|30.00|>)
+TIME_PRECISION = 0.02
+# Longest run of words matched when removing a repeat at a window boundary
+MAX_REPEAT_WORDS = 12
+
+
+def window_starts(num_samples: int, sample_rate: int, overlap_seconds: float) -> List[int]:
+    """
+    Sample offsets of the overlapping windows covering a waveform.
+
+    Args:
+        num_samples: Waveform length
+        sample_rate: Samples per second
+        overlap_seconds: Seconds shared by consecutive windows (< 30)
+
+    Returns:
+        Start offsets; the last window may run past the end (it is padded)
+    """
+    window = WINDOW_SECONDS * sample_rate
+    stride = int(round((WINDOW_SECONDS - overlap_seconds) * sample_rate))
+    if stride <= 0:
+        raise ValueError(f"Window overlap must be shorter than {WINDOW_SECONDS}s, got {overlap_seconds}")
+    if num_samples <= window:
+        return [0]
+    return [index * stride for index in range(1 + math.ceil((num_samples - window) / stride))]
+
+
+def timestamp_segments(
+    token_ids: Iterable[int],
+    timestamp_begin: int,
+    special_ids: Sequence[int],
+    decode: Callable[[List[int]], str],
+    offset: float,
+    window_end: float,
+) -> List[dict]:
+    """
+    Segments of one window decoded with timestamp tokens.
+
+    Args:
+        token_ids: Generated ids of the window
+        timestamp_begin: Id of <|0.00|> (all later ids are timestamps)
+        special_ids: Other special ids (start of transcript, language, ...)
+        decode: Text of a list of text token ids
+        offset: Window start in seconds
+        window_end: Window end in seconds (end of a segment cut by the window)
+
+    Returns:
+        [{"start", "end", "text"}] in absolute seconds
+    """
+    special = set(special_ids)
+    segments = []
+    start = None
+    last_time = offset
+    text_tokens = []
+
+    def close(end):
+        text = decode(text_tokens).strip()
+        if text:
+            begin = start if start is not None else last_time
+            segments.append({"start": round(begin, 2), "end": round(max(end, begin), 2), "text": text})
+
+    for token in token_ids:
+        token = int(token)
+        if token >= timestamp_begin:
+            time = offset + (token - timestamp_begin) * TIME_PRECISION
+            if text_tokens:
+                close(time)
+                text_tokens = []
+                start = None
+            else:
+                start = time
+            last_time = time
+        elif token not in special:
+            text_tokens.append(token)
+
+    if text_tokens:
+        close(window_end)
+    return segments
+
+
+def _words(text: str) -> List[str]:
+    return [re.sub(r"[^\w']", "", word.lower()) for word in text.split()]
+
+
+class TranscriptStitcher:
+    """Merges the segments of overlapping windows, in window order."""
+
+    def __init__(self, starts: Sequence[float], overlap_seconds: float):
+        """
+        Args:
+            starts: Window start times in seconds (window_starts / sample rate)
+            overlap_seconds: Seconds shared by consecutive windows
+        """
+        # Window k keeps segments starting in [cuts[k - 1], cuts[k])
+        self.cuts = [start + overlap_seconds / 2 for start in starts[1:]]
+        self.segments = []
+        self._next_window = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join(segment["text"] for segment in self.segments)
+
+    def add(self, window: int, segments: List[dict]) -> List[dict]:
+        """
+        Commit the segments of the next window.
+
+        Args:
+            window: Window index (windows must be added in order)
+            segments: The window's timestamp_segments()
+
+        Returns:
+            The segments newly committed to the transcript
+        """
+        if window != self._next_window:
+            raise ValueError(f"Expected window {self._next_window}, got {window}")
+        self._next_window += 1
+
+        lower = self.cuts[window - 1] if window > 0 else -math.inf
+        upper = self.cuts[window] if window < len(self.cuts) else math.inf
+
+        committed = []
+        for segment in segments:
+            if not lower <= segment["start"] < upper:
+                continue
+            text = segment["text"]
+            if window > 0 and not committed:
+                text = self._remove_repeat(text)
+            if not text:
+                continue
+            start = max(segment["start"], self.segments[-1]["end"]) if self.segments else segment["start"]
+            merged = {"start": start, "end": max(segment["end"], start), "text": text}
+            self.segments.append(merged)
+            committed.append(merged)
+        return committed
+
+    def _remove_repeat(self, text: str) -> str:
+        """Drop leading words of text that repeat the end of the transcript."""
+        if not self.segments:
+            return text
+        previous = _words(" ".join(segment["text"] for segment in self.segments[-2:]))[-MAX_REPEAT_WORDS:]
+        words = text.split()
+        current = _words(text)
+        for count in range(min(len(previous), len(current)), 0, -1):
+            if previous[-count:] == current[:count]:
+                return " ".join(words[count:])
+        return text